@@ -0,0 +1,13 @@
+"""
+Offline Benchmark Suite for the Memory Service
+
+Drives the real UnifiedVectorStore, bulk import, export and graph store
+code paths against local backends only (an in-process pgvector stand-in by
+default, optionally a local Postgres+pgvector or ChromaDB on a temp dir),
+writes throughput, latency percentiles and peak RSS as JSON and compares
+them against stored baselines.
+
+Run from python/memory_service:
+
+    PYTHONPATH=src python -m benchmarks --sizes 100 1000
+"""
@@ -0,0 +1,95 @@
+"""
+Benchmark runner.
+
+    PYTHONPATH=src python -m benchmarks [--sizes 100 1000] [--scenarios ...]
+        [--backend memory|pgvector|chromadb] [--repeat 3] [--output results.json]
+        [--baseline benchmarks/baselines/default.json] [--update-baseline]
+
+Exits with status 1 when any scenario regresses against the baseline.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import tempfile
+from pathlib import Path
+
+from loguru import logger as loguru_logger
+
+from .backends import BACKENDS
+from .harness import compare_to_baseline, load_results, reset_peak_rss, write_results
+from .scenarios import SCENARIOS
+
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "default.json"
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline memory service benchmarks")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000], help="Dataset sizes")
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--backend', choices=BACKENDS, default='memory', help="Primary vector backend")
+    parser.add_argument('--embedding-dim', type=int, default=1536)
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per scenario; the fastest is kept")
+    parser.add_argument('--output', type=Path, default=Path("benchmark_results.json"))
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--tolerance', type=float, default=0.35, help="Allowed relative throughput/latency change")
+    parser.add_argument('--rss-tolerance', type=float, default=0.25,
+                        help="Allowed relative increase of a scenario's RSS growth")
+    parser.add_argument('--update-baseline', action='store_true', help="Write this run as the new baseline")
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    results = []
+    with tempfile.TemporaryDirectory(prefix="memory-bench-") as workdir:
+        for size in args.sizes:
+            for name in args.scenarios:
+                # Best of N filters out scheduler noise on shared machines
+                runs = []
+                for _ in range(args.repeat):
+                    # Bill the scenario's setup (store, seeded corpus) to its RSS growth
+                    reset_peak_rss()
+                    runs.append(await SCENARIOS[name](size, args.backend, workdir, args.embedding_dim))
+                result = max(runs, key=lambda run: run['throughput_per_s'])
+                results.append(result)
+                print(f"{name:>16} [{size:>6}]  {result['throughput_per_s']:>10.1f}/s  "
+                      f"p50 {result['p50_ms']:>8.3f}ms  p95 {result['p95_ms']:>8.3f}ms  "
+                      f"p99 {result['p99_ms']:>8.3f}ms  rss +{result['rss_delta_mb']:.0f}MB")
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    # Per-operation INFO logs would dominate the measurements
+    logging.disable(logging.WARNING)
+    loguru_logger.remove()
+
+    results = asyncio.run(run(args))
+    config = {'backend': args.backend, 'sizes': args.sizes, 'embedding_dim': args.embedding_dim,
+              'repeat': args.repeat}
+    write_results(results, args.output, config)
+    print(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        write_results(results, args.baseline, config)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    regressions = compare_to_baseline(results, load_results(args.baseline), args.tolerance, args.rss_tolerance)
+    if regressions:
+        print("Regressions against baseline:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+
+    print("No regressions against baseline")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
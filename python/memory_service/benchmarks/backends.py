@@ -0,0 +1,262 @@
+"""
+Local Backends for Benchmarks
+
+In-process stand-ins for the pgvector provider and the graph tables, plus
+factories for the optional real local backends. Nothing here talks to the
+production deployment: the Postgres backend only reads BENCH_PG_* variables
+and defaults to localhost.
+"""
+
+import hashlib
+import os
+from datetime import datetime
+from typing import Any
+from uuid import UUID, uuid4
+
+import numpy as np
+from memory_service.chunking import PARENT_KEY
+from memory_service.models import MemoryResponse, ProviderConfig
+from memory_service.unified_store import VectorProvider
+from memory_service.vector_storage import VectorStorage
+
+BACKENDS = ('memory', 'pgvector', 'chromadb')
+
+
+class InMemoryVectorProvider(VectorProvider):
+    """
+    In-process stand-in for PgVectorProvider.
+
+    Brute-force cosine search over a growing NumPy matrix, with the same
+    equality filters on metadata and the same get_recent_memories() hook the
+    store uses for empty queries. Reduced vector storage modes are emulated
+    exactly (prefix/float16/bit candidate search, full-precision rerank), so
+    their recall can be measured without Postgres.
+    """
+
+    def __init__(self, config: ProviderConfig):
+        super().__init__(config)
+        self.embedding_dim = config.config.get('embedding_dim', 1536)
+        self.storage = VectorStorage.from_config(config.config, self.embedding_dim)
+        self._vectors = np.zeros((1024, self.embedding_dim), dtype=np.float32)
+        self._reduced: np.ndarray | None = None
+        self._rows: list[dict[str, Any]] = []
+        # The store's empty-query path checks for a pool before falling back to get_recent_memories
+        self.connection_pool = None
+
+    async def store(self, content: str, embedding: list[float], metadata: dict[str, Any]) -> UUID:
+        if len(self._rows) == len(self._vectors):
+            self._vectors = np.concatenate([self._vectors, np.zeros_like(self._vectors)])
+
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        self._vectors[len(self._rows)] = vector / norm if norm else vector
+
+        memory_id = uuid4()
+        self._reduced = None
+        self._rows.append({
+            'id': memory_id,
+            'content': content,
+            'metadata': dict(metadata),
+            'importance_score': metadata.get('importance_score', 0.5),
+            'created_at': datetime.utcnow()
+        })
+        return memory_id
+
+    def set_vector_storage(self, storage: VectorStorage) -> None:
+        self.storage = storage
+        self._reduced = None
+
+    def _candidate_scores(self, query: np.ndarray, count: int) -> np.ndarray:
+        """Cosine scores in the index's representation (reduced when the storage mode is)."""
+        if not self.storage.reduced:
+            return self._vectors[:count] @ query
+        if self._reduced is None:
+            self._reduced = self.storage.reduce(self._vectors[:count])
+        return self.storage.similarity(self._reduced, self.storage.reduce(query))
+
+    def _matches(self, row: dict[str, Any], filters: dict[str, Any] | None) -> bool:
+        return not filters or all(row['metadata'].get(k) == v for k, v in filters.items())
+
+    def _response(self, row: dict[str, Any], similarity: float | None = None) -> MemoryResponse:
+        return MemoryResponse(
+            id=row['id'],
+            content=row['content'],
+            metadata=row['metadata'],
+            importance_score=row['importance_score'],
+            similarity_score=similarity,
+            created_at=row['created_at']
+        )
+
+    async def query(self, query_embedding: list[float], limit: int, filters: dict[str, Any]) -> list[MemoryResponse]:
+        count = len(self._rows)
+        if not count:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        query = query / norm if norm else query
+        scores = self._candidate_scores(query, count)
+        wanted = limit * self.storage.overfetch if self.storage.reduced else limit
+
+        candidates = []
+        for index in np.argsort(-scores):
+            if self._matches(self._rows[index], filters):
+                candidates.append(index)
+                if len(candidates) >= wanted:
+                    break
+
+        # Rerank (a no-op ordering for full storage) by full-precision cosine
+        full_scores = self._vectors[candidates] @ query if candidates else np.zeros(0)
+        order = np.argsort(-full_scores, kind='stable')[:limit]
+        return [self._response(self._rows[candidates[i]], float(full_scores[i])) for i in order]
+
+    def _memory_rows(self) -> list[dict[str, Any]]:
+        # Chunk rows are part of their parent, as in PgVectorProvider's listings and counts
+        return [row for row in self._rows if PARENT_KEY not in row['metadata']]
+
+    async def get_recent_memories(self, limit: int, filters: dict[str, Any] | None = None) -> list[MemoryResponse]:
+        recent = [row for row in reversed(self._memory_rows()) if self._matches(row, filters)]
+        return [self._response(row) for row in recent[:limit]]
+
+    async def get_memories(self, memory_ids: list[UUID]) -> list[MemoryResponse]:
+        wanted = set(memory_ids)
+        return [self._response(row) for row in self._rows if row['id'] in wanted]
+
+    async def health_check(self) -> dict[str, Any]:
+        return {'status': 'healthy', 'details': {'total_vectors': len(self._memory_rows())}}
+
+    async def get_stats(self) -> dict[str, Any]:
+        memories = len(self._memory_rows())
+        return {'total_memories': memories, 'total_chunks': len(self._rows) - memories}
+
+
+def bench_pg_config() -> dict[str, Any]:
+    """Connection settings for the local benchmark Postgres (BENCH_PG_*)."""
+    return {
+        'host': os.getenv('BENCH_PG_HOST', 'localhost'),
+        'port': int(os.getenv('BENCH_PG_PORT', '5432')),
+        'database': os.getenv('BENCH_PG_DATABASE', 'benchmarks'),
+        'user': os.getenv('BENCH_PG_USER', 'postgres'),
+        'password': os.getenv('BENCH_PG_PASSWORD', 'postgres')
+    }
+
+
+def bench_pg_dsn() -> str:
+    config = bench_pg_config()
+    return (f"postgresql://{config['user']}:{config['password']}@"
+            f"{config['host']}:{config['port']}/{config['database']}")
+
+
+def create_vector_provider(backend: str, workdir: str, embedding_dim: int) -> VectorProvider:
+    """
+    Create the primary provider for a benchmark run.
+
+    Args:
+        backend: 'memory' (default, in-process), 'pgvector' (local Postgres
+            configured via BENCH_PG_HOST/PORT/DATABASE/USER/PASSWORD) or
+            'chromadb' (persisted under workdir)
+        workdir: Temporary directory owned by the run
+        embedding_dim: Embedding dimension used by the mock embedding model
+    """
+    if backend == 'memory':
+        return InMemoryVectorProvider(ProviderConfig(
+            name="pgvector", primary=True, config={'embedding_dim': embedding_dim}
+        ))
+
+    if backend == 'pgvector':
+        from memory_service.providers import PgVectorProvider
+
+        return PgVectorProvider(ProviderConfig(name="pgvector", primary=True, config={
+            **bench_pg_config(),
+            'table_name': f"bench_memories_{uuid4().hex[:8]}",
+            'embedding_dim': embedding_dim
+        }))
+
+    if backend == 'chromadb':
+        from memory_service.providers import ChromaProvider
+
+        return ChromaProvider(ProviderConfig(name="chromadb", primary=True, config={
+            'persist_directory': os.path.join(workdir, 'chroma'),
+            'collection_name': 'benchmark_memories'
+        }))
+
+    raise ValueError(f"Unknown benchmark backend: {backend} (expected one of {BACKENDS})")
+
+
+class InMemoryGraphConnection:
+    """
+    In-process stand-in for the asyncpg connection used by GraphProvider.store.
+
+    Understands the handful of statements the store path issues against
+    graph_nodes, memory_entity_map and graph_relationships.
+    """
+
+    def __init__(self):
+        self.nodes: dict[tuple[str, str], dict[str, Any]] = {}
+        self.nodes_by_id: dict[UUID, dict[str, Any]] = {}
+        self.memory_links: set[tuple[UUID, UUID]] = set()
+        self.relationships: dict[tuple[UUID, UUID, str], dict[str, Any]] = {}
+
+    async def fetch(self, query: str, *args):
+        if "FROM graph_nodes" in query:
+            return [{'id': node['id'], 'entity_name': name, 'entity_type': entity_type}
+                    for (name, entity_type), node in self.nodes.items()]
+        return []
+
+    async def fetchrow(self, query: str, *args):
+        if "FROM graph_nodes" in query:
+            node = self.nodes.get((args[0], args[1]))
+            return {'id': node['id'], 'mention_count': node['mention_count']} if node else None
+        return None
+
+    async def execute(self, query: str, *args):
+        if "INSERT INTO graph_nodes" in query:
+            entity_id, entity_type, entity_name = args[:3]
+            node = {'id': entity_id, 'mention_count': 1}
+            self.nodes[(entity_name, entity_type)] = self.nodes_by_id[entity_id] = node
+        elif "UPDATE graph_nodes" in query:
+            node = self.nodes_by_id.get(args[0])
+            if node:
+                node['mention_count'] += 1
+            return f"UPDATE {1 if node else 0}"
+        elif "INSERT INTO memory_entity_map" in query:
+            self.memory_links.add((args[0], args[1]))
+        elif "INSERT INTO graph_relationships" in query:
+            key = (args[0], args[1], args[2])
+            existing = self.relationships.get(key)
+            if existing:
+                existing['occurrence_count'] += 1
+                existing['strength'] = max(existing['strength'], args[3])
+            else:
+                self.relationships[key] = {'strength': args[3], 'occurrence_count': 1}
+        return "OK"
+
+
+class InMemoryGraphPool:
+    """Pool handing out a single InMemoryGraphConnection."""
+
+    def __init__(self, conn: InMemoryGraphConnection | None = None):
+        self.conn = conn or InMemoryGraphConnection()
+
+    def acquire(self):
+        conn = self.conn
+
+        class AcquireContext:
+            async def __aenter__(self):
+                return conn
+
+            async def __aexit__(self, *args):
+                return None
+
+        return AcquireContext()
+
+
+class HashEntityEncoder:
+    """Deterministic stand-in for the sentence-transformers entity encoder."""
+
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+
+    def encode(self, text: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), 'little')
+        return np.random.default_rng(seed).standard_normal(self.dimension).astype(np.float32)
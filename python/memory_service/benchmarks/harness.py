@@ -0,0 +1,186 @@
+"""
+Benchmark Measurement and Baseline Comparison
+
+Times each operation into the service's own LatencyHistogram, records
+throughput and how far the peak RSS rose above the RSS the scenario started
+from, and compares a run against a stored JSON baseline with relative
+tolerances.
+"""
+
+import gc
+import json
+import platform
+import re
+import resource
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from memory_service.latency import LatencyHistogram
+
+# Latency differences below this are treated as timer noise
+MIN_LATENCY_DELTA_MS = 0.5
+# Percentiles of fewer samples are not compared (batch scenarios rely on throughput)
+MIN_PERCENTILE_SAMPLES = 20
+# RSS growth below this is allocator noise
+MIN_RSS_DELTA_MB = 5.0
+
+# RSS when the current scenario started (see reset_peak_rss)
+_rss_start_mb: float | None = None
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of this process in MB: VmHWM on Linux (which
+    reset_peak_rss can reset), otherwise ru_maxrss (KB on Linux, bytes on macOS).
+    """
+    try:
+        with open('/proc/self/status') as status:
+            return int(re.search(r'VmHWM:\s+(\d+)', status.read()).group(1)) / 1024
+    except (OSError, AttributeError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def current_rss_mb() -> float:
+    """Current resident set size in MB (the peak where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize() / (1024 * 1024)
+    except OSError:
+        return peak_rss_mb()
+
+
+def reset_peak_rss() -> None:
+    """
+    Start measuring RSS for a new scenario: collect garbage, reset the
+    high-water mark to the current RSS and remember that RSS.
+
+    Resetting needs Linux (/proc/self/clear_refs). Elsewhere the peak stays
+    the process high-water mark, so a scenario is only billed for pushing it
+    higher than the scenarios before it did.
+    """
+    global _rss_start_mb
+    gc.collect()
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+    except OSError:
+        pass
+    _rss_start_mb = current_rss_mb()
+
+
+async def measure(scenario: str,
+                  size: int,
+                  operation: Callable[[int], Awaitable[Any]],
+                  iterations: int,
+                  items_per_operation: int = 1) -> dict[str, Any]:
+    """
+    Run operation(i) for i in range(iterations) and summarize it.
+
+    Args:
+        scenario: Scenario name
+        size: Dataset size the scenario was parametrized with
+        operation: Coroutine function taking the iteration index
+        iterations: Number of timed calls
+        items_per_operation: Records handled per call (for batch scenarios)
+
+    Returns:
+        Result dict with throughput (items/s), latency percentiles and
+        rss_delta_mb: peak RSS growth since reset_peak_rss (called here when
+        the runner did not call it before setting the scenario up)
+    """
+    global _rss_start_mb
+    histogram = LatencyHistogram()
+    if _rss_start_mb is None:
+        reset_peak_rss()
+    started = time.perf_counter()
+    for i in range(iterations):
+        call_started = time.perf_counter()
+        await operation(i)
+        histogram.record(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+    rss_delta_mb = max(peak_rss_mb() - _rss_start_mb, 0.0)
+    _rss_start_mb = None
+
+    return {
+        'scenario': scenario,
+        'size': size,
+        'operations': iterations,
+        'items': iterations * items_per_operation,
+        'elapsed_s': round(elapsed, 4),
+        'throughput_per_s': round(iterations * items_per_operation / elapsed, 2) if elapsed else 0.0,
+        **histogram.snapshot(),
+        'rss_delta_mb': round(rss_delta_mb, 1)
+    }
+
+
+def write_results(results: list[dict[str, Any]], path: Path, config: dict[str, Any]) -> None:
+    """Write a run (or a baseline) as JSON."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            **config
+        },
+        'results': results
+    }
+    path.write_text(json.dumps(payload, indent=2) + "\n")
+
+
+def load_results(path: Path) -> list[dict[str, Any]]:
+    return json.loads(path.read_text())['results']
+
+
+def compare_to_baseline(results: list[dict[str, Any]],
+                        baseline: list[dict[str, Any]],
+                        tolerance: float = 0.25,
+                        rss_tolerance: float = 0.25) -> list[str]:
+    """
+    Compare a run against a baseline.
+
+    A scenario regresses when throughput drops, or p50/p95 latency grows, by
+    more than `tolerance` (relative), or the RSS growth of the scenario
+    exceeds the baseline's by more than `rss_tolerance` (and
+    MIN_RSS_DELTA_MB). Scenarios missing from the baseline are ignored, and
+    latency percentiles are only compared for scenarios with at least
+    MIN_PERCENTILE_SAMPLES operations.
+
+    Returns:
+        Human-readable regression messages (empty when the run passes)
+    """
+    expected = {(entry['scenario'], entry['size']): entry for entry in baseline}
+    regressions = []
+
+    for result in results:
+        key = (result['scenario'], result['size'])
+        base = expected.get(key)
+        if base is None:
+            continue
+        label = f"{result['scenario']}[{result['size']}]"
+
+        if result['throughput_per_s'] < base['throughput_per_s'] * (1 - tolerance):
+            regressions.append(
+                f"{label}: throughput {result['throughput_per_s']:.1f}/s "
+                f"< baseline {base['throughput_per_s']:.1f}/s"
+            )
+
+        for metric in ('p50_ms', 'p95_ms'):
+            if result['operations'] < MIN_PERCENTILE_SAMPLES:
+                break
+            limit = base[metric] * (1 + tolerance)
+            if result[metric] > limit and result[metric] - base[metric] > MIN_LATENCY_DELTA_MS:
+                regressions.append(f"{label}: {metric} {result[metric]:.3f} > baseline {base[metric]:.3f}")
+
+        rss_limit = base['rss_delta_mb'] * (1 + rss_tolerance)
+        if result['rss_delta_mb'] > rss_limit and result['rss_delta_mb'] - base['rss_delta_mb'] > MIN_RSS_DELTA_MB:
+            regressions.append(
+                f"{label}: RSS growth {result['rss_delta_mb']:.1f}MB > baseline {base['rss_delta_mb']:.1f}MB"
+            )
+
+    return regressions
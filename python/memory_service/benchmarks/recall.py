@@ -0,0 +1,483 @@
+"""
+Recall@k Harness Across Vector Providers
+
+Generates clustered synthetic corpora with user/conversation metadata,
+computes exact top-k ground truth with NumPy and reports recall@k, QPS and
+latency percentiles per provider and index configuration, so index
+parameters (ivfflat lists/probes, HNSW m/ef) are chosen from measurements.
+
+Run from python/memory_service:
+
+    PYTHONPATH=src python -m benchmarks.recall --providers memory lite pgvector chromadb \\
+        --size 20000 --dimension 384 --filtered-fraction 0.3 \\
+        --configs exact ivfflat:lists=100,probes=1 ivfflat:lists=100,probes=10 hnsw:m=16,ef_search=40
+
+Reduced ANN storage (memory_service.vector_storage) is selected per config
+with ann_dim, halfvec, binary and overfetch, e.g. hnsw:m=16,ef_search=40,ann_dim=256,halfvec=1
+or hnsw:m=16,binary=1,overfetch=20. --target-recall marks which configs reach
+the recall we require, to pick the smallest overfetch that does.
+Note that only real text-embedding-3 vectors are Matryoshka-trained: on the
+synthetic corpus a prefix keeps less information, so its recall is a lower bound.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from memory_service.latency import LatencyHistogram
+from memory_service.vector_storage import (
+    BINARY_OVERFETCH,
+    DEFAULT_OVERFETCH,
+    VectorStorage,
+)
+
+from .backends import bench_pg_dsn, create_vector_provider
+from .harness import write_results
+
+PROVIDERS = ('memory', 'lite', 'pgvector', 'chromadb')
+DEFAULT_CONFIGS = [
+    'exact',
+    'ivfflat:lists=100,probes=1',
+    'ivfflat:lists=100,probes=10',
+    'hnsw:m=16,ef_construction=64,ef_search=40',
+]
+# IndexConfig params that select the vector storage mode rather than the index
+STORAGE_PARAMS = ('ann_dim', 'halfvec', 'binary', 'overfetch')
+
+
+@dataclass
+class SyntheticCorpus:
+    """Unit-norm corpus and query vectors with per-document metadata."""
+    vectors: np.ndarray
+    metadata: list[dict[str, str]]
+    queries: np.ndarray
+    query_filters: list[dict[str, str] | None]
+
+
+@dataclass
+class IndexConfig:
+    """Index configuration parsed from 'kind:key=value,...' (e.g. 'ivfflat:lists=100,probes=10')."""
+    kind: str
+    params: dict[str, int] = field(default_factory=dict)
+    label: str = ''
+
+    @classmethod
+    def parse(cls, spec: str) -> 'IndexConfig':
+        kind, _, raw_params = spec.partition(':')
+        params = {}
+        for item in filter(None, raw_params.split(',')):
+            key, _, value = item.partition('=')
+            params[key.strip()] = int(value)
+        if kind not in ('exact', 'ivfflat', 'hnsw'):
+            raise ValueError(f"Unknown index kind '{kind}' in '{spec}'")
+        return cls(kind=kind, params=params, label=spec)
+
+    @property
+    def reduced_storage(self) -> bool:
+        return any(key in self.params for key in STORAGE_PARAMS)
+
+    def storage(self, dim: int) -> VectorStorage:
+        """Vector storage selected by ann_dim / halfvec / binary / overfetch (full by default)."""
+        binary = bool(self.params.get('binary', 0))
+        return VectorStorage(
+            dim=dim,
+            ann_dim=min(self.params.get('ann_dim', dim), dim),
+            halfvec=bool(self.params.get('halfvec', 0)),
+            binary=binary,
+            overfetch=max(1, self.params.get('overfetch', BINARY_OVERFETCH if binary else DEFAULT_OVERFETCH))
+        )
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+def generate_corpus(size: int,
+                    dimension: int,
+                    num_queries: int = 200,
+                    num_clusters: int | None = None,
+                    cluster_spread: float = 0.6,
+                    num_users: int = 20,
+                    num_conversations: int = 200,
+                    filtered_fraction: float = 0.0,
+                    filter_field: str = 'user_id',
+                    seed: int = 0) -> SyntheticCorpus:
+    """
+    Generate a clustered synthetic corpus.
+
+    Documents and queries are drawn around the same random cluster centers
+    (sqrt(size) clusters by default), which mimics topical embedding data
+    far better than uniform noise. Each conversation belongs to one user, so
+    user_id has num_users values and conversation_id num_conversations.
+
+    Args:
+        size: Number of documents
+        dimension: Vector dimension
+        num_queries: Number of query vectors
+        num_clusters: Cluster count (default sqrt(size))
+        cluster_spread: Norm of the noise added to a unit cluster center
+        num_users: Distinct user_id values
+        num_conversations: Distinct conversation_id values
+        filtered_fraction: Share of queries filtered on filter_field
+        filter_field: Metadata field used by filtered queries
+        seed: RNG seed
+    """
+    rng = np.random.default_rng(seed)
+    num_clusters = num_clusters or max(1, int(np.sqrt(size)))
+    centers = _normalize(rng.standard_normal((num_clusters, dimension)))
+
+    def sample(count: int) -> np.ndarray:
+        assignment = rng.integers(num_clusters, size=count)
+        noise = rng.standard_normal((count, dimension)) * (cluster_spread / np.sqrt(dimension))
+        return _normalize(centers[assignment] + noise)
+
+    conversations = rng.integers(num_conversations, size=size)
+    metadata = [
+        {'user_id': f"user_{conversation % num_users}", 'conversation_id': f"conv_{conversation}"}
+        for conversation in conversations.tolist()
+    ]
+
+    query_filters: list[dict[str, str] | None] = []
+    for _ in range(num_queries):
+        if rng.random() < filtered_fraction:
+            query_filters.append({filter_field: metadata[int(rng.integers(size))][filter_field]})
+        else:
+            query_filters.append(None)
+
+    return SyntheticCorpus(vectors=sample(size), metadata=metadata, queries=sample(num_queries),
+                           query_filters=query_filters)
+
+
+def exact_top_k(corpus: SyntheticCorpus, k: int, chunk_size: int = 256) -> list[np.ndarray]:
+    """Exact cosine top-k document indices per query, honouring query filters."""
+    labels: dict[str, np.ndarray] = {}
+    truth = []
+    for start in range(0, len(corpus.queries), chunk_size):
+        scores = corpus.queries[start:start + chunk_size] @ corpus.vectors.T
+        for offset, row in enumerate(scores):
+            filters = corpus.query_filters[start + offset]
+            if filters:
+                mask = np.ones(len(row), dtype=bool)
+                for key, value in filters.items():
+                    if key not in labels:
+                        labels[key] = np.array([meta[key] for meta in corpus.metadata])
+                    mask &= labels[key] == value
+                row = np.where(mask, row, -np.inf)
+                limit = min(k, int(mask.sum()))
+            else:
+                limit = min(k, len(row))
+            if limit == 0:
+                truth.append(np.zeros(0, dtype=np.int64))
+                continue
+            top = np.argpartition(-row, limit - 1)[:limit]
+            truth.append(top[np.argsort(-row[top])])
+    return truth
+
+
+class RecallTarget(ABC):
+    """A searchable store under test; search results are corpus indices."""
+
+    name: str = ''
+    supports_filters = True
+    index_kinds: tuple[str, ...] = ('exact',)
+
+    @property
+    def supports_storage(self) -> bool:
+        """Whether configs with reduced vector storage params apply to this target."""
+        return False
+
+    @abstractmethod
+    async def load(self, corpus: SyntheticCorpus) -> None:
+        """Insert the corpus."""
+
+    async def configure(self, config: IndexConfig) -> None:  # noqa: B027 - optional hook, no-op by default
+        """Switch to an index configuration (after load)."""
+
+    @abstractmethod
+    async def search(self, query: np.ndarray, k: int, filters: dict[str, str] | None) -> list[int]:
+        """Return corpus indices of the top-k results."""
+
+    async def close(self) -> None:  # noqa: B027 - optional hook, no-op by default
+        """Release resources."""
+
+
+class ProviderTarget(RecallTarget):
+    """Any VectorProvider; documents are mapped back to corpus indices by returned ID."""
+
+    def __init__(self, name: str, provider):
+        self.name = name
+        self.provider = provider
+        self.index_by_id: dict[str, int] = {}
+
+    @property
+    def supports_storage(self) -> bool:
+        return hasattr(self.provider, 'set_vector_storage')
+
+    async def load(self, corpus: SyntheticCorpus) -> None:
+        self.index_by_id = {}
+        for i, (vector, metadata) in enumerate(zip(corpus.vectors, corpus.metadata, strict=True)):
+            memory_id = await self.provider.store(f"synthetic memory {i}", vector.tolist(), dict(metadata))
+            self.index_by_id[str(memory_id)] = i
+
+    async def configure(self, config: IndexConfig) -> None:
+        if self.supports_storage:
+            self.provider.set_vector_storage(config.storage(self.provider.embedding_dim))
+
+    async def search(self, query: np.ndarray, k: int, filters: dict[str, str] | None) -> list[int]:
+        results = await self.provider.query(query.tolist(), k, filters or {})
+        return [self.index_by_id[str(m.id)] for m in results if str(m.id) in self.index_by_id]
+
+
+class PgVectorTarget(ProviderTarget):
+    """PgVectorProvider on a fresh table; index configs rebuild the embedding index."""
+
+    index_kinds = ('exact', 'ivfflat', 'hnsw')
+
+    async def load(self, corpus: SyntheticCorpus) -> None:
+        await self.provider.start()
+        await super().load(corpus)
+
+    async def configure(self, config: IndexConfig) -> None:
+        table = self.provider.table_name
+        pool = self.provider.connection_pool
+
+        async with pool.acquire() as conn:
+            await conn.execute(f"DROP INDEX IF EXISTS {self.provider.ann_index_name}")
+            self.provider.set_vector_storage(config.storage(self.provider.embedding_dim))
+            storage = self.provider.storage
+            index = self.provider.ann_index_name
+            indexed = f"{storage.index_expression()} {storage.opclass}"
+            if config.kind == 'ivfflat':
+                await conn.execute(f"""
+                    CREATE INDEX {index} ON {table}
+                    USING ivfflat ({indexed})
+                    WITH (lists = {config.params.get('lists', 100)})
+                """)
+            elif config.kind == 'hnsw':
+                await conn.execute(f"""
+                    CREATE INDEX {index} ON {table}
+                    USING hnsw ({indexed})
+                    WITH (m = {config.params.get('m', 16)},
+                          ef_construction = {config.params.get('ef_construction', 64)})
+                """)
+            await conn.execute(f"ANALYZE {table}")
+
+        # Search-time parameters are per session, so reconnect the provider's pool with them
+        server_settings = {'jit': 'off'}
+        if 'probes' in config.params:
+            server_settings['ivfflat.probes'] = str(config.params['probes'])
+        if 'ef_search' in config.params:
+            server_settings['hnsw.ef_search'] = str(config.params['ef_search'])
+        pool.set_connect_args(bench_pg_dsn(), server_settings=server_settings)
+        await pool.expire_connections()
+
+    async def close(self) -> None:
+        async with self.provider.connection_pool.acquire() as conn:
+            await conn.execute(f"DROP TABLE IF EXISTS {self.provider.table_name}")
+        await self.provider.close()
+
+
+class ChromaTarget(ProviderTarget):
+    """ChromaProvider on a temp dir; every HNSW config gets a freshly loaded collection."""
+
+    index_kinds = ('hnsw',)
+
+    def __init__(self, name: str, provider):
+        super().__init__(name, provider)
+        self.corpus: SyntheticCorpus | None = None
+        self._collections = 0
+
+    async def load(self, corpus: SyntheticCorpus) -> None:
+        # Loading happens per configuration, since HNSW parameters are fixed at creation
+        self.corpus = corpus
+
+    async def configure(self, config: IndexConfig) -> None:
+        self._collections += 1
+        metadata = {'hnsw:space': 'cosine'}
+        for key, chroma_key in (('m', 'hnsw:M'), ('ef_construction', 'hnsw:construction_ef'),
+                                ('ef_search', 'hnsw:search_ef')):
+            if key in config.params:
+                metadata[chroma_key] = config.params[key]
+        self.provider.collection = self.provider.client.create_collection(
+            name=f"recall_{self._collections}", metadata=metadata
+        )
+        await super().load(self.corpus)
+
+
+class LiteTarget(RecallTarget):
+    """core_memory_slice.LiteVectorStore (brute force, no metadata filters)."""
+
+    supports_filters = False
+
+    def __init__(self, workdir: str):
+        sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+        from core_memory_slice import LiteVectorStore
+
+        self.name = 'lite'
+        self.store = LiteVectorStore(str(Path(workdir) / "lite_vectors.json"))
+
+    async def load(self, corpus: SyntheticCorpus) -> None:
+        # upsert() rewrites the JSON file on every call, so fill the store and save once
+        for i, (vector, metadata) in enumerate(zip(corpus.vectors, corpus.metadata, strict=True)):
+            self.store.data["vectors"][str(i)] = vector.tolist()
+            self.store.data["metadata"][str(i)] = metadata
+        self.store._save_store()
+
+    async def search(self, query: np.ndarray, k: int, filters: dict[str, str] | None) -> list[int]:
+        return [int(doc_id) for doc_id, _, _ in self.store.search(query.tolist(), k)]
+
+
+def create_target(name: str, workdir: str, dimension: int) -> RecallTarget:
+    if name == 'lite':
+        return LiteTarget(workdir)
+    provider = create_vector_provider(name, workdir, dimension)
+    if name == 'pgvector':
+        return PgVectorTarget(name, provider)
+    if name == 'chromadb':
+        return ChromaTarget(name, provider)
+    return ProviderTarget(name, provider)
+
+
+async def evaluate(target: RecallTarget,
+                   corpus: SyntheticCorpus,
+                   truth: list[np.ndarray],
+                   k: int,
+                   config: IndexConfig) -> dict[str, Any]:
+    """Run every query once and summarize recall@k, QPS and latency."""
+    histogram = LatencyHistogram()
+    recalls: dict[bool, list[float]] = {False: [], True: []}
+    skipped = 0
+
+    started = time.perf_counter()
+    for query, filters, expected in zip(corpus.queries, corpus.query_filters, truth, strict=True):
+        if filters and not target.supports_filters:
+            skipped += 1
+            continue
+        call_started = time.perf_counter()
+        found = await target.search(query, k, filters)
+        histogram.record(time.perf_counter() - call_started)
+        hits = len(set(found) & set(expected.tolist()))
+        recalls[bool(filters)].append(hits / len(expected) if len(expected) else 1.0)
+    elapsed = time.perf_counter() - started
+
+    every = recalls[False] + recalls[True]
+    return {
+        'provider': target.name,
+        'config': config.label,
+        'k': k,
+        'queries': len(every),
+        'skipped_filtered_queries': skipped,
+        'recall_at_k': round(float(np.mean(every)), 4) if every else None,
+        'unfiltered_recall_at_k': round(float(np.mean(recalls[False])), 4) if recalls[False] else None,
+        'filtered_recall_at_k': round(float(np.mean(recalls[True])), 4) if recalls[True] else None,
+        'qps': round(len(every) / elapsed, 1) if elapsed else 0.0,
+        **histogram.snapshot()
+    }
+
+
+async def run_recall(providers: list[str],
+                     configs: list[IndexConfig],
+                     corpus: SyntheticCorpus,
+                     k: int,
+                     workdir: str,
+                     target_recall: float | None = None) -> list[dict[str, Any]]:
+    """
+    Evaluate every provider under every index configuration it supports.
+    With target_recall, each result records whether its recall@k reaches it.
+    """
+    truth = exact_top_k(corpus, k)
+    dimension = corpus.vectors.shape[1]
+    results = []
+
+    for name in providers:
+        try:
+            target = create_target(name, workdir, dimension)
+            load_started = time.perf_counter()
+            await target.load(corpus)
+            load_seconds = time.perf_counter() - load_started
+        except Exception as e:
+            print(f"Skipping {name}: {e}")
+            continue
+
+        try:
+            for config in configs:
+                if config.kind not in target.index_kinds:
+                    continue
+                if config.reduced_storage and not target.supports_storage:
+                    continue
+                configure_started = time.perf_counter()
+                await target.configure(config)
+                result = await evaluate(target, corpus, truth, k, config)
+                result['load_s'] = round(load_seconds, 2)
+                result['configure_s'] = round(time.perf_counter() - configure_started, 2)
+                marker = ''
+                if target_recall is not None:
+                    result['meets_target'] = (result['recall_at_k'] or 0.0) >= target_recall
+                    marker = '  ok' if result['meets_target'] else '  BELOW TARGET'
+                results.append(result)
+                print(f"{name:>9} {config.label:<44} recall@{k} {result['recall_at_k']}  "
+                      f"qps {result['qps']:>8.1f}  p50 {result['p50_ms']:.3f}ms  "
+                      f"p95 {result['p95_ms']:.3f}ms  p99 {result['p99_ms']:.3f}ms{marker}")
+        finally:
+            await target.close()
+
+    return results
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Recall@k / QPS harness for vector providers")
+    parser.add_argument('--providers', nargs='+', choices=PROVIDERS, default=['memory', 'lite'])
+    parser.add_argument('--configs', nargs='+', default=DEFAULT_CONFIGS,
+                        help="Index configs, e.g. exact ivfflat:lists=100,probes=10 hnsw:m=16,ef_search=40")
+    parser.add_argument('--size', type=int, default=10000)
+    parser.add_argument('--dimension', type=int, default=384)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--clusters', type=int, default=None)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--conversations', type=int, default=200)
+    parser.add_argument('--filtered-fraction', type=float, default=0.0)
+    parser.add_argument('--filter-field', choices=['user_id', 'conversation_id'], default='user_id')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--target-recall', type=float, default=None,
+                        help="Flag configs whose recall@k falls below this (e.g. 0.95)")
+    parser.add_argument('--output', type=Path, default=Path("recall_results.json"))
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    logging.disable(logging.WARNING)
+
+    configs = [IndexConfig.parse(spec) for spec in args.configs]
+    corpus = generate_corpus(
+        args.size, args.dimension, num_queries=args.queries, num_clusters=args.clusters,
+        num_users=args.users, num_conversations=args.conversations,
+        filtered_fraction=args.filtered_fraction, filter_field=args.filter_field, seed=args.seed
+    )
+
+    with tempfile.TemporaryDirectory(prefix="memory-recall-") as workdir:
+        results = asyncio.run(run_recall(args.providers, configs, corpus, args.k, workdir, args.target_recall))
+
+    write_results(results, args.output, {
+        'size': args.size, 'dimension': args.dimension, 'queries': args.queries, 'k': args.k,
+        'clusters': args.clusters, 'users': args.users, 'conversations': args.conversations,
+        'filtered_fraction': args.filtered_fraction, 'filter_field': args.filter_field, 'seed': args.seed,
+        'target_recall': args.target_recall
+    })
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""
+Query Log Replay
+
+Replays a sampled query log (memory_service.query_log) against a local
+UnifiedVectorStore at the original pace, a scaled pace or as fast as
+possible, and reports the latency distribution and cache hit ratio next to
+the latencies recorded in production.
+
+Query text is never logged, so each distinct query hash is replayed as a
+deterministic synthetic query of the same token count: repeats stay
+repeats (and hit the cache) while content stays private. The seeded corpus
+carries the hashed filter values seen in the log, so filtered queries
+match rows.
+
+    PYTHONPATH=src python -m benchmarks.replay logs/query_log.jsonl --speed 4 --seed-size 5000
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from loguru import logger as loguru_logger
+
+from memory_service.latency import LatencyHistogram
+from memory_service.models import MemoryRequest, QueryRequest
+from memory_service.query_log import load_query_log
+from memory_service.unified_store import UnifiedVectorStore
+
+from .backends import BACKENDS
+from .harness import write_results
+from .scenarios import VOCABULARY, build_store, make_corpus
+
+
+def synthetic_query(entry: dict[str, Any]) -> str:
+    """Deterministic stand-in text for a logged query hash."""
+    if entry.get('empty') or not entry.get('query_hash'):
+        return ""
+    rng = random.Random(entry['query_hash'])
+    return " ".join(rng.choices(VOCABULARY, k=max(1, entry.get('query_tokens', 1))))
+
+
+def to_request(entry: dict[str, Any]) -> QueryRequest:
+    """Rebuild a QueryRequest with the logged shape."""
+    return QueryRequest(
+        query=synthetic_query(entry),
+        # GET /memories accepts larger limits than QueryRequest allows
+        limit=max(1, min(entry.get('limit', 10), 100)),
+        min_similarity=entry.get('min_similarity', 0.3),
+        filters=dict(entry.get('filters') or {}),
+        user_id=entry.get('user_id'),
+        conversation_id=entry.get('conversation_id'),
+        providers=entry.get('providers'),
+        graph_expand=entry.get('graph_expand', False),
+        graph_hops=entry.get('graph_hops', 1)
+    )
+
+
+def seed_metadata(entries: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Distinct filter combinations seen in the log, used as corpus metadata."""
+    combinations = []
+    seen = set()
+    for entry in entries:
+        metadata = dict(entry.get('filters') or {})
+        for key in ('user_id', 'conversation_id'):
+            if entry.get(key):
+                metadata[key] = entry[key]
+        marker = tuple(sorted(metadata.items()))
+        if metadata and marker not in seen:
+            seen.add(marker)
+            combinations.append(metadata)
+    return combinations
+
+
+async def seed_store(store: UnifiedVectorStore, entries: list[dict[str, Any]], size: int) -> None:
+    combinations = seed_metadata(entries)
+    for i, content in enumerate(make_corpus(size)):
+        metadata = combinations[i % len(combinations)] if combinations and i % 2 == 0 else {}
+        await store.store_memory(MemoryRequest(content=content, metadata=dict(metadata), importance_score=0.5))
+
+
+async def replay(store: UnifiedVectorStore,
+                 entries: list[dict[str, Any]],
+                 speed: float | None = 1.0,
+                 concurrency: int = 64) -> dict[str, Any]:
+    """
+    Replay entries against the store.
+
+    Args:
+        store: Seeded store
+        entries: Log entries sorted by timestamp
+        speed: Pace multiplier on the original inter-arrival times
+            (2.0 = twice as fast); None replays back to back
+        concurrency: Maximum in-flight queries
+
+    Returns:
+        Replayed and original latency snapshots, cache hit ratio, errors and
+        the largest scheduling lag
+    """
+    histogram = LatencyHistogram()
+    original = LatencyHistogram()
+    semaphore = asyncio.Semaphore(concurrency)
+    cache_hits_before = store.stats.get('cache_hits', 0)
+    errors = 0
+    max_lag = 0.0
+
+    async def run_one(request: QueryRequest):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await store.query_memories(request)
+            except Exception:
+                errors += 1
+            histogram.record(time.perf_counter() - started)
+
+    first_ts = entries[0]['ts'] if entries else 0.0
+    tasks = []
+    replay_started = time.perf_counter()
+    for entry in entries:
+        original.record(entry.get('latency_ms', 0.0) / 1000)
+        if speed:
+            due = replay_started + (entry['ts'] - first_ts) / speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                max_lag = max(max_lag, -delay)
+        tasks.append(asyncio.create_task(run_one(to_request(entry))))
+        if not speed:
+            await tasks[-1]
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - replay_started
+
+    cache_hits = store.stats.get('cache_hits', 0) - cache_hits_before
+    return {
+        'scenario': 'replay',
+        'queries': len(entries),
+        'speed': speed,
+        'elapsed_s': round(elapsed, 4),
+        'throughput_per_s': round(len(entries) / elapsed, 2) if elapsed else 0.0,
+        'cache_hits': cache_hits,
+        'cache_hit_ratio': round(cache_hits / len(entries), 4) if entries else 0.0,
+        'errors': errors,
+        'max_schedule_lag_ms': round(max_lag * 1000, 3),
+        'latency': histogram.snapshot(),
+        'original_latency': original.snapshot()
+    }
+
+
+def summarize_log(entries: list[dict[str, Any]]) -> dict[str, Any]:
+    """Traffic shape of a log: empty-query share, repeat rate, limits and filter keys."""
+    if not entries:
+        return {'queries': 0}
+    hashes = [entry['query_hash'] for entry in entries if entry.get('query_hash')]
+    limits: dict[int, int] = {}
+    filter_shapes: dict[str, int] = {}
+    for entry in entries:
+        limits[entry.get('limit', 0)] = limits.get(entry.get('limit', 0), 0) + 1
+        keys = sorted(entry.get('filters') or {})
+        keys += [key for key in ('user_id', 'conversation_id') if entry.get(key)]
+        shape = ",".join(keys) or "none"
+        filter_shapes[shape] = filter_shapes.get(shape, 0) + 1
+    return {
+        'queries': len(entries),
+        'empty_query_share': round(sum(1 for e in entries if e.get('empty')) / len(entries), 4),
+        'repeat_rate': round(1 - len(set(hashes)) / len(hashes), 4) if hashes else 0.0,
+        'error_share': round(sum(1 for e in entries if e.get('status') != 'ok') / len(entries), 4),
+        'limits': {str(limit): count for limit, count in sorted(limits.items())},
+        'filter_shapes': filter_shapes,
+        'duration_s': round(entries[-1]['ts'] - entries[0]['ts'], 3)
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay a sampled query log against a local store")
+    parser.add_argument('log', type=Path, help="Query log path (rotated backups are included)")
+    parser.add_argument('--speed', type=float, default=1.0, help="Pace multiplier on original arrival times")
+    parser.add_argument('--max-rate', action='store_true', help="Ignore timestamps and replay back to back")
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--seed-size', type=int, default=1000, help="Synthetic memories seeded before replay")
+    parser.add_argument('--backend', choices=BACKENDS, default='memory')
+    parser.add_argument('--embedding-dim', type=int, default=1536)
+    parser.add_argument('--output', type=Path, default=Path("replay_results.json"))
+    return parser.parse_args(argv)
+
+
+async def run(args: argparse.Namespace, entries: list[dict[str, Any]]) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="memory-replay-") as workdir:
+        store = await build_store(args.backend, workdir, args.embedding_dim)
+        await seed_store(store, entries, args.seed_size)
+        return await replay(store, entries, None if args.max_rate else args.speed, args.concurrency)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    logging.disable(logging.WARNING)
+    loguru_logger.remove()
+
+    entries = [entry for entry in load_query_log(args.log) if 'ts' in entry]
+    if not entries:
+        print(f"No query log entries in {args.log}")
+        return 1
+
+    shape = summarize_log(entries)
+    result = asyncio.run(run(args, entries))
+    latency, original = result['latency'], result['original_latency']
+    print(f"Replayed {result['queries']} queries in {result['elapsed_s']:.2f}s "
+          f"({result['throughput_per_s']:.1f}/s), cache hit ratio {result['cache_hit_ratio']:.1%}, "
+          f"errors {result['errors']}")
+    print(f"  replay   p50 {latency['p50_ms']:.3f}ms  p95 {latency['p95_ms']:.3f}ms  p99 {latency['p99_ms']:.3f}ms")
+    print(f"  original p50 {original['p50_ms']:.3f}ms  p95 {original['p95_ms']:.3f}ms  p99 {original['p99_ms']:.3f}ms")
+
+    write_results([result], args.output, {
+        'log': str(args.log), 'backend': args.backend, 'seed_size': args.seed_size,
+        'embedding_dim': args.embedding_dim, 'traffic': shape
+    })
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+Benchmark Scenarios
+
+Each scenario builds its own store on the selected local backend, seeds it
+with a deterministic synthetic corpus where needed (untimed) and then times
+one real service code path: store_memory, query_memories, bulk import,
+JSON export and the knowledge graph store.
+"""
+
+import base64
+import json
+import random
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from fastapi import BackgroundTasks
+from memory_service.bulk_import_simple import (
+    BulkImportRequest,
+    BulkImportService,
+    ImportFormat,
+    ImportOptions,
+)
+from memory_service.embedding_models import MockEmbeddingModel
+from memory_service.memory_export import (
+    ExportFilters,
+    ExportFormat,
+    ExportRequest,
+    MemoryExportService,
+)
+from memory_service.models import MemoryRequest, ProviderConfig, QueryRequest
+from memory_service.providers import GraphProvider
+from memory_service.unified_store import UnifiedVectorStore
+
+from .backends import HashEntityEncoder, InMemoryGraphPool, create_vector_provider
+from .harness import measure
+
+# Timed queries per size; the corpus itself is seeded untimed
+QUERY_COUNT = 200
+IMPORT_ITERATIONS = 3
+EXPORT_ITERATIONS = 5
+
+VOCABULARY = [
+    "meeting", "project", "deadline", "review", "design", "budget", "customer", "release",
+    "database", "index", "latency", "memory", "vector", "search", "report", "planning",
+    "invoice", "contract", "feedback", "roadmap", "migration", "incident", "dashboard",
+    "onboarding", "training", "quarterly", "weekly", "priority", "launch", "analysis",
+    "the", "a", "with", "for", "about", "after", "before", "during", "and", "from", "to",
+]
+ENTITIES = [
+    "Nike", "Adidas", "Portland", "Berlin", "Microsoft", "Google", "Alice Johnson",
+    "Bob Smith", "Acme Analytics", "Seattle", "London", "Tesla", "Maria Garcia", "Tokyo",
+]
+
+
+def make_corpus(size: int, seed: int = 42) -> list[str]:
+    """Deterministic synthetic memories with two capitalized entities each."""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(size):
+        words = rng.choices(VOCABULARY, k=rng.randint(20, 60))
+        first, second = rng.sample(ENTITIES, 2)
+        corpus.append(f"{first} {' '.join(words)} with {second} (note {seed}-{i})")
+    return corpus
+
+
+async def build_store(backend: str, workdir: str, embedding_dim: int) -> UnifiedVectorStore:
+    """UnifiedVectorStore on a local backend with the mock embedding model."""
+    provider = create_vector_provider(backend, workdir, embedding_dim)
+    await provider.start()
+
+    store = UnifiedVectorStore([provider], embedding_model=MockEmbeddingModel(embedding_dim))
+    # Never share a Redis cache across runs
+    store.query_cache = {}
+    return store
+
+
+async def _seed(store: UnifiedVectorStore, corpus: list[str]) -> None:
+    for content in corpus:
+        # Fixed importance skips ADM so seeding stays cheap
+        await store.store_memory(MemoryRequest(content=content, importance_score=0.5))
+
+
+async def bench_store_memory(size: int, backend: str, workdir: str, embedding_dim: int) -> dict[str, Any]:
+    store = await build_store(backend, workdir, embedding_dim)
+    corpus = make_corpus(size)
+
+    async def operation(i: int):
+        await store.store_memory(MemoryRequest(content=corpus[i], metadata={'source': 'benchmark'}))
+
+    return await measure('store_memory', size, operation, size)
+
+
+async def bench_query_memories(size: int, backend: str, workdir: str, embedding_dim: int) -> dict[str, Any]:
+    store = await build_store(backend, workdir, embedding_dim)
+    await _seed(store, make_corpus(size))
+    # A different seed gives distinct query strings, so nothing is served from cache
+    queries = make_corpus(min(size, QUERY_COUNT), seed=7)
+
+    async def operation(i: int):
+        await store.query_memories(QueryRequest(query=queries[i], limit=10))
+
+    return await measure('query_memories', size, operation, len(queries))
+
+
+async def bench_batch_import(size: int, backend: str, workdir: str, embedding_dim: int) -> dict[str, Any]:
+    store = await build_store(backend, workdir, embedding_dim)
+    service = BulkImportService(store)
+    payloads = [
+        base64.b64encode("\n".join(
+            json.dumps({'content': content, 'importance_score': 0.5})
+            for content in make_corpus(size, seed=100 + iteration)
+        ).encode()).decode()
+        for iteration in range(IMPORT_ITERATIONS)
+    ]
+
+    async def operation(i: int):
+        background_tasks = BackgroundTasks()
+        job = await service.import_memories(
+            BulkImportRequest(format=ImportFormat.JSONL, data=payloads[i], options=ImportOptions(batch_size=100)),
+            background_tasks
+        )
+        await background_tasks()
+        progress = await service.get_import_status(job['import_id'])
+        if progress.successful_records != size:
+            raise RuntimeError(f"Import stored {progress.successful_records}/{size} records")
+
+    return await measure('batch_import', size, operation, IMPORT_ITERATIONS, items_per_operation=size)
+
+
+async def bench_export(size: int, backend: str, workdir: str, embedding_dim: int) -> dict[str, Any]:
+    store = await build_store(backend, workdir, embedding_dim)
+    await _seed(store, make_corpus(size))
+    service = MemoryExportService(store)
+
+    async def operation(_i: int):
+        response = await service.export_memories(
+            ExportRequest(format=ExportFormat.JSON, filters=ExportFilters(limit=size))
+        )
+        async for _ in response.body_iterator:
+            pass
+
+    return await measure('export', size, operation, EXPORT_ITERATIONS, items_per_operation=size)
+
+
+async def bench_graph_store(size: int, _backend: str, _workdir: str, _embedding_dim: int) -> dict[str, Any]:
+    # The graph tables always use the in-process stand-in
+    provider = GraphProvider(ProviderConfig(name="graph", config={'connection_pool': InMemoryGraphPool()}))
+    provider._embedding_model = HashEntityEncoder()
+    corpus = make_corpus(size)
+
+    async def operation(i: int):
+        writes = provider._graph_writes
+        await provider.store(corpus[i], [], {'importance_score': 0.5})
+        # GraphProvider.store logs and swallows graph errors; timing those would be meaningless
+        if provider._graph_writes != writes + 1:
+            raise RuntimeError(f"Graph store failed for memory {i} (see the log)")
+
+    return await measure('graph_store', size, operation, size)
+
+
+SCENARIOS: dict[str, Callable[..., Awaitable[dict[str, Any]]]] = {
+    'store_memory': bench_store_memory,
+    'query_memories': bench_query_memories,
+    'batch_import': bench_batch_import,
+    'export': bench_export,
+    'graph_store': bench_graph_store,
+}
@@ -4,13 +4,20 @@ Entity Deduplication and Dashboard Sync
 Priority #1: Fix the trust crisis by cleaning entities and syncing with Agent 3
 """
 
+import argparse
 import asyncio
 import json
 import logging
+import os
+import sys
 from datetime import datetime
 
 import asyncpg
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from memory_service.entity_resolution import EntityResolver
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("entity_deduplication")
 
@@ -44,7 +51,14 @@ class EntityDeduplicator:
             "ACE": ["ace", "Ace", "A.C.E."]
         }
 
-    async def analyze_duplicates(self) -> dict[str, list[str]]:
+    def _build_resolver(self, entities) -> EntityResolver:
+        """Index entity names under their blocking keys."""
+        resolver = EntityResolver(rules=self.rules)
+        for entity in entities:
+            resolver.add(entity['id'], entity['entity_name'])
+        return resolver
+
+    async def analyze_duplicates(self, only_ids: set | None = None) -> dict[str, list[dict]]:
         """Analyze all entities and find duplicates"""
         logger.info("🔍 Analyzing entities for duplicates...")
 
@@ -57,64 +71,20 @@ class EntityDeduplicator:
 
         logger.info(f"📊 Found {len(entities)} total entities")
 
-        # Find duplicates using rules and fuzzy matching
-        duplicates = {}
-        processed = set()
+        # Only entities sharing a blocking key are compared
+        resolver = self._build_resolver(entities)
+        by_id = {entity['id']: entity for entity in entities}
 
-        for canonical, aliases in self.rules.items():
-            found_entities = []
-            for entity in entities:
-                name = entity['entity_name']
-                if name in processed:
-                    continue
-
-                # Check exact matches (case insensitive)
-                if name.lower() == canonical.lower() or name.lower() in [a.lower() for a in aliases]:
-                    found_entities.append(entity)
-                    processed.add(name)
-
-            if len(found_entities) > 1:
-                duplicates[canonical] = found_entities
-                logger.info(f"  Found {len(found_entities)} variations of '{canonical}'")
-
-        # Find additional duplicates using similarity
-        remaining_entities = [e for e in entities if e['entity_name'] not in processed]
-        for i, e1 in enumerate(remaining_entities):
-            similar = []
-            for e2 in remaining_entities[i+1:]:
-                if self._are_similar(e1['entity_name'], e2['entity_name']):
-                    similar.append(e2)
-
-            if similar:
-                duplicates[e1['entity_name']] = [e1] + similar
-                logger.info(f"  Found {len(similar) + 1} similar to '{e1['entity_name']}'")
+        duplicates = {}
+        for cluster in resolver.find_clusters(only_ids):
+            canonical = resolver.canonical_name(cluster)
+            members = sorted((by_id[entity_id] for entity_id in cluster), key=lambda e: e['entity_name'])
+            duplicates.setdefault(canonical, []).extend(members)
+            logger.info(f"  Found {len(members)} variations of '{canonical}'")
 
+        logger.info(f"📊 {resolver.comparisons} pair comparisons for {len(entities)} entities")
         return duplicates
 
-    def _are_similar(self, name1: str, name2: str) -> bool:
-        """Check if two entity names are similar"""
-        # Normalize
-        n1 = name1.lower().strip()
-        n2 = name2.lower().strip()
-
-        # Exact match
-        if n1 == n2:
-            return True
-
-        # One contains the other
-        if n1 in n2 or n2 in n1:
-            return True
-
-        # Remove common suffixes and check
-        suffixes = [' inc', ' inc.', ' corp', ' corp.', ' llc', ' ltd']
-        for suffix in suffixes:
-            n1_clean = n1.replace(suffix, '')
-            n2_clean = n2.replace(suffix, '')
-            if n1_clean == n2_clean:
-                return True
-
-        return False
-
     async def create_canonicalization_table(self):
         """Create table to track entity canonicalization"""
         logger.info("📋 Creating canonicalization table...")
@@ -137,64 +107,150 @@ class EntityDeduplicator:
 
     async def merge_entities(self, canonical_name: str, entities: list[dict]) -> str:
         """Merge multiple entity variations into one canonical entity"""
-        logger.info(f"🔄 Merging {len(entities)} entities into '{canonical_name}'")
+        merged = await self.merge_all({canonical_name: entities})
+        return merged[canonical_name]
+
+    async def merge_all(self, duplicates: dict[str, list[dict]]) -> dict[str, str]:
+        """
+        Merge every duplicate cluster in one transaction.
+
+        The duplicate -> canonical mapping is copied into a temp table once and
+        each table is then rewritten with a single set-based statement, instead
+        of five statements per duplicate entity.
+        """
+        merge_rows = []      # (duplicate_id, canonical_id)
+        canonical_rows = []  # (canonical_id, canonical_name, total_mentions, max_importance, merged_names)
+        alias_rows = []      # (alias, canonical_name, canonical_id)
+        canonical_ids = {}
 
-        # Find the best entity to keep (highest importance × mention count)
-        best_entity = max(entities, key=lambda e:
-                         (e['importance_score'] or 0.5) * (e['mention_count'] or 1))
-        canonical_id = best_entity['id']
+        for canonical_name, entities in duplicates.items():
+            if len(entities) < 2:
+                continue
+            logger.info(f"🔄 Merging {len(entities)} entities into '{canonical_name}'")
+
+            # Find the best entity to keep (highest importance × mention count)
+            best_entity = max(entities, key=lambda e:
+                             (e['importance_score'] or 0.5) * (e['mention_count'] or 1))
+            canonical_id = best_entity['id']
+            canonical_ids[canonical_name] = canonical_id
+
+            canonical_rows.append((
+                canonical_id,
+                canonical_name,
+                sum(e['mention_count'] or 1 for e in entities),
+                max(e['importance_score'] or 0.5 for e in entities),
+                json.dumps([e['entity_name'] for e in entities if e['id'] != canonical_id])
+            ))
+            for entity in entities:
+                if entity['id'] != canonical_id:
+                    merge_rows.append((entity['id'], canonical_id))
+                    alias_rows.append((entity['entity_name'], canonical_name, canonical_id))
+
+        if not merge_rows:
+            return canonical_ids
+
+        async with self.conn.transaction():
+            await self.conn.execute("""
+                CREATE TEMP TABLE entity_merge_map (
+                    duplicate_id UUID PRIMARY KEY,
+                    canonical_id UUID NOT NULL
+                ) ON COMMIT DROP
+            """)
+            await self.conn.copy_records_to_table(
+                'entity_merge_map', records=merge_rows, columns=['duplicate_id', 'canonical_id']
+            )
+
+            # Update the canonical entities with aggregated data
+            await self.conn.execute("""
+                UPDATE graph_nodes gn
+                SET entity_name = c.canonical_name,
+                    mention_count = c.total_mentions,
+                    importance_score = c.max_importance,
+                    properties = COALESCE(gn.properties, '{}'::jsonb)
+                        || jsonb_build_object('merged_from', c.merged_from::jsonb)
+                FROM unnest($1::uuid[], $2::text[], $3::int[], $4::float8[], $5::text[])
+                    AS c(canonical_id, canonical_name, total_mentions, max_importance, merged_from)
+                WHERE gn.id = c.canonical_id
+            """, *map(list, zip(*canonical_rows, strict=True)))
+
+            # Record all aliases
+            await self.conn.execute("""
+                INSERT INTO entity_canonicalization (alias, canonical_name, canonical_id)
+                SELECT * FROM unnest($1::text[], $2::text[], $3::uuid[])
+                ON CONFLICT (alias) DO UPDATE
+                SET canonical_name = EXCLUDED.canonical_name,
+                    canonical_id = EXCLUDED.canonical_id
+            """, *map(list, zip(*alias_rows, strict=True)))
+
+            # Re-point relationships, folding ones that now collide and
+            # dropping self-loops created by the merge
+            await self.conn.execute("""
+                INSERT INTO graph_relationships
+                    (from_node_id, to_node_id, relationship_type, strength, confidence,
+                     occurrence_count, first_seen, last_seen)
+                SELECT
+                    COALESCE(mf.canonical_id, r.from_node_id),
+                    COALESCE(mt.canonical_id, r.to_node_id),
+                    r.relationship_type,
+                    MAX(r.strength), MAX(r.confidence),
+                    SUM(r.occurrence_count), MIN(r.first_seen), MAX(r.last_seen)
+                FROM graph_relationships r
+                LEFT JOIN entity_merge_map mf ON r.from_node_id = mf.duplicate_id
+                LEFT JOIN entity_merge_map mt ON r.to_node_id = mt.duplicate_id
+                WHERE (mf.duplicate_id IS NOT NULL OR mt.duplicate_id IS NOT NULL)
+                  AND COALESCE(mf.canonical_id, r.from_node_id) <> COALESCE(mt.canonical_id, r.to_node_id)
+                GROUP BY 1, 2, 3
+                ON CONFLICT (from_node_id, to_node_id, relationship_type) DO UPDATE SET
+                    occurrence_count = graph_relationships.occurrence_count + EXCLUDED.occurrence_count,
+                    strength = GREATEST(graph_relationships.strength, EXCLUDED.strength),
+                    last_seen = GREATEST(graph_relationships.last_seen, EXCLUDED.last_seen)
+            """)
+            await self.conn.execute("""
+                DELETE FROM graph_relationships r
+                USING entity_merge_map m
+                WHERE r.from_node_id = m.duplicate_id OR r.to_node_id = m.duplicate_id
+            """)
+
+            # Update memory-entity mappings
+            await self.conn.execute("""
+                INSERT INTO memory_entity_map (memory_id, entity_id, position_start, position_end, confidence)
+                SELECT mem.memory_id, m.canonical_id, mem.position_start, mem.position_end, mem.confidence
+                FROM memory_entity_map mem
+                JOIN entity_merge_map m ON mem.entity_id = m.duplicate_id
+                ON CONFLICT DO NOTHING
+            """)
+
+            # Delete the duplicate entities (remaining mappings cascade)
+            await self.conn.execute("""
+                DELETE FROM graph_nodes gn
+                USING entity_merge_map m
+                WHERE gn.id = m.duplicate_id
+            """)
+
+        return canonical_ids
+
+    async def deduplicate_incremental(self, since: datetime) -> dict[str, int]:
+        """
+        Deduplicate only entities inserted since the given time.
+
+        New entities are compared against the whole graph through the
+        blocking index, but old/old pairs are never re-examined.
+        """
+        await self.create_canonicalization_table()
 
-        # Update the canonical entity with aggregated data
-        total_mentions = sum(e['mention_count'] or 1 for e in entities)
-        max_importance = max(e['importance_score'] or 0.5 for e in entities)
+        rows = await self.conn.fetch("""
+            SELECT id FROM graph_nodes WHERE created_at >= $1
+        """, since)
+        new_ids = {row['id'] for row in rows}
+        if not new_ids:
+            return {"new_entities": 0, "entities_merged": 0}
 
-        await self.conn.execute("""
-            UPDATE graph_nodes
-            SET entity_name = $1,
-                mention_count = $2,
-                importance_score = $3,
-                properties = properties || '{"merged_from": []}'::jsonb
-            WHERE id = $4
-        """, canonical_name, total_mentions, max_importance, canonical_id)
-
-        # Record all aliases
-        for entity in entities:
-            if entity['id'] != canonical_id:
-                # Record in canonicalization table
-                await self.conn.execute("""
-                    INSERT INTO entity_canonicalization (alias, canonical_name, canonical_id)
-                    VALUES ($1, $2, $3)
-                    ON CONFLICT (alias) DO UPDATE
-                    SET canonical_name = EXCLUDED.canonical_name,
-                        canonical_id = EXCLUDED.canonical_id
-                """, entity['entity_name'], canonical_name, canonical_id)
-
-                # Update relationships to point to canonical entity
-                await self.conn.execute("""
-                    UPDATE graph_relationships
-                    SET from_node_id = $1
-                    WHERE from_node_id = $2
-                """, canonical_id, entity['id'])
-
-                await self.conn.execute("""
-                    UPDATE graph_relationships
-                    SET to_node_id = $1
-                    WHERE to_node_id = $2
-                """, canonical_id, entity['id'])
-
-                # Update memory-entity mappings
-                await self.conn.execute("""
-                    UPDATE memory_entity_map
-                    SET entity_id = $1
-                    WHERE entity_id = $2
-                """, canonical_id, entity['id'])
-
-                # Delete the duplicate entity
-                await self.conn.execute("""
-                    DELETE FROM graph_nodes WHERE id = $1
-                """, entity['id'])
-
-        return canonical_id
+        duplicates = await self.analyze_duplicates(only_ids=new_ids)
+        await self.merge_all(duplicates)
+        merged_count = sum(len(entities) - 1 for entities in duplicates.values())
+
+        logger.info(f"✅ Incremental deduplication merged {merged_count} of {len(new_ids)} new entities")
+        return {"new_entities": len(new_ids), "entities_merged": merged_count}
 
     async def deduplicate_all(self) -> dict[str, int]:
         """Main deduplication process"""
@@ -209,12 +265,9 @@ class EntityDeduplicator:
         # Analyze duplicates
         duplicates = await self.analyze_duplicates()
 
-        # Merge duplicates
-        merged_count = 0
-        for canonical_name, entities in duplicates.items():
-            if len(entities) > 1:
-                await self.merge_entities(canonical_name, entities)
-                merged_count += len(entities) - 1
+        # Merge duplicates in one batched transaction
+        await self.merge_all(duplicates)
+        merged_count = sum(len(entities) - 1 for entities in duplicates.values() if len(entities) > 1)
 
         # Remove duplicate relationships
         await self.conn.execute("""
@@ -333,6 +386,11 @@ async def refresh_dashboard_cache():
 
 async def main():
     """Run the complete deduplication and sync setup"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--since", type=datetime.fromisoformat,
+                        help="Only deduplicate entities created at or after this ISO timestamp")
+    args = parser.parse_args()
+
     logger.info("="*60)
     logger.info("🎯 PRIORITY #1: Entity Deduplication + Dashboard Sync")
     logger.info("="*60)
@@ -344,8 +402,15 @@ async def main():
     )
 
     try:
-        # Step 1: Deduplicate entities
         deduplicator = EntityDeduplicator(conn)
+        if args.since:
+            # Incremental run: new entities against the whole graph, no sync setup
+            results = await deduplicator.deduplicate_incremental(args.since)
+            print(f"✅ New entities since {args.since.isoformat()}: {results['new_entities']}")
+            print(f"✅ Entities merged: {results['entities_merged']}")
+            return
+
+        # Step 1: Deduplicate entities
         results = await deduplicator.deduplicate_all()
 
         # Step 2: Show results
@@ -230,6 +230,9 @@ CREATE TABLE IF NOT EXISTS graph_nodes (
     first_seen TIMESTAMP DEFAULT NOW(),                     -- When entity first appeared
     last_seen TIMESTAMP DEFAULT NOW(),                      -- Most recent mention
     mention_count INTEGER DEFAULT 1,                        -- Total mentions across memories
+    pagerank FLOAT DEFAULT 0,                               -- Weighted PageRank (graph analytics job)
+    degree INTEGER DEFAULT 0,                               -- Distinct neighbours (graph analytics job)
+    centrality_updated_at TIMESTAMP,                        -- Last centrality recomputation
     created_at TIMESTAMP DEFAULT NOW()
 );
 
@@ -266,6 +269,7 @@ CREATE INDEX IF NOT EXISTS graph_nodes_entity_type_idx ON graph_nodes (entity_ty
 CREATE INDEX IF NOT EXISTS graph_nodes_entity_name_idx ON graph_nodes (entity_name);
 CREATE INDEX IF NOT EXISTS graph_nodes_importance_idx ON graph_nodes (importance_score DESC);
 CREATE INDEX IF NOT EXISTS graph_nodes_mention_count_idx ON graph_nodes (mention_count DESC);
+CREATE INDEX IF NOT EXISTS graph_nodes_degree_idx ON graph_nodes (degree DESC, importance_score DESC);
 CREATE INDEX IF NOT EXISTS graph_nodes_embedding_hnsw_idx 
     ON graph_nodes USING hnsw (embedding vector_cosine_ops)
     WITH (m = 16, ef_construction = 64);
@@ -448,10 +452,12 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
--- Apply trigger to vector_memories table
+-- Apply trigger to vector_memories table (chunk rows of long memories share
+-- content between revisions and are never deduplicated on their own)
 CREATE TRIGGER trigger_auto_hash_memory
 AFTER INSERT ON vector_memories
 FOR EACH ROW
+WHEN (NOT (NEW.metadata ? 'parent_id'))
 EXECUTE FUNCTION auto_hash_memory();
 
 -- Display initialization success
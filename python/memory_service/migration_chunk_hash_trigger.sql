@@ -0,0 +1,23 @@
+-- Keep chunk rows of long memories out of memory_content_hashes
+-- (see src/memory_service/chunking.py).
+--
+-- content_hash is UNIQUE, so a second revision of a long document failed on
+-- its first chunk identical to a chunk of the previous revision. Chunk rows are
+-- never deduplicated on their own; only parent rows need a hash.
+
+BEGIN;
+
+DROP TRIGGER IF EXISTS trigger_auto_hash_memory ON vector_memories;
+
+CREATE TRIGGER trigger_auto_hash_memory
+AFTER INSERT ON vector_memories
+FOR EACH ROW
+WHEN (NOT (NEW.metadata ? 'parent_id'))
+EXECUTE FUNCTION auto_hash_memory();
+
+-- Drop hashes already recorded for chunk rows
+DELETE FROM memory_content_hashes h
+USING vector_memories m
+WHERE h.memory_id = m.id AND m.metadata ? 'parent_id';
+
+COMMIT;
@@ -0,0 +1,43 @@
+-- Switch the pgvector ANN index to a reduced representation
+-- (see src/memory_service/vector_storage.py).
+--
+-- The reduced vector is an index expression over the existing embedding
+-- column, so no rows are rewritten: build the new index next to the old one,
+-- point the service at it, then drop the old index. Requires pgvector >= 0.7
+-- (halfvec, subvector). Only text-embedding-3 embeddings are Matryoshka-trained;
+-- for other models use PGVECTOR_STORAGE=halfvec (no dimension cut).
+
+-- Step 1: Build the reduced index without blocking writes
+-- (512 leading dimensions as halfvec: ~1 KB per entry instead of ~6 KB)
+SET maintenance_work_mem = '256MB';
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_vector_memories_embedding_512h
+ON vector_memories
+USING ivfflat ((subvector(embedding, 1, 512)::halfvec(512)) halfvec_cosine_ops)
+WITH (lists = 100);
+
+-- Step 2: Compare index sizes
+SELECT indexrelname, pg_size_pretty(pg_relation_size(indexrelid)) AS size
+FROM pg_stat_user_indexes
+WHERE relname = 'vector_memories' AND indexrelname LIKE 'idx_vector_memories_embedding%';
+
+-- Step 3: Restart the service with
+--   PGVECTOR_STORAGE=matryoshka:512+halfvec
+--   PGVECTOR_RERANK_OVERFETCH=4
+-- and check recall first with:
+--   python -m benchmarks.recall --providers pgvector --dimension 1536 \
+--       --configs ivfflat:lists=100,probes=10 ivfflat:lists=100,probes=10,ann_dim=512,halfvec=1
+
+-- Step 4: Once every instance runs with the new setting and queries use the
+-- new index, drop the full-precision one with
+-- migration_reduced_ann_index_cutover.sql. It is kept separate so that running
+-- this file never removes the index the service is still using.
+
+-- Alternative for very large tables: binary quantization (1 bit per dimension,
+-- ~32x smaller than the full index), searched by Hamming distance and reranked
+-- at full precision. Use with PGVECTOR_STORAGE=binary and tune
+-- PGVECTOR_RERANK_OVERFETCH (default 10) with benchmarks.recall --target-recall.
+--
+-- CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_vector_memories_embedding_1536b
+-- ON vector_memories
+-- USING hnsw ((binary_quantize(embedding)::bit(1536)) bit_hamming_ops);
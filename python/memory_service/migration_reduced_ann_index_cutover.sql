@@ -0,0 +1,14 @@
+-- Drop the full-precision pgvector ANN index after switching to a reduced one
+-- (see migration_reduced_ann_index.sql).
+--
+-- Run this only after every instance has been restarted with the reduced
+-- PGVECTOR_STORAGE setting: instances still on full storage order by the raw
+-- embedding and fall back to a sequential scan once this index is gone.
+
+-- Check that the reduced index exists and is valid before dropping
+SELECT c.relname, i.indisvalid
+FROM pg_index i
+JOIN pg_class c ON c.oid = i.indexrelid
+WHERE c.relname LIKE 'idx_vector_memories_embedding%';
+
+DROP INDEX CONCURRENTLY IF EXISTS idx_vector_memories_embedding;
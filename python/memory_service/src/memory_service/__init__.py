@@ -13,8 +13,13 @@ This service leverages existing implementations:
 __version__ = "0.1.0"
 __author__ = "Core Nexus Team"
 
-from .api import create_memory_app
-from .models import (
+# Installed first so the rest of the package import is timed (see /metrics/startup)
+from .startup_profile import startup_profile
+
+startup_profile.install_import_hook()
+
+from .api import create_memory_app  # noqa: E402
+from .models import (  # noqa: E402
     EntityInsights,
     GraphNode,
     GraphQuery,
@@ -25,9 +30,9 @@ from .models import (
     QueryRequest,
     QueryResponse,
 )
-from .providers import ChromaProvider, GraphProvider, PgVectorProvider, PineconeProvider
-from .temporal import TemporalMemoryStore
-from .unified_store import UnifiedVectorStore
+from .providers import ChromaProvider, GraphProvider, PgVectorProvider, PineconeProvider  # noqa: E402
+from .temporal import TemporalMemoryStore  # noqa: E402
+from .unified_store import UnifiedVectorStore  # noqa: E402
 
 __all__ = [
     "UnifiedVectorStore",
@@ -6,15 +6,14 @@ wrapping the UnifiedVectorStore with proper error handling and validation.
 """
 
 import asyncio
-import hashlib
 import json
-import logging
 import os
 import sys
 import time
 from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Any
+from uuid import UUID
 
 from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -26,6 +25,10 @@ from .bulk_import_simple import (
     BulkImportService,
     ImportProgress,
 )
+from .chunking import TextChunker
+from .db_monitoring import DatabaseMonitor, initialize_db_monitor
+from .log_broadcast import FORMATS as LOG_FORMATS
+from .log_broadcast import LogBroadcaster, render_dropped
 from .logging_config import get_logger, setup_logging
 from .memory_export import (
     ExportRequest,
@@ -41,6 +44,12 @@ from .models import (
     QueryResponse,
 )
 from .providers import ChromaProvider, PgVectorProvider, PineconeProvider
+from .pool_manager import SharedPoolManager
+from .query_log import QueryLogSampler
+from .replica_router import parse_replica_hosts
+from .startup_profile import startup_profile
+from .temporal import TemporalMemoryStore
+from .tracking import UsageCollector, UsageTrackingMiddleware
 from .unified_store import UnifiedVectorStore
 from .observability import (
     initialize_observability,
@@ -64,24 +73,158 @@ logger = get_logger("api")
 
 # Global instances
 unified_store: UnifiedVectorStore | None = None
-usage_collector: Any = None  # Type: UsageCollector when implemented
+usage_collector: UsageCollector | None = None
 memory_dashboard: Any = None  # Type: MemoryDashboard when implemented
 bulk_import_service: BulkImportService | None = None
 memory_export_service: MemoryExportService | None = None
+query_log_sampler: QueryLogSampler | None = None
+pool_manager: SharedPoolManager | None = None
+log_broadcaster: LogBroadcaster | None = None
+
+
+def _create_chroma_provider(chroma_config: ProviderConfig):
+    """Build the ChromaDB provider (blocking: imports chromadb and opens the client)."""
+    # Use instrumented provider if observability is enabled
+    if os.getenv("OTEL_TRACING_ENABLED", "true").lower() == "true":
+        from .providers_instrumented import InstrumentedChromaProvider
+        logger.info("Using instrumented ChromaDB provider")
+        return InstrumentedChromaProvider(chroma_config)
+    return ChromaProvider(chroma_config)
+
+
+def _create_embedding_model():
+    """
+    Build the embedding model (blocking): the local CPU model when
+    EMBEDDING_PROVIDER=local, else OpenAI, or the mock model without an API key.
+    """
+    # Shortened embeddings only for a table created with that dimension; to keep
+    # full vectors and shrink just the ANN index, use PGVECTOR_STORAGE instead
+    dimension = int(os.getenv("EMBEDDING_DIMENSIONS", "1536"))
+    try:
+        from .embedding_models import create_embedding_model
+        from .rate_limiter import EmbeddingRateLimiter
+
+        if os.getenv("EMBEDDING_PROVIDER", "openai").lower() == "local":
+            embedding_model = create_embedding_model(
+                provider="local",
+                model=os.getenv("LOCAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"),
+                backend=os.getenv("LOCAL_EMBEDDING_BACKEND", "torch"),
+                onnx_file=os.getenv("LOCAL_EMBEDDING_ONNX_FILE") or None,
+                max_batch_size=int(os.getenv("LOCAL_EMBEDDING_BATCH_SIZE", "32")),
+                max_wait_ms=float(os.getenv("LOCAL_EMBEDDING_MAX_WAIT_MS", "5")),
+                num_workers=int(os.getenv("LOCAL_EMBEDDING_WORKERS", "1"))
+            )
+        else:
+            # Check if OpenAI API key is available
+            openai_api_key = os.getenv("OPENAI_API_KEY")
+            if openai_api_key and openai_api_key.strip():
+                embedding_model = create_embedding_model(
+                    provider="openai",
+                    model="text-embedding-3-small",
+                    api_key=openai_api_key,
+                    max_retries=3,
+                    timeout=30.0,
+                    dimensions=dimension if dimension != 1536 else None,
+                    rate_limiter=EmbeddingRateLimiter.from_env()
+                )
+                logger.info(f"Initialized OpenAI embedding model: text-embedding-3-small ({dimension} dims)")
+            else:
+                embedding_model = create_embedding_model(provider="mock", dimension=dimension)
+                logger.warning("No OpenAI API key found, using mock embeddings")
+            return embedding_model
+
+    except Exception as e:
+        logger.error(f"Failed to initialize embedding model: {e}")
+        # Fallback to mock model
+        from .embedding_models import MockEmbeddingModel
+        logger.warning("Using mock embedding model as fallback")
+        return MockEmbeddingModel(dimension=dimension)
+
+    # Outside the fallback above: every store and query would fail on the vector
+    # column, so a mismatched local model stops startup instead
+    if embedding_model.dimension != dimension:
+        raise RuntimeError(
+            f"Local embedding model produces {embedding_model.dimension} dims but "
+            f"EMBEDDING_DIMENSIONS={dimension}; set it to match the vector tables"
+        )
+    return embedding_model
+
+
+async def _start_provider(provider) -> bool:
+    """Run a provider's async start() (pools, schema, warmup), recording it in the startup profile."""
+    try:
+        await startup_profile.timed(f"provider.{provider.name}.start", provider.start())
+        return True
+    except Exception as e:
+        logger.error(f"Provider {provider.name} failed to start: {e}")
+        return False
+
+
+async def _mark_ready_when_primary_ready(app: FastAPI, store: UnifiedVectorStore):
+    """Start all providers; readiness flips once the primary has started and warmed up."""
+    primary = store.primary_provider
+    secondaries = [
+        asyncio.create_task(_start_provider(p)) for p in store.providers.values() if p is not primary
+    ]
+    if not await _start_provider(primary):
+        # Never ready: stop timing imports anyway
+        startup_profile.remove_import_hook()
+        return
+    app.state.ready = True
+    startup_profile.mark_ready()
+    await asyncio.gather(*secondaries)
+
+
+async def _attach_secondary(store: UnifiedVectorStore, provider_task: asyncio.Task):
+    """Add a secondary provider to the store once its background initialization finishes."""
+    try:
+        provider = await provider_task
+    except Exception as e:
+        logger.error(f"ChromaDB provider failed to initialize: {e}")
+        return
+    await _start_provider(provider)
+    store.add_provider(provider)
+    logger.info(f"{provider.name} provider initialized as secondary")
+
+
+async def _start_db_monitor(monitor: DatabaseMonitor):
+    """Point the database monitor at the shared pool's background lane."""
+    try:
+        await monitor.initialize_pool()
+    except Exception as e:
+        logger.warning(f"Database monitor not started: {e}")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    """Application lifespan; the startup import hook is removed when it ends, even if startup fails."""
+    try:
+        async with _service_lifespan(app):
+            yield
+    finally:
+        startup_profile.remove_import_hook()
+
+
+@asynccontextmanager
+async def _service_lifespan(app: FastAPI):
     """Application lifespan management."""
     global unified_store, usage_collector, memory_dashboard, bulk_import_service, memory_export_service
+    global query_log_sampler, pool_manager, log_broadcaster
 
     # Startup
     logger.info("Initializing Core Nexus Memory Service...")
     
+    app.state.ready = False
+
+    # One handler feeds every /logs/stream client
+    log_broadcaster = LogBroadcaster.from_env()
+    log_broadcaster.install()
+
     # Initialize OpenTelemetry observability
     try:
-        observability_config = ObservabilityConfig()
-        initialize_observability(app, observability_config)
+        with startup_profile.phase("observability"):
+            observability_config = ObservabilityConfig()
+            initialize_observability(app, observability_config)
         logger.info("OpenTelemetry observability initialized successfully")
     except Exception as e:
         logger.warning(f"Failed to initialize observability: {e}")
@@ -100,30 +243,51 @@ async def lifespan(app: FastAPI):
         logger.error("PGPASSWORD or PGVECTOR_PASSWORD environment variable is required but not set")
         raise ValueError("PGPASSWORD or PGVECTOR_PASSWORD must be set in environment variables")
 
+    pg_connection = {
+        "host": pgvector_host,
+        "port": int(os.getenv("PGVECTOR_PORT", "5432")),
+        "database": os.getenv("PGVECTOR_DATABASE", "nexus_memory_db"),
+        "user": os.getenv("PGVECTOR_USER", "nexus_memory_db_user"),
+        "password": pgvector_password
+    }
+    # One pool per worker for every Postgres subsystem, split into budgeted lanes
+    # (query, write, graph, background) so workers x pool size stays under the server limit
+    pool_manager = SharedPoolManager.from_env(pg_connection)
+
     pgvector_config = ProviderConfig(
         name="pgvector",
         enabled=True,
         primary=False,  # Don't make primary unless it initializes successfully
         config={
-            "host": pgvector_host,
-            "port": int(os.getenv("PGVECTOR_PORT", "5432")),
-            "database": os.getenv("PGVECTOR_DATABASE", "nexus_memory_db"),
-            "user": os.getenv("PGVECTOR_USER", "nexus_memory_db_user"),
-            "password": pgvector_password,
+            **pg_connection,
+            "pool_manager": pool_manager,
             "table_name": "vector_memories",
-            "embedding_dim": 1536,
-            "distance_metric": "cosine"
+            "embedding_dim": int(os.getenv("EMBEDDING_DIMENSIONS", "1536")),
+            "distance_metric": "cosine",
+            # ANN index storage: full, halfvec, binary, matryoshka:<dim>[+halfvec|+binary];
+            # reduced modes rerank PGVECTOR_RERANK_OVERFETCH x limit candidates (4, binary 10)
+            "vector_storage": os.getenv("PGVECTOR_STORAGE", "full"),
+            "rerank_overfetch": int(os.getenv("PGVECTOR_RERANK_OVERFETCH", "0")) or None,
+            "warmup_probes": int(os.getenv("PGVECTOR_WARMUP_PROBES", "3")),
+            "prewarm_index": os.getenv("PGVECTOR_PREWARM", "false").lower() == "true",
+            # Read replicas ("host[:port],..."); reads fall back to the primary for
+            # PGVECTOR_READ_STALENESS_MS after a write unless a replica has replayed it
+            "read_replicas": parse_replica_hosts(os.getenv("PGVECTOR_READ_HOSTS", ""), int(os.getenv("PGVECTOR_PORT", "5432"))),
+            "replica_pool_size": int(os.getenv("PGVECTOR_REPLICA_POOL_SIZE", "10")),
+            "replica_staleness_window": float(os.getenv("PGVECTOR_READ_STALENESS_MS", "2000")) / 1000
         }
     )
     try:
-        # Use instrumented provider if observability is enabled
-        if os.getenv("OTEL_TRACING_ENABLED", "true").lower() == "true":
-            from .providers_instrumented import InstrumentedPgVectorProvider
-            pgvector_provider = InstrumentedPgVectorProvider(pgvector_config)
-            logger.info("Using instrumented PgVector provider")
-        else:
-            pgvector_provider = PgVectorProvider(pgvector_config)
-        
+        # Construction only schedules the pool; it becomes ready in the background
+        with startup_profile.phase("provider.pgvector"):
+            # Use instrumented provider if observability is enabled
+            if os.getenv("OTEL_TRACING_ENABLED", "true").lower() == "true":
+                from .providers_instrumented import InstrumentedPgVectorProvider
+                pgvector_provider = InstrumentedPgVectorProvider(pgvector_config)
+                logger.info("Using instrumented PgVector provider")
+            else:
+                pgvector_provider = PgVectorProvider(pgvector_config)
+
         providers.append(pgvector_provider)
         pgvector_config.primary = True  # Make primary if successful
         logger.info("PgVector provider initialized as primary")
@@ -160,24 +324,28 @@ async def lifespan(app: FastAPI):
             "persist_directory": "./memory_service_chroma"
         }
     )
-    try:
-        # Use instrumented provider if observability is enabled
-        if os.getenv("OTEL_TRACING_ENABLED", "true").lower() == "true":
-            from .providers_instrumented import InstrumentedChromaProvider
-            chroma_provider = InstrumentedChromaProvider(chroma_config)
-            logger.info("Using instrumented ChromaDB provider")
-        else:
-            chroma_provider = ChromaProvider(chroma_config)
-        
-        providers.append(chroma_provider)
-        # If pgvector was successfully initialized, make it primary instead
-        if any(p.name == "pgvector" and p.enabled for p in providers):
-            chroma_config.primary = False
-            logger.info("ChromaDB provider initialized as secondary (pgvector is primary)")
-        else:
+    pgvector_is_primary = any(p.name == "pgvector" and p.enabled for p in providers)
+    if pgvector_is_primary:
+        # Secondary: attached to the store once ready, without delaying startup
+        chroma_config.primary = False
+
+    # ChromaDB (import + client) and the embedding client are the slowest constructors;
+    # build them in threads, concurrently with each other and the pgvector pool
+    chroma_task = asyncio.create_task(
+        startup_profile.timed("provider.chromadb", asyncio.to_thread(_create_chroma_provider, chroma_config))
+    )
+    embedding_task = asyncio.create_task(
+        startup_profile.timed("embedding_model", asyncio.to_thread(_create_embedding_model))
+    )
+
+    if not pgvector_is_primary:
+        # Without pgvector, ChromaDB is the primary and the store needs it up front
+        try:
+            providers.append(await chroma_task)
             logger.info("ChromaDB provider initialized as primary")
-    except Exception as e:
-        logger.error(f"ChromaDB provider failed to initialize: {e}")
+        except Exception as e:
+            logger.error(f"ChromaDB provider failed to initialize: {e}")
+        chroma_task = None
 
     # Add Graph Provider for knowledge graph functionality
     # Feature flag controlled activation for safe rollout
@@ -188,27 +356,27 @@ async def lifespan(app: FastAPI):
         pgvector_provider = next((p for p in providers if p.name == 'pgvector' and p.enabled), None)
         if pgvector_provider:
             try:
-                # Build connection string from pgvector config
-                # This avoids timing issues with async pool initialization
-                pg_config = pgvector_config.config
-                connection_string = (
-                    f"postgresql://{pg_config['user']}:{pg_config['password']}@"
-                    f"{pg_config['host']}:{pg_config['port']}/{pg_config['database']}"
-                )
-                
+                # The graph lane of the shared pool; it connects on first use, so there is
+                # no ordering dependency on the pgvector provider's startup
                 graph_config = ProviderConfig(
                     name="graph",
                     enabled=True,
                     primary=False,
                     config={
-                        "connection_string": connection_string,  # Pass connection string instead of pool
-                        "table_prefix": "graph"
+                        "connection_pool": pool_manager.lane('graph'),
+                        "table_prefix": "graph",
+                        "gazetteer_enabled": os.getenv("GRAPH_GAZETTEER_ENABLED", "true").lower() == "true",
+                        "spacy_mode": os.getenv("GRAPH_SPACY_MODE", "fallback"),
+                        "expansion_max_nodes": int(os.getenv("GRAPH_EXPANSION_MAX_NODES", "200")),
+                        "expansion_max_memories": int(os.getenv("GRAPH_EXPANSION_MAX_MEMORIES", "50")),
+                        "expansion_timeout_ms": float(os.getenv("GRAPH_EXPANSION_TIMEOUT_MS", "150"))
                     }
                 )
 
                 # Import and initialize GraphProvider
                 from .providers import GraphProvider
-                graph_provider = GraphProvider(graph_config)
+                with startup_profile.phase("provider.graph"):
+                    graph_provider = GraphProvider(graph_config)
                 providers.append(graph_provider)
                 logger.info("✅ Graph provider initialized successfully - Knowledge graph is ACTIVE!")
 
@@ -220,6 +388,19 @@ async def lifespan(app: FastAPI):
     else:
         logger.info("Graph provider disabled (set GRAPH_ENABLED=true to activate)")
 
+    embedding_model = await embedding_task
+
+    # pgvector may have failed while the threads ran; ChromaDB then has to be the primary
+    if chroma_task and not any(p.enabled for p in providers):
+        try:
+            chroma_provider = await chroma_task
+            chroma_provider.config.primary = True
+            providers.append(chroma_provider)
+            logger.warning("PgVector unavailable, ChromaDB provider initialized as primary")
+        except Exception as e:
+            logger.error(f"ChromaDB provider failed to initialize: {e}")
+        chroma_task = None
+
     if not providers:
         raise RuntimeError("No vector providers could be initialized")
 
@@ -234,48 +415,61 @@ async def lifespan(app: FastAPI):
         enabled_providers[0].config.primary = True
         logger.warning(f"No enabled primary provider found, setting {enabled_providers[0].name} as primary")
 
-    # Initialize OpenAI embedding model
-    embedding_model = None
-    try:
-        from .embedding_models import create_embedding_model
-
-        # Check if OpenAI API key is available
-        openai_api_key = os.getenv("OPENAI_API_KEY")
-        if openai_api_key and openai_api_key.strip():
-            embedding_model = create_embedding_model(
-                provider="openai",
-                model="text-embedding-3-small",
-                api_key=openai_api_key,
-                max_retries=3,
-                timeout=30.0
-            )
-            logger.info("Initialized OpenAI embedding model: text-embedding-3-small")
-        else:
-            embedding_model = create_embedding_model(provider="mock", dimension=1536)
-            logger.warning("No OpenAI API key found, using mock embeddings")
-
-    except Exception as e:
-        logger.error(f"Failed to initialize embedding model: {e}")
-        # Fallback to mock model
-        from .embedding_models import MockEmbeddingModel
-        embedding_model = MockEmbeddingModel(dimension=1536)
-        logger.warning("Using mock embedding model as fallback")
-
     # Initialize unified store with ADM enabled and embedding model
-    unified_store = UnifiedVectorStore(providers, embedding_model=embedding_model, adm_enabled=True)
+    with startup_profile.phase("unified_store"):
+        unified_store = UnifiedVectorStore(providers, embedding_model=embedding_model, adm_enabled=True,
+                                           chunker=TextChunker.from_env())
     logger.info(f"Memory service started with {len(providers)} providers and {embedding_model.__class__.__name__}")
 
+    # Providers start (connect, warm up) in the background; /health/ready flips once the
+    # primary is warm, and a late ChromaDB joins as a secondary
+    app.state.startup_tasks = [asyncio.create_task(_mark_ready_when_primary_ready(app, unified_store))]
+    if chroma_task:
+        app.state.startup_tasks.append(asyncio.create_task(_attach_secondary(unified_store, chroma_task)))
+
+    # Schedule graph centrality recomputation (PageRank/degree for live stats)
+    graph_analytics_job = None
+    analytics_interval = float(os.getenv("GRAPH_ANALYTICS_INTERVAL_SECONDS", "900"))
+    graph_provider = unified_store.providers.get('graph')
+    if graph_provider and graph_provider.enabled and analytics_interval > 0:
+        try:
+            from .graph_analytics import GraphAnalyticsJob
+            graph_analytics_job = GraphAnalyticsJob(graph_provider, interval_seconds=analytics_interval)
+            graph_analytics_job.start()
+            logger.info(f"Graph analytics job scheduled every {analytics_interval:.0f}s")
+        except Exception as e:
+            logger.warning(f"Graph analytics job not started: {e}")
+    app.state.graph_analytics_job = graph_analytics_job
+
+    # Pool monitoring and temporal queries borrow lanes of the shared pool
+    # instead of opening pools of their own
+    app.state.db_monitor = initialize_db_monitor(pool_manager.dsn, pool_manager)
+    app.state.startup_tasks.append(asyncio.create_task(_start_db_monitor(app.state.db_monitor)))
+    app.state.temporal_store = TemporalMemoryStore(unified_store, pg_connection, pool_manager)
+    await app.state.temporal_store.initialize()
+
     # Initialize bulk import service (simplified version without Redis)
     global bulk_import_service, memory_export_service
     bulk_import_service = BulkImportService(unified_store)
     memory_export_service = MemoryExportService(unified_store)
     logger.info("Bulk import/export services initialized")
 
-    # Initialize usage tracking - DISABLED FOR STABLE DEPLOYMENT
-    # from .tracking import UsageCollector
-    # usage_collector = UsageCollector(unified_store=unified_store)
-    # logger.info("Usage tracking initialized")
-    usage_collector = None
+    # Sampled, anonymized query log for replay (benchmarks.replay)
+    try:
+        query_log_sampler = QueryLogSampler.from_env()
+        if query_log_sampler:
+            logger.info(f"Query log sampling {query_log_sampler.sample_rate:.2%} to {query_log_sampler.path}")
+    except Exception as e:
+        logger.warning(f"Query log sampling disabled: {e}")
+        query_log_sampler = None
+
+    # Usage tracking (opt-in): O(1) per request into fixed-size ring buffers and aggregates
+    if os.getenv("USAGE_TRACKING_ENABLED", "false").lower() == "true":
+        usage_collector = UsageCollector.from_env(unified_store=unified_store)
+        logger.info(f"Usage tracking initialized ({usage_collector.max_events} events buffered)")
+    else:
+        usage_collector = None
+    app.state.usage_collector = usage_collector
 
     # Initialize dashboard - DISABLED FOR STABLE DEPLOYMENT
     # from .dashboard import MemoryDashboard
@@ -296,21 +490,48 @@ async def lifespan(app: FastAPI):
     #     }
     # )
 
+    startup_profile.mark_serving()
+
     yield
 
     # Shutdown
     logger.info("Shutting down Memory Service...")
 
-    # Close provider connections
-    for provider in providers:
+    for task in app.state.startup_tasks:
+        task.cancel()
+
+    if graph_analytics_job:
+        await graph_analytics_job.stop()
+
+    if query_log_sampler:
+        query_log_sampler.close()
+        query_log_sampler = None
+
+    # Close provider connections (including secondaries attached after startup)
+    for provider in list(unified_store.providers.values()):
         if hasattr(provider, 'close'):
             try:
                 await provider.close()
             except Exception as e:
                 logger.warning(f"Error closing provider {provider.name}: {e}")
 
+    if getattr(app.state, 'temporal_store', None):
+        await app.state.temporal_store.close()
+
+    if pool_manager:
+        await pool_manager.close()
+        pool_manager = None
+
+    if hasattr(unified_store.embedding_model, 'close'):
+        await unified_store.embedding_model.close()
+
+    if log_broadcaster:
+        log_broadcaster.uninstall()
+        log_broadcaster = None
+
     unified_store = None
     usage_collector = None
+    app.state.usage_collector = None
     memory_dashboard = None
 
 
@@ -368,12 +589,8 @@ def create_memory_app() -> FastAPI:
 
         return response
 
-    # Add usage tracking middleware - DISABLED FOR STABLE DEPLOYMENT
-    # @app.on_event("startup")
-    # async def add_usage_tracking():
-    #     if usage_collector:
-    #         from .tracking import UsageTrackingMiddleware
-    #         app.add_middleware(UsageTrackingMiddleware, usage_collector=usage_collector)
+    # Usage tracking middleware; records into app.state.usage_collector once lifespan sets it
+    app.add_middleware(UsageTrackingMiddleware)
 
     def get_store() -> UnifiedVectorStore:
         """Dependency to get the unified store instance."""
@@ -406,6 +623,37 @@ def create_memory_app() -> FastAPI:
             logger.error(f"Health check failed: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
+    @app.get("/health/ready")
+    async def readiness_check():
+        """
+        Readiness probe: 200 once the primary provider can serve, 503 before.
+
+        Secondary providers may still be initializing when this flips.
+        """
+        if unified_store is None or not getattr(app.state, "ready", False):
+            return JSONResponse(status_code=503, content={"status": "starting"})
+        return {
+            "status": "ready",
+            "primary_provider": unified_store.primary_provider.name,
+            "providers": list(unified_store.providers.keys())
+        }
+
+    @app.get("/metrics/startup")
+    async def startup_metrics():
+        """Cold-start profile: time to serving/ready, startup phases and slowest imports."""
+        return startup_profile.report()
+
+    @app.get("/metrics/pool")
+    async def pool_metrics():
+        """Shared Postgres pool: occupancy, waiters and per-lane acquire wait percentiles."""
+        if not pool_manager:
+            raise HTTPException(status_code=503, detail="Shared pool not initialized")
+        db_monitor = getattr(app.state, 'db_monitor', None)
+        if db_monitor:
+            # Refreshes the Prometheus pool gauges from the same numbers
+            await db_monitor.get_pool_stats()
+        return pool_manager.stats()
+
     # @app.get("/metrics") - DISABLED FOR STABLE DEPLOYMENT
     # async def metrics_endpoint():
     #     """
@@ -429,6 +677,24 @@ def create_memory_app() -> FastAPI:
     #         logger.error(f"Metrics collection failed: {e}")
     #         raise HTTPException(status_code=500, detail="Metrics collection failed")
 
+    @app.get("/metrics/latency")
+    async def latency_metrics(store: UnifiedVectorStore = Depends(get_store)):
+        """
+        Latency percentiles per operation and stage.
+
+        Keys are 'store' / 'query' for whole operations and
+        '<operation>.<stage>' for stages (embed, cache, dedup, adm,
+        provider.<name>, rank, graph_expand, serialize).
+        """
+        try:
+            return {
+                "histograms": store.latency.snapshot(),
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        except Exception as e:
+            logger.error(f"Failed to get latency metrics: {e}")
+            raise HTTPException(status_code=500, detail=str(e)) from e
+
     # @app.get("/db/stats") - DISABLED FOR STABLE DEPLOYMENT
     # async def database_stats():
     #     """
@@ -461,13 +727,13 @@ def create_memory_app() -> FastAPI:
             # Add tracing context
             trace_id = get_current_trace_id()
             if trace_id:
-                logger.info(f"Storing memory with trace_id: {trace_id}")
+                logger.info("Storing memory with trace_id: %s", trace_id)
             
             memory = await store.store_memory(request)
 
             # Log and record performance
             store_time = (time.time() - start_time) * 1000
-            logger.info(f"Memory stored in {store_time:.1f}ms: {memory.id}")
+            logger.info("Memory stored in %.1fms: %s", store_time, memory.id)
             
             # Record metrics
             record_metric("memory_operations_total", 1, {"operation": "store", "status": "success"})
@@ -495,9 +761,9 @@ def create_memory_app() -> FastAPI:
         Returns semantically similar memories ranked by relevance and importance.
         Special handling: Empty queries return all memories (fixes 3-result bug).
         """
+        sampled = query_log_sampler is not None and query_log_sampler.should_sample()
+        start_time = time.time()
         try:
-            start_time = time.time()
-            
             # Add tracing attributes
             from opentelemetry import trace
             span = trace.get_current_span()
@@ -509,7 +775,7 @@ def create_memory_app() -> FastAPI:
 
             # Fix for empty query returning only 3 results
             if not request.query or request.query.strip() == "":
-                logger.info(f"Empty query detected - returning all memories with limit {request.limit}")
+                logger.info("Empty query detected - returning all memories with limit %d", request.limit)
                 # For empty queries, set min_similarity to 0 to get all memories
                 request.min_similarity = 0.0
 
@@ -517,7 +783,10 @@ def create_memory_app() -> FastAPI:
 
             # Add request timing info
             total_time = (time.time() - start_time) * 1000
-            logger.info(f"Query completed in {total_time:.1f}ms, found {response.total_found} memories, returned {len(response.memories)}")
+            logger.info("Query completed in %.1fms, found %d memories, returned %d",
+                        total_time, response.total_found, len(response.memories))
+            if sampled:
+                query_log_sampler.record("POST /memories/query", request, start_time, total_time, response)
             
             # Record metrics
             record_metric("memory_operations_total", 1, {"operation": "query", "status": "success"})
@@ -540,6 +809,7 @@ def create_memory_app() -> FastAPI:
             }
 
             response.query_metadata = {
+                **(response.query_metadata or {}),
                 "original_query": request.query,
                 "limit_requested": request.limit,
                 "actual_returned": len(response.memories),
@@ -550,10 +820,16 @@ def create_memory_app() -> FastAPI:
 
         except ValueError as e:
             record_metric("memory_operations_total", 1, {"operation": "query", "status": "error", "error_type": "validation"})
+            if sampled:
+                query_log_sampler.record("POST /memories/query", request, start_time,
+                                         (time.time() - start_time) * 1000, status='error')
             raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
             record_metric("memory_operations_total", 1, {"operation": "query", "status": "error", "error_type": "internal"})
             logger.error(f"Query failed: {e}")
+            if sampled:
+                query_log_sampler.record("POST /memories/query", request, start_time,
+                                         (time.time() - start_time) * 1000, status='error')
             raise HTTPException(status_code=500, detail="Internal server error")
 
     @app.get("/memories", response_model=QueryResponse)
@@ -568,6 +844,9 @@ def create_memory_app() -> FastAPI:
         This endpoint addresses the issue where only 3 memories were returned.
         Now properly returns all memories with configurable limit.
         """
+        sampled = query_log_sampler is not None and query_log_sampler.should_sample()
+        start_time = time.time()
+        request = None
         try:
             # Use empty query to get all memories
             request = QueryRequest(
@@ -577,7 +856,9 @@ def create_memory_app() -> FastAPI:
             )
 
             response = await store.query_memories(request)
-            logger.info(f"GET /memories returned {len(response.memories)} of {response.total_found} total memories")
+            logger.info("GET /memories returned %d of %d total memories", len(response.memories), response.total_found)
+            if sampled:
+                query_log_sampler.record("GET /memories", request, start_time, (time.time() - start_time) * 1000, response)
 
             # Add trust metrics
             response.trust_metrics = {
@@ -589,6 +870,7 @@ def create_memory_app() -> FastAPI:
             }
 
             response.query_metadata = {
+                **(response.query_metadata or {}),
                 "limit_requested": limit,
                 "offset": offset,
                 "actual_returned": len(response.memories),
@@ -599,6 +881,9 @@ def create_memory_app() -> FastAPI:
 
         except Exception as e:
             logger.error(f"Failed to get memories: {e}")
+            if sampled and request is not None:
+                query_log_sampler.record("GET /memories", request, start_time,
+                                         (time.time() - start_time) * 1000, status='error')
             raise HTTPException(status_code=500, detail="Internal server error")
 
     @app.get("/emergency/find-all-memories")
@@ -662,7 +947,8 @@ def create_memory_app() -> FastAPI:
                 raise HTTPException(status_code=503, detail="PgVector provider not available")
             
             from .search_fix import EmergencySearchFix
-            emergency_search = EmergencySearchFix(pgvector.connection_pool)
+            # Read-only: served by a read replica when one is configured and fresh
+            emergency_search = EmergencySearchFix(pgvector.read_pool or pgvector.connection_pool)
             
             # Try text search first
             memories = await emergency_search.text_search(q, limit=limit)
@@ -774,54 +1060,15 @@ def create_memory_app() -> FastAPI:
         Returns last N lines of logs with timestamps and levels.
         """
         try:
-            from collections import deque
-            from datetime import datetime
-
-            # Create in-memory log buffer if not exists
-            if not hasattr(app.state, 'log_buffer'):
-                app.state.log_buffer = deque(maxlen=1000)
-
-                # Set up log capture handler
-                import logging
-
-                class BufferHandler(logging.Handler):
-                    def emit(self, record):
-                        try:
-                            log_entry = {
-                                'timestamp': datetime.fromtimestamp(record.created).isoformat(),
-                                'level': record.levelname,
-                                'logger': record.name,
-                                'message': self.format(record),
-                                'module': record.module,
-                                'function': record.funcName,
-                                'line': record.lineno
-                            }
-                            app.state.log_buffer.append(log_entry)
-                        except Exception:
-                            pass
-
-                # Add handler to root logger
-                buffer_handler = BufferHandler()
-                buffer_handler.setLevel(logging.DEBUG)
-                buffer_handler.setFormatter(logging.Formatter(
-                    '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-                ))
-                logging.getLogger().addHandler(buffer_handler)
-
-                # Also add to our logger
-                logger.addHandler(buffer_handler)
-
-                # Log that we started capturing
-                logger.info("Log capture initialized for debug endpoint")
-
-            # Get requested number of recent logs
-            recent_logs = list(app.state.log_buffer)[-lines:]
+            # The /logs/stream ring buffer; no handler of its own
+            recent_logs = [entry.as_dict() for entry in log_broadcaster.recent(lines)] if log_broadcaster else []
+            buffered = log_broadcaster.stats()['buffered'] if log_broadcaster else 0
 
             # Add some system info
             system_info = {
                 'python_version': sys.version,
                 'service_uptime_seconds': time.time() - app.state.start_time if hasattr(app.state, 'start_time') else 0,
-                'log_buffer_size': len(app.state.log_buffer),
+                'log_buffer_size': buffered,
                 'providers_status': {
                     name: {
                         'enabled': provider.enabled,
@@ -834,7 +1081,7 @@ def create_memory_app() -> FastAPI:
 
             return {
                 'logs': recent_logs,
-                'total_logs_captured': len(app.state.log_buffer),
+                'total_logs_captured': buffered,
                 'logs_returned': len(recent_logs),
                 'system_info': system_info
             }
@@ -901,7 +1148,7 @@ def create_memory_app() -> FastAPI:
         return startup_info
 
     @app.get("/logs/stream")
-    async def stream_logs(format: str = "json"):
+    async def stream_logs(format: str = "json", replay: int = 0):
         """
         Stream logs in real-time via Server-Sent Events (SSE).
 
@@ -910,78 +1157,26 @@ def create_memory_app() -> FastAPI:
         - syslog: Syslog format (RFC3164) compatible with Papertrail
         - plain: Plain text logs
 
+        replay sends up to that many recent lines before following live.
+        A client that falls behind has its oldest lines dropped and receives
+        a notice with the count.
+
         Usage:
         - curl https://service.com/logs/stream
-        - curl https://service.com/logs/stream?format=syslog
+        - curl https://service.com/logs/stream?format=syslog&replay=200
         """
-        import queue
-        from datetime import datetime
-
-        # Create queue for log streaming
-        log_queue = queue.Queue(maxsize=100)
-
-        # Custom handler to capture logs
-        class StreamHandler(logging.Handler):
-            def emit(self, record):
-                try:
-                    if format == "syslog":
-                        # Syslog format: <priority>timestamp hostname app[pid]: message
-                        priority = self._get_syslog_priority(record.levelno)
-                        timestamp = datetime.fromtimestamp(record.created).strftime('%b %d %H:%M:%S')
-                        hostname = os.getenv('RENDER_SERVICE_NAME', 'core-nexus-memory')
-                        pid = os.getpid()
-                        message = self.format(record)
-                        log_line = f"<{priority}>{timestamp} {hostname} {record.name}[{pid}]: {message}\n"
-                    elif format == "plain":
-                        log_line = f"{self.format(record)}\n"
-                    else:  # json
-                        log_data = {
-                            'timestamp': datetime.fromtimestamp(record.created).isoformat(),
-                            'level': record.levelname,
-                            'logger': record.name,
-                            'message': self.format(record),
-                            'module': record.module,
-                            'function': record.funcName,
-                            'line': record.lineno
-                        }
-                        log_line = f"data: {json.dumps(log_data)}\n\n"
-
-                    # Non-blocking put
-                    log_queue.put_nowait(log_line)
-                except queue.Full:
-                    pass  # Drop log if queue is full
-                except Exception:
-                    pass
-
-            def _get_syslog_priority(self, levelno):
-                """Convert Python log level to syslog priority."""
-                # Facility = 16 (local0), Severity based on level
-                facility = 16
-                if levelno >= 50:  # CRITICAL
-                    severity = 2
-                elif levelno >= 40:  # ERROR
-                    severity = 3
-                elif levelno >= 30:  # WARNING
-                    severity = 4
-                elif levelno >= 20:  # INFO
-                    severity = 6
-                else:  # DEBUG
-                    severity = 7
-                return facility * 8 + severity
-
-        # Add handler to capture logs
-        stream_handler = StreamHandler()
-        stream_handler.setLevel(logging.DEBUG)
-        stream_handler.setFormatter(logging.Formatter('%(message)s'))
-
-        # Add to root logger and our logger
-        root_logger = logging.getLogger()
-        root_logger.addHandler(stream_handler)
-        logger.addHandler(stream_handler)
+        if log_broadcaster is None:
+            raise HTTPException(status_code=503, detail="Log streaming not initialized")
+        if format not in LOG_FORMATS:
+            format = "json"
+        heartbeat = float(os.getenv("LOG_STREAM_HEARTBEAT_SECONDS", "15"))
+        broadcaster = log_broadcaster
 
         async def generate():
             """Generate log stream."""
-            try:
+            # Subscribed only once the response starts, so a stream that is never
+            # iterated leaves nothing registered
+            with broadcaster.subscribe(replay=max(0, replay)) as subscription:
                 # Send initial connection message
                 if format == "json":
                     yield f"data: {json.dumps({'connected': True, 'format': format})}\n\n"
@@ -992,27 +1187,14 @@ def create_memory_app() -> FastAPI:
 
                 # Stream logs
                 while True:
-                    try:
-                        # Get log with timeout
-                        log_line = await asyncio.get_event_loop().run_in_executor(
-                            None, log_queue.get, True, 1.0
-                        )
-                        yield log_line
-
-                        # Send keepalive every 30 seconds
-                        if format == "json" and asyncio.get_event_loop().time() % 30 < 1:
-                            yield f"data: {json.dumps({'keepalive': True})}\n\n"
-
-                    except queue.Empty:
-                        # Send keepalive
-                        if format == "json":
-                            yield "\n"  # SSE keepalive
-                        await asyncio.sleep(0.1)
-
-            finally:
-                # Cleanup
-                root_logger.removeHandler(stream_handler)
-                logger.removeHandler(stream_handler)
+                    entry = await subscription.get(timeout=heartbeat)
+                    dropped = subscription.take_dropped()
+                    if dropped:
+                        yield render_dropped(format, dropped)
+                    if entry is not None:
+                        yield entry.render(format)
+                    elif format == "json":
+                        yield ": keepalive\n\n"  # SSE comment keeps proxies from closing the stream
 
         # Return appropriate response type
         if format == "json":
@@ -1591,11 +1773,10 @@ def create_memory_app() -> FastAPI:
             if not usage_collector:
                 raise HTTPException(status_code=503, detail="Usage tracking not initialized")
 
-            if not memory_dashboard:
-                raise HTTPException(status_code=503, detail="Dashboard not initialized")
-
             # Export comprehensive data
             if format.lower() == "comprehensive":
+                if not memory_dashboard:
+                    raise HTTPException(status_code=503, detail="Dashboard not initialized")
                 export_data = await memory_dashboard.export_metrics(format="json")
                 return JSONResponse(
                     content={"data": export_data},
@@ -1769,6 +1950,7 @@ def create_memory_app() -> FastAPI:
     @app.delete("/dedup/cleanup")
     async def cleanup_orphaned_hashes(
         days: int = 90,
+        batch_size: int = 5000,
         admin_key: str | None = None,
         store: UnifiedVectorStore = Depends(get_store)
     ):
@@ -1785,7 +1967,9 @@ def create_memory_app() -> FastAPI:
             if not store.deduplication_service:
                 raise HTTPException(status_code=503, detail="Deduplication service not enabled")
             
-            deleted_count = await store.deduplication_service.cleanup_old_hashes(days)
+            deleted_count = await store.deduplication_service.cleanup_old_hashes(
+                days, batch_size=max(1, min(batch_size, 50000))
+            )
             
             return {
                 "status": "success",
@@ -1799,61 +1983,79 @@ def create_memory_app() -> FastAPI:
 
     @app.post("/dedup/backfill")
     async def backfill_content_hashes(
-        limit: int = 1000,
+        limit: int | None = None,
+        batch_size: int = 2000,
+        start_after: str | None = None,
+        background: bool = False,
         admin_key: str | None = None,
         store: UnifiedVectorStore = Depends(get_store)
     ):
         """
         Backfill content hashes for existing memories.
 
-        Useful when enabling deduplication on existing data.
+        Useful when enabling deduplication on existing data. Memories are
+        walked in primary-key order in batches of batch_size; pass the
+        returned last_id as start_after to resume. A request hashes at most
+        limit memories (default 1000). With background=true the job keeps
+        running after the response and, without a limit, walks every memory;
+        poll /dedup/backfill/status.
         """
         # Simple security check
         if admin_key != os.getenv("ADMIN_KEY", "dedup-backfill-2025"):
             raise HTTPException(status_code=403, detail="Invalid admin key")
+
+        try:
+            cursor = UUID(start_after) if start_after else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid start_after UUID") from None
         
         try:
             # Get pgvector provider
             pgvector = store.providers.get('pgvector')
             if not pgvector or not pgvector.enabled:
                 raise HTTPException(status_code=503, detail="PgVector provider not available")
-            
-            async with pgvector.connection_pool.acquire() as conn:
-                # Find memories without hashes
-                rows = await conn.fetch("""
-                    SELECT vm.id, vm.content
-                    FROM vector_memories vm
-                    LEFT JOIN memory_content_hashes mch ON vm.id = mch.memory_id
-                    WHERE mch.id IS NULL
-                    ORDER BY vm.created_at DESC
-                    LIMIT $1
-                """, limit)
-                
-                # Hash and insert
-                hashed_count = 0
-                for row in rows:
-                    try:
-                        content_hash = hashlib.sha256(row['content'].encode()).hexdigest()
-                        await conn.execute("""
-                            INSERT INTO memory_content_hashes (content_hash, memory_id, content_length)
-                            VALUES ($1, $2, $3)
-                            ON CONFLICT (content_hash, memory_id) DO NOTHING
-                        """, content_hash, row['id'], len(row['content']))
-                        hashed_count += 1
-                    except Exception as e:
-                        logger.error(f"Failed to hash memory {row['id']}: {e}")
-                
-                return {
-                    "status": "success",
-                    "memories_processed": len(rows),
-                    "hashes_created": hashed_count,
-                    "message": f"Backfilled {hashed_count} content hashes"
-                }
-                
+
+            backfill = getattr(app.state, 'content_hash_backfill', None)
+            if backfill is None:
+                from .deduplication import ContentHashBackfill
+                backfill = ContentHashBackfill(
+                    pool_manager.lane('background') if pool_manager else pgvector.connection_pool
+                )
+                app.state.content_hash_backfill = backfill
+            if backfill.running:
+                raise HTTPException(status_code=409, detail="Backfill already running")
+            backfill.batch_size = max(1, min(batch_size, 20000))
+            if limit is None and not background:
+                limit = 1000
+
+            if background:
+                backfill.start(cursor, limit)
+                return {"status": "started", "progress_endpoint": "/dedup/backfill/status"}
+
+            progress = await backfill.run(cursor, limit)
+            return {
+                "status": "success" if progress['status'] == 'completed' else progress['status'],
+                "memories_processed": progress['memories_hashed'],
+                "hashes_created": progress['hashes_created'],
+                "last_id": progress['last_id'],
+                "progress": progress,
+                "message": f"Backfilled {progress['hashes_created']} content hashes"
+            }
+
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Backfill failed: {e}")
             raise HTTPException(status_code=500, detail="Failed to backfill content hashes")
 
+    @app.get("/dedup/backfill/status")
+    async def backfill_status():
+        """Progress of the most recent content hash backfill."""
+        backfill = getattr(app.state, 'content_hash_backfill', None)
+        if backfill is None:
+            return {"status": "idle"}
+        return {**backfill.progress, "running": backfill.running}
+
     # =====================================================
     # KNOWLEDGE GRAPH ENDPOINTS (Added by Agent 2)
     # =====================================================
@@ -1975,23 +2177,31 @@ def create_memory_app() -> FastAPI:
             if not graph_provider or not graph_provider.enabled:
                 raise HTTPException(status_code=503, detail="Graph provider not available")
 
-            # TODO: Implement actual insights gathering
-            # For now, return mock data
+            try:
+                memory_uuid = UUID(memory_id)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid memory ID format") from None
+
+            start_time = time.time()
+            subgraph = await graph_provider.extract_subgraph(memory_id=memory_uuid, max_depth=1)
+
+            # Depth 0 nodes are mentioned by the memory, depth 1 co-occur elsewhere
+            depths = subgraph['nodes']['depth']
             return {
                 "memory_id": memory_id,
-                "entity": {
-                    "id": memory_id,
-                    "entity_type": "concept",
-                    "entity_name": "placeholder",
-                    "properties": {},
-                    "importance_score": 0.5
-                },
-                "memory_count": 1,
-                "relationship_count": 0,
-                "top_relationships": [],
-                "co_occurring_entities": []
+                "entity_count": sum(1 for d in depths if d == 0),
+                "co_occurring_count": sum(1 for d in depths if d > 0),
+                "relationship_count": len(subgraph['edges']['source']),
+                "nodes": subgraph['nodes'],
+                "relationships": subgraph['edges'],
+                "truncated": subgraph['truncated'],
+                "graph_version": subgraph['graph_version'],
+                "cached": subgraph['cached'],
+                "query_time_ms": (time.time() - start_time) * 1000
             }
 
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Graph insights failed: {e}")
             raise HTTPException(status_code=500, detail=f"Failed to get insights: {str(e)}")
@@ -2125,40 +2335,64 @@ def create_memory_app() -> FastAPI:
         """
         Advanced graph query endpoint.
 
-        Supports entity filtering, relationship traversal, and pattern matching.
+        Returns a bounded subgraph in columnar form. Accepted keys:
+        entity_name / entity_type / relationship_type (string or list),
+        memory_id, max_depth (1-5), min_strength, max_nodes (<= 1000) and
+        max_edges (<= 5000). Edges reference nodes by index into nodes.id.
         """
         try:
+            from .validators import (
+                validate_confidence_score,
+                validate_entity_name,
+                validate_graph_depth,
+                validate_graph_limit,
+            )
+
             graph_provider = store.providers.get('graph')
             if not graph_provider or not graph_provider.enabled:
                 raise HTTPException(status_code=503, detail="Graph provider not available")
 
-            # Convert query dict to filters for the provider
-            filters = {}
-            if query.get('entity_name'):
-                filters['entity_name'] = query['entity_name']
-            if query.get('entity_type'):
-                filters['entity_type'] = query['entity_type']
-            if query.get('relationship_type'):
-                filters['relationship_type'] = query['relationship_type']
-
-            # Execute query
-            import time
-            start_time = time.time()
+            def as_list(value):
+                if value is None:
+                    return None
+                return [value] if isinstance(value, str) else list(value)
 
-            limit = query.get('limit', 10)
-            await graph_provider.query([], limit, filters)
+            entity_names = as_list(query.get('entity_name'))
+            if entity_names:
+                entity_names = [validate_entity_name(name) for name in entity_names]
 
-            query_time = (time.time() - start_time) * 1000
+            memory_id = None
+            if query.get('memory_id'):
+                try:
+                    memory_id = UUID(str(query['memory_id']))
+                except ValueError:
+                    raise HTTPException(status_code=400, detail="Invalid memory ID format") from None
+
+            start_time = time.time()
+            subgraph = await graph_provider.extract_subgraph(
+                entity_names=entity_names,
+                entity_types=as_list(query.get('entity_type')),
+                relationship_types=as_list(query.get('relationship_type')),
+                memory_id=memory_id,
+                max_depth=validate_graph_depth(query.get('max_depth', 1)),
+                min_strength=validate_confidence_score(query.get('min_strength', 0.0), "min_strength"),
+                max_nodes=validate_graph_limit(query.get('max_nodes', query.get('limit', 200)), 'max_nodes', 1, 1000),
+                max_edges=validate_graph_limit(query.get('max_edges', 500), 'max_edges', 0, 5000)
+            )
 
-            # TODO: Convert memories to graph nodes and relationships
             return {
-                "nodes": [],
-                "relationships": [],
-                "query_time_ms": query_time,
-                "total_nodes": 0,
-                "total_relationships": 0
+                "nodes": subgraph['nodes'],
+                "relationships": subgraph['edges'],
+                "query_time_ms": (time.time() - start_time) * 1000,
+                "total_nodes": subgraph['total_nodes'],
+                "total_relationships": len(subgraph['edges']['source']),
+                "truncated": subgraph['truncated'],
+                "graph_version": subgraph['graph_version'],
+                "cached": subgraph['cached']
             }
 
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Graph query failed: {e}")
             raise HTTPException(status_code=500, detail=f"Failed to query graph: {str(e)}")
@@ -2189,17 +2423,9 @@ def create_memory_app() -> FastAPI:
                     "SELECT COUNT(*) FROM graph_relationships"
                 )
 
-                # Get top entities by connections
-                top_entities = await conn.fetch("""
-                    SELECT n.entity_name, n.entity_type, n.importance_score,
-                           COUNT(DISTINCT r.to_node_id) + COUNT(DISTINCT r2.from_node_id) as connections
-                    FROM graph_nodes n
-                    LEFT JOIN graph_relationships r ON n.id = r.from_node_id
-                    LEFT JOIN graph_relationships r2 ON n.id = r2.to_node_id
-                    GROUP BY n.id, n.entity_name, n.entity_type, n.importance_score
-                    ORDER BY connections DESC, n.importance_score DESC
-                    LIMIT 10
-                """)
+                # Get top entities by connections (precomputed by GraphAnalyticsJob)
+                from .graph_live_sync import fetch_top_entities
+                top_entities = await fetch_top_entities(conn)
 
                 # Get entity type distribution
                 type_dist = await conn.fetch("""
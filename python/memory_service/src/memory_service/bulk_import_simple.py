@@ -14,11 +14,11 @@ from enum import Enum
 from typing import Any
 from uuid import uuid4
 
-import pandas as pd
 from fastapi import BackgroundTasks, HTTPException
 from loguru import logger
 from pydantic import BaseModel, Field
 
+from .rate_limiter import embedding_priority
 from .unified_store import UnifiedVectorStore
 
 
@@ -162,7 +162,11 @@ class BulkImportService:
         logger.info(f"Cleaned up {len(old_jobs)} old import jobs")
 
     async def _process_import(self, import_id: str, request: BulkImportRequest):
-        """Process import job in background."""
+        """Process import job in background, behind interactive embedding calls."""
+        with embedding_priority('bulk'):
+            await self._run_import(import_id, request)
+
+    async def _run_import(self, import_id: str, request: BulkImportRequest):
         progress = self._jobs[import_id]
 
         try:
@@ -260,7 +264,9 @@ class BulkImportService:
         records = []
 
         try:
-            # Use pandas for robust CSV parsing
+            # Use pandas for robust CSV parsing (imported here to keep it off the startup path)
+            import pandas as pd
+
             df = pd.read_csv(io.StringIO(data))
 
             # Validate required columns
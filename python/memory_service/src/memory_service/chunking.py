@@ -0,0 +1,186 @@
+"""
+Token-Aware Chunking of Long Memories
+
+Long content is split into overlapping windows of at most max_tokens
+tokens before embedding, so every part of a document is searchable and
+each vector covers one focused passage instead of a diluted average.
+UnifiedVectorStore stores the chunks as child rows (metadata parent_id,
+chunk_index, chunk_count) next to the parent memory and collapses chunk
+hits back to their parent at query time.
+
+Token counts come from tiktoken's cl100k_base (the text-embedding-3
+tokenizer) when it is installed, otherwise from a word/punctuation
+approximation. Tokenizers are built once per process.
+"""
+
+import logging
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+from uuid import UUID
+
+from .models import MemoryResponse
+
+logger = logging.getLogger(__name__)
+
+# Child-row metadata keys
+PARENT_KEY = 'parent_id'
+CHUNK_INDEX_KEY = 'chunk_index'
+CHUNK_COUNT_KEY = 'chunk_count'
+
+
+class RegexTokenizer:
+    """Approximate tokenizer: words and single punctuation marks, decoded as text spans."""
+
+    name = 'regex'
+    _TOKEN = re.compile(r"\w+|[^\w\s]")
+
+    def spans(self, text: str) -> list[tuple[int, int]]:
+        return [match.span() for match in self._TOKEN.finditer(text)]
+
+    def windows(self, text: str, size: int, stride: int) -> list[str]:
+        spans = self.spans(text)
+        return [text[spans[start][0]:spans[min(start + size, len(spans)) - 1][1]]
+                for start in _window_starts(len(spans), size, stride)]
+
+    def count(self, text: str) -> int:
+        return len(self._TOKEN.findall(text))
+
+
+class TiktokenTokenizer:
+    """tiktoken BPE tokenizer; windows are decoded from token slices."""
+
+    def __init__(self, encoding_name: str):
+        import tiktoken
+
+        self.name = encoding_name
+        self._encoding = tiktoken.get_encoding(encoding_name)
+
+    def windows(self, text: str, size: int, stride: int) -> list[str]:
+        tokens = self._encoding.encode(text, disallowed_special=())
+        return [self._encoding.decode(tokens[start:start + size]).strip()
+                for start in _window_starts(len(tokens), size, stride)]
+
+    def count(self, text: str) -> int:
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+
+def _window_starts(total: int, size: int, stride: int) -> list[int]:
+    if total <= size:
+        return [0] if total else []
+    starts = list(range(0, total - size, stride))
+    # The last window ends exactly at the last token
+    starts.append(total - size)
+    return starts
+
+
+@lru_cache(maxsize=8)
+def get_tokenizer(encoding_name: str = 'cl100k_base'):
+    """The tokenizer for an encoding, built once per process (regex fallback without tiktoken)."""
+    try:
+        return TiktokenTokenizer(encoding_name)
+    except Exception as e:
+        logger.info(f"tiktoken unavailable ({e}), using approximate token counts for chunking")
+        return RegexTokenizer()
+
+
+@dataclass
+class TextChunker:
+    """
+    Splits text into overlapping token windows.
+
+    Attributes:
+        max_tokens: Tokens per chunk (content up to this size is not split)
+        overlap_tokens: Tokens shared by consecutive chunks
+        aggregation: How chunk similarities combine into the parent's: 'max' or 'sum'
+        tokenizer: Any object with windows()/count(); defaults to get_tokenizer()
+    """
+    max_tokens: int = 512
+    overlap_tokens: int = 64
+    aggregation: str = 'max'
+    tokenizer: Any = None
+
+    def __post_init__(self):
+        if self.max_tokens < 1 or not 0 <= self.overlap_tokens < self.max_tokens:
+            raise ValueError("Chunking needs max_tokens >= 1 and 0 <= overlap_tokens < max_tokens")
+        if self.aggregation not in ('max', 'sum'):
+            raise ValueError(f"Unknown chunk aggregation '{self.aggregation}' (expected max or sum)")
+        if self.tokenizer is None:
+            self.tokenizer = get_tokenizer()
+
+    @classmethod
+    def from_env(cls) -> 'TextChunker | None':
+        """Chunker from CHUNKING_ENABLED / CHUNK_MAX_TOKENS / CHUNK_OVERLAP_TOKENS / CHUNK_AGGREGATION."""
+        if os.getenv('CHUNKING_ENABLED', 'true').lower() != 'true':
+            return None
+        return cls(
+            max_tokens=int(os.getenv('CHUNK_MAX_TOKENS', '512')),
+            overlap_tokens=int(os.getenv('CHUNK_OVERLAP_TOKENS', '64')),
+            aggregation=os.getenv('CHUNK_AGGREGATION', 'max').lower()
+        )
+
+    def split(self, text: str) -> list[str]:
+        """Chunks of text; a single element when it fits in max_tokens."""
+        chunks = [chunk for chunk in self.tokenizer.windows(
+            text, self.max_tokens, self.max_tokens - self.overlap_tokens
+        ) if chunk]
+        return chunks if len(chunks) > 1 else [text]
+
+
+def chunk_rows(parent_id: UUID, chunks: list[tuple[str, list[float]]],
+               metadata: dict[str, Any]) -> list[tuple[str, list[float], dict[str, Any]]]:
+    """(content, embedding, metadata) child rows for the chunks of parent_id."""
+    return [
+        (text, embedding, {**metadata, PARENT_KEY: str(parent_id), CHUNK_INDEX_KEY: index,
+                           'content_length': len(text)})
+        for index, (text, embedding) in enumerate(chunks)
+    ]
+
+
+def collapse_chunk_hits(memories: list[MemoryResponse],
+                        parents: dict[str, MemoryResponse] | None = None,
+                        aggregation: str = 'max') -> list[MemoryResponse]:
+    """
+    Merge chunk hits into one result per parent memory.
+
+    The parent's similarity is the max or the sum (capped at 1.0) of its
+    matching chunk similarities, and of the parent row's own similarity when
+    it matched too. Parent content comes from a matching parent row or from
+    `parents`; failing both, the best chunk stands in with the parent's id.
+    Order follows each parent's first appearance.
+    """
+    groups: dict[str, dict[str, Any]] = {}
+    for memory in memories:
+        parent_id = (memory.metadata or {}).get(PARENT_KEY)
+        key = str(parent_id or memory.id)
+        group = groups.setdefault(key, {'parent': None, 'best_chunk': None, 'scores': [], 'chunks': []})
+        score = memory.similarity_score or 0.0
+        group['scores'].append(score)
+        if parent_id is None:
+            group['parent'] = memory
+        else:
+            group['chunks'].append(memory.metadata.get(CHUNK_INDEX_KEY))
+            if group['best_chunk'] is None or score > (group['best_chunk'].similarity_score or 0.0):
+                group['best_chunk'] = memory
+
+    collapsed = []
+    for key, group in groups.items():
+        parent = group['parent'] or (parents or {}).get(key)
+        if not group['chunks']:
+            collapsed.append(parent)
+            continue
+
+        scores = group['scores']
+        score = min(1.0, sum(scores)) if aggregation == 'sum' else max(scores)
+        if parent is None:
+            chunk = group['best_chunk']
+            metadata = {k: v for k, v in chunk.metadata.items() if k not in (PARENT_KEY, CHUNK_INDEX_KEY)}
+            parent = chunk.model_copy(update={'id': UUID(key), 'metadata': metadata})
+        matched = sorted(index for index in group['chunks'] if index is not None)
+        collapsed.append(parent.model_copy(update={
+            'similarity_score': score,
+            'metadata': {**parent.metadata, 'matched_chunks': matched}
+        }))
+    return collapsed
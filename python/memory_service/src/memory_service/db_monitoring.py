@@ -3,12 +3,13 @@ Database monitoring and telemetry for Core Nexus Memory Service
 """
 
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any
 
 import asyncpg
 
 from .metrics import time_db_query, update_db_pool_metrics
+from .pool_manager import SharedPoolManager
 
 logger = logging.getLogger(__name__)
 
@@ -30,19 +31,30 @@ class PoolStats:
     free: int
     waiting: int
     max_size: int
+    # Per-lane budget, waiters and wait-time percentiles (shared pool only)
+    classes: dict[str, Any] = field(default_factory=dict)
 
 class DatabaseMonitor:
     """
     Monitors PostgreSQL database performance and connection pool health
     """
 
-    def __init__(self, connection_string: str):
+    def __init__(self, connection_string: str, pool_manager: SharedPoolManager | None = None):
         self.connection_string = connection_string
+        self.pool_manager = pool_manager
         self.pool: asyncpg.Pool | None = None
         self._monitoring_enabled = False
 
     async def initialize_pool(self, min_size: int = 5, max_size: int = 20) -> asyncpg.Pool:
         """Initialize connection pool with monitoring"""
+        if self.pool_manager:
+            # Monitoring queries are background work on the shared pool
+            await self.pool_manager.start()
+            self.pool = self.pool_manager.lane('background')
+            await self._enable_query_monitoring()
+            logger.info("Database monitor using shared connection pool")
+            return self.pool
+
         try:
             self.pool = await asyncpg.create_pool(
                 self.connection_string,
@@ -86,6 +98,19 @@ class DatabaseMonitor:
 
     async def get_pool_stats(self) -> PoolStats:
         """Get current connection pool statistics"""
+        if self.pool_manager:
+            # The manager counts waiters and wait times per lane
+            stats = self.pool_manager.stats()
+            update_db_pool_metrics(stats['size'], stats['used'], stats['waiting'])
+            return PoolStats(
+                size=stats['size'],
+                used=stats['used'],
+                free=stats['free'],
+                waiting=stats['waiting'],
+                max_size=stats['max_size'],
+                classes=stats['classes']
+            )
+
         if not self.pool:
             return PoolStats(0, 0, 0, 0, 0)
 
@@ -241,9 +266,10 @@ class DatabaseMonitor:
             return await conn.fetch(query, *args)
 
     async def close(self):
-        """Close the connection pool"""
+        """Close the connection pool (a shared pool is left to its manager)"""
         if self.pool:
-            await self.pool.close()
+            if not self.pool_manager:
+                await self.pool.close()
             self.pool = None
             logger.info("Database pool closed")
 
@@ -254,10 +280,11 @@ def get_db_monitor() -> DatabaseMonitor | None:
     """Get the global database monitor instance"""
     return db_monitor
 
-def initialize_db_monitor(connection_string: str) -> DatabaseMonitor:
+def initialize_db_monitor(connection_string: str,
+                          pool_manager: SharedPoolManager | None = None) -> DatabaseMonitor:
     """Initialize the global database monitor"""
     global db_monitor
-    db_monitor = DatabaseMonitor(connection_string)
+    db_monitor = DatabaseMonitor(connection_string, pool_manager)
     return db_monitor
 
 async def get_database_health() -> dict[str, Any]:
@@ -284,8 +311,10 @@ async def get_database_health() -> dict[str, Any]:
                 "size": pool_stats.size,
                 "used": pool_stats.used,
                 "free": pool_stats.free,
+                "waiting": pool_stats.waiting,
                 "max_size": pool_stats.max_size,
-                "utilization": pool_stats.used / pool_stats.max_size if pool_stats.max_size > 0 else 0
+                "utilization": pool_stats.used / pool_stats.max_size if pool_stats.max_size > 0 else 0,
+                "classes": pool_stats.classes
             },
             "database": db_stats,
             "slow_queries": [
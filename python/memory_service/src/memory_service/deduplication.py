@@ -2,24 +2,37 @@
 Enterprise-Grade Deduplication Service
 
 Implements a 3-tier deduplication pipeline:
-1. Content Hash Matching (SHA-256)
-2. Vector Similarity Search
+1. Content Hash Matching (SHA-256, Bloom filter before the database)
+2. Vector Similarity Search (gated by an in-process SimHash prefilter)
 3. Business Rule Application
 """
 
 import asyncio
 import hashlib
 import logging
+import math
+import re
 import time
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Optional
+from itertools import pairwise
+from typing import Any
 from uuid import UUID
 
+import numpy as np
+
+from .chunking import PARENT_KEY
 from .models import MemoryResponse
 
 logger = logging.getLogger(__name__)
 
+# Retry delays (seconds) after a failed prefilter warmup, doubling up to the cap
+PREFILTER_RETRY_INITIAL = 30.0
+PREFILTER_RETRY_MAX = 3600.0
+
+# Nearest rows fetched for the semantic check; chunk rows among them are skipped
+SEMANTIC_CANDIDATES = 5
+
 
 class DeduplicationMode(Enum):
     """Deduplication operational modes."""
@@ -39,12 +52,153 @@ class DeduplicationDecision(Enum):
 class DeduplicationResult:
     """Result of deduplication check."""
     is_duplicate: bool
-    existing_memory: Optional[MemoryResponse] = None
+    existing_memory: MemoryResponse | None = None
     confidence_score: float = 0.0
     decision: DeduplicationDecision = DeduplicationDecision.UNIQUE
     reason: str = ""
-    content_hash: Optional[str] = None
-    similarity_score: Optional[float] = None
+    content_hash: str | None = None
+    similarity_score: float | None = None
+    embedding: list[float] | None = None
+    fingerprint: int | None = None
+
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# SQLSTATE of a unique violation, e.g. memory_content_hashes.content_hash
+# rejecting an exact duplicate stored through another worker
+UNIQUE_VIOLATION = '23505'
+
+
+def is_unique_violation(error: BaseException) -> bool:
+    """Whether a database error is a unique constraint violation."""
+    return getattr(error, 'sqlstate', None) == UNIQUE_VIOLATION
+
+
+def simhash(content: str) -> int:
+    """
+    64-bit SimHash over lowercased word features.
+
+    Near-identical texts differ in only a few bits, so Hamming distance
+    between fingerprints approximates how much the wording changed.
+    """
+    tokens = _TOKEN_PATTERN.findall(content.lower())
+    if not tokens:
+        return 0
+
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(t.encode('utf-8'), digest_size=8).digest(), 'little') for t in tokens),
+        dtype=np.uint64,
+        count=len(tokens)
+    )
+    bits = (hashes[:, None] >> np.arange(64, dtype=np.uint64)) & np.uint64(1)
+    votes = bits.sum(axis=0) * 2 > len(tokens)
+    return sum(1 << int(i) for i in np.flatnonzero(votes))
+
+
+def simhash_many(contents: list[str]) -> list[int]:
+    """SimHash a batch of texts; one worker-thread hop for the whole batch."""
+    return [simhash(content) for content in contents]
+
+
+class ContentHashBloomFilter:
+    """
+    Bloom filter over SHA-256 content hashes.
+
+    The hashes are already uniformly distributed, so the k probe positions
+    are derived from the digest itself by double hashing instead of hashing
+    again. A miss is definite for the hashes added to this filter; a hit
+    still needs the database. Hashes stored through other workers only
+    arrive at the next rebuild, so a duplicate of one of those is caught by
+    the content_hash constraint on insert instead (see find_exact_match).
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(int(capacity), 1)
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, content_hash: str):
+        h1 = int(content_hash[:16], 16)
+        h2 = int(content_hash[16:32], 16) | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, content_hash: str) -> None:
+        for position in self._positions(content_hash):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, content_hash: str) -> bool:
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(content_hash))
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+
+    @property
+    def false_positive_rate(self) -> float:
+        """Expected false-positive rate at the current fill level."""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+
+class SimHashIndex:
+    """
+    In-process LSH index over SimHash fingerprints.
+
+    Fingerprints are split into max_distance + 1 bands; by the pigeonhole
+    principle any two fingerprints within max_distance bits share at least
+    one identical band, so bucket lookups find every near duplicate.
+    """
+
+    def __init__(self, max_distance: int = 8, max_entries: int = 100_000):
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        bands = max_distance + 1
+        bounds = [round(i * 64 / bands) for i in range(bands + 1)]
+        self._bands = [(start, (1 << (end - start)) - 1) for start, end in pairwise(bounds)]
+        self._buckets: list[dict[int, set[UUID]]] = [{} for _ in self._bands]
+        self._fingerprints: dict[UUID, int] = {}
+        self.warm = False
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def _keys(self, fingerprint: int) -> list[int]:
+        return [(fingerprint >> start) & mask for start, mask in self._bands]
+
+    def add(self, memory_id: UUID, fingerprint: int) -> None:
+        """Index a stored memory, evicting the oldest entry when full."""
+        if memory_id in self._fingerprints:
+            return
+        if len(self._fingerprints) >= self.max_entries:
+            self.remove(next(iter(self._fingerprints)))
+        self._fingerprints[memory_id] = fingerprint
+        for buckets, key in zip(self._buckets, self._keys(fingerprint), strict=True):
+            buckets.setdefault(key, set()).add(memory_id)
+
+    def remove(self, memory_id: UUID) -> None:
+        fingerprint = self._fingerprints.pop(memory_id, None)
+        if fingerprint is None:
+            return
+        for buckets, key in zip(self._buckets, self._keys(fingerprint), strict=True):
+            bucket = buckets.get(key)
+            if bucket:
+                bucket.discard(memory_id)
+                if not bucket:
+                    del buckets[key]
+
+    def candidates(self, fingerprint: int) -> list[UUID]:
+        """Memory IDs within max_distance bits of fingerprint."""
+        seen: set[UUID] = set()
+        for buckets, key in zip(self._buckets, self._keys(fingerprint), strict=True):
+            seen.update(buckets.get(key, ()))
+        return [
+            memory_id for memory_id in seen
+            if bin(self._fingerprints[memory_id] ^ fingerprint).count('1') <= self.max_distance
+        ]
 
 
 class DeduplicationService:
@@ -53,7 +207,8 @@ class DeduplicationService:
     
     Features:
     - SHA-256 content hashing for exact matches
-    - Vector similarity for semantic duplicates
+    - SimHash LSH prefilter that skips the vector stage when nothing is close
+    - Vector similarity for semantic duplicates (embedding returned for reuse)
     - Configurable business rules
     - Performance metrics and monitoring
     - Audit trail for all decisions
@@ -63,7 +218,14 @@ class DeduplicationService:
                  vector_store,
                  mode: DeduplicationMode = DeduplicationMode.ACTIVE,
                  similarity_threshold: float = 0.95,
-                 exact_match_only: bool = False):
+                 exact_match_only: bool = False,
+                 prefilter_enabled: bool = True,
+                 prefilter_max_distance: int = 8,
+                 prefilter_max_entries: int = 100_000,
+                 prefilter_min_tokens: int = 16,
+                 bloom_enabled: bool = True,
+                 bloom_error_rate: float = 0.001,
+                 bloom_rebuild_interval: float = 3600):
         """
         Initialize deduplication service.
         
@@ -72,12 +234,38 @@ class DeduplicationService:
             mode: Operational mode (off, log_only, active)
             similarity_threshold: Threshold for semantic similarity (0.0-1.0)
             exact_match_only: If True, only use content hash matching
+            prefilter_enabled: Skip the vector stage when no SimHash near duplicate exists
+            prefilter_max_distance: Hamming distance treated as a near duplicate
+            prefilter_max_entries: Fingerprints kept in memory
+            prefilter_min_tokens: Shorter content always gets the vector stage,
+                since a single edited word flips too many SimHash bits
+            bloom_enabled: Skip the exact-match query when the Bloom filter misses
+            bloom_error_rate: Target false-positive rate of the Bloom filter
+            bloom_rebuild_interval: Seconds between rebuilds from the database,
+                which also picks up hashes written by other instances
         """
         self.vector_store = vector_store
         self.mode = mode
         self.similarity_threshold = similarity_threshold
         self.exact_match_only = exact_match_only
         self.connection_pool = None
+
+        # The prefilter only skips the vector stage once it has been warmed
+        # from existing memories; until then every check stays semantic.
+        self.near_duplicates = (
+            SimHashIndex(prefilter_max_distance, prefilter_max_entries) if prefilter_enabled else None
+        )
+        self.prefilter_min_tokens = prefilter_min_tokens
+        self._warmup_task: asyncio.Task | None = None
+
+        # Exact-match Bloom filter; None until the first load completes
+        self.bloom_enabled = bloom_enabled
+        self.bloom_error_rate = bloom_error_rate
+        self.bloom_rebuild_interval = bloom_rebuild_interval
+        self.content_hashes: ContentHashBloomFilter | None = None
+        self._bloom_pending: list[str] | None = None
+        self._bloom_task: asyncio.Task | None = None
+        self.bloom_last_rebuild: float | None = None
         
         # Metrics
         self.metrics = {
@@ -86,6 +274,10 @@ class DeduplicationService:
             'semantic_matches': 0,
             'unique_contents': 0,
             'false_positives': 0,
+            'prefilter_skips': 0,
+            'semantic_checks': 0,
+            'bloom_skips': 0,
+            'bloom_false_positives': 0,
             'processing_time_ms': []
         }
         
@@ -94,9 +286,11 @@ class DeduplicationService:
     async def _ensure_pool(self):
         """Ensure database connection pool is available."""
         if not self.connection_pool:
-            # Get pgvector provider's pool
+            # Get pgvector provider's pool (its write lane when the pool is shared)
             pgvector = self.vector_store.providers.get('pgvector')
-            if pgvector and hasattr(pgvector, 'connection_pool'):
+            if pgvector and getattr(pgvector, 'write_pool', None):
+                self.connection_pool = pgvector.write_pool
+            elif pgvector and hasattr(pgvector, 'connection_pool'):
                 self.connection_pool = pgvector.connection_pool
             else:
                 raise RuntimeError("PgVector connection pool not available for deduplication")
@@ -104,17 +298,102 @@ class DeduplicationService:
     def _hash_content(self, content: str) -> str:
         """Generate SHA-256 hash of content."""
         return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def _start_background_tasks(self):
+        """Start loading the Bloom filter and SimHash prefilter in the background."""
+        if self.bloom_enabled and self._bloom_task is None:
+            self._bloom_task = asyncio.create_task(self._maintain_bloom_filter())
+        if self.near_duplicates is not None and not self.near_duplicates.warm and not self._warmup_task:
+            self._warmup_task = asyncio.create_task(self._warm_prefilter())
+
+    async def _rebuild_bloom_filter(self):
+        """Stream every content hash into a fresh filter and swap it in."""
+        started = time.time()
+        self._bloom_pending = []
+
+        try:
+            async with self.connection_pool.acquire() as conn:
+                total = await conn.fetchval("SELECT COUNT(*) FROM memory_content_hashes")
+                # Leave headroom for writes until the next rebuild
+                bloom = ContentHashBloomFilter(max(total * 2, 100_000), self.bloom_error_rate)
+                async with conn.transaction():
+                    async for row in conn.cursor("SELECT content_hash FROM memory_content_hashes", prefetch=10_000):
+                        bloom.add(row['content_hash'])
+
+            # Hashes written while the cursor was streaming
+            for content_hash in self._bloom_pending:
+                bloom.add(content_hash)
+            self.content_hashes = bloom
+            self.bloom_last_rebuild = time.time()
+            logger.info(f"Content hash Bloom filter loaded {bloom.count} hashes "
+                        f"({bloom.memory_bytes / 1024:.0f} KiB) in {time.time() - started:.1f}s")
+        finally:
+            self._bloom_pending = None
+
+    async def _maintain_bloom_filter(self):
+        while True:
+            try:
+                await self._rebuild_bloom_filter()
+            except Exception as e:
+                logger.warning(f"Content hash Bloom filter load failed, using database lookups: {e}")
+            await asyncio.sleep(self.bloom_rebuild_interval)
+
+    async def _warm_prefilter(self):
+        """
+        Load fingerprints of the most recent memories. Failures are retried
+        with exponential backoff by this task, so checks never restart it.
+        """
+        delay = PREFILTER_RETRY_INITIAL
+        while True:
+            try:
+                async with self.connection_pool.acquire() as conn:
+                    rows = await conn.fetch(f"""
+                        SELECT id, content FROM vector_memories
+                        WHERE NOT (metadata ? '{PARENT_KEY}')
+                        ORDER BY created_at DESC
+                        LIMIT $1
+                    """, self.near_duplicates.max_entries)
+
+                # Oldest first so eviction order matches insertion order
+                rows = rows[::-1]
+                fingerprints = await asyncio.to_thread(simhash_many, [row['content'] or '' for row in rows])
+                for row, fingerprint in zip(rows, fingerprints, strict=True):
+                    self.near_duplicates.add(row['id'], fingerprint)
+                self.near_duplicates.warm = True
+                logger.info(f"Deduplication prefilter warmed with {len(self.near_duplicates)} fingerprints")
+                return
+            except Exception as e:
+                logger.warning(f"Deduplication prefilter warmup failed, semantic checks stay on "
+                               f"(retrying in {delay:.0f}s): {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, PREFILTER_RETRY_MAX)
+
+    def remember(self, memory_id: UUID, content: str, fingerprint: int | None = None,
+                 content_hash: str | None = None):
+        """Add a newly stored memory to the Bloom filter and near-duplicate prefilter."""
+        if self.content_hashes is not None or self._bloom_pending is not None:
+            content_hash = content_hash or self._hash_content(content)
+            if self.content_hashes is not None:
+                self.content_hashes.add(content_hash)
+            if self._bloom_pending is not None:
+                self._bloom_pending.append(content_hash)
+        if self.near_duplicates is not None:
+            self.near_duplicates.add(memory_id, fingerprint if fingerprint is not None else simhash(content))
     
-    async def check_duplicate(self, content: str, metadata: Optional[dict] = None) -> DeduplicationResult:
+    async def check_duplicate(self, content: str, metadata: dict | None = None,
+                              embedding: list[float] | None = None) -> DeduplicationResult:
         """
         Check if content is a duplicate using multi-stage pipeline.
         
         Args:
             content: Memory content to check
             metadata: Optional metadata for business rules
+            embedding: Precomputed embedding; generated on demand otherwise
             
         Returns:
-            DeduplicationResult with decision and details
+            DeduplicationResult with decision and details. Any embedding
+            computed for the semantic stage is returned so callers can store
+            it instead of embedding the content a second time.
         """
         start_time = time.time()
         self.metrics['total_checks'] += 1
@@ -126,9 +405,18 @@ class DeduplicationService:
         try:
             await self._ensure_pool()
             
-            # Stage 1: Content Hash Check
+            self._start_background_tasks()
+
+            # Stage 1: Content Hash Check (a Bloom filter miss is definite for this
+            # worker; other workers' duplicates surface as a unique violation on insert)
             content_hash = self._hash_content(content)
-            exact_match = await self._check_exact_match(content_hash)
+            if self.content_hashes is not None and content_hash not in self.content_hashes:
+                self.metrics['bloom_skips'] += 1
+                exact_match = None
+            else:
+                exact_match = await self._check_exact_match(content_hash)
+                if not exact_match and self.content_hashes is not None:
+                    self.metrics['bloom_false_positives'] += 1
             
             if exact_match:
                 self.metrics['exact_matches'] += 1
@@ -148,8 +436,20 @@ class DeduplicationService:
                 return result
             
             # Stage 2: Vector Similarity Check (if not exact-match-only mode)
+            fingerprint = None
+            semantic_match = None
+            if self.near_duplicates is not None:
+                fingerprint = simhash(content)
+
             if not self.exact_match_only:
-                semantic_match = await self._check_semantic_similarity(content)
+                if (self.near_duplicates is not None and self.near_duplicates.warm
+                        and len(_TOKEN_PATTERN.findall(content)) >= self.prefilter_min_tokens
+                        and not self.near_duplicates.candidates(fingerprint)):
+                    # Nothing textually close: a >= threshold cosine match is very unlikely
+                    self.metrics['prefilter_skips'] += 1
+                else:
+                    self.metrics['semantic_checks'] += 1
+                    semantic_match, embedding = await self._check_semantic_similarity(content, embedding)
                 
                 if semantic_match and semantic_match.similarity_score >= self.similarity_threshold:
                     self.metrics['semantic_matches'] += 1
@@ -166,7 +466,9 @@ class DeduplicationService:
                         decision=decision,
                         reason=f"Semantic similarity: {semantic_match.similarity_score:.3f}",
                         content_hash=content_hash,
-                        similarity_score=semantic_match.similarity_score
+                        similarity_score=semantic_match.similarity_score,
+                        embedding=embedding,
+                        fingerprint=fingerprint
                     )
                     
                     # Record decision
@@ -182,7 +484,9 @@ class DeduplicationService:
                 confidence_score=1.0,
                 decision=DeduplicationDecision.UNIQUE,
                 reason="No duplicates found",
-                content_hash=content_hash
+                content_hash=content_hash,
+                embedding=embedding,
+                fingerprint=fingerprint
             )
             
         except Exception as e:
@@ -190,7 +494,8 @@ class DeduplicationService:
             # Fail open - don't block on dedup errors
             return DeduplicationResult(
                 is_duplicate=False,
-                reason=f"Deduplication error: {str(e)}"
+                reason=f"Deduplication error: {str(e)}",
+                embedding=embedding
             )
         finally:
             # Record processing time
@@ -201,7 +506,15 @@ class DeduplicationService:
             if len(self.metrics['processing_time_ms']) > 1000:
                 self.metrics['processing_time_ms'] = self.metrics['processing_time_ms'][-1000:]
     
-    async def _check_exact_match(self, content_hash: str) -> Optional[MemoryResponse]:
+    async def find_exact_match(self, content: str) -> MemoryResponse | None:
+        """Look up an exact duplicate in the database, bypassing the Bloom filter."""
+        await self._ensure_pool()
+        exact_match = await self._check_exact_match(self._hash_content(content))
+        if exact_match:
+            self.metrics['exact_matches'] += 1
+        return exact_match
+
+    async def _check_exact_match(self, content_hash: str) -> MemoryResponse | None:
         """Check for exact content match using hash."""
         async with self.connection_pool.acquire() as conn:
             row = await conn.fetchrow("""
@@ -224,38 +537,50 @@ class DeduplicationService:
             
             return None
     
-    async def _check_semantic_similarity(self, content: str) -> Optional[MemoryResponse]:
-        """Check for semantic duplicates using vector similarity."""
-        # Generate embedding for content
-        if not self.vector_store.embedding_model:
-            return None
-            
+    async def _check_semantic_similarity(
+        self, content: str, embedding: list[float] | None = None
+    ) -> tuple[MemoryResponse | None, list[float] | None]:
+        """
+        Check for semantic duplicates using vector similarity.
+
+        Returns:
+            (matching memory or None, embedding used for the lookup)
+        """
+        if embedding is None:
+            if not self.vector_store.embedding_model:
+                return None, None
+            try:
+                embedding = await self.vector_store.embedding_model.embed_text(content)
+            except Exception as e:
+                logger.error(f"Semantic similarity check failed: {e}")
+                return None, None
+
         try:
-            embedding = await self.vector_store.embedding_model.embed_text(content)
-            
             # Query for similar memories
             pgvector = self.vector_store.providers.get('pgvector')
             if not pgvector:
-                return None
+                return None, embedding
                 
             similar_memories = await pgvector.query(
                 query_embedding=embedding,
-                limit=1,
+                limit=SEMANTIC_CANDIDATES,
                 filters={}
             )
-            
+            # A chunk of a long memory is not a memory of its own
+            similar_memories = [m for m in similar_memories if PARENT_KEY not in (m.metadata or {})]
+
             if similar_memories and similar_memories[0].similarity_score >= self.similarity_threshold:
-                return similar_memories[0]
+                return similar_memories[0], embedding
                 
         except Exception as e:
             logger.error(f"Semantic similarity check failed: {e}")
             
-        return None
+        return None, embedding
     
     async def _apply_business_rules(self, 
                                    content: str,
                                    existing_memory: MemoryResponse,
-                                   metadata: Optional[dict]) -> DeduplicationDecision:
+                                   metadata: dict | None) -> DeduplicationDecision:
         """
         Apply business rules to determine final decision.
         
@@ -289,7 +614,7 @@ class DeduplicationService:
         return DeduplicationDecision.DUPLICATE
     
     async def _record_decision(self, 
-                              candidate_id: Optional[UUID],
+                              candidate_id: UUID | None,
                               existing_id: UUID,
                               result: DeduplicationResult):
         """Record deduplication decision for audit trail."""
@@ -365,12 +690,36 @@ class DeduplicationService:
                 'semantic_matches': self.metrics['semantic_matches'],
                 'unique_contents': self.metrics['unique_contents'],
                 'false_positives': self.metrics['false_positives'],
+                'semantic_checks': self.metrics['semantic_checks'],
+                'prefilter_skips': self.metrics['prefilter_skips'],
                 'avg_processing_time_ms': (
                     sum(self.metrics['processing_time_ms']) / len(self.metrics['processing_time_ms'])
                     if self.metrics['processing_time_ms'] else 0
                 )
             }
         }
+
+        if self.content_hashes is not None:
+            stats['bloom_filter'] = {
+                'items': self.content_hashes.count,
+                'capacity': self.content_hashes.capacity,
+                'memory_bytes': self.content_hashes.memory_bytes,
+                'num_hashes': self.content_hashes.num_hashes,
+                'target_false_positive_rate': self.content_hashes.error_rate,
+                'expected_false_positive_rate': self.content_hashes.false_positive_rate,
+                'observed_false_positives': self.metrics['bloom_false_positives'],
+                'skipped_lookups': self.metrics['bloom_skips'],
+                'last_rebuild': self.bloom_last_rebuild
+            }
+        else:
+            stats['bloom_filter'] = {'loaded': False, 'enabled': self.bloom_enabled}
+
+        if self.near_duplicates is not None:
+            stats['prefilter'] = {
+                'warm': self.near_duplicates.warm,
+                'fingerprints': len(self.near_duplicates),
+                'max_distance': self.near_duplicates.max_distance
+            }
         
         # Get database stats
         try:
@@ -388,21 +737,185 @@ class DeduplicationService:
             
         return stats
     
-    async def cleanup_old_hashes(self, days: int = 90):
-        """Clean up old content hashes for deleted memories."""
+    async def cleanup_old_hashes(self, days: int = 90, batch_size: int = 5000) -> int:
+        """
+        Clean up old content hashes for deleted memories.
+
+        Deletes in bounded batches with an anti-join so each statement is
+        short and never scans vector_memories through NOT IN.
+        """
+        deleted_total = 0
         try:
             await self._ensure_pool()
-            async with self.connection_pool.acquire() as conn:
-                deleted = await conn.fetchval("""
-                    DELETE FROM memory_content_hashes
-                    WHERE memory_id NOT IN (SELECT id FROM vector_memories)
-                    AND created_at < NOW() - INTERVAL '%s days'
-                    RETURNING COUNT(*)
-                """, days)
-                
-                logger.info(f"Cleaned up {deleted} orphaned content hashes")
-                return deleted
-                
+            while True:
+                async with self.connection_pool.acquire() as conn:
+                    status = await conn.execute("""
+                        WITH orphaned AS (
+                            SELECT mch.id
+                            FROM memory_content_hashes mch
+                            LEFT JOIN vector_memories vm ON vm.id = mch.memory_id
+                            WHERE vm.id IS NULL
+                              AND mch.created_at < NOW() - make_interval(days => $1)
+                            LIMIT $2
+                        )
+                        DELETE FROM memory_content_hashes mch
+                        USING orphaned
+                        WHERE mch.id = orphaned.id
+                    """, days, batch_size)
+
+                deleted = int(status.split()[-1]) if status else 0
+                deleted_total += deleted
+                if deleted < batch_size:
+                    break
+                # Yield between batches so other queries get the connection
+                await asyncio.sleep(0)
+
+            logger.info(f"Cleaned up {deleted_total} orphaned content hashes")
+            return deleted_total
+
         except Exception as e:
             logger.error(f"Failed to cleanup old hashes: {e}")
-            return 0
\ No newline at end of file
+            return deleted_total
+
+
+def _hash_contents(contents: list[str]) -> list[str]:
+    """SHA-256 a chunk of contents (runs in a worker thread; hashlib releases the GIL)."""
+    return [hashlib.sha256((content or '').encode('utf-8')).hexdigest() for content in contents]
+
+
+class ContentHashBackfill:
+    """
+    Resumable backfill of memory_content_hashes for existing memories.
+
+    Walks vector_memories by primary key (keyset pagination), hashes each
+    batch across a thread pool and writes it with COPY into a temp table
+    followed by one INSERT ... SELECT ... ON CONFLICT DO NOTHING, so every
+    batch is a short transaction. Progress (including the keyset cursor to
+    resume from) is kept in self.progress.
+    """
+
+    def __init__(self, connection_pool, batch_size: int = 2000, workers: int = 4):
+        self.connection_pool = connection_pool
+        self.batch_size = batch_size
+        self.workers = workers
+        self.progress: dict[str, Any] = {'status': 'idle'}
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def _hash_parallel(self, executor, contents: list[str]) -> list[str]:
+        loop = asyncio.get_running_loop()
+        chunk = max(1, -(-len(contents) // self.workers))
+        parts = await asyncio.gather(*(
+            loop.run_in_executor(executor, _hash_contents, contents[i:i + chunk])
+            for i in range(0, len(contents), chunk)
+        ))
+        return [content_hash for part in parts for content_hash in part]
+
+    async def run(self, start_after: UUID | None = None, max_rows: int | None = None) -> dict[str, Any]:
+        """
+        Backfill hashes for memories with id > start_after.
+
+        Args:
+            start_after: Keyset cursor to resume from (progress['last_id'])
+            max_rows: Stop after this many memories have been hashed
+
+        Returns:
+            Progress dict with counts, last_id and completion status
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        started = time.time()
+        self.progress = {
+            'status': 'running',
+            'started_at': started,
+            'batches': 0,
+            'memories_hashed': 0,
+            'hashes_created': 0,
+            'last_id': str(start_after) if start_after else None,
+            'rate_per_second': 0.0
+        }
+        last_id = start_after
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="content-hash") as executor:
+                while max_rows is None or self.progress['memories_hashed'] < max_rows:
+                    limit = self.batch_size
+                    if max_rows is not None:
+                        limit = min(limit, max_rows - self.progress['memories_hashed'])
+
+                    async with self.connection_pool.acquire() as conn:
+                        rows = await conn.fetch(f"""
+                            SELECT vm.id, vm.content
+                            FROM vector_memories vm
+                            WHERE ($1::uuid IS NULL OR vm.id > $1::uuid)
+                              AND NOT (vm.metadata ? '{PARENT_KEY}')
+                              AND NOT EXISTS (
+                                  SELECT 1 FROM memory_content_hashes mch WHERE mch.memory_id = vm.id
+                              )
+                            ORDER BY vm.id
+                            LIMIT $2
+                        """, last_id, limit)
+
+                    if not rows:
+                        break
+
+                    contents = [row['content'] or '' for row in rows]
+                    hashes = await self._hash_parallel(executor, contents)
+                    records = [
+                        (content_hash, row['id'], len(content))
+                        for content_hash, row, content in zip(hashes, rows, contents, strict=True)
+                    ]
+
+                    async with self.connection_pool.acquire() as conn:
+                        async with conn.transaction():
+                            await conn.execute("""
+                                CREATE TEMP TABLE IF NOT EXISTS content_hash_staging (
+                                    content_hash VARCHAR(64),
+                                    memory_id UUID,
+                                    content_length INTEGER
+                                ) ON COMMIT DELETE ROWS
+                            """)
+                            await conn.copy_records_to_table(
+                                'content_hash_staging',
+                                records=records,
+                                columns=['content_hash', 'memory_id', 'content_length']
+                            )
+                            status = await conn.execute("""
+                                INSERT INTO memory_content_hashes (content_hash, memory_id, content_length)
+                                SELECT DISTINCT ON (content_hash) content_hash, memory_id, content_length
+                                FROM content_hash_staging
+                                ORDER BY content_hash, memory_id
+                                ON CONFLICT DO NOTHING
+                            """)
+
+                    last_id = rows[-1]['id']
+                    elapsed = max(time.time() - started, 1e-6)
+                    self.progress['batches'] += 1
+                    self.progress['memories_hashed'] += len(rows)
+                    self.progress['hashes_created'] += int(status.split()[-1]) if status else 0
+                    self.progress['last_id'] = str(last_id)
+                    self.progress['rate_per_second'] = round(self.progress['memories_hashed'] / elapsed, 1)
+
+                    if len(rows) < limit:
+                        break
+
+            self.progress['status'] = 'completed'
+        except Exception as e:
+            logger.error(f"Content hash backfill failed after {self.progress['memories_hashed']} memories: {e}")
+            self.progress.update({'status': 'failed', 'error': str(e)})
+        finally:
+            self.progress['elapsed_seconds'] = round(time.time() - started, 2)
+
+        logger.info(f"Content hash backfill {self.progress['status']}: "
+                    f"{self.progress['hashes_created']} hashes in {self.progress['batches']} batches")
+        return self.progress
+
+    def start(self, start_after: UUID | None = None, max_rows: int | None = None) -> bool:
+        """Run the backfill in the background; returns False if one is already running."""
+        if self.running:
+            return False
+        self._task = asyncio.create_task(self.run(start_after, max_rows))
+        return True
@@ -2,16 +2,27 @@
 OpenAI Embedding Models for Core Nexus Memory Service
 
 Provides text embedding generation using OpenAI's embedding models,
-specifically optimized for text-embedding-3-small for cost efficiency.
+specifically optimized for text-embedding-3-small for cost efficiency,
+and a local CPU model (sentence-transformers, optionally on quantized
+ONNX Runtime) for offline use and to avoid per-request API cost.
 """
 
 import asyncio
+import hashlib
+import itertools
 import logging
 import os
+import re
+import threading
 import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
+import numpy as np
+
+from .rate_limiter import EmbeddingRateLimiter, estimate_tokens, retry_after_seconds
+
 try:
     import openai
     from openai import AsyncOpenAI
@@ -51,7 +62,9 @@ class OpenAIEmbeddingModel(EmbeddingModel):
         model: str = "text-embedding-3-small",
         max_retries: int = 3,
         timeout: float = 30.0,
-        max_batch_size: int = 100
+        max_batch_size: int = 100,
+        dimensions: int | None = None,
+        rate_limiter: EmbeddingRateLimiter | None = None
     ):
         """
         Initialize OpenAI embedding model.
@@ -62,6 +75,10 @@ class OpenAIEmbeddingModel(EmbeddingModel):
             max_retries: Maximum retry attempts for failed requests
             timeout: Request timeout in seconds
             max_batch_size: Maximum texts per batch request
+            dimensions: Shortened output dimension (text-embedding-3 models
+                only); None returns the model's full dimension
+            rate_limiter: Shared limiter for all embedding calls (a default
+                one is created when omitted)
         """
         if not OPENAI_AVAILABLE:
             raise ImportError(
@@ -73,6 +90,15 @@ class OpenAIEmbeddingModel(EmbeddingModel):
         self.timeout = timeout
         self.max_batch_size = max_batch_size
 
+        # text-embedding-3 models return shortened (Matryoshka) embeddings on request
+        self.dimensions: int | None = None
+        if dimensions:
+            if model.startswith("text-embedding-3"):
+                self.dimensions = dimensions
+            else:
+                logger.warning(f"{model} does not support the dimensions parameter, using full dimension")
+        self._request_options = {'dimensions': self.dimensions} if self.dimensions else {}
+
         # Initialize OpenAI client
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
@@ -81,11 +107,13 @@ class OpenAIEmbeddingModel(EmbeddingModel):
                 "or pass api_key parameter."
             )
 
+        # Retries happen here, behind the rate limiter; client-level retries would stack on top
         self.client = AsyncOpenAI(
             api_key=self.api_key,
             timeout=timeout,
-            max_retries=max_retries
+            max_retries=0
         )
+        self.rate_limiter = rate_limiter or EmbeddingRateLimiter()
 
         # Cache for embedding dimensions
         self._dimension_cache: int | None = None
@@ -97,7 +125,9 @@ class OpenAIEmbeddingModel(EmbeddingModel):
         """Get embedding dimension for the model."""
         if self._dimension_cache is None:
             # text-embedding-3-small has 1536 dimensions
-            if "text-embedding-3-small" in self.model:
+            if self.dimensions:
+                self._dimension_cache = self.dimensions
+            elif "text-embedding-3-small" in self.model:
                 self._dimension_cache = 1536
             elif "text-embedding-3-large" in self.model:
                 self._dimension_cache = 3072
@@ -130,31 +160,14 @@ class OpenAIEmbeddingModel(EmbeddingModel):
         # Clean and truncate text if needed
         cleaned_text = self._clean_text(text)
 
-        try:
-            start_time = time.time()
-
-            response = await self.client.embeddings.create(
-                input=[cleaned_text],
-                model=self.model
-            )
-
-            embedding = response.data[0].embedding
+        start_time = time.time()
+        embedding = (await self._create_embeddings([cleaned_text]))[0]
 
-            # Log performance metrics
-            duration = (time.time() - start_time) * 1000
-            logger.debug(f"Generated embedding in {duration:.1f}ms for {len(text)} chars")
+        # Log performance metrics
+        duration = (time.time() - start_time) * 1000
+        logger.debug(f"Generated embedding in {duration:.1f}ms for {len(text)} chars")
 
-            return embedding
-
-        except openai.RateLimitError as e:
-            logger.error(f"OpenAI rate limit exceeded: {e}")
-            raise Exception(f"Rate limit exceeded: {e}")
-        except openai.APIError as e:
-            logger.error(f"OpenAI API error: {e}")
-            raise Exception(f"API error: {e}")
-        except Exception as e:
-            logger.error(f"Unexpected error generating embedding: {e}")
-            raise Exception(f"Failed to generate embedding: {e}")
+        return embedding
 
     async def embed_batch(self, texts: list[str]) -> list[list[float]]:
         """
@@ -192,37 +205,67 @@ class OpenAIEmbeddingModel(EmbeddingModel):
 
     async def _embed_batch_chunk(self, texts: list[str]) -> list[list[float]]:
         """Generate embeddings for a chunk of texts."""
-        try:
-            start_time = time.time()
-
-            response = await self.client.embeddings.create(
-                input=texts,
-                model=self.model
-            )
-
-            embeddings = [data.embedding for data in response.data]
-
-            # Log performance metrics
-            duration = (time.time() - start_time) * 1000
-            total_chars = sum(len(text) for text in texts)
-            logger.debug(
-                f"Generated {len(embeddings)} embeddings in {duration:.1f}ms "
-                f"for {total_chars} total chars"
-            )
+        start_time = time.time()
+        embeddings = await self._create_embeddings(texts)
+
+        # Log performance metrics
+        duration = (time.time() - start_time) * 1000
+        total_chars = sum(len(text) for text in texts)
+        logger.debug(
+            f"Generated {len(embeddings)} embeddings in {duration:.1f}ms "
+            f"for {total_chars} total chars"
+        )
 
-            return embeddings
+        return embeddings
 
-        except openai.RateLimitError as e:
-            logger.error(f"OpenAI rate limit exceeded for batch: {e}")
-            # Implement exponential backoff
-            await asyncio.sleep(2 ** (self.max_retries - 1))
-            raise Exception(f"Rate limit exceeded: {e}")
-        except openai.APIError as e:
-            logger.error(f"OpenAI API error for batch: {e}")
-            raise Exception(f"API error: {e}")
-        except Exception as e:
-            logger.error(f"Unexpected error in batch embedding: {e}")
-            raise Exception(f"Failed to generate batch embeddings: {e}")
+    async def _create_embeddings(self, texts: list[str]) -> list[list[float]]:
+        """
+        One embeddings request through the rate limiter, retried on 429s and
+        transient errors. A 429 halves the limiter's concurrency and pauses
+        dispatch for Retry-After; other failures back off exponentially.
+        """
+        tokens = estimate_tokens(texts)
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            delay = None
+            release = {}
+            await self.rate_limiter.acquire(tokens)
+            try:
+                raw = await self.client.embeddings.with_raw_response.create(
+                    input=texts,
+                    model=self.model,
+                    **self._request_options
+                )
+            except openai.RateLimitError as e:
+                headers = e.response.headers
+                release = {'rate_limited': True, 'retry_after': retry_after_seconds(headers)}
+                self.rate_limiter.update_from_headers(headers)
+                if last_attempt:
+                    logger.error(f"OpenAI rate limit exceeded after {attempt + 1} attempts: {e}")
+                    raise Exception(f"Rate limit exceeded: {e}")
+                continue
+            except (openai.APIConnectionError, openai.InternalServerError) as e:
+                if last_attempt:
+                    logger.error(f"OpenAI API error: {e}")
+                    raise Exception(f"API error: {e}")
+                delay = min(8.0, 0.5 * 2 ** attempt)
+                logger.warning(f"Embedding request failed ({e}), retrying in {delay:.1f}s")
+            except openai.APIError as e:
+                logger.error(f"OpenAI API error: {e}")
+                raise Exception(f"API error: {e}")
+            except Exception as e:
+                logger.error(f"Unexpected error generating embeddings: {e}")
+                raise Exception(f"Failed to generate embeddings: {e}")
+            finally:
+                # Every exit, cancellation included, gives the slot back
+                await self.rate_limiter.release(**release)
+
+            if delay is not None:
+                # Back off without holding a slot
+                await asyncio.sleep(delay)
+                continue
+            self.rate_limiter.update_from_headers(raw.headers)
+            return [data.embedding for data in raw.parse().data]
 
     def _clean_text(self, text: str) -> str:
         """
@@ -269,7 +312,8 @@ class OpenAIEmbeddingModel(EmbeddingModel):
                 "dimension": self.dimension,
                 "response_time_ms": round(response_time, 2),
                 "api_key_configured": bool(self.api_key),
-                "max_batch_size": self.max_batch_size
+                "max_batch_size": self.max_batch_size,
+                "rate_limiter": self.rate_limiter.stats()
             }
 
         except Exception as e:
@@ -283,11 +327,37 @@ class OpenAIEmbeddingModel(EmbeddingModel):
 
 
 class MockEmbeddingModel(EmbeddingModel):
-    """Mock embedding model for testing and development."""
+    """
+    Mock embedding model for testing, development and load testing.
+
+    Texts are embedded by a sparse random projection of hashed word n-grams
+    (unigrams and bigrams): each n-gram adds +-weight to a few pseudo-random
+    dimensions derived from a keyed BLAKE2 hash, and the result is
+    L2-normalized. Overlapping texts therefore get similar vectors, unrelated
+    texts are close to orthogonal, and the output is deterministic across
+    processes. Batches are accumulated in a single NumPy pass.
+    """
+
+    # Non-zero dimensions per n-gram (sparse Johnson-Lindenstrauss projection)
+    PROJECTIONS_PER_FEATURE = 4
+    BIGRAM_WEIGHT = 0.5
+    MAX_CACHED_FEATURES = 200_000
+
+    _TOKEN_PATTERN = re.compile(r"\w+")
+
+    def __init__(self, dimension: int = 1536, latency_ms: float = 0.0, seed: int = 0):
+        """
+        Initialize mock embedding model.
 
-    def __init__(self, dimension: int = 1536):
-        """Initialize mock embedding model."""
+        Args:
+            dimension: Embedding dimension
+            latency_ms: Simulated latency per embed_text/embed_batch call
+            seed: Projection seed; different seeds give unrelated embedding spaces
+        """
         self._dimension = dimension
+        self.latency_ms = latency_ms
+        self._hash_key = seed.to_bytes(8, 'little')
+        self._projection_cache: dict[str, tuple[tuple[int, ...], tuple[float, ...]]] = {}
         logger.info(f"Initialized mock embedding model with {dimension} dimensions")
 
     @property
@@ -295,30 +365,294 @@ class MockEmbeddingModel(EmbeddingModel):
         """Get embedding dimension."""
         return self._dimension
 
+    def _project(self, feature: str, weight: float) -> tuple[tuple[int, ...], tuple[float, ...]]:
+        """Dimensions and weighted signs an n-gram contributes to (cached)."""
+        cached = self._projection_cache.get(feature)
+        if cached is None:
+            digest = hashlib.blake2b(
+                feature.encode(), digest_size=4 * self.PROJECTIONS_PER_FEATURE, key=self._hash_key
+            ).digest()
+            words = np.frombuffer(digest, dtype='<u4')
+            cached = (
+                tuple(((words & 0x7FFFFFFF) % self._dimension).tolist()),
+                tuple(np.where(words >> 31, -weight, weight).tolist())
+            )
+            if len(self._projection_cache) < self.MAX_CACHED_FEATURES:
+                self._projection_cache[feature] = cached
+        return cached
+
+    def _features(self, text: str) -> list[tuple[str, float]]:
+        tokens = self._TOKEN_PATTERN.findall(text.lower())
+        if not tokens:
+            # Punctuation-only text still gets a stable, distinct vector
+            return [(text.strip(), 1.0)]
+        features = [(token, 1.0) for token in tokens]
+        # Bigrams contain a space, so they never collide with unigram cache keys
+        features.extend((f"{a} {b}", self.BIGRAM_WEIGHT) for a, b in itertools.pairwise(tokens))
+        return features
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        """
+        Embed texts synchronously.
+
+        Returns:
+            float32 array of shape (len(texts), dimension) with unit-norm rows
+        """
+        indices: list[int] = []
+        values: list[float] = []
+        counts: list[int] = []
+        for text in texts:
+            if not text or not text.strip():
+                raise ValueError("Text cannot be empty")
+            start = len(indices)
+            for feature, weight in self._features(text):
+                feature_indices, feature_values = self._project(feature, weight)
+                indices += feature_indices
+                values += feature_values
+            counts.append(len(indices) - start)
+
+        row_offsets = np.repeat(np.arange(len(texts), dtype=np.int64) * self._dimension, counts)
+        embeddings = np.bincount(
+            row_offsets + np.asarray(indices, dtype=np.int64),
+            weights=np.asarray(values),
+            minlength=len(texts) * self._dimension
+        ).reshape(len(texts), self._dimension)
+
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (embeddings / norms).astype(np.float32)
+
     async def embed_text(self, text: str) -> list[float]:
         """Generate mock embedding for text."""
-        if not text or not text.strip():
-            raise ValueError("Text cannot be empty")
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return self.encode([text])[0].tolist()
 
-        # Generate deterministic mock embedding based on text hash
-        import hashlib
-        hash_bytes = hashlib.md5(text.encode()).digest()
+    async def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Generate mock embeddings for multiple texts in one vectorized pass."""
+        if not texts:
+            return []
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return self.encode(texts).tolist()
+
+
+# Loaded sentence-transformers models, shared by every LocalEmbeddingModel in the process
+_local_encoders: dict[tuple, Any] = {}
+_local_encoders_lock = threading.Lock()
+
+
+def _load_local_encoder(model_name: str, backend: str, onnx_file: str | None):
+    """Load (once per process) a SentenceTransformer on CPU; blocking."""
+    key = (model_name, backend, onnx_file)
+    with _local_encoders_lock:
+        encoder = _local_encoders.get(key)
+        if encoder is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError:
+                raise ImportError(
+                    "sentence-transformers not available. Install with: "
+                    "pip install 'sentence-transformers[onnx]'"
+                )
+            options: dict[str, Any] = {'device': 'cpu'}
+            if backend != 'torch':
+                options['backend'] = backend
+                if onnx_file:
+                    # e.g. onnx/model_qint8_avx512_vnni.onnx for an int8-quantized export
+                    options['model_kwargs'] = {'file_name': onnx_file}
+            start_time = time.time()
+            encoder = SentenceTransformer(model_name, **options)
+            logger.info(f"Loaded local embedding model {model_name} ({backend}) "
+                        f"in {(time.time() - start_time) * 1000:.0f}ms")
+            _local_encoders[key] = encoder
+        return encoder
 
-        embedding = []
-        for i in range(self._dimension):
-            byte_idx = i % len(hash_bytes)
-            # Normalize to [-1, 1] range like real embeddings
-            embedding.append((float(hash_bytes[byte_idx]) / 127.5) - 1.0)
 
-        return embedding
+class LocalEmbeddingModel(EmbeddingModel):
+    """
+    Local CPU embedding model with dynamic batching.
 
-    async def embed_batch(self, texts: list[str]) -> list[list[float]]:
-        """Generate mock embeddings for multiple texts."""
-        embeddings = []
+    Concurrent embed_text/embed_batch calls put their texts on one queue; a
+    batcher task drains it into batches of up to max_batch_size, waiting at
+    most max_wait_ms for a batch to fill, and runs each batch on a dedicated
+    thread pool so inference never blocks the event loop. The model itself
+    is loaded once per process and shared between instances.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        backend: str = "torch",
+        onnx_file: str | None = None,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        num_workers: int = 1,
+        encoder: Any = None
+    ):
+        """
+        Initialize local embedding model (blocking: loads the model).
+
+        Args:
+            model_name: sentence-transformers model name or path
+            backend: "torch" or "onnx" (ONNX Runtime)
+            onnx_file: ONNX file within the model repo, e.g. a quantized export
+            max_batch_size: Maximum texts per inference call
+            max_wait_ms: Longest a text waits for its batch to fill
+            num_workers: Inference threads (batches run concurrently)
+            encoder: Preloaded model with encode() (skips loading)
+        """
+        if backend not in ("torch", "onnx"):
+            raise ValueError(f"Unsupported local embedding backend: {backend}")
+
+        self.model = model_name
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.num_workers = num_workers
+
+        self._encoder = encoder if encoder is not None else _load_local_encoder(model_name, backend, onnx_file)
+        self._dimension = int(self._encoder.get_sentence_embedding_dimension())
+        self._executor = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="local-embed")
+
+        # Created on first use in the serving event loop (the model may be built in a thread)
+        self._queue: asyncio.Queue | None = None
+        self._batcher: asyncio.Task | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._inflight: set[asyncio.Task] = set()
+        self.batches = 0
+        self.texts = 0
+
+        logger.info(f"Initialized local embedding model: {model_name} ({self._dimension} dims, {backend})")
+
+    @property
+    def dimension(self) -> int:
+        """Get embedding dimension for the model."""
+        return self._dimension
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        """Embed texts synchronously (runs on the calling thread)."""
+        return np.asarray(self._encoder.encode(
+            texts,
+            batch_size=len(texts),
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        ), dtype=np.float32)
+
+    def _ensure_batcher(self) -> asyncio.Queue:
+        if self._batcher is None or self._batcher.done():
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.num_workers)
+            self._batcher = asyncio.create_task(self._run_batcher())
+        return self._queue
+
+    async def _run_batcher(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                if self._queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self._queue.get_nowait())
+
+            # Keep collecting the next batch while this one runs, up to num_workers in flight
+            await self._slots.acquire()
+            task = asyncio.create_task(self._run_batch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            batch = [(text, future) for text, future in batch if not future.done()]
+            if not batch:
+                return
+            start_time = time.time()
+            try:
+                embeddings = await loop.run_in_executor(self._executor, self.encode, [text for text, _ in batch])
+            except Exception as e:
+                logger.error(f"Local embedding batch failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(Exception(f"Failed to generate embedding: {e}"))
+                return
+
+            self.batches += 1
+            self.texts += len(batch)
+            logger.debug(f"Generated {len(batch)} local embeddings in {(time.time() - start_time) * 1000:.1f}ms")
+            for (_, future), embedding in zip(batch, embeddings, strict=True):
+                if not future.done():
+                    future.set_result(embedding.tolist())
+        finally:
+            self._slots.release()
+
+    async def _submit(self, texts: list[str]) -> list[list[float]]:
+        queue = self._ensure_batcher()
+        loop = asyncio.get_running_loop()
+        futures = []
         for text in texts:
-            embedding = await self.embed_text(text)
-            embeddings.append(embedding)
-        return embeddings
+            future = loop.create_future()
+            queue.put_nowait((" ".join(text.split()), future))
+            futures.append(future)
+        return list(await asyncio.gather(*futures))
+
+    async def embed_text(self, text: str) -> list[float]:
+        """Generate embedding for a single text, batched with concurrent callers."""
+        if not text or not text.strip():
+            raise ValueError("Text cannot be empty")
+        return (await self._submit([text]))[0]
+
+    async def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """Generate embeddings for multiple texts in the same order as the input."""
+        if not texts:
+            return []
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                raise ValueError(f"Text at index {i} cannot be empty")
+        return await self._submit(texts)
+
+    async def health_check(self) -> dict[str, Any]:
+        """Embed a short text and report latency and batching counters."""
+        try:
+            start_time = time.time()
+            await self.embed_text("Health check test")
+            return {
+                "status": "healthy",
+                "model": self.model,
+                "backend": self.backend,
+                "dimension": self.dimension,
+                "response_time_ms": round((time.time() - start_time) * 1000, 2),
+                "max_batch_size": self.max_batch_size,
+                "batches": self.batches,
+                "avg_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0
+            }
+        except Exception as e:
+            logger.error(f"Embedding health check failed: {e}")
+            return {"status": "unhealthy", "model": self.model, "error": str(e)}
+
+    async def close(self) -> None:
+        """Stop the batcher and the inference threads (the loaded model stays cached)."""
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(Exception("Local embedding model closed"))
+        self._executor.shutdown(wait=False)
 
 
 def create_embedding_model(
@@ -330,7 +664,7 @@ def create_embedding_model(
     Factory function to create embedding models.
 
     Args:
-        provider: Embedding provider ("openai" or "mock")
+        provider: Embedding provider ("openai", "local" or "mock")
         model: Model name for the provider
         **kwargs: Additional configuration for the model
 
@@ -343,8 +677,14 @@ def create_embedding_model(
     """
     if provider.lower() == "openai":
         return OpenAIEmbeddingModel(model=model, **kwargs)
+    elif provider.lower() == "local":
+        if model.startswith("text-embedding-"):
+            # The factory default names an OpenAI model; use the local default instead
+            return LocalEmbeddingModel(**kwargs)
+        return LocalEmbeddingModel(model_name=model, **kwargs)
     elif provider.lower() == "mock":
         dimension = kwargs.get("dimension", 1536)
-        return MockEmbeddingModel(dimension=dimension)
+        latency_ms = float(kwargs.get("latency_ms", os.getenv("MOCK_EMBEDDING_LATENCY_MS", "0")))
+        return MockEmbeddingModel(dimension=dimension, latency_ms=latency_ms)
     else:
         raise ValueError(f"Unsupported embedding provider: {provider}")
@@ -0,0 +1,256 @@
+"""
+Entity Resolution for Knowledge Graph Deduplication
+
+Blocking-based duplicate detection for graph_nodes. Instead of comparing every
+pair of entity names, each entity is assigned a handful of blocking keys
+(normalized name, suffix-stripped name, token set, individual tokens and
+trigram MinHash LSH bands) and only entities sharing a block are compared.
+Clusters are built with union-find so chains of duplicates collapse into one
+canonical entity; a fuzzy match only joins two clusters when their
+representatives also match, so a chain of loose pairs cannot merge unrelated
+names.
+"""
+
+import logging
+import re
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CORPORATE_SUFFIXES = {'inc', 'corp', 'corporation', 'co', 'company', 'llc', 'ltd', 'limited'}
+
+# Mersenne prime for universal hashing; coefficients stay below 2**29 so
+# a * crc32 + b never overflows uint64.
+_MINHASH_PRIME = (1 << 61) - 1
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(_PUNCTUATION.sub(" ", name.lower()).split())
+
+
+def strip_suffixes(normalized: str) -> str:
+    """Remove trailing corporate suffixes ("nike inc" -> "nike")."""
+    tokens = normalized.split()
+    while len(tokens) > 1 and tokens[-1] in CORPORATE_SUFFIXES:
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def trigrams(normalized: str) -> set[str]:
+    """Character trigrams of the padded name."""
+    padded = f"  {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class EntityKey:
+    """Precomputed comparison features for one entity."""
+    entity_id: Any
+    name: str
+    normalized: str
+    stripped: str
+    tokens: tuple[str, ...]
+    grams: set[str] = field(repr=False)
+
+
+class _UnionFind:
+    """Disjoint sets keyed by entity id."""
+
+    def __init__(self):
+        self.parent: dict[Any, Any] = {}
+
+    def find(self, item):
+        parent = self.parent.setdefault(item, item)
+        if parent != item:
+            parent = self.parent[item] = self.find(parent)
+        return parent
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[root_b] = root_a
+
+
+class EntityResolver:
+    """
+    Incremental, blocking-based entity duplicate detector.
+
+    Exact keys (normalized name, suffix-stripped name, token set, alias rule)
+    merge every member of a block directly. Fuzzy keys (shared tokens and
+    MinHash LSH bands) only produce candidate pairs, which are confirmed with
+    are_similar(). Fuzzy blocks larger than max_block_size are skipped since
+    they come from very common tokens and carry no signal.
+    """
+
+    def __init__(self,
+                 rules: dict[str, list[str]] | None = None,
+                 num_perm: int = 32,
+                 bands: int = 8,
+                 jaccard_threshold: float = 0.8,
+                 max_block_size: int = 200,
+                 seed: int = 7):
+        """
+        Initialize the resolver.
+
+        Args:
+            rules: Canonical name -> list of known aliases
+            num_perm: MinHash signature length
+            bands: LSH bands (num_perm must be divisible by bands)
+            jaccard_threshold: Trigram Jaccard needed for a fuzzy match
+            max_block_size: Fuzzy blocks above this size are ignored
+            seed: Seed for the MinHash permutations
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.jaccard_threshold = jaccard_threshold
+        self.max_block_size = max_block_size
+
+        rng = np.random.default_rng(seed)
+        self._perm_a = rng.integers(1, 1 << 29, size=num_perm, dtype=np.uint64)
+        self._perm_b = rng.integers(0, 1 << 29, size=num_perm, dtype=np.uint64)
+
+        # Alias lookup is a dict built once, not a list rebuilt per comparison
+        self.rule_index: dict[str, str] = {}
+        for canonical, aliases in (rules or {}).items():
+            for alias in [canonical, *aliases]:
+                self.rule_index[normalize_name(alias)] = canonical
+
+        self.entities: dict[Any, EntityKey] = {}
+        self.exact_blocks: dict[str, list[Any]] = defaultdict(list)
+        self.fuzzy_blocks: dict[str, list[Any]] = defaultdict(list)
+        self.comparisons = 0
+
+    def __len__(self) -> int:
+        return len(self.entities)
+
+    def _signature(self, grams: set[str]) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(g.encode()) for g in grams), dtype=np.uint64, count=len(grams))
+        products = self._perm_a[:, None] * hashes[None, :] + self._perm_b[:, None]
+        return (products % _MINHASH_PRIME).min(axis=1)
+
+    def _blocking_keys(self, key: EntityKey) -> tuple[list[str], list[str]]:
+        exact = [f"n:{key.normalized}", f"s:{key.stripped}", f"t:{' '.join(sorted(set(key.tokens)))}"]
+        canonical = self.rule_index.get(key.normalized) or self.rule_index.get(key.stripped)
+        if canonical:
+            exact.append(f"r:{canonical}")
+
+        fuzzy = [f"w:{token}" for token in set(key.tokens) if len(token) >= 3]
+        if key.grams:
+            signature = self._signature(key.grams)
+            for band in range(self.bands):
+                chunk = signature[band * self.rows:(band + 1) * self.rows]
+                fuzzy.append(f"l{band}:{chunk.tobytes().hex()}")
+        return exact, fuzzy
+
+    def add(self, entity_id, name: str) -> EntityKey:
+        """Index an entity under all of its blocking keys."""
+        normalized = normalize_name(name)
+        key = EntityKey(
+            entity_id=entity_id,
+            name=name,
+            normalized=normalized,
+            stripped=strip_suffixes(normalized),
+            tokens=tuple(normalized.split()),
+            grams=trigrams(normalized) if normalized else set()
+        )
+        self.entities[entity_id] = key
+
+        exact, fuzzy = self._blocking_keys(key)
+        for block in exact:
+            self.exact_blocks[block].append(entity_id)
+        for block in fuzzy:
+            self.fuzzy_blocks[block].append(entity_id)
+        return key
+
+    def are_similar(self, a: EntityKey, b: EntityKey) -> bool:
+        """Confirm a candidate pair produced by a fuzzy block."""
+        self.comparisons += 1
+
+        if a.normalized == b.normalized or a.stripped == b.stripped:
+            return True
+
+        # One multi-word name is a whole-word part of the other ("von base" /
+        # "von base enterprises"); a single word ("bill", "apple") is too ambiguous
+        if a.normalized and b.normalized:
+            short, long = sorted((a.normalized, b.normalized), key=len)
+            if " " in short and f" {short} " in f" {long} ":
+                return True
+
+        union = len(a.grams | b.grams)
+        return bool(union) and len(a.grams & b.grams) / union >= self.jaccard_threshold
+
+    def find_clusters(self, only_ids: set | None = None) -> list[list[Any]]:
+        """
+        Group duplicate entities.
+
+        Args:
+            only_ids: If given, only clusters containing at least one of these
+                entities are returned and only pairs touching them are compared
+                (incremental mode for newly inserted entities).
+
+        Returns:
+            Lists of entity ids, each with two or more members
+        """
+        union_find = _UnionFind()
+        self.comparisons = 0
+
+        for members in self.exact_blocks.values():
+            if len(members) < 2:
+                continue
+            if only_ids is not None and not any(m in only_ids for m in members):
+                continue
+            for member in members[1:]:
+                union_find.union(members[0], member)
+
+        for members in self.fuzzy_blocks.values():
+            if len(members) < 2 or len(members) > self.max_block_size:
+                continue
+            if only_ids is None:
+                pairs = ((members[i], other) for i in range(len(members)) for other in members[i + 1:])
+            else:
+                fresh = [m for m in members if m in only_ids]
+                pairs = ((new, other) for new in fresh for other in members if other != new)
+            for left, right in pairs:
+                root_left, root_right = union_find.find(left), union_find.find(right)
+                if root_left == root_right:
+                    continue
+                if not self.are_similar(self.entities[left], self.entities[right]):
+                    continue
+                # Both clusters' representatives must agree too, so A~B and B~C
+                # does not pull C into A's cluster on its own
+                if (root_left, root_right) != (left, right) and not self.are_similar(
+                        self.entities[root_left], self.entities[root_right]):
+                    continue
+                union_find.union(left, right)
+
+        clusters: dict[Any, list[Any]] = defaultdict(list)
+        for entity_id in union_find.parent:
+            clusters[union_find.find(entity_id)].append(entity_id)
+
+        result = [members for members in clusters.values() if len(members) > 1]
+        if only_ids is not None:
+            result = [members for members in result if any(m in only_ids for m in members)]
+
+        logger.debug(f"Entity resolution: {len(self)} entities, {self.comparisons} comparisons, {len(result)} clusters")
+        return result
+
+    def canonical_name(self, cluster: list[Any]) -> str:
+        """Rule canonical name if any member matches a rule, else the first name alphabetically."""
+        for entity_id in cluster:
+            key = self.entities[entity_id]
+            canonical = self.rule_index.get(key.normalized) or self.rule_index.get(key.stripped)
+            if canonical:
+                return canonical
+        return min(self.entities[entity_id].name for entity_id in cluster)
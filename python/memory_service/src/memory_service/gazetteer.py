@@ -0,0 +1,306 @@
+"""
+Entity Gazetteer for Knowledge Graph Extraction
+
+Fast-path entity extractor built on an Aho-Corasick automaton over every
+known canonical entity name and alias. A single linear pass over the memory
+content emits canonical entity IDs directly, so known entities never need
+spaCy NER or a database lookup to be resolved.
+"""
+
+import logging
+from collections import deque
+from typing import Any
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+# Common words that also occur as entity names ("The", "Will"); matching is
+# case-insensitive, so as single-token names they would match almost any text
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'can', 'for', 'from', 'has', 'have', 'her', 'his', 'how',
+    'into', 'its', 'may', 'more', 'most', 'new', 'not', 'now', 'one', 'our', 'out',
+    'over', 'she', 'that', 'the', 'their', 'them', 'then', 'there', 'these', 'they',
+    'this', 'time', 'was', 'way', 'were', 'what', 'when', 'who', 'will', 'with', 'you',
+    'your'
+})
+
+
+def _normalize(text: str) -> str:
+    """
+    Lowercase text one character at a time.
+
+    Some characters expand when lowercased (e.g. 'İ'), which would shift
+    match offsets. Keeping only the first lowered character preserves a 1:1
+    mapping between normalized and original positions.
+    """
+    return ''.join(c.lower()[:1] or c for c in text)
+
+
+class AhoCorasickAutomaton:
+    """
+    Multi-pattern string matcher (Aho-Corasick).
+
+    Patterns can be added at any time. Insertion only touches the trie; the
+    failure links are recomputed lazily on the next search, so a burst of
+    new entities costs one O(total pattern length) rebuild instead of one
+    per entity.
+    """
+
+    def __init__(self):
+        # Node 0 is the root. Each node has goto edges, a failure link and
+        # the payloads of every pattern that ends at that node.
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[list[tuple[int, Any]]] = [[]]
+        self._dirty = False
+        self.pattern_count = 0
+
+    def add(self, pattern: str, payload: Any) -> None:
+        """Add a (pre-normalized) pattern with its payload."""
+        if not pattern:
+            return
+
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[node][char] = next_node
+            node = next_node
+
+        # Replace the payload if this exact pattern was already registered
+        outputs = self._output[node]
+        for i, (length, _) in enumerate(outputs):
+            if length == len(pattern):
+                outputs[i] = (length, payload)
+                break
+        else:
+            outputs.append((len(pattern), payload))
+            self.pattern_count += 1
+
+        self._dirty = True
+
+    def _build(self) -> None:
+        """Recompute failure links with a BFS over the trie."""
+        self._fail = [0] * len(self._goto)
+        # Own outputs only; suffix outputs are followed via failure links
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                candidate = self._goto[fallback].get(char, 0)
+                self._fail[child] = candidate if candidate != child else 0
+
+        self._dirty = False
+
+    def iter_matches(self, text: str):
+        """
+        Yield (start, end, payload) for every pattern occurrence in text.
+
+        Overlapping matches are all reported; callers pick the ones they want.
+        """
+        if self._dirty:
+            self._build()
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        node = 0
+
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            match_node = node
+            while match_node:
+                for length, payload in output[match_node]:
+                    yield index + 1 - length, index + 1, payload
+                match_node = fail[match_node]
+
+
+class EntityGazetteer:
+    """
+    Gazetteer of canonical entities and their aliases.
+
+    Loaded from graph_nodes and the entity_canonicalization table and kept up
+    to date as the graph provider creates new entities.
+    """
+
+    def __init__(self, min_length: int = 2, min_single_token_length: int = 4, confidence: float = 0.9):
+        """
+        Initialize an empty gazetteer.
+
+        Args:
+            min_length: Shortest name/alias that will be matched
+            min_single_token_length: Shortest one-word name that will be matched,
+                unless it is written as an acronym ("VBE", "IBM")
+            confidence: Confidence score reported for gazetteer matches
+        """
+        self.min_length = min_length
+        self.min_single_token_length = min_single_token_length
+        self.confidence = confidence
+        self._automaton = AhoCorasickAutomaton()
+        self._entities: dict[UUID, dict[str, Any]] = {}
+        self._names: dict[str, UUID] = {}
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    @property
+    def alias_count(self) -> int:
+        """Number of distinct surface forms that can be matched."""
+        return len(self._names)
+
+    def add_entity(self, entity_id: UUID, name: str, entity_type: str = 'other',
+                   aliases: list[str] | None = None) -> None:
+        """Register a canonical entity and optional aliases."""
+        self._entities[entity_id] = {'name': name, 'type': entity_type}
+        self.add_alias(name, entity_id)
+        for alias in aliases or []:
+            self.add_alias(alias, entity_id)
+
+    def add_alias(self, alias: str, entity_id: UUID) -> None:
+        """Map an alias onto an already registered canonical entity."""
+        if entity_id not in self._entities:
+            return
+
+        alias = alias.strip()
+        key = _normalize(alias)
+        if not self._matchable(alias, key) or self._names.get(key) == entity_id:
+            return
+
+        self._names[key] = entity_id
+        self._automaton.add(key, entity_id)
+
+    def _matchable(self, alias: str, key: str) -> bool:
+        """Whether a surface form is specific enough to match case-insensitively."""
+        if len(key) < self.min_length:
+            return False
+        if len(key.split()) > 1:
+            return True
+        if key in STOPWORDS:
+            return False
+        return len(key) >= self.min_single_token_length or alias.isupper()
+
+    def remove_entity(self, entity_id: UUID, merged_into: UUID | None = None) -> None:
+        """
+        Forget an entity whose graph node was deleted (e.g. merged away by
+        entity deduplication). Its surface forms are redirected to merged_into
+        when that entity is known, otherwise they stop matching.
+        """
+        if self._entities.pop(entity_id, None) is None:
+            return
+        for key, target in list(self._names.items()):
+            if target != entity_id:
+                continue
+            if merged_into in self._entities:
+                self._names[key] = merged_into
+                self._automaton.add(key, merged_into)
+            else:
+                # The automaton keeps the pattern; extract() skips unknown ids
+                del self._names[key]
+
+    def lookup(self, name: str) -> UUID | None:
+        """Resolve an exact name or alias to its canonical entity ID."""
+        return self._names.get(_normalize(name.strip()))
+
+    def extract(self, content: str) -> list[dict[str, Any]]:
+        """
+        Extract known entities from content in a single pass.
+
+        Matches must sit on word boundaries. Overlaps are resolved
+        leftmost-longest, so "Von Base Enterprises" wins over "Von Base".
+
+        Returns:
+            Entity dicts in the same shape as GraphProvider._extract_entities,
+            with the canonical name and an extra 'entity_id' key.
+        """
+        if not self._names or not content:
+            return []
+
+        text = _normalize(content)
+        text_length = len(text)
+
+        candidates = []
+        for start, end, entity_id in self._automaton.iter_matches(text):
+            if entity_id not in self._entities:
+                continue
+            if start > 0 and text[start - 1].isalnum():
+                continue
+            if end < text_length and text[end].isalnum():
+                continue
+            candidates.append((start, end, entity_id))
+
+        candidates.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+
+        entities = []
+        last_end = -1
+        for start, end, entity_id in candidates:
+            if start < last_end:
+                continue
+            entity = self._entities[entity_id]
+            entities.append({
+                'name': entity['name'],
+                'type': entity['type'],
+                'start': start,
+                'end': end,
+                'confidence': self.confidence,
+                'entity_id': entity_id,
+                'surface_form': content[start:end]
+            })
+            last_end = end
+
+        return entities
+
+    async def load(self, conn) -> int:
+        """
+        Load canonical entities and aliases from the database.
+
+        The entity_canonicalization table is optional; it only exists once
+        entity deduplication has been run.
+
+        Returns:
+            Number of canonical entities loaded
+        """
+        rows = await conn.fetch("""
+            SELECT id, entity_name, entity_type
+            FROM graph_nodes
+        """)
+        for row in rows:
+            self.add_entity(row['id'], row['entity_name'], row['entity_type'])
+
+        try:
+            aliases = await conn.fetch("""
+                SELECT alias, canonical_id
+                FROM entity_canonicalization
+            """)
+            for row in aliases:
+                self.add_alias(row['alias'], row['canonical_id'])
+        except Exception as e:
+            logger.debug(f"Entity canonicalization table not available: {e}")
+
+        self.loaded = True
+        logger.info(f"Entity gazetteer loaded {len(self)} entities with {self.alias_count} surface forms")
+        return len(self)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get gazetteer statistics."""
+        return {
+            'loaded': self.loaded,
+            'entities': len(self),
+            'surface_forms': self.alias_count,
+            'automaton_patterns': self._automaton.pattern_count
+        }
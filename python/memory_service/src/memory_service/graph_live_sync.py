@@ -6,8 +6,37 @@ Add these to api.py to enable real-time graph stats
 import logging
 from datetime import datetime
 
+from asyncpg.exceptions import UndefinedColumnError
+
 logger = logging.getLogger(__name__)
 
+
+async def fetch_top_entities(conn, limit: int = 10):
+    """
+    Most connected entities, from the degree column precomputed by
+    GraphAnalyticsJob, or counted from graph_relationships before the first
+    analytics run has added the centrality columns.
+    """
+    try:
+        return await conn.fetch("""
+            SELECT entity_name, entity_type, importance_score, degree as connections
+            FROM graph_nodes
+            ORDER BY degree DESC, importance_score DESC
+            LIMIT $1
+        """, limit)
+    except UndefinedColumnError:
+        return await conn.fetch("""
+            SELECT n.entity_name, n.entity_type, n.importance_score,
+                   COUNT(DISTINCT r.to_node_id) + COUNT(DISTINCT r2.from_node_id) as connections
+            FROM graph_nodes n
+            LEFT JOIN graph_relationships r ON n.id = r.from_node_id
+            LEFT JOIN graph_relationships r2 ON n.id = r2.to_node_id
+            GROUP BY n.id, n.entity_name, n.entity_type, n.importance_score
+            ORDER BY connections DESC, n.importance_score DESC
+            LIMIT $1
+        """, limit)
+
+
 # Add these endpoints to your existing router in api.py
 
 async def get_graph_live_stats(conn):
@@ -24,16 +53,7 @@ async def get_graph_live_stats(conn):
         )
 
         # Get top entities by connections
-        top_entities = await conn.fetch("""
-            SELECT n.entity_name, n.entity_type, n.importance_score,
-                   COUNT(DISTINCT r.to_node_id) + COUNT(DISTINCT r2.from_node_id) as connections
-            FROM graph_nodes n
-            LEFT JOIN graph_relationships r ON n.id = r.from_node_id
-            LEFT JOIN graph_relationships r2 ON n.id = r2.to_node_id
-            GROUP BY n.id, n.entity_name, n.entity_type, n.importance_score
-            ORDER BY connections DESC, n.importance_score DESC
-            LIMIT 10
-        """)
+        top_entities = await fetch_top_entities(conn)
 
         # Get entity type distribution
         type_dist = await conn.fetch("""
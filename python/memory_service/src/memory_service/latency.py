@@ -0,0 +1,166 @@
+"""
+Latency Histograms for Store and Query Paths
+
+Fixed-memory log-bucket histograms (HDR style) recorded per operation and
+per stage, so tail latency can be attributed to embedding, deduplication,
+ADM scoring, provider SQL or ranking instead of a single running mean.
+Recording is a few integer operations; percentiles are only computed when
+a snapshot is requested.
+"""
+
+import time
+from typing import Any
+
+# 2**SUB_BUCKET_BITS buckets per power of two: ~12.5% relative error
+SUB_BUCKET_BITS = 3
+_SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+_SUB_MASK = _SUB_BUCKETS - 1
+# Values are microseconds; everything above ~19 hours lands in the last bucket
+_MAX_EXPONENT = 36
+_BUCKET_COUNT = (_MAX_EXPONENT - SUB_BUCKET_BITS + 2) * _SUB_BUCKETS
+
+
+def _bucket_index(micros: int) -> int:
+    if micros < _SUB_BUCKETS:
+        return micros if micros > 0 else 0
+    exponent = micros.bit_length() - 1
+    if exponent > _MAX_EXPONENT:
+        return _BUCKET_COUNT - 1
+    shift = exponent - SUB_BUCKET_BITS
+    return ((shift + 1) << SUB_BUCKET_BITS) | ((micros >> shift) & _SUB_MASK)
+
+
+def _bucket_bounds(index: int) -> tuple[int, int]:
+    """Inclusive lower and exclusive upper bound (microseconds) of a bucket."""
+    if index < _SUB_BUCKETS:
+        return index, index + 1
+    shift = (index >> SUB_BUCKET_BITS) - 1
+    lower = (_SUB_BUCKETS | (index & _SUB_MASK)) << shift
+    return lower, lower + (1 << shift)
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram with a fixed number of buckets.
+
+    Only mutated from the event loop thread, so plain integer updates need
+    no locking (there is no await between read and write).
+    """
+
+    __slots__ = ('counts', 'count', 'total_micros', 'max_micros')
+
+    def __init__(self):
+        self.counts = [0] * _BUCKET_COUNT
+        self.count = 0
+        self.total_micros = 0
+        self.max_micros = 0
+
+    def record(self, seconds: float) -> None:
+        micros = int(seconds * 1_000_000)
+        self.counts[_bucket_index(micros)] += 1
+        self.count += 1
+        self.total_micros += micros
+        if micros > self.max_micros:
+            self.max_micros = micros
+
+    def percentile(self, q: float) -> float:
+        """Approximate q-th percentile (0-100) in milliseconds."""
+        if not self.count:
+            return 0.0
+        target = max(1, int(self.count * q / 100 + 0.5))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                lower, upper = _bucket_bounds(index)
+                return min((lower + upper) / 2, self.max_micros) / 1000
+        return self.max_micros / 1000
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total_micros / self.count / 1000, 3) if self.count else 0.0,
+            'p50_ms': round(self.percentile(50), 3),
+            'p95_ms': round(self.percentile(95), 3),
+            'p99_ms': round(self.percentile(99), 3),
+            'max_ms': round(self.max_micros / 1000, 3)
+        }
+
+    def reset(self) -> None:
+        self.counts = [0] * _BUCKET_COUNT
+        self.count = 0
+        self.total_micros = 0
+        self.max_micros = 0
+
+
+class LatencyRecorder:
+    """Named histograms, e.g. 'query', 'query.embed', 'query.provider.pgvector'."""
+
+    def __init__(self):
+        self.histograms: dict[str, LatencyHistogram] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = LatencyHistogram()
+        histogram.record(seconds)
+
+    def timer(self, operation: str) -> 'StageTimer':
+        return StageTimer(self, operation)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        return {name: histogram.snapshot() for name, histogram in sorted(self.histograms.items())}
+
+    def reset(self) -> None:
+        self.histograms.clear()
+
+
+class _Stage:
+    __slots__ = ('timer', 'name', 'started')
+
+    def __init__(self, timer: 'StageTimer', name: str):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.add(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class StageTimer:
+    """
+    Per-request stage timings for one operation.
+
+    Stage durations accumulate in a small dict while the request runs and
+    are flushed into the shared histograms (as '<operation>.<stage>') by
+    finish(), keeping the per-stage cost to two clock reads and a dict
+    update. Repeated stages (e.g. one embed per chunk) accumulate.
+    """
+
+    __slots__ = ('recorder', 'operation', 'started', 'stages')
+
+    def __init__(self, recorder: LatencyRecorder, operation: str):
+        self.recorder = recorder
+        self.operation = operation
+        self.started = time.perf_counter()
+        self.stages: dict[str, float] = {}
+
+    def stage(self, name: str) -> _Stage:
+        return _Stage(self, name)
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def finish(self) -> dict[str, float]:
+        """Record the total and return the breakdown in milliseconds."""
+        total = time.perf_counter() - self.started
+        self.recorder.record(self.operation, total)
+        for name, seconds in self.stages.items():
+            self.recorder.record(f"{self.operation}.{name}", seconds)
+        breakdown = {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()}
+        breakdown['total'] = round(total * 1000, 3)
+        return breakdown
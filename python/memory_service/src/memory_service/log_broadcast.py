@@ -0,0 +1,237 @@
+"""
+Log Broadcasting for /logs/stream
+
+A single logging.Handler, behind the root logger's queue, feeds one
+in-memory ring buffer of recent records and fans each record out to the
+streaming clients through per-client bounded asyncio queues. A record is
+formatted once (its message when it is handled, each wire format the
+first time a client asks for it), however many clients are connected,
+and no client holds a thread while it waits for the next line.
+
+A client that reads slower than logs are written does not slow the
+service down or grow memory: once its queue is full the oldest queued
+lines are dropped, and the client is told how many it missed. New clients
+can replay the last N lines from the ring buffer before following live, and
+/debug/logs reads the same buffer.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any
+
+from .logging_config import attach_handler, detach_handler
+
+FORMATS = ('json', 'syslog', 'plain')
+
+
+def syslog_priority(levelno: int) -> int:
+    """RFC3164 priority for a Python log level, facility local0 (16)."""
+    if levelno >= logging.CRITICAL:
+        severity = 2
+    elif levelno >= logging.ERROR:
+        severity = 3
+    elif levelno >= logging.WARNING:
+        severity = 4
+    elif levelno >= logging.INFO:
+        severity = 6
+    else:
+        severity = 7
+    return 16 * 8 + severity
+
+
+class LogEntry:
+    """One captured record; wire formats are rendered on first use and cached."""
+
+    __slots__ = ('created', 'levelno', 'levelname', 'name', 'module', 'function', 'line',
+                 'message', '_rendered')
+
+    def __init__(self, record: logging.LogRecord, message: str):
+        self.created = record.created
+        self.levelno = record.levelno
+        self.levelname = record.levelname
+        self.name = record.name
+        self.module = record.module
+        self.function = record.funcName
+        self.line = record.lineno
+        self.message = message
+        self._rendered: dict[str, str] = {}
+
+    def render(self, format: str) -> str:
+        rendered = self._rendered.get(format)
+        if rendered is None:
+            rendered = self._rendered[format] = self._render(format)
+        return rendered
+
+    def _render(self, format: str) -> str:
+        if format == 'syslog':
+            # Syslog format: <priority>timestamp hostname app[pid]: message
+            timestamp = datetime.fromtimestamp(self.created).strftime('%b %d %H:%M:%S')
+            hostname = os.getenv('RENDER_SERVICE_NAME', 'core-nexus-memory')
+            return f"<{syslog_priority(self.levelno)}>{timestamp} {hostname} {self.name}[{os.getpid()}]: {self.message}\n"
+        if format == 'plain':
+            return f"{self.message}\n"
+        return f"data: {json.dumps(self.as_dict())}\n\n"
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            'timestamp': datetime.fromtimestamp(self.created).isoformat(),
+            'level': self.levelname,
+            'logger': self.name,
+            'message': self.message,
+            'module': self.module,
+            'function': self.function,
+            'line': self.line
+        }
+
+
+def render_dropped(format: str, count: int) -> str:
+    """Notice sent to a client in place of lines dropped from its queue."""
+    if format == 'json':
+        return f"data: {json.dumps({'dropped': count})}\n\n"
+    return f"[log stream lagged: {count} lines dropped]\n"
+
+
+class LogSubscription:
+    """One streaming client's bounded queue; use as a context manager to unsubscribe."""
+
+    def __init__(self, broadcaster: 'LogBroadcaster', loop: asyncio.AbstractEventLoop, maxsize: int):
+        self._broadcaster = broadcaster
+        self._loop = loop
+        self._queue: asyncio.Queue[LogEntry] = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self._reported = 0
+
+    def offer(self, entry: LogEntry) -> None:
+        """Queue an entry (event loop thread only), dropping the oldest when full."""
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(entry)
+
+    async def get(self, timeout: float | None = None) -> LogEntry | None:
+        """The next entry, or None if none arrives within timeout seconds."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def take_dropped(self) -> int:
+        """Lines dropped since the last call."""
+        count = self.dropped - self._reported
+        self._reported = self.dropped
+        return count
+
+    def close(self) -> None:
+        self._broadcaster.unsubscribe(self)
+
+    def __enter__(self) -> 'LogSubscription':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class _BroadcastHandler(logging.Handler):
+    def __init__(self, broadcaster: 'LogBroadcaster'):
+        super().__init__()
+        self.broadcaster = broadcaster
+        self.setFormatter(logging.Formatter('%(message)s'))
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.broadcaster.publish(LogEntry(record, self.format(record)))
+        except Exception:
+            self.handleError(record)
+
+
+class LogBroadcaster:
+    """Ring buffer of recent log records with fan-out to streaming subscribers."""
+
+    def __init__(self, capacity: int = 1000, client_queue_size: int = 500):
+        """
+        Args:
+            capacity: Records kept for replay
+            client_queue_size: Lines a client may fall behind before the oldest are dropped
+        """
+        self.capacity = capacity
+        self.client_queue_size = client_queue_size
+        self.handler = _BroadcastHandler(self)
+        self._buffer: deque[LogEntry] = deque(maxlen=capacity)
+        self._subscribers: set[LogSubscription] = set()
+        self._lock = threading.Lock()
+        self.published = 0
+
+    @classmethod
+    def from_env(cls) -> 'LogBroadcaster':
+        """Build a broadcaster from LOG_STREAM_BUFFER_SIZE / LOG_STREAM_CLIENT_QUEUE_SIZE."""
+        return cls(
+            capacity=int(os.getenv('LOG_STREAM_BUFFER_SIZE', '1000')),
+            client_queue_size=int(os.getenv('LOG_STREAM_CLIENT_QUEUE_SIZE', '500'))
+        )
+
+    def install(self, target: logging.Logger | None = None) -> None:
+        """
+        Attach the handler to target, or by default behind the root logger's
+        queue so the event loop never formats for it.
+        """
+        if target is None:
+            attach_handler(self.handler)
+        elif self.handler not in target.handlers:
+            target.addHandler(self.handler)
+
+    def uninstall(self, target: logging.Logger | None = None) -> None:
+        if target is None:
+            detach_handler(self.handler)
+        else:
+            target.removeHandler(self.handler)
+
+    def publish(self, entry: LogEntry) -> None:
+        """Buffer an entry and hand it to every subscriber; safe from any thread."""
+        with self._lock:
+            self._buffer.append(entry)
+            self.published += 1
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription._loop.call_soon_threadsafe(subscription.offer, entry)
+            except RuntimeError:
+                # The subscriber's event loop is closed
+                self.unsubscribe(subscription)
+
+    def recent(self, limit: int) -> list[LogEntry]:
+        """Up to `limit` of the most recent buffered entries, oldest first."""
+        with self._lock:
+            return list(self._buffer)[-limit:] if limit > 0 else []
+
+    def subscribe(self, replay: int = 0) -> LogSubscription:
+        """
+        Register a client on the running event loop, pre-loaded with up to
+        `replay` of the most recent buffered lines.
+        """
+        subscription = LogSubscription(self, asyncio.get_running_loop(), self.client_queue_size)
+        with self._lock:
+            # Snapshot and register together so no record is missed or repeated
+            backlog = list(self._buffer)[-replay:] if replay > 0 else []
+            self._subscribers.add(subscription)
+        for entry in backlog[-self.client_queue_size:]:
+            subscription.offer(entry)
+        return subscription
+
+    def unsubscribe(self, subscription: LogSubscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                'subscribers': len(self._subscribers),
+                'buffered': len(self._buffer),
+                'capacity': self.capacity,
+                'published': self.published,
+                'dropped': sum(s.dropped for s in self._subscribers)
+            }
@@ -2,22 +2,132 @@
 Logging configuration for Core Nexus Memory Service.
 
 Supports both local logging and remote syslog (Papertrail) for production.
+
+Records are not written by the thread that logs them: the root logger has
+one QueueHandler, and a QueueListener thread formats and writes them to the
+console, file and Papertrail handlers. A log call on the event loop costs a
+queue put. The message is formatted lazily, by the listener, and only if
+some handler writes the record. Optionally (LOG_SAMPLE_LIMIT), repeated
+INFO/DEBUG lines from a single call site are rate-sampled before they are
+queued; WARNING and above are never sampled.
 """
 
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
 import socket
 import sys
+import threading
+import time
 
 
-def setup_papertrail_logging(
+class RateSamplingFilter(logging.Filter):
+    """
+    Pass at most `limit` records per call site (logger and line) every
+    `interval` seconds at or below `max_level`; records above it (by default
+    WARNING and up) always pass. The next record passed from a call site
+    notes how many of its lines were suppressed.
+    """
+
+    def __init__(self, limit: int = 20, interval: float = 1.0, max_level: int = logging.INFO):
+        super().__init__()
+        self.limit = limit
+        self.interval = interval
+        self.max_level = max_level
+        self.suppressed = 0
+        self._windows: dict[tuple[str, int], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level or self.limit <= 0:
+            return True
+        key = (record.name, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            # [window start, records passed, records suppressed]
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                skipped = window[2] if window else 0
+                window = self._windows[key] = [now, 0, 0]
+            else:
+                skipped = 0
+            if window[1] >= self.limit:
+                window[2] += 1
+                self.suppressed += 1
+                return False
+            window[1] += 1
+        if skipped:
+            record.msg = f"{record.msg} [{skipped} similar lines suppressed]"
+        return True
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that queues the record as-is; the listener formats it."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The default prepare() formats on the logging thread so records can be
+        # pickled; this queue never leaves the process
+        return record
+
+
+class LoggingPipeline:
+    """The root QueueHandler and the listener thread that feeds the output handlers."""
+
+    def __init__(self, handlers: list[logging.Handler], sampler: RateSamplingFilter | None = None):
+        self.queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.queue_handler = _LazyQueueHandler(self.queue)
+        if sampler:
+            self.queue_handler.addFilter(sampler)
+        self.sampler = sampler
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.running = False
+
+    def start(self) -> None:
+        logging.getLogger().addHandler(self.queue_handler)
+        self.listener.start()
+        self.running = True
+
+    def stop(self) -> None:
+        """Detach from the root logger and write out everything still queued."""
+        logging.getLogger().removeHandler(self.queue_handler)
+        if self.running:
+            self.listener.stop()
+            self.running = False
+
+    def add_handler(self, handler: logging.Handler) -> None:
+        if handler not in self.listener.handlers:
+            self.listener.handlers = (*self.listener.handlers, handler)
+
+    def remove_handler(self, handler: logging.Handler) -> None:
+        self.listener.handlers = tuple(h for h in self.listener.handlers if h is not handler)
+
+
+_pipeline: LoggingPipeline | None = None
+
+
+def attach_handler(handler: logging.Handler) -> None:
+    """Add an output handler behind the logging queue (or on the root logger without one)."""
+    if _pipeline:
+        _pipeline.add_handler(handler)
+    else:
+        logging.getLogger().addHandler(handler)
+
+
+def detach_handler(handler: logging.Handler) -> None:
+    if _pipeline:
+        _pipeline.remove_handler(handler)
+    logging.getLogger().removeHandler(handler)
+
+
+def create_papertrail_handler(
     papertrail_host: str = None,
     papertrail_port: int = None,
     app_name: str = "core-nexus-memory"
-):
+) -> logging.Handler | None:
     """
-    Configure logging to send to Papertrail via syslog.
+    Build the syslog handler that sends to Papertrail.
 
     Args:
         papertrail_host: Papertrail host (e.g., 'logs.papertrailapp.com')
@@ -33,10 +143,9 @@ def setup_papertrail_logging(
     # Skip if no valid configuration
     if not papertrail_host or not papertrail_port:
         logging.warning("Papertrail configuration not found, using local logging only")
-        return False
+        return None
 
     try:
-        # Create syslog handler for Papertrail
         handler = logging.handlers.SysLogHandler(
             address=(papertrail_host, papertrail_port),
             facility=logging.handlers.SysLogHandler.LOG_LOCAL0,
@@ -49,23 +158,30 @@ def setup_papertrail_logging(
             f'{hostname} {app_name}: %(name)s - %(levelname)s - %(message)s'
         )
         handler.setFormatter(formatter)
+        return handler
 
-        # Add to root logger
-        root_logger = logging.getLogger()
-        root_logger.addHandler(handler)
-        root_logger.setLevel(logging.INFO)
+    except Exception as e:
+        logging.error(f"Failed to configure Papertrail logging: {e}")
+        return None
 
-        # Also add to specific loggers
-        app_logger = logging.getLogger('memory_service')
-        app_logger.addHandler(handler)
 
-        # Log successful setup
-        logging.info(f"Papertrail logging configured: {papertrail_host}:{papertrail_port}")
-        return True
+def setup_papertrail_logging(
+    papertrail_host: str = None,
+    papertrail_port: int = None,
+    app_name: str = "core-nexus-memory"
+):
+    """
+    Configure logging to send to Papertrail via syslog.
 
-    except Exception as e:
-        logging.error(f"Failed to configure Papertrail logging: {e}")
+    The handler is attached once, behind the logging queue when setup_logging
+    has run; memory_service loggers reach it by propagation.
+    """
+    handler = create_papertrail_handler(papertrail_host, papertrail_port, app_name)
+    if handler is None:
         return False
+    attach_handler(handler)
+    logging.info(f"Papertrail logging configured: {handler.address[0]}:{handler.address[1]}")
+    return True
 
 
 def setup_logging():
@@ -76,7 +192,14 @@ def setup_logging():
     - Console logging (always enabled)
     - File logging (if LOG_FILE env var is set)
     - Papertrail logging (if configured)
+    - Per-call-site sampling of INFO/DEBUG lines, off unless LOG_SAMPLE_LIMIT
+      is set (at most that many per LOG_SAMPLE_INTERVAL seconds; WARNING and
+      above always pass)
+
+    Calling it again replaces the previous configuration.
     """
+    global _pipeline
+
     # Basic configuration
     log_level = os.getenv('LOG_LEVEL', 'INFO')
 
@@ -87,10 +210,19 @@ def setup_logging():
     )
     console_handler.setFormatter(console_formatter)
 
-    # Configure root logger
+    sample_limit = int(os.getenv('LOG_SAMPLE_LIMIT', '0'))
+    sampler = RateSamplingFilter(
+        limit=sample_limit,
+        interval=float(os.getenv('LOG_SAMPLE_INTERVAL', '1.0'))
+    ) if sample_limit > 0 else None
+
+    # Configure root logger: one QueueHandler in front of the output handlers
     root_logger = logging.getLogger()
     root_logger.setLevel(getattr(logging, log_level.upper()))
-    root_logger.addHandler(console_handler)
+    if _pipeline:
+        _pipeline.stop()
+    _pipeline = LoggingPipeline([console_handler], sampler)
+    _pipeline.start()
 
     # File handler - optional
     log_file = os.getenv('LOG_FILE')
@@ -102,7 +234,7 @@ def setup_logging():
                 backupCount=5
             )
             file_handler.setFormatter(console_formatter)
-            root_logger.addHandler(file_handler)
+            attach_handler(file_handler)
             logging.info(f"File logging enabled: {log_file}")
         except Exception as e:
             logging.error(f"Failed to setup file logging: {e}")
@@ -118,6 +250,17 @@ def setup_logging():
     logging.info("=" * 60)
 
 
+def shutdown_logging():
+    """Stop the listener thread after writing out queued records."""
+    global _pipeline
+    if _pipeline:
+        _pipeline.stop()
+        _pipeline = None
+
+
+atexit.register(shutdown_logging)
+
+
 # Specialized loggers
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance with the given name."""
@@ -69,16 +69,23 @@ class MemoryExportService:
         # For MVP, use simple query approach
         # In production, would use direct database queries for efficiency
 
-        # Start with all memories query
-        query_request = QueryRequest(
-            query="",  # Empty query to get all
-            limit=filters.limit if filters and filters.limit else 10000,
-            min_similarity=0.0  # Get all memories
-        )
+        limit = filters.limit if filters and filters.limit else 10000
+        provider = self.store.primary_provider
+
+        if hasattr(provider, 'get_recent_memories'):
+            # QueryRequest caps limit at 100, so read larger exports from the provider directly
+            memories = await provider.get_recent_memories(limit, {})
+        else:
+            # Start with all memories query
+            query_request = QueryRequest(
+                query="",  # Empty query to get all
+                limit=min(limit, 100),
+                min_similarity=0.0  # Get all memories
+            )
 
-        # Query memories
-        results = await self.store.query_memories(query_request)
-        memories = results.memories
+            # Query memories
+            results = await self.store.query_memories(query_request)
+            memories = results.memories
 
         # Apply filters
         if filters:
@@ -148,7 +155,7 @@ class MemoryExportService:
                 if request.include_embeddings and hasattr(memory, 'embedding') and memory.embedding:
                     memory_dict["embedding"] = memory.embedding
 
-                yield json.dumps(memory_dict)
+                yield json.dumps(memory_dict, default=str)
 
             yield ']}'
 
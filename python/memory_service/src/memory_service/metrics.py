@@ -85,6 +85,11 @@ DB_POOL_USED = Gauge(
     'Database connections currently in use'
 )
 
+DB_POOL_WAITING = Gauge(
+    'core_nexus_db_pool_waiting',
+    'Callers waiting for a database connection'
+)
+
 DB_QUERY_TIME = Histogram(
     'core_nexus_db_query_seconds',
     'Database query execution time',
@@ -185,10 +190,11 @@ def time_embedding_generation(provider: str):
         return wrapper
     return decorator
 
-def update_db_pool_metrics(pool_size: int, used_connections: int):
+def update_db_pool_metrics(pool_size: int, used_connections: int, waiting: int = 0):
     """Update database pool metrics"""
     DB_POOL_SIZE.set(pool_size)
     DB_POOL_USED.set(used_connections)
+    DB_POOL_WAITING.set(waiting)
 
 def time_db_query(query_type: str):
     """Decorator to time database queries"""
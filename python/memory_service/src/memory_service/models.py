@@ -25,6 +25,7 @@ class MemoryRequest(BaseModel):
     importance_score: float | None = Field(None, ge=0.0, le=1.0, description="Memory importance (0-1)")
     user_id: str | None = Field(None, description="User identifier")
     conversation_id: str | None = Field(None, description="Conversation identifier")
+    include_timings: bool = Field(False, description="Return a per-stage timing breakdown")
 
 
 class MemoryResponse(BaseModel):
@@ -37,6 +38,7 @@ class MemoryResponse(BaseModel):
     similarity_score: float | None = Field(None, description="Similarity score (for queries)")
     created_at: datetime = Field(default_factory=datetime.utcnow, description="Creation timestamp")
     updated_at: datetime | None = Field(None, description="Last update timestamp")
+    timings: dict[str, float] | None = Field(None, description="Per-stage timings in ms (when requested)")
 
 
 class QueryRequest(BaseModel):
@@ -50,6 +52,10 @@ class QueryRequest(BaseModel):
     conversation_id: str | None = Field(None, description="Filter by conversation")
     time_range: dict[str, datetime] | None = Field(None, description="Time range filter")
     providers: list[str] | None = Field(None, description="Specific providers to query")
+    graph_expand: bool = Field(False, description="Expand vector hits through the knowledge graph")
+    graph_hops: int = Field(1, ge=1, le=3, description="Maximum relationship hops for graph expansion")
+    graph_min_strength: float = Field(0.3, ge=0.0, le=1.0, description="Minimum relationship strength to follow")
+    include_timings: bool = Field(False, description="Return a per-stage timing breakdown")
 
 
 class QueryResponse(BaseModel):
@@ -61,6 +67,7 @@ class QueryResponse(BaseModel):
     providers_used: list[str] = Field(default_factory=list, description="Vector providers queried")
     trust_metrics: dict[str, Any] | None = Field(None, description="Trust and confidence metrics")
     query_metadata: dict[str, Any] | None = Field(None, description="Additional query metadata")
+    timings: dict[str, float] | None = Field(None, description="Per-stage timings in ms (when requested)")
 
 
 class HealthCheckResponse(BaseModel):
@@ -3,32 +3,26 @@ OpenTelemetry Observability Configuration
 
 Provides comprehensive instrumentation for the Core Nexus memory service
 with distributed tracing, metrics, and correlated logging.
+
+Only the lightweight OpenTelemetry API is imported with this module; the
+SDK, exporters and instrumentors load inside initialize_observability() so
+they stay off the import path when observability is disabled.
 """
 
 import functools
 import logging
 import os
 import time
-from typing import Any, Optional
-
-from opentelemetry import trace, metrics, baggage
-from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
-from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
-from opentelemetry.exporter.prometheus import PrometheusMetricReader
-from opentelemetry.instrumentation.asyncpg import AsyncPGInstrumentor
-from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
-from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
-from opentelemetry.instrumentation.logging import LoggingInstrumentor
-from opentelemetry.propagate import set_global_textmap
-from opentelemetry.propagators.b3 import B3MultiFormat
-from opentelemetry.sdk.metrics import MeterProvider
-from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
-from opentelemetry.sdk.resources import Resource, SERVICE_NAME, SERVICE_VERSION
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
-from opentelemetry.semconv.trace import SpanAttributes
+from typing import TYPE_CHECKING, Any, Optional
+
+from opentelemetry import baggage, metrics, trace
 from opentelemetry.trace import Status, StatusCode
 
+if TYPE_CHECKING:
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+
 logger = logging.getLogger(__name__)
 
 # Global instances
@@ -63,8 +57,8 @@ class ObservabilityConfig:
         
         # Resource attributes
         self.resource_attributes = {
-            SERVICE_NAME: self.service_name,
-            SERVICE_VERSION: self.service_version,
+            "service.name": self.service_name,
+            "service.version": self.service_version,
             "environment": self.environment,
             "deployment.environment": self.environment,
             "service.namespace": "memory",
@@ -82,7 +76,12 @@ def initialize_observability(app=None, config: Optional[ObservabilityConfig] = N
         config: ObservabilityConfig instance
     """
     global tracer, meter
-    
+
+    from opentelemetry.instrumentation.logging import LoggingInstrumentor
+    from opentelemetry.propagate import set_global_textmap
+    from opentelemetry.propagators.b3 import B3MultiFormat
+    from opentelemetry.sdk.resources import Resource
+
     if not config:
         config = ObservabilityConfig()
     
@@ -122,8 +121,11 @@ def initialize_observability(app=None, config: Optional[ObservabilityConfig] = N
     logger.info(f"Observability initialized for {config.service_name} v{config.service_version}")
 
 
-def _setup_tracing(config: ObservabilityConfig, resource: Resource) -> TracerProvider:
+def _setup_tracing(config: ObservabilityConfig, resource: "Resource") -> "TracerProvider":
     """Set up distributed tracing with OTLP export."""
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+
     tracer_provider = TracerProvider(resource=resource)
     
     # OTLP exporter for production
@@ -138,6 +140,10 @@ def _setup_tracing(config: ObservabilityConfig, resource: Resource) -> TracerPro
                     # gRPC requires lowercase header keys
                     headers[key.strip().lower()] = value.strip()
         
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import (
+            OTLPSpanExporter,
+        )
+
         otlp_exporter = OTLPSpanExporter(
             endpoint=config.otlp_endpoint,
             headers=headers,
@@ -156,8 +162,12 @@ def _setup_tracing(config: ObservabilityConfig, resource: Resource) -> TracerPro
     return tracer_provider
 
 
-def _setup_metrics(config: ObservabilityConfig, resource: Resource) -> MeterProvider:
+def _setup_metrics(config: ObservabilityConfig, resource: "Resource") -> "MeterProvider":
     """Set up metrics with Prometheus and OTLP export."""
+    from opentelemetry.exporter.prometheus import PrometheusMetricReader
+    from opentelemetry.sdk.metrics import MeterProvider
+    from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+
     # Prometheus exporter for scraping
     prometheus_reader = PrometheusMetricReader()
     
@@ -175,6 +185,10 @@ def _setup_metrics(config: ObservabilityConfig, resource: Resource) -> MeterProv
                     # gRPC requires lowercase header keys
                     headers[key.strip().lower()] = value.strip()
         
+        from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import (
+            OTLPMetricExporter,
+        )
+
         otlp_exporter = OTLPMetricExporter(
             endpoint=config.otlp_endpoint,
             headers=headers,
@@ -196,6 +210,10 @@ def _setup_metrics(config: ObservabilityConfig, resource: Resource) -> MeterProv
 
 def _setup_auto_instrumentation(app=None):
     """Set up automatic instrumentation for libraries."""
+    from opentelemetry.instrumentation.asyncpg import AsyncPGInstrumentor
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+    from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+
     # FastAPI
     if app:
         FastAPIInstrumentor.instrument_app(app)
@@ -0,0 +1,334 @@
+"""
+Shared Postgres Pool Manager
+
+One asyncpg pool per worker, shared by the pgvector and graph providers,
+deduplication, temporal queries and database monitoring. Callers borrow
+connections through named lanes (interactive queries, writes, background
+jobs, ...), each with a budget on how many connections it may hold at
+once, so a backfill cannot starve interactive queries and the worker's
+total connection count stays at the pool's max_size however many
+subsystems are enabled. Lanes other than the interactive ones also share
+one cap of max_size minus an interactive reserve, so writes, graph work
+and background jobs together can never take the last connections.
+
+Every lane records how long acquires wait (budget plus pool) in a
+LatencyHistogram and how many callers are waiting right now, which is
+what db_monitoring.PoolStats reports. Configured with DB_POOL_MIN_SIZE,
+DB_POOL_MAX_SIZE, DB_POOL_CLASSES ("query=20,write=8,background=4") and
+DB_POOL_INTERACTIVE_RESERVE (share of max_size kept for interactive lanes).
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from .latency import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+# Lane budgets as a share of max_size: interactive queries may use the whole
+# pool, writes and graph work part of it, background jobs a small slice.
+# Non-interactive lanes are further capped together by the interactive reserve.
+DEFAULT_CLASS_SHARES = {
+    'query': 1.0,
+    'write': 0.5,
+    'graph': 0.3,
+    'background': 0.2
+}
+
+# Lanes exempt from the shared non-interactive cap
+INTERACTIVE_LANES = frozenset({'query'})
+
+
+def parse_pool_classes(spec: str) -> dict[str, int]:
+    """Parse "query=20,write=8,background=4" into lane budgets."""
+    budgets = {}
+    for part in spec.split(','):
+        if not part.strip():
+            continue
+        name, _, budget = part.partition('=')
+        budgets[name.strip()] = int(budget)
+    return budgets
+
+
+class _LaneAcquireContext:
+    """Same dual use as asyncpg's PoolAcquireContext: ``async with`` or ``await``."""
+
+    __slots__ = ('_lane', '_timeout', '_conn')
+
+    def __init__(self, lane: 'PoolLane', timeout: float | None):
+        self._lane = lane
+        self._timeout = timeout
+        self._conn = None
+
+    def __await__(self):
+        return self._lane._acquire(self._timeout).__await__()
+
+    async def __aenter__(self):
+        self._conn = await self._lane._acquire(self._timeout)
+        return self._conn
+
+    async def __aexit__(self, *exc_info):
+        conn, self._conn = self._conn, None
+        await self._lane.release(conn)
+
+
+class PoolLane:
+    """
+    A budgeted view of the shared pool for one class of work.
+
+    Quacks like an asyncpg.Pool for the calls this package makes (acquire,
+    release, fetch/fetchval/execute, get_size...), so existing code keeps
+    its ``connection_pool`` attribute. close() is a no-op: the manager owns
+    the pool.
+    """
+
+    def __init__(self, manager: 'SharedPoolManager', name: str, budget: int,
+                 shared_slots: asyncio.Semaphore | None = None):
+        self.manager = manager
+        self.name = name
+        self.budget = budget
+        self._slots = asyncio.Semaphore(budget)
+        # Cap shared by all non-interactive lanes (None for interactive lanes)
+        self._shared_slots = shared_slots
+        self.wait = LatencyHistogram()
+        self.waiting = 0
+        self.in_use = 0
+        self.acquired = 0
+        self.timeouts = 0
+
+    def acquire(self, *, timeout: float | None = None) -> _LaneAcquireContext:
+        return _LaneAcquireContext(self, timeout)
+
+    async def _acquire(self, timeout: float | None):
+        started = time.perf_counter()
+        deadline = started + timeout if timeout is not None else None
+        self.waiting += 1
+        try:
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                raise
+            if self._shared_slots is not None:
+                remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+                try:
+                    await asyncio.wait_for(self._shared_slots.acquire(), remaining)
+                except BaseException as e:
+                    self._slots.release()
+                    if isinstance(e, asyncio.TimeoutError):
+                        self.timeouts += 1
+                    raise
+            try:
+                pool = await self.manager.start()
+                remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+                conn = await pool.acquire(timeout=remaining)
+            except BaseException as e:
+                self._release_slots()
+                if isinstance(e, asyncio.TimeoutError):
+                    self.timeouts += 1
+                raise
+        finally:
+            self.waiting -= 1
+
+        self.wait.record(time.perf_counter() - started)
+        self.in_use += 1
+        self.acquired += 1
+        return conn
+
+    async def release(self, conn) -> None:
+        try:
+            await self.manager.pool.release(conn)
+        finally:
+            self.in_use -= 1
+            self._release_slots()
+
+    def _release_slots(self) -> None:
+        if self._shared_slots is not None:
+            self._shared_slots.release()
+        self._slots.release()
+
+    async def fetch(self, query: str, *args, timeout: float | None = None):
+        async with self.acquire() as conn:
+            return await conn.fetch(query, *args, timeout=timeout)
+
+    async def fetchrow(self, query: str, *args, timeout: float | None = None):
+        async with self.acquire() as conn:
+            return await conn.fetchrow(query, *args, timeout=timeout)
+
+    async def fetchval(self, query: str, *args, column: int = 0, timeout: float | None = None):
+        async with self.acquire() as conn:
+            return await conn.fetchval(query, *args, column=column, timeout=timeout)
+
+    async def execute(self, query: str, *args, timeout: float | None = None):
+        async with self.acquire() as conn:
+            return await conn.execute(query, *args, timeout=timeout)
+
+    def get_size(self) -> int:
+        return self.manager.pool.get_size() if self.manager.pool else 0
+
+    def get_idle_size(self) -> int:
+        return self.manager.pool.get_idle_size() if self.manager.pool else 0
+
+    def get_min_size(self) -> int:
+        return min(self.manager.min_size, self.budget)
+
+    def get_max_size(self) -> int:
+        return min(self.manager.max_size, self.budget)
+
+    async def close(self) -> None:
+        """No-op: the shared pool is closed by its manager."""
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'budget': self.budget,
+            'in_use': self.in_use,
+            'waiting': self.waiting,
+            'acquired': self.acquired,
+            'timeouts': self.timeouts,
+            'wait': self.wait.snapshot()
+        }
+
+
+class SharedPoolManager:
+    """
+    Owns the worker's single asyncpg pool and hands out budgeted lanes.
+
+    Lanes can be handed out before the pool exists; the first acquire (or
+    an explicit start()) creates it. Subsystems that need per-connection
+    setup register it with add_init_hook() before the pool is created.
+    """
+
+    def __init__(self,
+                 config: dict[str, Any],
+                 min_size: int = 5,
+                 max_size: int = 20,
+                 classes: dict[str, int] | None = None,
+                 interactive_reserve: float = 0.25,
+                 command_timeout: float = 60,
+                 server_settings: dict[str, str] | None = None):
+        """
+        Args:
+            config: host, port, database, user and password
+            min_size: Connections opened up front
+            max_size: Hard cap on connections from this worker
+            classes: Lane budgets by name; unnamed default lanes get a
+                share of max_size (see DEFAULT_CLASS_SHARES)
+            interactive_reserve: Share of max_size (at least one connection)
+                that non-interactive lanes together may not use
+            command_timeout: Default statement timeout in seconds
+            server_settings: Session settings for every connection
+        """
+        self._config = config
+        self.min_size = min(min_size, max_size)
+        self.max_size = max_size
+        self.command_timeout = command_timeout
+        self.server_settings = server_settings if server_settings is not None else {
+            'synchronous_commit': 'on',
+            'jit': 'off'
+        }
+        self.pool = None
+        self._start_task: asyncio.Future | None = None
+        self._init_hooks: list[Callable[[Any], Awaitable[None]]] = []
+
+        reserved = max(1, round(max_size * interactive_reserve)) if interactive_reserve > 0 else 0
+        self.non_interactive_limit = max(1, max_size - reserved)
+        self._shared_slots = asyncio.Semaphore(self.non_interactive_limit)
+
+        budgets = {name: max(1, round(max_size * share)) for name, share in DEFAULT_CLASS_SHARES.items()}
+        budgets.update(classes or {})
+        self.lanes: dict[str, PoolLane] = {}
+        for name, budget in budgets.items():
+            self._add_lane(name, budget)
+
+    @classmethod
+    def from_env(cls, config: dict[str, Any]) -> 'SharedPoolManager':
+        """Build a manager for the given connection settings from DB_POOL_* variables."""
+        return cls(
+            config,
+            min_size=int(os.getenv('DB_POOL_MIN_SIZE', '5')),
+            max_size=int(os.getenv('DB_POOL_MAX_SIZE', '20')),
+            classes=parse_pool_classes(os.getenv('DB_POOL_CLASSES', '')),
+            interactive_reserve=float(os.getenv('DB_POOL_INTERACTIVE_RESERVE', '0.25'))
+        )
+
+    @property
+    def dsn(self) -> str:
+        config = self._config
+        return (f"postgresql://{config['user']}:{config['password']}@"
+                f"{config['host']}:{config['port']}/{config['database']}")
+
+    def _add_lane(self, name: str, budget: int) -> PoolLane:
+        shared = None if name in INTERACTIVE_LANES else self._shared_slots
+        self.lanes[name] = PoolLane(self, name, max(1, budget), shared)
+        return self.lanes[name]
+
+    def lane(self, name: str) -> PoolLane:
+        """The lane for a class of work; unknown names get a background-sized budget."""
+        if name not in self.lanes:
+            budget = self.lanes['background'].budget if 'background' in self.lanes else 1
+            self._add_lane(name, budget)
+        return self.lanes[name]
+
+    def add_init_hook(self, hook: Callable[[Any], Awaitable[None]]) -> None:
+        """Run hook(conn) on every new connection (e.g. statement warmup)."""
+        self._init_hooks.append(hook)
+
+    async def _init_connection(self, conn) -> None:
+        for hook in self._init_hooks:
+            try:
+                await hook(conn)
+            except Exception as e:
+                logger.debug(f"Connection init hook failed: {e}")
+
+    async def start(self):
+        """Create the pool once; concurrent callers share the attempt and failures can be retried."""
+        if self.pool is not None:
+            return self.pool
+        if self._start_task is None:
+            self._start_task = asyncio.ensure_future(self._create_pool())
+        try:
+            return await self._start_task
+        except Exception:
+            self._start_task = None
+            raise
+
+    async def _create_pool(self):
+        import asyncpg
+
+        self.pool = await asyncpg.create_pool(
+            self.dsn,
+            min_size=self.min_size,
+            max_size=self.max_size,
+            command_timeout=self.command_timeout,
+            server_settings=self.server_settings,
+            init=self._init_connection
+        )
+        logger.info(f"Shared Postgres pool created: {self.min_size}-{self.max_size} connections, "
+                    f"lanes {', '.join(f'{name}={lane.budget}' for name, lane in self.lanes.items())}, "
+                    f"non-interactive cap {self.non_interactive_limit}")
+        return self.pool
+
+    def stats(self) -> dict[str, Any]:
+        """Pool occupancy plus per-lane budget, waiters and wait-time percentiles."""
+        size = self.pool.get_size() if self.pool else 0
+        idle = self.pool.get_idle_size() if self.pool else 0
+        return {
+            'size': size,
+            'used': size - idle,
+            'free': idle,
+            'max_size': self.max_size,
+            'non_interactive_limit': self.non_interactive_limit,
+            'waiting': sum(lane.waiting for lane in self.lanes.values()),
+            'classes': {name: lane.stats() for name, lane in self.lanes.items()}
+        }
+
+    async def close(self) -> None:
+        self._start_task = None
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+            logger.info("Shared Postgres pool closed")
@@ -8,6 +8,9 @@ from the Core Nexus codebase while preparing for pgvector integration.
 import asyncio
 import json
 import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
 from typing import Any
 from uuid import uuid4
 
@@ -16,8 +19,12 @@ try:
 except ImportError:
     from uuid import UUID
 
+from .chunking import PARENT_KEY, chunk_rows
+from .gazetteer import EntityGazetteer
 from .models import MemoryResponse, ProviderConfig
+from .replica_router import ReplicaRouter, RoutedReadPool
 from .unified_store import VectorProvider
+from .vector_storage import VectorStorage
 
 logger = logging.getLogger(__name__)
 
@@ -141,7 +148,7 @@ class ChromaProvider(VectorProvider):
 
         await loop.run_in_executor(None, _store)
 
-        logger.debug(f"Stored in ChromaDB: {memory_id}")
+        logger.debug("Stored in ChromaDB: %s", memory_id)
         return memory_id
 
     async def query(self, query_embedding: list[float], limit: int, filters: dict[str, Any]) -> list[MemoryResponse]:
@@ -246,25 +253,157 @@ class PgVectorProvider(VectorProvider):
     def __init__(self, config: ProviderConfig):
         super().__init__(config)
         self.connection_pool = None
+        # Writes go through their own lane when the pool is shared (see pool_manager)
+        self.write_pool = None
+        self._pool_manager = config.config.get('pool_manager')
         self.table_name = config.config.get('table_name', 'memories')  # Use new non-partitioned table
         self.embedding_dim = config.config.get('embedding_dim', 1536)
-        self._pool_initialization_task = None
-        self._initialize_pool(config.config)
+        self._connection_config = config.config
+        self._start_task: asyncio.Future | None = None
+        self._schema_ready = False
+
+        # Warmup: pre-parse hot statements on every connection, optionally load the
+        # vector index into shared buffers (pg_prewarm) and run a few ANN probes
+        self.warmup_probes = int(config.config.get('warmup_probes', 3))
+        self.prewarm_index = bool(config.config.get('prewarm_index', False))
+
+        # ANN index storage: full vectors, or a Matryoshka prefix / halfvec / binary expression
+        # index with full-precision rerank of over-fetched candidates (see vector_storage)
+        self.storage = VectorStorage.from_config(config.config, self.embedding_dim)
+
+        # Hot statements are built once; asyncpg caches their prepared form per connection by text
+        self._insert_sql = f"""
+            INSERT INTO {self.table_name}
+            (id, content, embedding, metadata, importance_score)
+            VALUES ($1, $2, $3::vector, $4::jsonb, $5)
+        """
+        self._query_sql = self._build_query_sql("WHERE embedding IS NOT NULL")
+        self._recent_sql = self._build_recent_sql([])
+        # Memory count for health and stats (chunk rows are part of their parent)
+        self._count_sql = f"SELECT COUNT(*) FROM {self.table_name} WHERE NOT (metadata ? '{PARENT_KEY}')"
+
+        if self._pool_manager:
+            self._pool_manager.add_init_hook(self._prepare_connection)
+
+        # Optional read replicas for query/recent/stats/text search; writes stay on the primary
+        self.replicas: ReplicaRouter | None = None
+        self.read_pool = None
+        if config.config.get('read_replicas'):
+            self.replicas = ReplicaRouter.from_config(
+                config.config,
+                config.config['read_replicas'],
+                pool_size=int(config.config.get('replica_pool_size', 10)),
+                staleness_window=float(config.config.get('replica_staleness_window', 2.0)),
+                probe_interval=float(config.config.get('replica_probe_interval', 1.0))
+            )
+            for endpoint in self.replicas.endpoints:
+                endpoint.manager.add_init_hook(self._prepare_read_connection)
+
+    @property
+    def ann_index_name(self) -> str:
+        return self.storage.index_name(self.table_name)
+
+    def set_vector_storage(self, storage: VectorStorage) -> None:
+        """Switch the ANN storage mode used by queries (the matching index must exist)."""
+        self.storage = storage
+        self._query_sql = self._build_query_sql("WHERE embedding IS NOT NULL")
+
+    def _build_query_sql(self, where_clause: str) -> str:
+        if self.storage.reduced:
+            # Over-fetch by the reduced index expression, then rerank at full precision;
+            # both stages run in this one statement
+            storage = self.storage
+            return f"""
+                WITH candidates AS (
+                    SELECT id, content, metadata, importance_score, embedding, created_at
+                    FROM {self.table_name}
+                    {where_clause}
+                    ORDER BY {storage.index_expression()} {storage.distance_operator} {storage.query_expression()}
+                    LIMIT $2 * {storage.overfetch}
+                )
+                SELECT
+                    id,
+                    content,
+                    metadata,
+                    COALESCE(importance_score, 0.5) as importance_score,
+                    1 - (embedding <=> $1::vector) as similarity_score,
+                    created_at
+                FROM candidates
+                ORDER BY embedding <=> $1::vector
+                LIMIT $2
+            """
 
-    def _initialize_pool(self, config: dict[str, Any]):
-        """Initialize async connection pool."""
+        # Query with cosine similarity - handle NULL embeddings
+        return f"""
+                SELECT
+                    id,
+                    content,
+                    metadata,
+                    COALESCE(importance_score, 0.5) as importance_score,
+                    CASE 
+                        WHEN embedding IS NULL THEN 0.0
+                        ELSE 1 - (embedding <=> $1::vector)
+                    END as similarity_score,
+                    created_at
+                FROM {self.table_name}
+                {where_clause}
+                ORDER BY embedding <=> $1::vector
+                LIMIT $2
+            """
 
-        async def init_pool():
-            try:
-                import asyncpg
+    def _build_recent_sql(self, conditions: list[str]) -> str:
+        # Query WITHOUT vector similarity - just get recent memories
+        # Use COALESCE to handle both partitioned and non-partitioned tables
+        # Chunk rows are part of their parent memory, never listed on their own
+        where_clause = ' AND '.join([f"NOT (metadata ? '{PARENT_KEY}')", *conditions])
+        return f"""
+                SELECT
+                    id,
+                    content,
+                    metadata,
+                    COALESCE(importance_score, 0.5) as importance_score,
+                    created_at
+                FROM {self.table_name}
+                WHERE {where_clause}
+                ORDER BY created_at DESC
+                LIMIT $1
+            """
 
+    async def start(self):
+        """
+        Create the pool, ensure the schema and warm up.
+
+        Idempotent; concurrent callers share one attempt and a failed attempt
+        can be retried.
+        """
+        if self.connection_pool:
+            return
+        if self._start_task is None:
+            self._start_task = asyncio.ensure_future(self._start())
+        try:
+            await self._start_task
+        except Exception:
+            self._start_task = None
+            raise
+
+    async def _start(self):
+        config = self._connection_config
+        pool = None
+        try:
+            import asyncpg
+
+            if self._pool_manager:
+                # Shared pool: reads and writes borrow from their own lanes
+                await self._pool_manager.start()
+                pool = self._pool_manager.lane('query')
+            else:
                 # Build connection string
                 conn_str = (
                     f"postgresql://{config['user']}:{config['password']}@"
                     f"{config['host']}:{config['port']}/{config['database']}"
                 )
 
-                self.connection_pool = await asyncpg.create_pool(
+                pool = await asyncpg.create_pool(
                     conn_str,
                     min_size=5,
                     max_size=20,
@@ -272,81 +411,214 @@ class PgVectorProvider(VectorProvider):
                     server_settings={
                         'synchronous_commit': 'on',  # Ensure synchronous commits
                         'jit': 'off'  # Disable JIT for more predictable performance
-                    }
+                    },
+                    # Connections opened later (under load) are warmed as they join the pool
+                    init=self._prepare_connection
                 )
 
-                # Ensure pgvector extension is enabled
-                async with self.connection_pool.acquire() as conn:
-                    await conn.execute("CREATE EXTENSION IF NOT EXISTS vector")
-
-                    # Create table if not exists
-                    await conn.execute(f"""
-                        CREATE TABLE IF NOT EXISTS {self.table_name} (
-                            id UUID PRIMARY KEY,
-                            content TEXT NOT NULL,
-                            embedding vector({self.embedding_dim}),
-                            metadata JSONB DEFAULT '{{}}',
-                            importance_score FLOAT DEFAULT 0.5,
-                            created_at TIMESTAMP DEFAULT NOW(),
-                            updated_at TIMESTAMP DEFAULT NOW()
-                        )
-                    """)
-
-                    # Create indexes
-                    await conn.execute(f"""
-                        CREATE INDEX IF NOT EXISTS idx_{self.table_name}_embedding
-                        ON {self.table_name}
-                        USING ivfflat (embedding vector_cosine_ops)
-                        WITH (lists = 100)
-                    """)
-
-                    await conn.execute(f"""
-                        CREATE INDEX IF NOT EXISTS idx_{self.table_name}_metadata
-                        ON {self.table_name}
-                        USING GIN (metadata)
-                    """)
-
-                    await conn.execute(f"""
-                        CREATE INDEX IF NOT EXISTS idx_{self.table_name}_importance
-                        ON {self.table_name} (importance_score DESC)
-                    """)
-
-                    await conn.execute(f"""
-                        CREATE INDEX IF NOT EXISTS idx_{self.table_name}_created_at
-                        ON {self.table_name} (created_at DESC)
-                    """)
-
-                logger.info("PgVector provider initialized successfully")
-                self.enabled = True  # Mark as enabled after successful initialization
+            # Ensure pgvector extension is enabled
+            async with pool.acquire() as conn:
+                await conn.execute("CREATE EXTENSION IF NOT EXISTS vector")
 
-            except ImportError:
-                logger.error("asyncpg not installed. Install with: pip install asyncpg")
-                self.enabled = False
-                raise
+                # Create table if not exists
+                await conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self.table_name} (
+                        id UUID PRIMARY KEY,
+                        content TEXT NOT NULL,
+                        embedding vector({self.embedding_dim}),
+                        metadata JSONB DEFAULT '{{}}',
+                        importance_score FLOAT DEFAULT 0.5,
+                        created_at TIMESTAMP DEFAULT NOW(),
+                        updated_at TIMESTAMP DEFAULT NOW()
+                    )
+                """)
+
+                # Create indexes
+                await self._ensure_ann_index(conn)
+
+                await conn.execute(f"""
+                    CREATE INDEX IF NOT EXISTS idx_{self.table_name}_metadata
+                    ON {self.table_name}
+                    USING GIN (metadata)
+                """)
+
+                await conn.execute(f"""
+                    CREATE INDEX IF NOT EXISTS idx_{self.table_name}_importance
+                    ON {self.table_name} (importance_score DESC)
+                """)
+
+                await conn.execute(f"""
+                    CREATE INDEX IF NOT EXISTS idx_{self.table_name}_created_at
+                    ON {self.table_name} (created_at DESC)
+                """)
+
+            self._schema_ready = True
+            try:
+                await self._warmup(pool)
             except Exception as e:
-                logger.error(f"Failed to initialize PgVector: {e}")
-                self.enabled = False
-                raise
+                # A cold first query is better than no provider
+                logger.warning(f"PgVector warmup failed: {e}")
+
+            if self.replicas:
+                # Unreachable replicas stay out of rotation; reads fall back to the primary
+                await self.replicas.start()
+
+            self.connection_pool = pool
+            self.write_pool = self._pool_manager.lane('write') if self._pool_manager else pool
+            self.read_pool = RoutedReadPool(self.replicas, pool) if self.replicas else pool
+            logger.info("PgVector provider initialized successfully")
+            self.enabled = True  # Mark as enabled after successful initialization
+
+        except ImportError:
+            logger.error("asyncpg not installed. Install with: pip install asyncpg")
+            self.enabled = False
+            raise
+        except Exception as e:
+            logger.error(f"Failed to initialize PgVector: {e}")
+            self.enabled = False
+            if pool is not None:
+                await pool.close()
+            raise
+
+    async def _ensure_ann_index(self, conn):
+        """
+        Create the ANN index for the configured storage mode if it is missing.
 
-        # Run initialization
+        The full-precision index is created as before. A reduced index is only
+        built here on an empty table, concurrently so writes are not blocked;
+        on a populated table it has to be built with
+        migration_reduced_ann_index.sql before switching PGVECTOR_STORAGE.
+        """
+        create_sql = f"""
+            CREATE INDEX {{concurrently}} IF NOT EXISTS {self.ann_index_name}
+            ON {self.table_name}
+            USING ivfflat ({self.storage.index_expression()} {self.storage.opclass})
+            WITH (lists = 100)
+        """
+        if not self.storage.reduced:
+            await conn.execute(create_sql.format(concurrently=''))
+            return
+
+        valid = await conn.fetchval("""
+            SELECT i.indisvalid FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = $1
+        """, self.ann_index_name)
+        if valid:
+            return
+        if valid is None and not await conn.fetchval(f"SELECT EXISTS (SELECT 1 FROM {self.table_name})"):
+            # CONCURRENTLY cannot run in a transaction; execute() autocommits
+            await conn.execute(create_sql.format(concurrently='CONCURRENTLY'))
+            return
+        state = 'missing' if valid is None else 'invalid (an interrupted concurrent build)'
+        raise RuntimeError(
+            f"ANN index {self.ann_index_name} for PGVECTOR_STORAGE={self.storage.label} is {state}; "
+            f"build it with migration_reduced_ann_index.sql before starting with this setting"
+        )
+
+    async def _prepare_connection(self, conn):
+        """Pool init hook: pre-parse the hot statements on a new connection."""
+        if not self._schema_ready:
+            return
         try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                # We're already in an async context
-                self._pool_initialization_task = asyncio.create_task(init_pool())
-            else:
-                # Synchronous context
-                loop.run_until_complete(init_pool())
-        except RuntimeError:
-            # No event loop, create one
-            asyncio.run(init_pool())
+            await self._prepare_statements(conn)
+        except Exception as e:
+            logger.debug(f"Statement warmup skipped for new connection: {e}")
+
+    async def _prepare_read_connection(self, conn):
+        """Replica pool init hook: pre-parse the read statements (standbys reject the insert)."""
+        if not self._schema_ready:
+            return
+        try:
+            await self._prepare_statements(conn, include_insert=False)
+        except Exception as e:
+            logger.debug(f"Statement warmup skipped for new replica connection: {e}")
+
+    async def _prepare_statements(self, conn, include_count: bool = False, include_insert: bool = True):
+        """
+        Run each hot statement once so asyncpg caches its prepared form (and the
+        vector type introspection) on this connection.
+        """
+        # Unit vector: zero vectors have no cosine distance
+        unit_vector = '[1' + ',0' * (self.embedding_dim - 1) + ']'
+        await conn.fetch(self._query_sql, unit_vector, 0)
+        await conn.fetch(self._recent_sql, 0)
+        if include_insert:
+            # The insert is parsed and executed, then rolled back
+            tx = conn.transaction()
+            await tx.start()
+            try:
+                await conn.execute(self._insert_sql, uuid4(), '', unit_vector, '{}', 0.5)
+            finally:
+                await tx.rollback()
+        if include_count:
+            await conn.fetchval(self._count_sql)
+
+    async def _warmup(self, pool):
+        """Prepare statements on every idle connection, then prewarm and probe the vector index."""
+        started = time.perf_counter()
+        connections = [await pool.acquire() for _ in range(pool.get_min_size())]
+        try:
+            await asyncio.gather(*(self._prepare_statements(conn, include_count=True) for conn in connections))
+        finally:
+            for conn in connections:
+                await pool.release(conn)
+
+        async with pool.acquire() as conn:
+            if self.prewarm_index:
+                try:
+                    await conn.execute("CREATE EXTENSION IF NOT EXISTS pg_prewarm")
+                    blocks = await conn.fetchval("SELECT pg_prewarm($1)", self.ann_index_name)
+                    logger.info(f"Prewarmed {self.ann_index_name} ({blocks} blocks)")
+                except Exception as e:
+                    logger.warning(f"pg_prewarm unavailable: {e}")
+
+            # A few real ANN probes pull the index lists/graph into cache
+            import numpy as np
+
+            rng = np.random.default_rng(0)
+            for _ in range(self.warmup_probes):
+                probe = rng.standard_normal(self.embedding_dim)
+                probe /= np.linalg.norm(probe)
+                await conn.fetch(self._query_sql, '[' + ','.join(map(str, probe.tolist())) + ']', 10)
+
+        logger.info(f"PgVector warmup finished in {(time.perf_counter() - started) * 1000:.0f}ms")
 
     async def _ensure_pool_ready(self):
-        """Ensure the connection pool is ready before use."""
-        if self._pool_initialization_task and not self._pool_initialization_task.done():
-            await self._pool_initialization_task
-        if not self.connection_pool:
-            raise RuntimeError("PgVector connection pool not initialized")
+        """Ensure the connection pool is ready before use (starts it lazily if start() was never called)."""
+        if self.connection_pool is None:
+            await self.start()
+
+    async def _read(self, run):
+        """
+        Run run(conn) on a replica when one qualifies (healthy, and caught up
+        with recent writes), otherwise, or when the replica fails, on the primary.
+        """
+        endpoint = await self.replicas.choose_fresh() if self.replicas else None
+        if endpoint is not None:
+            started = time.perf_counter()
+            try:
+                async with endpoint.pool.acquire() as conn:
+                    result = await run(conn)
+                endpoint.observe(time.perf_counter() - started)
+                return result
+            except Exception as e:
+                self.replicas.record_failure(endpoint, e)
+                logger.debug(f"Read on replica {endpoint.name} failed, retrying on primary: {e}")
+
+        async with self.connection_pool.acquire() as conn:
+            return await run(conn)
+
+    async def _note_write(self, conn):
+        """Record the primary's WAL position after a write, bounding replica staleness for later reads."""
+        if not self.replicas:
+            return
+        try:
+            lsn = await conn.fetchval("SELECT pg_current_wal_lsn()::text")
+        except Exception as e:
+            logger.debug(f"Could not read WAL position after write: {e}")
+            lsn = None
+        self.replicas.note_write(lsn)
 
     async def store(self, content: str, embedding: list[float], metadata: dict[str, Any]) -> UUID:
         """Store vector in PostgreSQL with transaction wrapping."""
@@ -354,7 +626,7 @@ class PgVectorProvider(VectorProvider):
 
         memory_id = uuid4()
 
-        async with self.connection_pool.acquire() as conn:
+        async with self.write_pool.acquire() as conn:
             # Use transaction for atomicity
             async with conn.transaction():
                 # Convert embedding to PostgreSQL vector format
@@ -363,11 +635,7 @@ class PgVectorProvider(VectorProvider):
                 # Serialize metadata to JSON string for PostgreSQL JSONB column
                 metadata_json = json.dumps(metadata) if metadata else '{}'
 
-                await conn.execute(f"""
-                    INSERT INTO {self.table_name}
-                    (id, content, embedding, metadata, importance_score)
-                    VALUES ($1, $2, $3::vector, $4::jsonb, $5)
-                """,
+                await conn.execute(self._insert_sql,
                     memory_id,
                     content,
                     embedding_str,
@@ -378,67 +646,76 @@ class PgVectorProvider(VectorProvider):
                 # Force synchronous commit for immediate consistency
                 await conn.execute("SET LOCAL synchronous_commit = on")
 
-        logger.debug(f"Stored in PgVector: {memory_id}")
+            await self._note_write(conn)
+
+        logger.debug("Stored in PgVector: %s", memory_id)
         return memory_id
 
-    async def query(self, query_embedding: list[float], limit: int, filters: dict[str, Any]) -> list[MemoryResponse]:
-        """Query PostgreSQL for similar vectors."""
+    async def store_with_chunks(self, content: str, embedding: list[float], metadata: dict[str, Any],
+                                chunks: list[tuple[str, list[float]]]) -> UUID:
+        """Store a memory and its chunk rows in one transaction (one executemany for the chunks)."""
         await self._ensure_pool_ready()
 
-        async with self.connection_pool.acquire() as conn:
-            # Build query with filters
-            where_clauses = []
-            params = []
-            param_count = 2  # $1 is embedding, $2 is limit
+        memory_id = uuid4()
+        rows = [(memory_id, content, embedding, metadata)]
+        rows += [(uuid4(), *row) for row in chunk_rows(memory_id, chunks, metadata)]
+        records = [
+            (row_id, text, '[' + ','.join(map(str, vector)) + ']', json.dumps(row_metadata),
+             row_metadata.get('importance_score', 0.5))
+            for row_id, text, vector, row_metadata in rows
+        ]
+
+        async with self.write_pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.executemany(self._insert_sql, records)
+                await conn.execute("SET LOCAL synchronous_commit = on")
+            await self._note_write(conn)
 
-            # Add metadata filters
-            if filters:
-                for key, value in filters.items():
-                    if key not in ['limit', 'offset']:
-                        where_clauses.append(f"metadata->>'{key}' = ${param_count + 1}")
-                        params.append(str(value))
-                        param_count += 1
+        logger.debug("Stored in PgVector: %s with %d chunks", memory_id, len(chunks))
+        return memory_id
 
-            where_clause = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
+    async def query(self, query_embedding: list[float], limit: int, filters: dict[str, Any]) -> list[MemoryResponse]:
+        """Query PostgreSQL for similar vectors."""
+        await self._ensure_pool_ready()
 
-            # Convert embedding to PostgreSQL vector format
-            embedding_str = '[' + ','.join(map(str, query_embedding)) + ']'
+        # Build query with filters
+        where_clauses = []
+        params = []
+        param_count = 2  # $1 is embedding, $2 is limit
+
+        # Add metadata filters
+        if filters:
+            for key, value in filters.items():
+                if key not in ['limit', 'offset']:
+                    where_clauses.append(f"metadata->>'{key}' = ${param_count + 1}")
+                    params.append(str(value))
+                    param_count += 1
+
+        if where_clauses:
+            where_clauses.append("embedding IS NOT NULL")
+            query = self._build_query_sql(f"WHERE {' AND '.join(where_clauses)}")
+        else:
+            query = self._query_sql
 
-            # Query with cosine similarity - handle NULL embeddings
-            query = f"""
-                SELECT
-                    id,
-                    content,
-                    metadata,
-                    COALESCE(importance_score, 0.5) as importance_score,
-                    CASE 
-                        WHEN embedding IS NULL THEN 0.0
-                        ELSE 1 - (embedding <=> $1::vector)
-                    END as similarity_score,
-                    created_at
-                FROM {self.table_name}
-                {where_clause}
-                WHERE embedding IS NOT NULL
-                ORDER BY embedding <=> $1::vector
-                LIMIT $2
-            """
+        # Convert embedding to PostgreSQL vector format
+        embedding_str = '[' + ','.join(map(str, query_embedding)) + ']'
 
-            # Use read committed isolation level for consistent reads
-            rows = await conn.fetch(query, embedding_str, limit, *params)
+        # Use read committed isolation level for consistent reads
+        rows = await self._read(lambda conn: conn.fetch(query, embedding_str, limit, *params))
 
-            # Convert to MemoryResponse objects
-            memories = []
-            for row in rows:
-                memory = MemoryResponse(
-                    id=row['id'],
-                    content=row['content'],
-                    metadata=row['metadata'] if isinstance(row['metadata'], dict) else {},
-                    embedding=[],  # Don't return full embeddings in response
-                    importance_score=float(row['importance_score']),
-                    similarity_score=float(row['similarity_score']),
-                    created_at=row['created_at'].isoformat() if row['created_at'] else ''
-                )
-                memories.append(memory)
+        # Convert to MemoryResponse objects
+        memories = []
+        for row in rows:
+            memory = MemoryResponse(
+                id=row['id'],
+                content=row['content'],
+                metadata=row['metadata'] if isinstance(row['metadata'], dict) else {},
+                embedding=[],  # Don't return full embeddings in response
+                importance_score=float(row['importance_score']),
+                similarity_score=float(row['similarity_score']),
+                created_at=row['created_at'].isoformat() if row['created_at'] else ''
+            )
+            memories.append(memory)
 
         return memories
 
@@ -452,56 +729,66 @@ class PgVectorProvider(VectorProvider):
         """
         await self._ensure_pool_ready()
         
-        async with self.connection_pool.acquire() as conn:
-            # Build query with filters
-            where_clauses = []
-            params = []
-            param_count = 1  # $1 is limit
-            
-            # Add metadata filters
-            if filters:
-                for key, value in filters.items():
-                    if key not in ['limit', 'offset']:
-                        where_clauses.append(f"metadata->>'{key}' = ${param_count + 1}")
-                        params.append(str(value))
-                        param_count += 1
-            
-            where_clause = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ""
-            
-            # Query WITHOUT vector similarity - just get recent memories
-            # Use COALESCE to handle both partitioned and non-partitioned tables
-            query = f"""
-                SELECT
-                    id,
-                    content,
-                    metadata,
-                    COALESCE(importance_score, 0.5) as importance_score,
-                    created_at
-                FROM {self.table_name}
-                {where_clause}
-                ORDER BY created_at DESC
-                LIMIT $1
-            """
-            
-            rows = await conn.fetch(query, limit, *params)
-            
-            # Convert to MemoryResponse objects
-            memories = []
-            for row in rows:
-                memory = MemoryResponse(
-                    id=row['id'],
-                    content=row['content'],
-                    metadata=row['metadata'] if isinstance(row['metadata'], dict) else {},
-                    embedding=[],  # Don't return full embeddings
-                    importance_score=float(row['importance_score']),
-                    similarity_score=1.0,  # Default high score since no similarity calc
-                    created_at=row['created_at'].isoformat() if row['created_at'] else ''
-                )
-                memories.append(memory)
+        # Build query with filters
+        where_clauses = []
+        params = []
+        param_count = 1  # $1 is limit
+        
+        # Add metadata filters
+        if filters:
+            for key, value in filters.items():
+                if key not in ['limit', 'offset']:
+                    where_clauses.append(f"metadata->>'{key}' = ${param_count + 1}")
+                    params.append(str(value))
+                    param_count += 1
         
-        logger.debug(f"Retrieved {len(memories)} recent memories from PgVector")
+        if where_clauses:
+            query = self._build_recent_sql(where_clauses)
+        else:
+            query = self._recent_sql
+        
+        rows = await self._read(lambda conn: conn.fetch(query, limit, *params))
+        
+        # Convert to MemoryResponse objects
+        memories = []
+        for row in rows:
+            memory = MemoryResponse(
+                id=row['id'],
+                content=row['content'],
+                metadata=row['metadata'] if isinstance(row['metadata'], dict) else {},
+                embedding=[],  # Don't return full embeddings
+                importance_score=float(row['importance_score']),
+                similarity_score=1.0,  # Default high score since no similarity calc
+                created_at=row['created_at'].isoformat() if row['created_at'] else ''
+            )
+            memories.append(memory)
+        
+        logger.debug("Retrieved %d recent memories from PgVector", len(memories))
         return memories
 
+    async def get_memories(self, memory_ids: list[UUID]) -> list[MemoryResponse]:
+        """Fetch memories by id (e.g. the parents of chunk hits), in no particular order."""
+        if not memory_ids:
+            return []
+        await self._ensure_pool_ready()
+
+        rows = await self._read(lambda conn: conn.fetch(f"""
+            SELECT id, content, metadata, COALESCE(importance_score, 0.5) as importance_score, created_at
+            FROM {self.table_name}
+            WHERE id = ANY($1::uuid[])
+        """, list(memory_ids)))
+
+        return [
+            MemoryResponse(
+                id=row['id'],
+                content=row['content'],
+                metadata=row['metadata'] if isinstance(row['metadata'], dict) else {},
+                importance_score=float(row['importance_score']),
+                created_at=row['created_at'].isoformat() if row['created_at'] else ''
+            )
+            for row in rows
+        ]
+
     async def health_check(self) -> dict[str, Any]:
         """Check PostgreSQL health."""
         try:
@@ -518,9 +805,7 @@ class PgVectorProvider(VectorProvider):
                 await conn.fetchval("SELECT 1")
 
                 # Get table stats
-                count = await conn.fetchval(
-                    f"SELECT COUNT(*) FROM {self.table_name}"
-                )
+                count = await conn.fetchval(self._count_sql)
 
                 # Check if pgvector is enabled
                 pgvector_enabled = await conn.fetchval("""
@@ -529,14 +814,17 @@ class PgVectorProvider(VectorProvider):
                     WHERE extname = 'vector'
                 """)
 
+                details = {
+                    'total_vectors': count,
+                    'pgvector_enabled': pgvector_enabled,
+                    'table_name': self.table_name,
+                    'pool_size': self.connection_pool.get_size()
+                }
+                if self.replicas:
+                    details['read_replicas'] = self.replicas.stats()
                 return {
                     'status': 'healthy',
-                    'details': {
-                        'total_vectors': count,
-                        'pgvector_enabled': pgvector_enabled,
-                        'table_name': self.table_name,
-                        'pool_size': self.connection_pool.get_size()
-                    }
+                    'details': details
                 }
         except Exception as e:
             return {
@@ -555,27 +843,34 @@ class PgVectorProvider(VectorProvider):
             }
 
         try:
-            async with self.connection_pool.acquire() as conn:
-                stats = await conn.fetchrow(f"""
-                    SELECT
-                        COUNT(*) as total_memories,
-                        AVG(importance_score) as avg_importance,
-                        MIN(created_at) as oldest_memory,
-                        MAX(created_at) as newest_memory,
-                        pg_size_pretty(pg_total_relation_size('{self.table_name}')) as table_size
-                    FROM {self.table_name}
-                """)
+            stats = await self._read(lambda conn: conn.fetchrow(f"""
+                SELECT
+                    COUNT(*) FILTER (WHERE NOT (metadata ? '{PARENT_KEY}')) as total_memories,
+                    COUNT(*) FILTER (WHERE metadata ? '{PARENT_KEY}') as total_chunks,
+                    AVG(importance_score) FILTER (WHERE NOT (metadata ? '{PARENT_KEY}')) as avg_importance,
+                    MIN(created_at) as oldest_memory,
+                    MAX(created_at) as newest_memory,
+                    pg_size_pretty(pg_total_relation_size('{self.table_name}')) as table_size
+                FROM {self.table_name}
+            """))
 
-                return {
-                    'provider': 'pgvector',
-                    'total_memories': stats['total_memories'],
-                    'avg_importance_score': float(stats['avg_importance']) if stats['avg_importance'] else 0,
-                    'oldest_memory': stats['oldest_memory'].isoformat() if stats['oldest_memory'] else None,
-                    'newest_memory': stats['newest_memory'].isoformat() if stats['newest_memory'] else None,
-                    'table_size': stats['table_size'],
-                    'table_name': self.table_name,
-                    'embedding_dimension': self.embedding_dim
+            return {
+                'provider': 'pgvector',
+                'total_memories': stats['total_memories'],
+                'total_chunks': stats['total_chunks'],
+                'avg_importance_score': float(stats['avg_importance']) if stats['avg_importance'] else 0,
+                'oldest_memory': stats['oldest_memory'].isoformat() if stats['oldest_memory'] else None,
+                'newest_memory': stats['newest_memory'].isoformat() if stats['newest_memory'] else None,
+                'table_size': stats['table_size'],
+                'table_name': self.table_name,
+                'embedding_dimension': self.embedding_dim,
+                'vector_storage': {
+                    'mode': self.storage.label,
+                    'ann_index': self.ann_index_name,
+                    'ann_bytes_per_vector': self.storage.bytes_per_vector,
+                    'rerank_overfetch': self.storage.overfetch if self.storage.reduced else None
                 }
+            }
         except Exception as e:
             return {
                 'provider': 'pgvector',
@@ -583,7 +878,7 @@ class PgVectorProvider(VectorProvider):
             }
 
     async def delete(self, memory_id: UUID) -> bool:
-        """Delete a memory from PgVector."""
+        """Delete a memory (and its chunk rows) from PgVector."""
         try:
             await self._ensure_pool_ready()
         except Exception as e:
@@ -591,16 +886,19 @@ class PgVectorProvider(VectorProvider):
             return False
 
         try:
-            async with self.connection_pool.acquire() as conn:
+            async with self.write_pool.acquire() as conn:
                 # Use transaction for atomicity
                 async with conn.transaction():
-                    result = await conn.execute(
-                        f"DELETE FROM {self.table_name} WHERE id = $1",
-                        memory_id
+                    result = await conn.execute(f"DELETE FROM {self.table_name} WHERE id = $1", memory_id)
+                    # Chunk rows, found through the GIN index on metadata
+                    await conn.execute(
+                        f"DELETE FROM {self.table_name} WHERE metadata @> jsonb_build_object($1::text, $2::text)",
+                        PARENT_KEY, str(memory_id)
                     )
                     # Force synchronous commit
                     await conn.execute("SET LOCAL synchronous_commit = on")
-                return result.split()[-1] == '1'  # "DELETE 1" means success
+                await self._note_write(conn)
+                return result.split()[-1] != '0'  # "DELETE n" with n > 0 means success
         except Exception as e:
             logger.error(f"Failed to delete memory {memory_id}: {e}")
             return False
@@ -614,7 +912,7 @@ class PgVectorProvider(VectorProvider):
             return False
 
         try:
-            async with self.connection_pool.acquire() as conn:
+            async with self.write_pool.acquire() as conn:
                 # Use transaction for atomicity
                 async with conn.transaction():
                     result = await conn.execute(f"""
@@ -624,16 +922,23 @@ class PgVectorProvider(VectorProvider):
                     """, importance_score, memory_id)
                     # Force synchronous commit
                     await conn.execute("SET LOCAL synchronous_commit = on")
+                await self._note_write(conn)
                 return result.split()[-1] == '1'  # "UPDATE 1" means success
         except Exception as e:
             logger.error(f"Failed to update importance for {memory_id}: {e}")
             return False
 
     async def close(self):
-        """Close the connection pool."""
+        """Close the connection pool and any replica pools."""
+        self._start_task = None
+        if self.replicas:
+            await self.replicas.close()
         if self.connection_pool:
+            # With a shared pool this closes a lane (no-op); the manager closes the pool
             await self.connection_pool.close()
             self.connection_pool = None
+            self.write_pool = None
+            self.read_pool = None
             logger.info("PgVector provider closed")
 
 
@@ -657,6 +962,26 @@ class GraphProvider(VectorProvider):
         self.entity_extractor = None  # Will be initialized lazily
         self._pool_initialized = bool(self.connection_pool)  # Already initialized if pool provided
 
+        # Gazetteer fast path: known entities are resolved without NER or DB lookups.
+        # spacy_mode controls when spaCy still runs: 'fallback' (only when the
+        # gazetteer finds nothing), 'always' (merge both) or 'never'.
+        self.gazetteer = EntityGazetteer() if config.config.get('gazetteer_enabled', True) else None
+        self.spacy_mode = config.config.get('spacy_mode', 'fallback')
+        self._gazetteer_lock = asyncio.Lock()
+        # Set when a gazetteer match points at a deleted (merged) node
+        self._gazetteer_stale = False
+
+        # Hard budgets for graph-augmented retrieval (expand_memories)
+        self.expansion_max_nodes = int(config.config.get('expansion_max_nodes', 200))
+        self.expansion_max_memories = int(config.config.get('expansion_max_memories', 50))
+        self.expansion_timeout_ms = float(config.config.get('expansion_timeout_ms', 150))
+
+        # Subgraph cache keyed by (filters, graph version); local writes bump
+        # _graph_writes, writes from other processes show up in pg_stat counters
+        self._graph_writes = 0
+        self._subgraph_cache: OrderedDict[tuple, dict[str, Any]] = OrderedDict()
+        self.subgraph_cache_size = int(config.config.get('subgraph_cache_size', 128))
+
     async def _ensure_pool(self):
         """Ensure connection pool is initialized (lazy initialization)."""
         if not self._pool_initialized:
@@ -685,6 +1010,18 @@ class GraphProvider(VectorProvider):
             else:
                 raise RuntimeError("GraphProvider requires either connection_pool or connection_string")
 
+    async def start(self):
+        """Open (or adopt) the connection pool up front instead of on the first request."""
+        await self._ensure_pool()
+
+    async def close(self):
+        """Close the pool if this provider created it from connection_string."""
+        if self.connection_pool and self.connection_string and self._pool_initialized:
+            await self.connection_pool.close()
+            self.connection_pool = None
+            self._pool_initialized = False
+            logger.info("Graph provider pool closed")
+
     async def _get_or_create_embedding_model(self):
         """Get or create the embedding model for entity embeddings."""
         if not hasattr(self, '_embedding_model') or self._embedding_model is None:
@@ -697,7 +1034,62 @@ class GraphProvider(VectorProvider):
                 self._embedding_model = None
         return self._embedding_model
 
+    async def _ensure_gazetteer(self, conn):
+        """
+        Load the entity gazetteer from the graph tables on first use, and
+        reload it after entity deduplication has deleted nodes it knew.
+        """
+        if self.gazetteer is None or (self.gazetteer.loaded and not self._gazetteer_stale):
+            return
+
+        async with self._gazetteer_lock:
+            if self.gazetteer.loaded and not self._gazetteer_stale:
+                return
+            gazetteer = self.gazetteer
+            if gazetteer.loaded:
+                # Build the replacement aside so concurrent stores keep matching
+                gazetteer = EntityGazetteer(gazetteer.min_length, gazetteer.min_single_token_length,
+                                            gazetteer.confidence)
+            try:
+                await gazetteer.load(conn)
+            except Exception as e:
+                # Keep extracting with NER; retry loading on the next store
+                logger.warning(f"Failed to load entity gazetteer: {e}")
+                return
+            self.gazetteer = gazetteer
+            self._gazetteer_stale = False
+
     async def _extract_entities(self, content: str) -> list[dict[str, Any]]:
+        """
+        Extract entities from memory content.
+
+        Known entities are matched by the gazetteer in one linear pass and carry
+        their canonical 'entity_id'. NER only runs according to spacy_mode.
+        """
+        gazetteer_entities = self.gazetteer.extract(content) if self.gazetteer else []
+
+        if gazetteer_entities and self.spacy_mode != 'always':
+            return gazetteer_entities
+        if self.gazetteer is not None and self.spacy_mode == 'never':
+            return gazetteer_entities
+
+        ner_entities = await self._extract_entities_ner(content)
+        if not gazetteer_entities:
+            return ner_entities
+
+        # Merge, preferring gazetteer spans over overlapping NER spans
+        merged = list(gazetteer_entities)
+        for entity in ner_entities:
+            overlaps = any(
+                entity['start'] < known['end'] and known['start'] < entity['end']
+                for known in gazetteer_entities
+            )
+            if not overlaps:
+                merged.append(entity)
+        merged.sort(key=lambda e: e['start'])
+        return merged
+
+    async def _extract_entities_ner(self, content: str) -> list[dict[str, Any]]:
         """Extract entities from memory content using NLP."""
         entities = []
 
@@ -836,6 +1228,8 @@ class GraphProvider(VectorProvider):
 
         async with self.connection_pool.acquire() as conn:
             try:
+                await self._ensure_gazetteer(conn)
+
                 # Extract entities from content
                 entities = await self._extract_entities(content)
 
@@ -844,39 +1238,53 @@ class GraphProvider(VectorProvider):
 
                 # Store entities as graph nodes
                 entity_ids = {}
+                mention_sql = """
+                    UPDATE graph_nodes
+                    SET mention_count = mention_count + 1,
+                        last_seen = NOW(),
+                        importance_score = LEAST(importance_score + 0.1, 1.0)
+                    WHERE id = $1
+                """
                 for entity in entities:
-                    # Generate entity embedding if model available
-                    entity_embedding = None
-                    if embedding_model:
-                        entity_embedding = embedding_model.encode(entity['name']).tolist()
-
-                    # Check if entity already exists
-                    existing = await conn.fetchrow("""
-                        SELECT id, mention_count FROM graph_nodes
-                        WHERE entity_name = $1 AND entity_type = $2
-                    """, entity['name'], entity['type'])
-
-                    if existing:
-                        # Update existing entity
-                        entity_id = existing['id']
-                        await conn.execute("""
-                            UPDATE graph_nodes
-                            SET mention_count = mention_count + 1,
-                                last_seen = NOW(),
-                                importance_score = LEAST(importance_score + 0.1, 1.0)
-                            WHERE id = $1
-                        """, entity_id)
-                    else:
-                        # Create new entity
-                        entity_id = uuid4()
-                        embedding_str = '[' + ','.join(map(str, entity_embedding)) + ']' if entity_embedding else None
-
-                        await conn.execute("""
-                            INSERT INTO graph_nodes
-                            (id, entity_type, entity_name, embedding, importance_score)
-                            VALUES ($1, $2, $3, $4::vector, $5)
-                        """, entity_id, entity['type'], entity['name'],
-                            embedding_str, metadata.get('importance_score', 0.5))
+                    entity_id = None
+                    # Gazetteer matches already carry their canonical ID: update it directly
+                    if entity.get('entity_id'):
+                        result = await conn.execute(mention_sql, entity['entity_id'])
+                        if result.split()[-1] != '0':  # "UPDATE n"
+                            entity_id = entity['entity_id']
+                        else:
+                            # Merged away by entity deduplication since the gazetteer loaded
+                            self.gazetteer.remove_entity(entity['entity_id'])
+                            self._gazetteer_stale = True
+
+                    if entity_id is None:
+                        # Check if entity already exists
+                        existing = await conn.fetchrow("""
+                            SELECT id, mention_count FROM graph_nodes
+                            WHERE entity_name = $1 AND entity_type = $2
+                        """, entity['name'], entity['type'])
+                        if existing:
+                            # Update existing entity
+                            entity_id = existing['id']
+                            await conn.execute(mention_sql, entity_id)
+                        else:
+                            # Create new entity; only new nodes need an embedding
+                            entity_embedding = None
+                            if embedding_model:
+                                entity_embedding = embedding_model.encode(entity['name']).tolist()
+                            entity_id = uuid4()
+                            embedding_str = '[' + ','.join(map(str, entity_embedding)) + ']' if entity_embedding else None
+
+                            await conn.execute("""
+                                INSERT INTO graph_nodes
+                                (id, entity_type, entity_name, embedding, importance_score)
+                                VALUES ($1, $2, $3, $4::vector, $5)
+                            """, entity_id, entity['type'], entity['name'],
+                                embedding_str, metadata.get('importance_score', 0.5))
+
+                            # Incrementally extend the gazetteer with the new entity
+                            if self.gazetteer is not None:
+                                self.gazetteer.add_entity(entity_id, entity['name'], entity['type'])
 
                     entity_ids[entity['name']] = entity_id
 
@@ -907,6 +1315,7 @@ class GraphProvider(VectorProvider):
                             rel['type'], rel['strength'], rel['confidence'],
                             {'context': content[entities[0]['start']:entities[-1]['end']][:200]})
 
+                self._graph_writes += 1
                 logger.info(f"Stored memory {memory_id} with {len(entities)} entities and {len(relationships)} relationships")
 
             except Exception as e:
@@ -975,6 +1384,298 @@ class GraphProvider(VectorProvider):
 
         return memories
 
+    async def expand_memories(self, seed_memory_ids: list[UUID],
+                              query_embedding: list[float] | None = None,
+                              max_hops: int = 1,
+                              min_strength: float = 0.3,
+                              exclude_ids: list[UUID] | None = None,
+                              filters: dict[str, Any] | None = None,
+                              time_range: dict[str, datetime] | None = None,
+                              min_similarity: float = 0.0) -> dict[str, Any]:
+        """
+        Expand vector hits through the knowledge graph.
+
+        Looks up the entities of the seed memories, walks relationships with
+        strength >= min_strength for up to max_hops, and fetches the memories
+        mentioning the reached entities. Node and memory counts are capped by
+        expansion_max_nodes / expansion_max_memories, and no new stage starts
+        once expansion_timeout_ms has elapsed.
+
+        Each entity gets a proximity score: 1.0 for seed entities, multiplied
+        by the edge strength on every hop. Expanded memories carry the best
+        proximity of their entities and, when query_embedding is given, their
+        cosine similarity to the query computed in the same statement.
+        Expanded memories are held to the same constraints as the vector
+        hits: metadata equality filters, the created_at time_range
+        ('start'/'end') and, with a query embedding, min_similarity.
+
+        Returns:
+            Dict with 'memories' (list of (MemoryResponse, proximity)),
+            'nodes', 'hops', 'truncated' and per-stage 'timings_ms'
+        """
+        started = time.perf_counter()
+        deadline = started + self.expansion_timeout_ms / 1000
+        timings: dict[str, float] = {}
+        result = {'memories': [], 'nodes': 0, 'hops': 0, 'truncated': False, 'timings_ms': timings}
+
+        if not seed_memory_ids:
+            return result
+
+        await self._ensure_pool()
+        if not self.connection_pool:
+            return result
+
+        exclude_ids = list(exclude_ids or seed_memory_ids)
+
+        async with self.connection_pool.acquire() as conn:
+            # Stage 1: entities mentioned by the seed memories
+            stage = time.perf_counter()
+            rows = await conn.fetch("""
+                SELECT DISTINCT entity_id
+                FROM memory_entity_map
+                WHERE memory_id = ANY($1::uuid[])
+                LIMIT $2
+            """, seed_memory_ids, self.expansion_max_nodes)
+            proximity: dict[UUID, float] = {row['entity_id']: 1.0 for row in rows}
+            timings['seed_entities'] = (time.perf_counter() - stage) * 1000
+
+            # Stage 2: bounded breadth-first walk over strong relationships
+            stage = time.perf_counter()
+            frontier = list(proximity)
+            for _ in range(max_hops):
+                if not frontier:
+                    break
+                remaining = self.expansion_max_nodes - len(proximity)
+                if remaining <= 0 or time.perf_counter() >= deadline:
+                    result['truncated'] = True
+                    break
+
+                edges = await conn.fetch("""
+                    SELECT from_node_id, to_node_id, strength
+                    FROM graph_relationships
+                    WHERE (from_node_id = ANY($1::uuid[]) OR to_node_id = ANY($1::uuid[]))
+                      AND strength >= $2
+                    ORDER BY strength DESC
+                    LIMIT $3
+                """, frontier, min_strength, remaining * 4)
+                result['hops'] += 1
+
+                frontier_set = set(frontier)
+                next_frontier = []
+                for edge in edges:
+                    strength = float(edge['strength'])
+                    for source, target in ((edge['from_node_id'], edge['to_node_id']),
+                                           (edge['to_node_id'], edge['from_node_id'])):
+                        if source not in frontier_set:
+                            continue
+                        score = proximity[source] * strength
+                        if target in proximity:
+                            proximity[target] = max(proximity[target], score)
+                        elif len(proximity) < self.expansion_max_nodes:
+                            proximity[target] = score
+                            next_frontier.append(target)
+                        else:
+                            result['truncated'] = True
+                frontier = next_frontier
+            timings['traverse'] = (time.perf_counter() - stage) * 1000
+            result['nodes'] = len(proximity)
+
+            # Stage 3: connected memories, scored against the query in one pass
+            if proximity and time.perf_counter() < deadline:
+                stage = time.perf_counter()
+                entity_ids = list(proximity)
+                embedding_str = '[' + ','.join(map(str, query_embedding)) + ']' if query_embedding else None
+                params: list[Any] = [entity_ids, [proximity[e] for e in entity_ids], exclude_ids,
+                                     embedding_str, self.expansion_max_memories]
+                where_clauses = ["NOT (vm.id = ANY($3::uuid[]))"]
+                for key, value in (filters or {}).items():
+                    if key not in ['limit', 'offset'] and value is not None:
+                        params.append(str(value))
+                        where_clauses.append(f"vm.metadata->>'{key}' = ${len(params)}")
+                for key, operator in (('start', '>='), ('end', '<=')):
+                    if time_range and time_range.get(key):
+                        params.append(time_range[key])
+                        where_clauses.append(f"vm.created_at {operator} ${len(params)}")
+                if query_embedding and min_similarity > 0:
+                    params.append(min_similarity)
+                    where_clauses.append(f"1 - (vm.embedding <=> $4::vector) >= ${len(params)}")
+                rows = await conn.fetch(f"""
+                    SELECT
+                        vm.id,
+                        vm.content,
+                        vm.metadata,
+                        COALESCE(vm.importance_score, 0.5) as importance_score,
+                        vm.created_at,
+                        MAX(n.proximity) as proximity,
+                        CASE
+                            WHEN $4::vector IS NULL OR vm.embedding IS NULL THEN 0.0
+                            ELSE 1 - (vm.embedding <=> $4::vector)
+                        END as similarity_score
+                    FROM unnest($1::uuid[], $2::float8[]) AS n(entity_id, proximity)
+                    JOIN memory_entity_map mem ON mem.entity_id = n.entity_id
+                    JOIN vector_memories vm ON vm.id = mem.memory_id
+                    WHERE {' AND '.join(where_clauses)}
+                    GROUP BY vm.id
+                    ORDER BY proximity DESC, importance_score DESC
+                    LIMIT $5
+                """, *params)
+
+                for row in rows:
+                    metadata = row['metadata']
+                    if isinstance(metadata, str):
+                        metadata = json.loads(metadata)
+                    result['memories'].append((MemoryResponse(
+                        id=row['id'],
+                        content=row['content'],
+                        metadata=dict(metadata) if metadata else {},
+                        importance_score=float(row['importance_score']),
+                        similarity_score=float(row['similarity_score']),
+                        created_at=row['created_at']
+                    ), float(row['proximity'])))
+                timings['fetch_memories'] = (time.perf_counter() - stage) * 1000
+            elif proximity:
+                result['truncated'] = True
+
+        timings['total'] = (time.perf_counter() - started) * 1000
+        return result
+
+    async def _graph_version(self, conn) -> str:
+        """Cheap change marker for the graph tables."""
+        changes = await conn.fetchval("""
+            SELECT COALESCE(SUM(n_tup_ins + n_tup_upd + n_tup_del), 0)
+            FROM pg_stat_user_tables
+            WHERE relname IN ('graph_nodes', 'graph_relationships', 'memory_entity_map')
+        """)
+        return f"{self._graph_writes}.{changes}"
+
+    async def extract_subgraph(self,
+                               entity_names: list[str] | None = None,
+                               entity_types: list[str] | None = None,
+                               relationship_types: list[str] | None = None,
+                               memory_id: UUID | None = None,
+                               max_depth: int = 1,
+                               min_strength: float = 0.0,
+                               max_nodes: int = 200,
+                               max_edges: int = 500) -> dict[str, Any]:
+        """
+        Extract a bounded subgraph in a single recursive CTE.
+
+        Seed nodes are selected by name/type filters and/or the entities of a
+        memory, then expanded up to max_depth hops over relationships matching
+        relationship_types and min_strength. Nodes closest to the seeds (then
+        most important) are kept first.
+
+        The result is columnar: 'nodes' and 'edges' are dicts of parallel
+        lists, and edges reference nodes by their position in nodes['id'].
+        Results are cached until the graph version changes.
+
+        Returns:
+            Dict with 'nodes', 'edges', 'total_nodes', 'truncated',
+            'graph_version' and 'cached'
+        """
+        await self._ensure_pool()
+        if not self.connection_pool:
+            raise RuntimeError("Graph provider not initialized")
+
+        async with self.connection_pool.acquire() as conn:
+            version = await self._graph_version(conn)
+            cache_key = (
+                tuple(entity_names or ()), tuple(entity_types or ()), tuple(relationship_types or ()),
+                str(memory_id) if memory_id else None, max_depth, min_strength, max_nodes, max_edges
+            )
+            cached = self._subgraph_cache.get(cache_key)
+            if cached and cached['graph_version'] == version:
+                self._subgraph_cache.move_to_end(cache_key)
+                return {**cached, 'cached': True}
+
+            rows = await conn.fetch("""
+                WITH RECURSIVE seeds AS (
+                    SELECT gn.id
+                    FROM graph_nodes gn
+                    WHERE ($1::text[] IS NULL OR gn.entity_name = ANY($1::text[]))
+                      AND ($2::text[] IS NULL OR gn.entity_type = ANY($2::text[]))
+                      AND ($3::uuid IS NULL OR gn.id IN (
+                          SELECT entity_id FROM memory_entity_map WHERE memory_id = $3::uuid
+                      ))
+                    ORDER BY gn.importance_score DESC
+                    LIMIT $7
+                ),
+                walk(id, depth) AS (
+                    SELECT id, 0 FROM seeds
+                    UNION
+                    SELECT CASE WHEN gr.from_node_id = w.id THEN gr.to_node_id ELSE gr.from_node_id END,
+                           w.depth + 1
+                    FROM walk w
+                    JOIN graph_relationships gr ON gr.from_node_id = w.id OR gr.to_node_id = w.id
+                    WHERE w.depth < $5
+                      AND gr.strength >= $6
+                      AND ($4::text[] IS NULL OR gr.relationship_type = ANY($4::text[]))
+                ),
+                selected AS (
+                    SELECT gn.id, gn.entity_name, gn.entity_type, gn.importance_score, w.depth,
+                           COUNT(*) OVER () as total_nodes
+                    FROM (SELECT id, MIN(depth) as depth FROM walk GROUP BY id) w
+                    JOIN graph_nodes gn ON gn.id = w.id
+                    ORDER BY w.depth, gn.importance_score DESC
+                    LIMIT $7
+                )
+                SELECT 'node' as kind, id, NULL::uuid as target, entity_name as label, entity_type as type,
+                       importance_score as weight, depth, total_nodes
+                FROM selected
+                UNION ALL
+                (
+                    SELECT 'edge', gr.from_node_id, gr.to_node_id, NULL, gr.relationship_type,
+                           gr.strength, NULL, NULL
+                    FROM graph_relationships gr
+                    WHERE gr.from_node_id IN (SELECT id FROM selected)
+                      AND gr.to_node_id IN (SELECT id FROM selected)
+                      AND gr.strength >= $6
+                      AND ($4::text[] IS NULL OR gr.relationship_type = ANY($4::text[]))
+                    ORDER BY gr.strength DESC
+                    LIMIT $8 + 1
+                )
+            """, entity_names or None, entity_types or None, memory_id, relationship_types or None,
+                max_depth, min_strength, max_nodes, max_edges)
+
+        nodes = {'id': [], 'name': [], 'type': [], 'importance': [], 'depth': []}
+        edges = {'source': [], 'target': [], 'type': [], 'strength': []}
+        position: dict[UUID, int] = {}
+        total_nodes = 0
+
+        for row in rows:
+            if row['kind'] != 'node':
+                continue
+            position[row['id']] = len(nodes['id'])
+            nodes['id'].append(str(row['id']))
+            nodes['name'].append(row['label'])
+            nodes['type'].append(row['type'])
+            nodes['importance'].append(float(row['weight'] or 0))
+            nodes['depth'].append(row['depth'])
+            total_nodes = row['total_nodes']
+
+        edge_rows = [row for row in rows if row['kind'] == 'edge']
+        for row in edge_rows[:max_edges]:
+            edges['source'].append(position[row['id']])
+            edges['target'].append(position[row['target']])
+            edges['type'].append(row['type'])
+            edges['strength'].append(float(row['weight'] or 0))
+
+        result = {
+            'nodes': nodes,
+            'edges': edges,
+            'total_nodes': total_nodes,
+            'truncated': total_nodes > len(nodes['id']) or len(edge_rows) > max_edges,
+            'graph_version': version,
+            'cached': False
+        }
+
+        self._subgraph_cache[cache_key] = result
+        self._subgraph_cache.move_to_end(cache_key)
+        while len(self._subgraph_cache) > self.subgraph_cache_size:
+            self._subgraph_cache.popitem(last=False)
+
+        return result
+
     async def get_relationships(self, node_id: UUID) -> list[dict[str, Any]]:
         """Get all relationships for a specific node."""
         # Ensure pool is initialized
@@ -1052,7 +1753,9 @@ class GraphProvider(VectorProvider):
                         'connection': 'active',
                         'graph_nodes': node_count,
                         'graph_relationships': relationship_count,
-                        'entity_extractor': 'spacy' if self.entity_extractor and self.entity_extractor != 'simple' else 'regex'
+                        'entity_extractor': 'spacy' if self.entity_extractor and self.entity_extractor != 'simple' else 'regex',
+                        'gazetteer': self.gazetteer.get_stats() if self.gazetteer else None,
+                        'spacy_mode': self.spacy_mode
                     }
                 }
         except Exception as e:
@@ -90,15 +90,14 @@ class InstrumentedPgVectorProvider(BasePgVectorProvider):
                         
                         # Trace index usage
                         with tracer.start_as_current_span("pgvector.check_index") as index_span:
-                            async with self.connection_pool.acquire() as conn:
-                                # Check if HNSW index exists
-                                index_info = await conn.fetchval("""
-                                    SELECT COUNT(*) 
-                                    FROM pg_indexes 
-                                    WHERE tablename = 'vector_memories' 
-                                    AND indexdef LIKE '%hnsw%'
-                                """)
-                                index_span.set_attribute("index.hnsw_exists", bool(index_info))
+                            # Check if HNSW index exists
+                            index_info = await self._read(lambda conn: conn.fetchval("""
+                                SELECT COUNT(*) 
+                                FROM pg_indexes 
+                                WHERE tablename = 'vector_memories' 
+                                AND indexdef LIKE '%hnsw%'
+                            """))
+                            index_span.set_attribute("index.hnsw_exists", bool(index_info))
                         
                         results = await super().query(query_embedding, limit, filters)
                 
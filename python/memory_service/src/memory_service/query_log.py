@@ -0,0 +1,188 @@
+"""
+Sampled Query Log
+
+Writes the anonymized shape of a sample of query requests (limit, filter
+keys, empty-query flag, hashed query text for repeat detection) and their
+timings to a rotating JSONL file per worker process. benchmarks.replay runs such a log against
+a local UnifiedVectorStore, so benchmarks and tuning use real traffic
+patterns instead of made-up ones.
+
+Enabled by QUERY_LOG_SAMPLE_RATE > 0. Query text, filter values and user or
+conversation IDs are never written, only keyed BLAKE2 digests of them; set
+QUERY_LOG_SALT to keep digests stable across restarts and workers.
+
+RotatingFileHandler cannot share a file between processes (every worker
+would rotate it on its own), so each worker writes QUERY_LOG_PATH with its
+pid inserted (logs/query_log.1234.jsonl); load_query_log merges them back.
+"""
+
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+from pathlib import Path
+from typing import Any
+
+from .models import QueryRequest, QueryResponse
+
+logger = logging.getLogger(__name__)
+
+
+class QueryLogSampler:
+    """
+    Bernoulli sampler writing anonymized query shapes to a rotating JSONL file.
+
+    Unsampled requests cost one random() call; sampled ones queue one JSON
+    line on a private, non-propagating logger. A QueueListener thread writes
+    the lines through a RotatingFileHandler, so file I/O and rotation never
+    block the event loop.
+    """
+
+    def __init__(self,
+                 path: str,
+                 sample_rate: float = 0.01,
+                 max_bytes: int = 50 * 1024 * 1024,
+                 backup_count: int = 5,
+                 salt: str | None = None):
+        self.path = path
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self._salt = salt.encode() if salt else os.urandom(16)
+        self.sampled = 0
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+        )
+        self._handler.setFormatter(logging.Formatter('%(message)s'))
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._queue_handler = logging.handlers.QueueHandler(log_queue)
+        self._listener = logging.handlers.QueueListener(log_queue, self._handler)
+        self._listener.start()
+        self._logger = logging.getLogger(f"{__name__}.{id(self)}")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._logger.addHandler(self._queue_handler)
+
+    @classmethod
+    def from_env(cls) -> 'QueryLogSampler | None':
+        """Build a sampler from QUERY_LOG_* variables, or None when sampling is off."""
+        sample_rate = float(os.getenv('QUERY_LOG_SAMPLE_RATE', '0'))
+        if sample_rate <= 0:
+            return None
+        return cls(
+            path=process_log_path(os.getenv('QUERY_LOG_PATH', 'logs/query_log.jsonl')),
+            sample_rate=sample_rate,
+            max_bytes=int(os.getenv('QUERY_LOG_MAX_BYTES', str(50 * 1024 * 1024))),
+            backup_count=int(os.getenv('QUERY_LOG_BACKUP_COUNT', '5')),
+            salt=os.getenv('QUERY_LOG_SALT')
+        )
+
+    def should_sample(self) -> bool:
+        return random.random() < self.sample_rate
+
+    def _digest(self, value: Any) -> str:
+        return hashlib.blake2b(str(value).encode(), digest_size=8, key=self._salt).hexdigest()
+
+    def request_shape(self, request: QueryRequest) -> dict[str, Any]:
+        """Anonymized shape of a query request."""
+        query = (request.query or "").strip()
+        filters = request.filters or {}
+        return {
+            'query_hash': self._digest(" ".join(query.lower().split())) if query else None,
+            'query_tokens': len(query.split()),
+            'query_chars': len(query),
+            'empty': not query,
+            'limit': request.limit,
+            'min_similarity': request.min_similarity,
+            'filters': {key: self._digest(filters[key]) for key in sorted(filters)},
+            'user_id': self._digest(request.user_id) if request.user_id else None,
+            'conversation_id': self._digest(request.conversation_id) if request.conversation_id else None,
+            'time_range': bool(request.time_range),
+            'providers': request.providers,
+            'graph_expand': request.graph_expand,
+            'graph_hops': request.graph_hops
+        }
+
+    def record(self,
+               endpoint: str,
+               request: QueryRequest,
+               started_at: float,
+               latency_ms: float,
+               response: QueryResponse | None = None,
+               status: str = 'ok') -> None:
+        """
+        Write one sampled request.
+
+        Args:
+            endpoint: Handler label, e.g. 'POST /memories/query'
+            request: The query as executed
+            started_at: Wall-clock start time (epoch seconds), used for replay pacing
+            latency_ms: Handler latency
+            response: Response, when the query succeeded
+            status: 'ok' or 'error'
+        """
+        entry = {
+            'ts': round(started_at, 6),
+            'endpoint': endpoint,
+            **self.request_shape(request),
+            'latency_ms': round(latency_ms, 3),
+            'returned': len(response.memories) if response else 0,
+            'total_found': response.total_found if response else 0,
+            'status': status
+        }
+        try:
+            self._logger.info(json.dumps(entry, separators=(',', ':')))
+            self.sampled += 1
+        except Exception as e:
+            logger.debug(f"Query log write failed: {e}")
+
+    def close(self) -> None:
+        """Write out queued lines and close the file."""
+        self._logger.removeHandler(self._queue_handler)
+        self._listener.stop()
+        self._handler.close()
+
+
+def process_log_path(path: str, pid: int | None = None) -> str:
+    """The log path of one worker process: logs/query_log.jsonl -> logs/query_log.<pid>.jsonl."""
+    base = Path(path)
+    return str(base.with_name(f"{base.stem}.{pid or os.getpid()}{base.suffix}"))
+
+
+def _with_backups(path: Path) -> list[Path]:
+    """path preceded by its rotated backups, oldest first."""
+    backups = sorted(
+        (p for p in path.parent.glob(f"{path.name}.*") if p.suffix[1:].isdigit()),
+        key=lambda p: int(p.suffix[1:]),
+        reverse=True
+    )
+    return [*backups, path]
+
+
+def load_query_log(path: str | Path) -> list[dict[str, Any]]:
+    """
+    Read a query log: the file itself and the per-process logs of its
+    workers (see process_log_path), including their rotated backups.
+
+    Entries are returned sorted by timestamp; malformed lines are skipped.
+    """
+    path = Path(path)
+    worker_name = re.compile(rf"{re.escape(path.stem)}\.\d+{re.escape(path.suffix)}")
+    worker_logs = sorted(p for p in path.parent.glob(f"{path.stem}.*{path.suffix}")
+                         if worker_name.fullmatch(p.name))
+    entries = []
+    for file in [log_file for log in [path, *worker_logs] for log_file in _with_backups(log)]:
+        if not file.exists():
+            continue
+        with open(file, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    entries.sort(key=lambda entry: entry.get('ts', 0))
+    return entries
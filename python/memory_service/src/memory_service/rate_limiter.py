@@ -0,0 +1,275 @@
+"""
+Adaptive Rate Limiting for Embedding API Calls
+
+Every OpenAI embedding request passes through one EmbeddingRateLimiter per
+worker, which combines:
+
+- Two token buckets, requests per minute and tokens per minute, kept in
+  step with the x-ratelimit-* response headers so the worker's view of its
+  remaining quota follows the server's.
+- AIMD adaptive concurrency: the number of requests in flight grows by
+  about one per window of successful calls and is halved on a 429, which
+  finds the highest concurrency the account sustains without errors.
+- Priority lanes: waiters are served in priority order, so interactive
+  queries get ahead of bulk imports. The priority comes from a context
+  variable, set around bulk work with ``with embedding_priority('bulk')``.
+
+A 429 also pauses all dispatch for the Retry-After interval instead of
+letting every waiter hit the limit again.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import re
+import time
+from collections.abc import Iterator, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Lower rank is served first
+PRIORITIES = {
+    'interactive': 0,
+    'bulk': 1
+}
+
+_priority: ContextVar[str] = ContextVar('embedding_priority', default='interactive')
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_SECONDS = {'h': 3600.0, 'm': 60.0, 's': 1.0, 'ms': 0.001}
+
+
+@contextmanager
+def embedding_priority(name: str) -> Iterator[None]:
+    """Run embedding calls made in this context (and tasks it spawns) at the given priority."""
+    if name not in PRIORITIES:
+        raise ValueError(f"Unknown embedding priority '{name}' (expected one of {', '.join(PRIORITIES)})")
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+def parse_duration(value: str | None) -> float | None:
+    """Parse rate-limit reset values such as '1s', '6m0s', '20ms' or '0.5' into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_SECONDS[unit] for amount, unit in parts)
+
+
+def retry_after_seconds(headers: Mapping[str, str]) -> float | None:
+    """Server-requested wait from retry-after-ms or retry-after, if any."""
+    milliseconds = parse_duration(headers.get('retry-after-ms'))
+    if milliseconds is not None:
+        return milliseconds / 1000
+    return parse_duration(headers.get('retry-after'))
+
+
+def estimate_tokens(texts: list[str]) -> int:
+    """Rough token count for budgeting (about 4 characters per token)."""
+    return max(1, sum(len(text) for text in texts) // 4)
+
+
+class TokenBucket:
+    """A per-minute quota refilled continuously, resynchronized from response headers."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, amount: float, now: float) -> float:
+        """Seconds until amount is available (0 when it is now)."""
+        self._refill(now)
+        # A request bigger than the bucket could never fit; let it through on a full bucket
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+
+    def sync(self, limit: float | None, remaining: float | None, reset: float | None) -> None:
+        """Adopt the server's limit and remaining quota (x-ratelimit-limit/remaining/reset-*)."""
+        now = time.monotonic()
+        self._refill(now)
+        if limit:
+            self.capacity = float(limit)
+            self.rate = self.capacity / 60.0
+        if remaining is not None:
+            # Other workers share the quota, so the server may know of less than we do
+            self.tokens = min(self.tokens, float(remaining))
+            if reset and remaining < self.capacity:
+                # The server refills the used quota over `reset` seconds
+                self.rate = max(self.rate, (self.capacity - remaining) / reset)
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on requests in flight: +1 per limit successes, x decrease on overload."""
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 32, decrease: float = 0.5):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self.in_flight = 0
+
+    @property
+    def available(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def on_success(self) -> None:
+        self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+
+    def on_overload(self) -> None:
+        self.limit = max(float(self.minimum), self.limit * self.decrease)
+
+
+class EmbeddingRateLimiter:
+    """Request/token buckets, AIMD concurrency and priority ordering for embedding calls."""
+
+    def __init__(self,
+                 requests_per_minute: float = 3000,
+                 tokens_per_minute: float = 1_000_000,
+                 initial_concurrency: int = 4,
+                 min_concurrency: int = 1,
+                 max_concurrency: int = 32):
+        """
+        Args:
+            requests_per_minute: Starting request quota (headers replace it)
+            tokens_per_minute: Starting token quota (headers replace it)
+            initial_concurrency: Requests in flight before any feedback
+            min_concurrency: Floor the AIMD limit never drops below
+            max_concurrency: Ceiling the AIMD limit never exceeds
+        """
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.concurrency = AdaptiveConcurrency(initial_concurrency, min_concurrency, max_concurrency)
+        self.paused_until = 0.0
+        self._waiters: list[tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._condition: asyncio.Condition | None = None
+        self.granted = dict.fromkeys(PRIORITIES, 0)
+        self.rate_limited = 0
+        self.wait_seconds = 0.0
+
+    @classmethod
+    def from_env(cls) -> 'EmbeddingRateLimiter':
+        """Build a limiter from OPENAI_EMBEDDING_RPM / _TPM and EMBEDDING_*_CONCURRENCY."""
+        return cls(
+            requests_per_minute=float(os.getenv('OPENAI_EMBEDDING_RPM', '3000')),
+            tokens_per_minute=float(os.getenv('OPENAI_EMBEDDING_TPM', '1000000')),
+            initial_concurrency=int(os.getenv('EMBEDDING_INITIAL_CONCURRENCY', '4')),
+            max_concurrency=int(os.getenv('EMBEDDING_MAX_CONCURRENCY', '32'))
+        )
+
+    def _ready_delay(self, tokens: int) -> float:
+        now = time.monotonic()
+        return max(self.paused_until - now, self.requests.delay(1, now), self.tokens.delay(tokens, now))
+
+    async def acquire(self, tokens: int, priority: str | None = None) -> None:
+        """
+        Wait for a slot for one request of about `tokens` tokens.
+
+        Waiters are admitted strictly in (priority, arrival) order; every
+        acquire must be paired with release().
+        """
+        priority = priority or current_priority()
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        entry = (PRIORITIES.get(priority, len(PRIORITIES)), next(self._sequence))
+        started = time.monotonic()
+
+        async with self._condition:
+            heapq.heappush(self._waiters, entry)
+            try:
+                while True:
+                    delay = None
+                    if self._waiters[0] == entry and self.concurrency.available:
+                        delay = self._ready_delay(tokens)
+                        if delay <= 0:
+                            break
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                # The next waiter may be admissible now
+                self._condition.notify_all()
+
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+            self.concurrency.in_flight += 1
+            self.granted[priority] = self.granted.get(priority, 0) + 1
+            self.wait_seconds += time.monotonic() - started
+
+    async def release(self, *, rate_limited: bool = False, retry_after: float | None = None) -> None:
+        """Finish a request: grow the concurrency limit on success, cut it and pause on a 429."""
+        self.concurrency.in_flight -= 1
+        if rate_limited:
+            self.rate_limited += 1
+            self.concurrency.on_overload()
+            pause = retry_after if retry_after is not None else 1.0
+            self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            logger.warning(f"Embedding rate limited: concurrency limit now {self.concurrency.limit:.1f}, "
+                           f"pausing {pause:.2f}s")
+        else:
+            self.concurrency.on_success()
+        if self._condition is not None:
+            async with self._condition:
+                self._condition.notify_all()
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Resynchronize both buckets from OpenAI's x-ratelimit-* headers."""
+        for bucket, kind in ((self.requests, 'requests'), (self.tokens, 'tokens')):
+            limit = headers.get(f'x-ratelimit-limit-{kind}')
+            remaining = headers.get(f'x-ratelimit-remaining-{kind}')
+            try:
+                bucket.sync(
+                    float(limit) if limit else None,
+                    float(remaining) if remaining is not None else None,
+                    parse_duration(headers.get(f'x-ratelimit-reset-{kind}'))
+                )
+            except ValueError:
+                logger.debug(f"Ignoring malformed x-ratelimit-*-{kind} headers")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'concurrency_limit': round(self.concurrency.limit, 2),
+            'in_flight': self.concurrency.in_flight,
+            'waiting': len(self._waiters),
+            'requests_available': round(self.requests.tokens, 1),
+            'requests_per_minute': self.requests.capacity,
+            'tokens_available': round(self.tokens.tokens, 1),
+            'tokens_per_minute': self.tokens.capacity,
+            'paused_for_s': round(max(0.0, self.paused_until - time.monotonic()), 3),
+            'granted': dict(self.granted),
+            'rate_limited': self.rate_limited,
+            'wait_seconds_total': round(self.wait_seconds, 3)
+        }
@@ -0,0 +1,348 @@
+"""
+Read-Replica Routing
+
+Sends PgVectorProvider reads (ANN queries, recent memories, text search,
+stats) to Postgres read replicas, keeping writes on the primary. Each
+replica has its own small pool (a SharedPoolManager with only a query
+lane), a health state and a latency EWMA; reads pick a healthy replica
+at random, weighted by inverse latency.
+
+Read-your-writes is bounded by the WAL position of the last write from
+this worker: a replica only serves reads once its replay LSN has reached
+the write's LSN, otherwise the read goes to the primary. Replicas are
+probed every probe_interval seconds; when every replica looks behind, a
+read re-checks their replay LSN on demand (at most once per
+lsn_recheck_interval per replica, shared by concurrent reads) rather than
+waiting for the next probe. If the write's LSN could not be read, reads
+stay on the primary for staleness_window seconds. A replica that keeps
+failing is skipped until retry_after has passed.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any
+
+from .pool_manager import SharedPoolManager
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest sample in the latency EWMA
+_EWMA_ALPHA = 0.2
+
+
+def parse_lsn(lsn: str | None) -> int | None:
+    """'16/B374D848' -> comparable integer; None for unknown positions."""
+    if not lsn:
+        return None
+    high, _, low = lsn.partition('/')
+    try:
+        return (int(high, 16) << 32) | int(low, 16)
+    except ValueError:
+        return None
+
+
+def parse_replica_hosts(spec: str, default_port: int = 5432) -> list[dict[str, Any]]:
+    """Parse "replica-a:5432,replica-b" into read endpoint configs."""
+    replicas = []
+    for part in spec.split(','):
+        host, _, port = part.strip().partition(':')
+        if host:
+            replicas.append({'host': host, 'port': int(port) if port else default_port})
+    return replicas
+
+
+class ReplicaEndpoint:
+    """One read replica: pool, health and observed latency."""
+
+    def __init__(self, name: str, manager: SharedPoolManager):
+        self.name = name
+        self.manager = manager
+        self.healthy = False
+        self.latency_ms: float | None = None
+        self.replay_lsn: int | None = None
+        self.consecutive_failures = 0
+        self.retry_at = 0.0
+        self.last_error: str | None = None
+        self.reads = 0
+        self.lsn_checked_at = 0.0
+        self._lsn_check: asyncio.Task | None = None
+
+    @property
+    def pool(self):
+        return self.manager.lane('query')
+
+    def available(self, now: float) -> bool:
+        return self.healthy and now >= self.retry_at
+
+    def weight(self) -> float:
+        # Unmeasured replicas get a typical weight so they receive traffic and a sample
+        latency = self.latency_ms if self.latency_ms is not None else 5.0
+        return 1.0 / max(latency, 0.1)
+
+    def record_latency(self, seconds: float) -> None:
+        ms = seconds * 1000
+        self.latency_ms = ms if self.latency_ms is None else (1 - _EWMA_ALPHA) * self.latency_ms + _EWMA_ALPHA * ms
+
+    def observe(self, seconds: float) -> None:
+        """A read completed on this replica."""
+        self.record_latency(seconds)
+        self.reads += 1
+        self.consecutive_failures = 0
+
+    def mark_failed(self, error: Exception, failure_threshold: int, retry_after: float) -> None:
+        self.consecutive_failures += 1
+        self.last_error = str(error)
+        if self.consecutive_failures >= failure_threshold and self.healthy:
+            self.healthy = False
+            logger.warning(f"Read replica {self.name} marked unhealthy: {error}")
+        # Back off even before the threshold so one bad replica does not fail every read
+        self.retry_at = time.monotonic() + retry_after * min(1.0, self.consecutive_failures / failure_threshold)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'healthy': self.healthy,
+            'latency_ewma_ms': round(self.latency_ms, 3) if self.latency_ms is not None else None,
+            'replay_lsn': self.replay_lsn,
+            'reads': self.reads,
+            'consecutive_failures': self.consecutive_failures,
+            'last_error': self.last_error,
+            'pool': self.pool.stats()
+        }
+
+
+class ReplicaRouter:
+    """Chooses a replica (or the primary) per read and keeps replica health current."""
+
+    def __init__(self,
+                 endpoints: list[ReplicaEndpoint],
+                 staleness_window: float = 2.0,
+                 probe_interval: float = 1.0,
+                 failure_threshold: int = 3,
+                 retry_after: float = 10.0,
+                 lsn_recheck_interval: float = 0.05):
+        self.endpoints = endpoints
+        self.staleness_window = staleness_window
+        self.probe_interval = probe_interval
+        self.failure_threshold = failure_threshold
+        self.retry_after = retry_after
+        self.lsn_recheck_interval = lsn_recheck_interval
+        self.last_write_at: float | None = None
+        self.last_write_lsn: int | None = None
+        self.primary_reads = 0
+        self.replica_reads = 0
+        self.lsn_rechecks = 0
+        self._monitor_task: asyncio.Task | None = None
+
+    @classmethod
+    def from_config(cls,
+                    primary_config: dict[str, Any],
+                    replicas: list[dict[str, Any] | str],
+                    pool_size: int = 10,
+                    **kwargs) -> 'ReplicaRouter':
+        """
+        Build a router from replica configs.
+
+        Args:
+            primary_config: Primary connection settings; replicas inherit
+                database, user and password unless they override them
+            replicas: Dicts with at least 'host', or "host[:port]" strings
+            pool_size: Maximum connections per replica
+        """
+        endpoints = []
+        for replica in replicas:
+            if isinstance(replica, str):
+                replica = parse_replica_hosts(replica, int(primary_config.get('port', 5432)))[0]
+            config = {
+                'port': primary_config.get('port', 5432),
+                'database': primary_config.get('database'),
+                'user': primary_config.get('user'),
+                'password': primary_config.get('password'),
+                **replica
+            }
+            manager = SharedPoolManager(config, min_size=1, max_size=pool_size, classes={'query': pool_size})
+            endpoints.append(ReplicaEndpoint(f"{config['host']}:{config['port']}", manager))
+        return cls(endpoints, **kwargs)
+
+    def note_write(self, lsn: str | None = None) -> None:
+        """Record a write on the primary and, when known, its WAL position."""
+        self.last_write_at = time.monotonic()
+        position = parse_lsn(lsn)
+        if position is not None:
+            self.last_write_lsn = max(self.last_write_lsn or 0, position)
+        else:
+            self.last_write_lsn = None
+
+    def _caught_up(self, endpoint: ReplicaEndpoint) -> bool:
+        return endpoint.replay_lsn is not None and endpoint.replay_lsn >= self.last_write_lsn
+
+    def _candidates(self, now: float) -> list[ReplicaEndpoint]:
+        candidates = [e for e in self.endpoints if e.available(now)]
+        if not candidates or self.last_write_at is None:
+            return candidates
+        if self.last_write_lsn is None:
+            # Nothing can prove a replica has the write until the window has passed
+            return [] if now - self.last_write_at < self.staleness_window else candidates
+        # Only replicas known to have replayed the last write qualify, however long ago it was
+        return [e for e in candidates if self._caught_up(e)]
+
+    def _pick(self, candidates: list[ReplicaEndpoint]) -> ReplicaEndpoint | None:
+        if not candidates:
+            self.primary_reads += 1
+            return None
+        self.replica_reads += 1
+        if len(candidates) == 1:
+            return candidates[0]
+        return random.choices(candidates, weights=[e.weight() for e in candidates])[0]
+
+    def choose(self) -> ReplicaEndpoint | None:
+        """A replica for the next read, or None to read from the primary (last probed LSNs only)."""
+        return self._pick(self._candidates(time.monotonic()))
+
+    async def choose_fresh(self) -> ReplicaEndpoint | None:
+        """
+        Like choose(), but when every available replica looks behind the last
+        write, re-read their replay LSN first instead of waiting for the next
+        probe.
+        """
+        now = time.monotonic()
+        candidates = self._candidates(now)
+        if not candidates and self.last_write_lsn is not None:
+            behind = [e for e in self.endpoints if e.available(now)]
+            if behind:
+                await asyncio.gather(*(self.recheck_lsn(e) for e in behind))
+                candidates = self._candidates(time.monotonic())
+        return self._pick(candidates)
+
+    async def recheck_lsn(self, endpoint: ReplicaEndpoint) -> None:
+        """Refresh a replica's replay LSN unless it was read within lsn_recheck_interval."""
+        if endpoint._lsn_check is None:
+            if time.monotonic() - endpoint.lsn_checked_at < self.lsn_recheck_interval:
+                return
+            self.lsn_rechecks += 1
+            endpoint._lsn_check = asyncio.ensure_future(self.probe(endpoint))
+            endpoint._lsn_check.add_done_callback(lambda _: setattr(endpoint, '_lsn_check', None))
+        # Concurrent reads share one check; a cancelled reader does not cancel it
+        await asyncio.shield(endpoint._lsn_check)
+
+    def record_failure(self, endpoint: ReplicaEndpoint, error: Exception) -> None:
+        endpoint.mark_failed(error, self.failure_threshold, self.retry_after)
+
+    async def probe(self, endpoint: ReplicaEndpoint) -> None:
+        """Check a replica, refreshing its replay LSN and latency."""
+        started = time.perf_counter()
+        try:
+            async with endpoint.pool.acquire(timeout=max(self.probe_interval, 1.0)) as conn:
+                row = await conn.fetchrow(
+                    "SELECT pg_is_in_recovery() AS in_recovery, pg_last_wal_replay_lsn()::text AS replay_lsn"
+                )
+        except Exception as e:
+            self.record_failure(endpoint, e)
+            return
+
+        endpoint.record_latency(time.perf_counter() - started)
+        endpoint.consecutive_failures = 0
+        endpoint.lsn_checked_at = time.monotonic()
+        endpoint.replay_lsn = parse_lsn(row['replay_lsn'])
+        if not row['in_recovery']:
+            # Not a standby (e.g. a second primary in a test setup): LSNs are not comparable
+            endpoint.replay_lsn = None
+        if not endpoint.healthy:
+            logger.info(f"Read replica {endpoint.name} healthy")
+        endpoint.healthy = True
+        endpoint.retry_at = 0.0
+        endpoint.last_error = None
+
+    async def start(self) -> None:
+        """Open replica pools and start probing; unreachable replicas stay out of rotation."""
+        async def open_endpoint(endpoint: ReplicaEndpoint):
+            try:
+                await endpoint.manager.start()
+            except Exception as e:
+                self.record_failure(endpoint, e)
+                logger.warning(f"Read replica {endpoint.name} unavailable: {e}")
+                return
+            await self.probe(endpoint)
+
+        await asyncio.gather(*(open_endpoint(e) for e in self.endpoints))
+        if self._monitor_task is None:
+            self._monitor_task = asyncio.create_task(self._monitor())
+
+    async def _monitor(self) -> None:
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            for endpoint in self.endpoints:
+                if endpoint.manager.pool is None:
+                    try:
+                        await endpoint.manager.start()
+                    except Exception as e:
+                        self.record_failure(endpoint, e)
+                        continue
+                await self.probe(endpoint)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            'primary_reads': self.primary_reads,
+            'replica_reads': self.replica_reads,
+            'lsn_rechecks': self.lsn_rechecks,
+            'staleness_window_s': self.staleness_window,
+            'replicas': {e.name: e.stats() for e in self.endpoints}
+        }
+
+    async def close(self) -> None:
+        if self._monitor_task:
+            self._monitor_task.cancel()
+            try:
+                await self._monitor_task
+            except asyncio.CancelledError:
+                pass
+            self._monitor_task = None
+        await asyncio.gather(*(e.manager.close() for e in self.endpoints), return_exceptions=True)
+
+
+class RoutedReadPool:
+    """
+    Pool-like view that routes each acquire to a replica or the primary, for
+    read-only callers that take a pool (EmergencySearchFix text search).
+    """
+
+    def __init__(self, router: ReplicaRouter, primary):
+        self.router = router
+        self.primary = primary
+
+    def acquire(self):
+        return _RoutedAcquireContext(self)
+
+    def get_size(self) -> int:
+        return self.primary.get_size()
+
+
+class _RoutedAcquireContext:
+    def __init__(self, routed: RoutedReadPool):
+        self._routed = routed
+        self._context = None
+        self._endpoint: ReplicaEndpoint | None = None
+        self._started = 0.0
+
+    async def __aenter__(self):
+        router = self._routed.router
+        self._endpoint = await router.choose_fresh()
+        if self._endpoint is not None:
+            self._started = time.perf_counter()
+            self._context = self._endpoint.pool.acquire()
+            try:
+                return await self._context.__aenter__()
+            except Exception as e:
+                router.record_failure(self._endpoint, e)
+                self._endpoint = None
+        self._context = self._routed.primary.acquire()
+        return await self._context.__aenter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._endpoint is not None:
+            if exc is None:
+                self._endpoint.observe(time.perf_counter() - self._started)
+            else:
+                self._routed.router.record_failure(self._endpoint, exc)
+        return await self._context.__aexit__(exc_type, exc, tb)
@@ -9,10 +9,14 @@ import asyncio
 from typing import Any, Optional
 from uuid import UUID
 
+from .chunking import PARENT_KEY
 from .models import MemoryResponse
 
 logger = logging.getLogger(__name__)
 
+# Chunk rows of long memories; every search here returns the parent rows instead
+NOT_CHUNK = f"NOT (metadata ? '{PARENT_KEY}')"
+
 
 class EmergencySearchFix:
     """
@@ -89,7 +93,7 @@ class EmergencySearchFix:
                 
                 # Get total count first
                 full_table_name = f"{schema_name}.{self.table_name}"
-                total_count = await conn.fetchval(f"SELECT COUNT(*) FROM {full_table_name}")
+                total_count = await conn.fetchval(f"SELECT COUNT(*) FROM {full_table_name} WHERE {NOT_CHUNK}")
                 logger.info(f"Total memories in {full_table_name}: {total_count}")
                 
                 # Now fetch the actual rows
@@ -101,7 +105,7 @@ class EmergencySearchFix:
                         importance_score,
                         created_at
                     FROM {full_table_name}
-                    WHERE content IS NOT NULL
+                    WHERE content IS NOT NULL AND {NOT_CHUNK}
                     ORDER BY created_at DESC
                     LIMIT $1
                 """, limit)
@@ -147,6 +151,7 @@ class EmergencySearchFix:
                         ) as rank
                     FROM {full_table_name}
                     WHERE to_tsvector('english', content) @@ plainto_tsquery('english', $1)
+                      AND {NOT_CHUNK}
                     ORDER BY rank DESC, created_at DESC
                     LIMIT $2
                 """, query, limit)
@@ -196,7 +201,7 @@ class EmergencySearchFix:
                         importance_score,
                         created_at
                     FROM {full_table_name}
-                    WHERE {where_clause}
+                    WHERE ({where_clause}) AND {NOT_CHUNK}
                     ORDER BY created_at DESC
                     LIMIT $1
                 """, limit)
@@ -237,11 +242,11 @@ class EmergencySearchFix:
             async with self.connection_pool.acquire() as conn:
                 # Count total memories
                 full_table_name = f"public.{self.table_name}"
-                total_count = await conn.fetchval(f"SELECT COUNT(*) FROM {full_table_name}")
+                total_count = await conn.fetchval(f"SELECT COUNT(*) FROM {full_table_name} WHERE {NOT_CHUNK}")
                 
                 # Count memories with embeddings
                 with_embeddings = await conn.fetchval(
-                    f"SELECT COUNT(*) FROM {full_table_name} WHERE embedding IS NOT NULL"
+                    f"SELECT COUNT(*) FROM {full_table_name} WHERE embedding IS NOT NULL AND {NOT_CHUNK}"
                 )
                 
                 # Count memories without embeddings
@@ -251,7 +256,7 @@ class EmergencySearchFix:
                 missing_samples = await conn.fetch(f"""
                     SELECT id, SUBSTRING(content, 1, 100) as content_preview
                     FROM {full_table_name}
-                    WHERE embedding IS NULL
+                    WHERE embedding IS NULL AND {NOT_CHUNK}
                     LIMIT 5
                 """)
                 
@@ -0,0 +1,146 @@
+"""
+Startup Profile
+
+Records where cold-start time goes: cumulative import time of this
+package's modules and of each third-party top-level package (via a
+meta-path finder that is installed when the package is imported and
+removed once the service is ready, or when the app lifespan ends or the
+primary provider fails to start), plus named startup phases such as
+per-provider initialization. Served at /metrics/startup.
+"""
+
+import importlib.abc
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_PACKAGE = __name__.rpartition('.')[0]
+
+
+class _TimedLoader:
+    """Wraps a module loader, records how long exec_module took and then puts the original back."""
+
+    def __init__(self, loader, name: str, profile: 'StartupProfile'):
+        self._loader = loader
+        self._name = name
+        self._profile = profile
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profile.imports[self._name] = (time.perf_counter() - started) * 1000
+            module.__loader__ = self._loader
+            if getattr(module, '__spec__', None) is not None:
+                module.__spec__.loader = self._loader
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class _ImportTimingFinder(importlib.abc.MetaPathFinder):
+    """Times imports of package modules and third-party top-level packages."""
+
+    def __init__(self, profile: 'StartupProfile'):
+        self._profile = profile
+        self._resolving: set[str] = set()
+
+    def find_spec(self, fullname, path, target=None):
+        tracked = fullname.startswith(f"{_PACKAGE}.") or '.' not in fullname
+        if not tracked or fullname in self._resolving or fullname in sys.builtin_module_names:
+            return None
+
+        self._resolving.add(fullname)
+        try:
+            for finder in sys.meta_path:
+                if isinstance(finder, _ImportTimingFinder) or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._resolving.discard(fullname)
+
+        if spec.loader is None or not hasattr(spec.loader, 'exec_module'):
+            return spec
+        spec.loader = _TimedLoader(spec.loader, fullname.removeprefix(f"{_PACKAGE}."), self._profile)
+        return spec
+
+
+class StartupProfile:
+    """Import and phase timings from package import until the service is ready."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.imports: dict[str, float] = {}
+        self.phases: dict[str, float] = {}
+        self.serving_ms: float | None = None
+        self.ready_ms: float | None = None
+        self._finder: _ImportTimingFinder | None = None
+
+    def install_import_hook(self) -> None:
+        if self._finder is None:
+            self._finder = _ImportTimingFinder(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def remove_import_hook(self) -> None:
+        if self._finder is not None:
+            if self._finder in sys.meta_path:
+                sys.meta_path.remove(self._finder)
+            self._finder = None
+
+    def record(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = round(seconds * 1000, 3)
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    async def timed(self, name: str, awaitable):
+        """Await and record an awaitable (e.g. asyncio.to_thread(...)) as a phase."""
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000, 3)
+
+    def mark_serving(self) -> None:
+        """The app accepts requests (lifespan startup finished)."""
+        self.serving_ms = self.elapsed_ms()
+
+    def mark_ready(self) -> None:
+        """The primary provider is ready; import tracking stops here."""
+        if self.ready_ms is None:
+            self.ready_ms = self.elapsed_ms()
+            self.remove_import_hook()
+            logger.info(f"Service ready {self.ready_ms:.0f}ms after import "
+                        f"(serving after {self.serving_ms or 0:.0f}ms)")
+
+    def report(self, top: int = 25) -> dict[str, Any]:
+        slowest = sorted(self.imports.items(), key=lambda item: item[1], reverse=True)[:top]
+        return {
+            'time_to_serving_ms': self.serving_ms,
+            'time_to_ready_ms': self.ready_ms,
+            'phases_ms': dict(self.phases),
+            'imports_ms': {name: round(ms, 3) for name, ms in slowest}
+        }
+
+
+startup_profile = StartupProfile()
@@ -12,6 +12,7 @@ from typing import Any
 import asyncpg
 
 from .models import MemoryResponse, TemporalQuery
+from .pool_manager import PoolLane, SharedPoolManager
 from .unified_store import UnifiedVectorStore
 
 logger = logging.getLogger(__name__)
@@ -25,13 +26,20 @@ class TemporalMemoryStore:
     while providing vector similarity search across time ranges.
     """
 
-    def __init__(self, unified_store: UnifiedVectorStore, db_config: dict[str, Any]):
+    def __init__(self, unified_store: UnifiedVectorStore, db_config: dict[str, Any],
+                 pool_manager: SharedPoolManager | None = None):
         self.unified_store = unified_store
         self.db_config = db_config
-        self.connection_pool: asyncpg.Pool | None = None
+        self.pool_manager = pool_manager
+        self.connection_pool: asyncpg.Pool | PoolLane | None = None
 
     async def initialize(self):
-        """Initialize database connection pool."""
+        """Initialize database connection pool (the shared pool's query lane when a manager is given)."""
+        if self.pool_manager:
+            self.connection_pool = self.pool_manager.lane('query')
+            logger.info("Temporal memory store using shared connection pool")
+            return
+
         try:
             self.connection_pool = await asyncpg.create_pool(
                 host=self.db_config.get('host', 'localhost'),
@@ -3,22 +3,42 @@ Usage Tracking Middleware
 
 Real-time usage tracking and analytics for the Core Nexus Memory Service.
 Collects performance metrics, user patterns, and system intelligence data.
+
+Recording an event is O(1): raw events go into fixed-size, array-backed
+ring buffers (one column per field), and the analytics are kept as
+incremental aggregates instead of being recomputed from the events:
+per-minute buckets with request/error counters, active users and a
+mergeable latency sketch; hour-of-day counters; a space-saving top-k of
+endpoints; and error counts by status and route. Reads cost O(buckets),
+not O(events), so the middleware can stay on in production.
+
+Tracking is off unless USAGE_TRACKING_ENABLED=true. Events keep no client
+address or query values: the client is a salted hash of its IP
+(USAGE_TRACKING_SALT, random per process by default), the query string is
+reduced to its parameter names and the user agent to its product token.
 """
 
 import asyncio
+import hashlib
+import heapq
 import json
 import logging
+import math
+import os
 import time
-from collections.abc import Callable
+from array import array
+from collections import OrderedDict, deque
 from dataclasses import asdict, dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Any
 
-from fastapi import Request, Response
-from fastapi.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
 
 logger = logging.getLogger(__name__)
 
+_EPOCH = datetime(1970, 1, 1)
+_MEMORY_EVENTS = ('memory_store', 'memory_query')
+
 
 @dataclass
 class UsageEvent:
@@ -52,6 +72,101 @@ class PerformanceMetrics:
     unique_users_last_hour: int
 
 
+class LatencySketch:
+    """
+    Log-bucketed latency histogram (DDSketch-style): quantiles within
+    `relative_accuracy` of the true value, in memory that grows with the
+    log of the latency range, and mergeable across time buckets.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value_ms: float) -> None:
+        # Sub-microsecond values share the lowest bin
+        index = math.ceil(math.log(max(value_ms, 0.001)) / self._log_gamma)
+        self.bins[index] = self.bins.get(index, 0) + 1
+        self.count += 1
+        self.total += value_ms
+
+    def merge(self, other: 'LatencySketch') -> None:
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if seen > rank:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class SpaceSaving:
+    """Approximate top-k counter (space-saving) holding at most `capacity` keys."""
+
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self.counts: dict[str, int] = {}
+
+    def add(self, key: str, amount: int = 1) -> None:
+        if key in self.counts or len(self.counts) < self.capacity:
+            self.counts[key] = self.counts.get(key, 0) + amount
+            return
+        # Replace the smallest key; the newcomer inherits its count as an overestimate
+        smallest = min(self.counts, key=self.counts.__getitem__)
+        self.counts[key] = self.counts.pop(smallest) + amount
+
+    def top(self, k: int) -> dict[str, int]:
+        return dict(heapq.nlargest(k, self.counts.items(), key=lambda item: item[1]))
+
+
+class _MinuteBucket:
+    __slots__ = ('minute', 'requests', 'errors', 'memory_operations', 'users', 'latency')
+
+    def __init__(self, minute: int = -1):
+        self.minute = minute
+        self.requests = 0
+        self.errors = 0
+        self.memory_operations = 0
+        self.users: set[str] = set()
+        self.latency = LatencySketch()
+
+
+class _Interner:
+    """Maps strings to small integer codes; past `limit` strings share one code."""
+
+    def __init__(self, limit: int = 1000, overflow: str = '(other)'):
+        self.limit = limit
+        self.codes: dict[str, int] = {}
+        self.values: list[str] = []
+        self.overflow = overflow
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            if len(self.values) >= self.limit:
+                value = self.overflow
+                code = self.codes.get(value)
+            if code is None:
+                code = self.codes[value] = len(self.values)
+                self.values.append(value)
+        return code
+
+
 class UsageCollector:
     """
     Collects and aggregates usage data for analytics.
@@ -59,16 +174,52 @@ class UsageCollector:
     Provides real-time insights into system performance and user behavior.
     """
 
-    def __init__(self, max_events: int = 10000, unified_store=None):
+    def __init__(self,
+                 max_events: int = 10000,
+                 unified_store=None,
+                 window_minutes: int = 60,
+                 max_users: int = 10000,
+                 top_k_capacity: int = 100):
+        """
+        Args:
+            max_events: Raw events kept for export and short-term trends
+            unified_store: Store for system learning memories (None disables them)
+            window_minutes: Minutes of per-minute aggregates ("last hour" metrics)
+            max_users: Users with per-user stats; the least recently active are evicted
+            top_k_capacity: Keys tracked for the popular endpoint ranking
+        """
         self.max_events = max_events
-        self.events: list[UsageEvent] = []
         self.unified_store = unified_store
-
-        # Performance tracking
-        self.response_times: list[float] = []
-        self.request_counts_by_minute: dict[str, int] = {}
+        self.window_minutes = window_minutes
+        self.max_users = max_users
+
+        # Raw event ring buffer, one column per field
+        self._timestamps = array('d', [0]) * max_events
+        self._response_times = array('d', [0]) * max_events
+        self._status_codes = array('i', [0]) * max_events
+        self._request_sizes = array('q', [0]) * max_events
+        self._response_sizes = array('q', [0]) * max_events
+        self._event_types = array('i', [0]) * max_events
+        self._endpoints = array('i', [0]) * max_events
+        self._methods = array('i', [0]) * max_events
+        self._user_ids: list[str | None] = [None] * max_events
+        self._metadata: list[dict[str, Any] | None] = [None] * max_events
+        self._head = 0
+        self._size = 0
+        self._event_type_codes = _Interner(limit=64)
+        self._endpoint_codes = _Interner(limit=1000)
+        self._method_codes = _Interner(limit=16)
+
+        # Streaming aggregates
+        self.total_requests = 0
+        self.total_errors = 0
+        self._minutes = [_MinuteBucket() for _ in range(window_minutes)]
+        self._hour_requests = array('q', [0]) * 24
+        self._hour_errors = array('q', [0]) * 24
+        self.endpoint_counts = SpaceSaving(top_k_capacity)
         self.error_counts: dict[str, int] = {}
-        self.user_activity: dict[str, datetime] = {}
+        # user_id -> [total_requests, memory_operations, total_response_ms, last_activity]
+        self.user_stats: OrderedDict[str, list] = OrderedDict()
 
         # Memory-specific metrics
         self.memory_operations: dict[str, int] = {
@@ -78,50 +229,117 @@ class UsageCollector:
         }
 
         # System learning data
-        self.learning_events: list[dict[str, Any]] = []
+        self.learning_events: deque[dict[str, Any]] = deque(maxlen=500)
+
+    @classmethod
+    def from_env(cls, unified_store=None) -> 'UsageCollector':
+        """
+        Build a collector from USAGE_TRACKING_MAX_EVENTS / _WINDOW_MINUTES.
+        System learning memories are stored only with USAGE_LEARNING_MEMORIES=true.
+        """
+        learning = os.getenv('USAGE_LEARNING_MEMORIES', 'false').lower() == 'true'
+        return cls(
+            max_events=int(os.getenv('USAGE_TRACKING_MAX_EVENTS', '10000')),
+            unified_store=unified_store if learning else None,
+            window_minutes=int(os.getenv('USAGE_TRACKING_WINDOW_MINUTES', '60'))
+        )
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def events(self) -> list[UsageEvent]:
+        """Buffered events, oldest first (materialized: O(max_events))."""
+        return self._recent_events(self._size)
 
     async def record_event(self, event: UsageEvent):
         """Record a usage event and update metrics."""
-        try:
-            # Add to events list
-            self.events.append(event)
+        self.record(event)
 
-            # Maintain max events limit
-            if len(self.events) > self.max_events:
-                self.events = self.events[-self.max_events:]
+    def record(self, event: UsageEvent) -> None:
+        """Record a usage event and update the aggregates in O(1)."""
+        try:
+            ts = (event.timestamp - _EPOCH).total_seconds()
+            is_error = event.status_code >= 400
+
+            slot = self._head
+            self._timestamps[slot] = ts
+            self._response_times[slot] = event.response_time_ms
+            self._status_codes[slot] = event.status_code
+            self._request_sizes[slot] = event.request_size_bytes
+            self._response_sizes[slot] = event.response_size_bytes
+            self._event_types[slot] = self._event_type_codes.code(event.event_type)
+            self._endpoints[slot] = self._endpoint_codes.code(event.endpoint)
+            self._methods[slot] = self._method_codes.code(event.method)
+            self._user_ids[slot] = event.user_id
+            self._metadata[slot] = event.metadata
+            self._head = (slot + 1) % self.max_events
+            self._size = min(self._size + 1, self.max_events)
 
             # Update performance metrics
-            self._update_performance_metrics(event)
+            self.total_requests += 1
+            endpoint = self._endpoint_codes.values[self._endpoints[slot]]
+            self.endpoint_counts.add(endpoint)
+            hour = int(ts // 3600) % 24
+            self._hour_requests[hour] += 1
+            if is_error:
+                self.total_errors += 1
+                self._hour_errors[hour] += 1
+                error_key = f"{event.status_code}_{endpoint}"
+                self.error_counts[error_key] = self.error_counts.get(error_key, 0) + 1
+
+            bucket = self._minute_bucket(int(ts // 60))
+            if bucket is not None:
+                bucket.requests += 1
+                bucket.errors += is_error
+                bucket.memory_operations += event.event_type in _MEMORY_EVENTS
+                bucket.latency.add(event.response_time_ms)
+                if event.user_id and event.user_id != 'system':
+                    bucket.users.add(event.user_id)
 
             # Update memory operation counts
             self._update_memory_metrics(event)
 
             # Track user activity
-            if event.user_id:
-                self.user_activity[event.user_id] = event.timestamp
+            if event.user_id and event.user_id != 'system':
+                self._update_user_stats(event)
 
             # Store learning data for evolution
-            if event.event_type in ['memory_store', 'memory_query']:
-                await self._record_learning_event(event)
+            if event.event_type in _MEMORY_EVENTS:
+                self._record_learning_event(event)
 
         except Exception as e:
             logger.error(f"Failed to record usage event: {e}")
 
-    def _update_performance_metrics(self, event: UsageEvent):
-        """Update aggregated performance metrics."""
-        # Response time tracking
-        self.response_times.append(event.response_time_ms)
-        if len(self.response_times) > 1000:  # Keep last 1000 for percentiles
-            self.response_times = self.response_times[-1000:]
-
-        # Request counting by minute
-        minute_key = event.timestamp.strftime('%Y-%m-%d %H:%M')
-        self.request_counts_by_minute[minute_key] = self.request_counts_by_minute.get(minute_key, 0) + 1
-
-        # Error tracking
-        if event.status_code >= 400:
-            error_key = f"{event.status_code}_{event.endpoint}"
-            self.error_counts[error_key] = self.error_counts.get(error_key, 0) + 1
+    def _minute_bucket(self, minute: int) -> _MinuteBucket | None:
+        """The bucket for a minute, recycled when it last held an older minute."""
+        bucket = self._minutes[minute % self.window_minutes]
+        if bucket.minute == minute:
+            return bucket
+        if bucket.minute > minute:
+            # More than a window late: only the cumulative counters see it
+            return None
+        bucket = self._minutes[minute % self.window_minutes] = _MinuteBucket(minute)
+        return bucket
+
+    def _window_buckets(self) -> list[_MinuteBucket]:
+        """Buckets for the last window_minutes minutes."""
+        now_minute = int(time.time() // 60)
+        return [b for b in self._minutes if 0 <= now_minute - b.minute < self.window_minutes]
+
+    def _update_user_stats(self, event: UsageEvent):
+        stats = self.user_stats.get(event.user_id)
+        if stats is None:
+            stats = self.user_stats[event.user_id] = [0, 0, 0.0, event.timestamp]
+            if len(self.user_stats) > self.max_users:
+                self.user_stats.popitem(last=False)
+        else:
+            self.user_stats.move_to_end(event.user_id)
+        stats[0] += 1
+        stats[1] += event.event_type in _MEMORY_EVENTS
+        stats[2] += event.response_time_ms
+        if event.timestamp > stats[3]:
+            stats[3] = event.timestamp
 
     def _update_memory_metrics(self, event: UsageEvent):
         """Update memory-specific operation metrics."""
@@ -133,7 +351,7 @@ class UsageCollector:
         elif 'health' in event.endpoint.lower():
             self.memory_operations['health_checks'] += 1
 
-    async def _record_learning_event(self, event: UsageEvent):
+    def _record_learning_event(self, event: UsageEvent):
         """Record events that contribute to system learning."""
         try:
             learning_data = {
@@ -147,18 +365,14 @@ class UsageCollector:
 
             self.learning_events.append(learning_data)
 
-            # Keep last 500 learning events
-            if len(self.learning_events) > 500:
-                self.learning_events = self.learning_events[-500:]
-
             # Store in unified store for long-term learning
             if self.unified_store and event.status_code < 400:
-                await self._store_system_learning_memory(learning_data)
+                self._store_system_learning_memory(learning_data)
 
         except Exception as e:
             logger.warning(f"Failed to record learning event: {e}")
 
-    async def _store_system_learning_memory(self, learning_data: dict[str, Any]):
+    def _store_system_learning_memory(self, learning_data: dict[str, Any]):
         """Store system learning data as memory for self-evolution."""
         try:
             from .models import MemoryRequest
@@ -187,51 +401,31 @@ class UsageCollector:
             logger.warning(f"Failed to store system learning memory: {e}")
 
     def get_performance_metrics(self) -> PerformanceMetrics:
-        """Get current performance metrics."""
+        """
+        Get current performance metrics: totals since startup, latency and
+        rates over the last window_minutes.
+        """
         try:
-            if not self.response_times:
-                return PerformanceMetrics(0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0)
-
-            # Calculate percentiles
-            sorted_times = sorted(self.response_times)
-            p95_idx = int(len(sorted_times) * 0.95)
-            p99_idx = int(len(sorted_times) * 0.99)
-
-            avg_response_time = sum(self.response_times) / len(self.response_times)
-            p95_response_time = sorted_times[p95_idx] if p95_idx < len(sorted_times) else 0
-            p99_response_time = sorted_times[p99_idx] if p99_idx < len(sorted_times) else 0
-
-            # Calculate rates
-            total_requests = len(self.events)
-            total_errors = sum(self.error_counts.values())
-            error_rate = total_errors / total_requests if total_requests > 0 else 0
-
-            # Recent activity (last hour)
-            now = datetime.utcnow()
-            recent_events = [e for e in self.events if (now - e.timestamp).seconds < 3600]
-            requests_per_minute = len(recent_events) / 60 if recent_events else 0
-
-            memory_ops_recent = sum(
-                1 for e in recent_events
-                if e.event_type in ['memory_store', 'memory_query']
-            )
-            memory_ops_per_minute = memory_ops_recent / 60 if recent_events else 0
+            buckets = self._window_buckets()
+            latency = LatencySketch()
+            for bucket in buckets:
+                latency.merge(bucket.latency)
+            if not latency.count:
+                return PerformanceMetrics(self.total_requests, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0)
 
-            # Unique users last hour
-            unique_users = len({
-                e.user_id for e in recent_events
-                if e.user_id and e.user_id != 'system'
-            })
+            requests_recent = sum(b.requests for b in buckets)
+            memory_ops_recent = sum(b.memory_operations for b in buckets)
+            unique_users = set().union(*(b.users for b in buckets))
 
             return PerformanceMetrics(
-                total_requests=total_requests,
-                avg_response_time_ms=avg_response_time,
-                p95_response_time_ms=p95_response_time,
-                p99_response_time_ms=p99_response_time,
-                error_rate=error_rate,
-                requests_per_minute=requests_per_minute,
-                memory_operations_per_minute=memory_ops_per_minute,
-                unique_users_last_hour=unique_users
+                total_requests=self.total_requests,
+                avg_response_time_ms=latency.mean,
+                p95_response_time_ms=latency.quantile(0.95),
+                p99_response_time_ms=latency.quantile(0.99),
+                error_rate=self.total_errors / self.total_requests if self.total_requests else 0,
+                requests_per_minute=requests_recent / self.window_minutes,
+                memory_operations_per_minute=memory_ops_recent / self.window_minutes,
+                unique_users_last_hour=len(unique_users)
             )
 
         except Exception as e:
@@ -255,81 +449,55 @@ class UsageCollector:
             logger.error(f"Failed to analyze usage patterns: {e}")
             return {}
 
-    def _analyze_peak_hours(self) -> dict[str, int]:
-        """Analyze peak usage hours."""
-        hour_counts = {}
-        for event in self.events:
-            hour = event.timestamp.hour
-            hour_counts[hour] = hour_counts.get(hour, 0) + 1
-
+    def _analyze_peak_hours(self) -> dict[int, int]:
+        """Analyze peak usage hours (UTC)."""
+        hour_counts = {hour: count for hour, count in enumerate(self._hour_requests) if count}
         return dict(sorted(hour_counts.items(), key=lambda x: x[1], reverse=True)[:5])
 
     def _analyze_popular_endpoints(self) -> dict[str, int]:
         """Analyze most popular endpoints."""
-        endpoint_counts = {}
-        for event in self.events:
-            endpoint_counts[event.endpoint] = endpoint_counts.get(event.endpoint, 0) + 1
-
-        return dict(sorted(endpoint_counts.items(), key=lambda x: x[1], reverse=True)[:10])
+        return self.endpoint_counts.top(10)
 
     def _analyze_user_behavior(self) -> dict[str, Any]:
         """Analyze user behavior patterns."""
-        user_stats = {}
-        for event in self.events:
-            if event.user_id and event.user_id != 'system':
-                if event.user_id not in user_stats:
-                    user_stats[event.user_id] = {
-                        'total_requests': 0,
-                        'memory_operations': 0,
-                        'avg_response_time': 0,
-                        'last_activity': event.timestamp
-                    }
-
-                stats = user_stats[event.user_id]
-                stats['total_requests'] += 1
-                if event.event_type in ['memory_store', 'memory_query']:
-                    stats['memory_operations'] += 1
-                stats['avg_response_time'] = (
-                    stats['avg_response_time'] * (stats['total_requests'] - 1) +
-                    event.response_time_ms
-                ) / stats['total_requests']
-
-                if event.timestamp > stats['last_activity']:
-                    stats['last_activity'] = event.timestamp
-
+        top_users = heapq.nlargest(5, self.user_stats.items(), key=lambda item: item[1][0])
         return {
-            'total_users': len(user_stats),
-            'active_users_last_hour': len([
-                u for u, s in user_stats.items()
-                if (datetime.utcnow() - s['last_activity']).seconds < 3600
-            ]),
-            'top_users': dict(sorted(
-                user_stats.items(),
-                key=lambda x: x[1]['total_requests'],
-                reverse=True
-            )[:5])
+            'total_users': len(self.user_stats),
+            'active_users_last_hour': len(set().union(*(b.users for b in self._window_buckets()))),
+            'top_users': {
+                user_id: {
+                    'total_requests': requests,
+                    'memory_operations': memory_operations,
+                    'avg_response_time': total_ms / requests,
+                    'last_activity': last_activity
+                }
+                for user_id, (requests, memory_operations, total_ms, last_activity) in top_users
+            }
         }
 
     def _analyze_error_patterns(self) -> dict[str, Any]:
         """Analyze error patterns for debugging."""
         return {
-            'total_errors': sum(self.error_counts.values()),
+            'total_errors': self.total_errors,
             'error_breakdown': dict(sorted(
                 self.error_counts.items(),
                 key=lambda x: x[1],
                 reverse=True
             )[:10]),
-            'error_rate_by_hour': {}  # TODO: Implement hourly error rates
+            'error_rate_by_hour': {
+                hour: self._hour_errors[hour] / requests
+                for hour, requests in enumerate(self._hour_requests) if requests
+            }
         }
 
     def _analyze_performance_trends(self) -> dict[str, Any]:
         """Analyze performance trends over time."""
-        if len(self.response_times) < 10:
+        if self._size < 10:
             return {'status': 'insufficient_data'}
 
         # Simple trend analysis (last 100 vs previous 100)
-        recent_times = self.response_times[-100:]
-        previous_times = self.response_times[-200:-100] if len(self.response_times) >= 200 else []
+        recent_times = self._recent_response_times(0, 100)
+        previous_times = self._recent_response_times(100, 200) if self._size >= 200 else []
 
         recent_avg = sum(recent_times) / len(recent_times)
         previous_avg = sum(previous_times) / len(previous_times) if previous_times else recent_avg
@@ -343,10 +511,35 @@ class UsageCollector:
             'improvement_pct': ((previous_avg - recent_avg) / previous_avg * 100) if previous_avg > 0 else 0
         }
 
+    def _slots(self, start: int, stop: int) -> list[int]:
+        """Ring slots of the start-th to stop-th most recent events, oldest first."""
+        stop = min(stop, self._size)
+        return [(self._head - age) % self.max_events for age in range(stop, start, -1)]
+
+    def _recent_response_times(self, start: int, stop: int) -> list[float]:
+        return [self._response_times[slot] for slot in self._slots(start, stop)]
+
+    def _recent_events(self, limit: int) -> list[UsageEvent]:
+        return [
+            UsageEvent(
+                timestamp=_EPOCH + timedelta(seconds=self._timestamps[slot]),
+                event_type=self._event_type_codes.values[self._event_types[slot]],
+                endpoint=self._endpoint_codes.values[self._endpoints[slot]],
+                method=self._method_codes.values[self._methods[slot]],
+                user_id=self._user_ids[slot],
+                response_time_ms=self._response_times[slot],
+                status_code=self._status_codes[slot],
+                request_size_bytes=self._request_sizes[slot],
+                response_size_bytes=self._response_sizes[slot],
+                metadata=self._metadata[slot] or {}
+            )
+            for slot in self._slots(0, limit)
+        ]
+
     def export_events(self, format: str = 'json', limit: int | None = None) -> str:
         """Export usage events for analysis."""
         try:
-            events_to_export = self.events[-limit:] if limit else self.events
+            events_to_export = self._recent_events(limit or self._size)
 
             if format.lower() == 'json':
                 return json.dumps([e.to_dict() for e in events_to_export], default=str, indent=2)
@@ -361,85 +554,80 @@ class UsageCollector:
             return json.dumps({'error': str(e)})
 
 
-class UsageTrackingMiddleware(BaseHTTPMiddleware):
+class UsageTrackingMiddleware:
     """
-    FastAPI middleware for automatic usage tracking.
+    ASGI middleware for automatic usage tracking.
 
-    Captures all API requests and responses for analytics.
+    Captures all API requests and responses for analytics. It wraps the
+    ASGI send channel instead of using BaseHTTPMiddleware, so responses
+    (including streams) pass through untouched and each request costs one
+    synchronous UsageCollector.record call. Without a usage_collector
+    argument it uses app.state.usage_collector, set during lifespan.
     """
 
-    def __init__(self, app, usage_collector: UsageCollector):
-        super().__init__(app)
+    def __init__(self, app, usage_collector: UsageCollector | None = None, salt: bytes | None = None):
+        self.app = app
         self.usage_collector = usage_collector
-
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """Process request and track usage."""
-        start_time = time.time()
-
-        # Extract user ID from headers or request
-        user_id = self._extract_user_id(request)
-
-        # Get request size
-        request_size = len(await self._get_body_size(request))
+        configured = os.getenv('USAGE_TRACKING_SALT')
+        self.salt = salt or (configured.encode() if configured else os.urandom(16))
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        collector = self.usage_collector
+        if collector is None and 'app' in scope:
+            collector = getattr(scope['app'].state, 'usage_collector', None)
+        if collector is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+        response_size = 0
+
+        async def send_tracked(message):
+            nonlocal status_code, response_size
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            elif message['type'] == 'http.response.body':
+                response_size += len(message.get('body', b''))
+            await send(message)
 
         try:
-            # Process request
-            response = await call_next(request)
-
-            # Calculate response time
-            response_time_ms = (time.time() - start_time) * 1000
-
-            # Get response size
-            response_size = self._get_response_size(response)
-
-            # Determine event type
-            event_type = self._determine_event_type(request.url.path, request.method)
-
-            # Create usage event
-            event = UsageEvent(
-                timestamp=datetime.utcnow(),
-                event_type=event_type,
-                endpoint=request.url.path,
-                method=request.method,
-                user_id=user_id,
-                response_time_ms=response_time_ms,
-                status_code=response.status_code,
-                request_size_bytes=request_size,
-                response_size_bytes=response_size,
-                metadata={
-                    'query_params': dict(request.query_params),
-                    'user_agent': request.headers.get('user-agent', ''),
-                    'ip_address': self._get_client_ip(request)
-                }
-            )
-
-            # Record event (non-blocking)
-            asyncio.create_task(self.usage_collector.record_event(event))
-
-            return response
-
+            await self.app(scope, receive, send_tracked)
         except Exception as e:
             # Record error event
-            response_time_ms = (time.time() - start_time) * 1000
-
-            error_event = UsageEvent(
-                timestamp=datetime.utcnow(),
-                event_type='api_error',
-                endpoint=request.url.path,
-                method=request.method,
-                user_id=user_id,
-                response_time_ms=response_time_ms,
-                status_code=500,
-                request_size_bytes=request_size,
-                response_size_bytes=0,
-                metadata={
-                    'error': str(e),
-                    'query_params': dict(request.query_params)
-                }
-            )
-
-            asyncio.create_task(self.usage_collector.record_event(error_event))
+            self._record(collector, scope, start_time, 500, response_size, error=e)
             raise
+        self._record(collector, scope, start_time, status_code, response_size)
+
+    def _record(self, collector: UsageCollector, scope, start_time: float,
+                status_code: int, response_size: int, error: Exception | None = None):
+        request = Request(scope)
+        path = scope['path']
+        # Route templates keep /memories/{memory_id} as one endpoint
+        endpoint = getattr(scope.get('route'), 'path', None) or path
+        metadata = {
+            'query_params': sorted(request.query_params.keys()),
+            'user_agent': request.headers.get('user-agent', '').split(' ', 1)[0],
+            'client': self._client_hash(request)
+        }
+        if error is not None:
+            metadata['error'] = str(error)
+
+        collector.record(UsageEvent(
+            timestamp=datetime.utcnow(),
+            event_type='api_error' if error is not None else self._determine_event_type(path, scope['method']),
+            endpoint=endpoint,
+            method=scope['method'],
+            user_id=self._extract_user_id(request),
+            response_time_ms=(time.perf_counter() - start_time) * 1000,
+            status_code=status_code,
+            request_size_bytes=self._get_body_size(request),
+            response_size_bytes=response_size,
+            metadata=metadata
+        ))
 
     def _extract_user_id(self, request: Request) -> str | None:
         """Extract user ID from request headers or auth."""
@@ -450,7 +638,7 @@ class UsageTrackingMiddleware(BaseHTTPMiddleware):
 
         return user_id
 
-    async def _get_body_size(self, request: Request) -> int:
+    def _get_body_size(self, request: Request) -> int:
         """Estimate request body size."""
         try:
             content_length = request.headers.get('content-length')
@@ -458,23 +646,16 @@ class UsageTrackingMiddleware(BaseHTTPMiddleware):
         except Exception:
             return 0
 
-    def _get_response_size(self, response: Response) -> int:
-        """Estimate response size."""
-        try:
-            content_length = response.headers.get('content-length')
-            return int(content_length) if content_length else 0
-        except Exception:
-            return 0
-
     def _determine_event_type(self, path: str, method: str) -> str:
         """Determine the type of event based on path and method."""
         if 'health' in path.lower():
             return 'health_check'
         elif 'memories' in path.lower():
-            if method == 'POST':
-                return 'memory_store'
-            elif 'query' in path.lower():
+            # POST /memories/query is a query, not a store
+            if 'query' in path.lower():
                 return 'memory_query'
+            elif method == 'POST':
+                return 'memory_store'
             else:
                 return 'memory_operation'
         elif 'dashboard' in path.lower() or 'metrics' in path.lower():
@@ -482,6 +663,10 @@ class UsageTrackingMiddleware(BaseHTTPMiddleware):
         else:
             return 'api_request'
 
+    def _client_hash(self, request: Request) -> str:
+        """Salted hash of the client IP: counts distinct clients without storing addresses."""
+        return hashlib.blake2b(self._get_client_ip(request).encode(), key=self.salt[:64], digest_size=8).hexdigest()
+
     def _get_client_ip(self, request: Request) -> str:
         """Get client IP address."""
         # Check various headers for real IP
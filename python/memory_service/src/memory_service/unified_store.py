@@ -21,7 +21,9 @@ from .models import (
     QueryRequest,
     QueryResponse,
 )
-from .deduplication import DeduplicationService, DeduplicationMode
+from .chunking import CHUNK_COUNT_KEY, PARENT_KEY, TextChunker, chunk_rows, collapse_chunk_hits
+from .deduplication import DeduplicationService, DeduplicationMode, is_unique_violation
+from .latency import LatencyRecorder, StageTimer
 
 logger = logging.getLogger(__name__)
 
@@ -54,6 +56,26 @@ class VectorProvider(ABC):
         """Get provider statistics."""
         pass
 
+    async def store_with_chunks(self, content: str, embedding: list[float], metadata: dict[str, Any],
+                                chunks: list[tuple[str, list[float]]]) -> UUID:
+        """
+        Store a memory and its chunks as child rows. This default stores them
+        one by one; providers that can should override it to write all rows
+        atomically.
+        """
+        memory_id = await self.store(content, embedding, metadata)
+        for text, chunk_embedding, chunk_metadata in chunk_rows(memory_id, chunks, metadata):
+            await self.store(text, chunk_embedding, chunk_metadata)
+        return memory_id
+
+    async def start(self) -> None:  # noqa: B027 - optional hook, no-op by default
+        """Open connections and warm up; called once from the app lifespan before serving."""
+        pass
+
+    async def close(self) -> None:  # noqa: B027 - optional hook, no-op by default
+        """Release connections opened by start()."""
+        pass
+
 
 class UnifiedVectorStore:
     """
@@ -65,7 +87,11 @@ class UnifiedVectorStore:
     Provides automatic failover, load balancing, and caching.
     """
 
-    def __init__(self, providers: list[VectorProvider], embedding_model=None, adm_enabled=True):
+    # Long content is embedded as overlapping token chunks stored as child rows
+    chunker: TextChunker | None = None
+
+    def __init__(self, providers: list[VectorProvider], embedding_model=None, adm_enabled=True,
+                 chunker: TextChunker | None = None):
         self.providers = {p.name: p for p in providers}
         # Find primary provider that's actually enabled
         self.primary_provider = next(
@@ -81,13 +107,19 @@ class UnifiedVectorStore:
         self.stats = {
             'total_stores': 0,
             'total_queries': 0,
+            'cache_hits': 0,
             'provider_usage': {p.name: 0 for p in providers},
             'avg_query_time': 0.0,
             'adm_calculations': 0,
             'avg_adm_score': 0.0,
             'duplicates_prevented': 0,
-            'storage_saved_bytes': 0
+            'storage_saved_bytes': 0,
+            'chunked_memories': 0,
+            'chunks_stored': 0
         }
+        self.chunker = chunker
+        # Per-operation and per-stage latency histograms (see /metrics/latency)
+        self.latency = LatencyRecorder()
         
         # Schedule initial stats sync after initialization
         asyncio.create_task(self._sync_initial_stats())
@@ -106,12 +138,20 @@ class UnifiedVectorStore:
                 mode = DeduplicationMode(dedup_mode)
                 similarity_threshold = float(os.getenv('DEDUP_SIMILARITY_THRESHOLD', '0.95'))
                 exact_match_only = os.getenv('DEDUP_EXACT_MATCH_ONLY', 'false').lower() == 'true'
+                prefilter_enabled = os.getenv('DEDUP_PREFILTER_ENABLED', 'true').lower() == 'true'
+                prefilter_distance = int(os.getenv('DEDUP_PREFILTER_MAX_DISTANCE', '8'))
+                bloom_enabled = os.getenv('DEDUP_BLOOM_ENABLED', 'true').lower() == 'true'
+                bloom_rebuild_interval = float(os.getenv('DEDUP_BLOOM_REBUILD_SECONDS', '3600'))
                 
                 self.deduplication_service = DeduplicationService(
                     vector_store=self,
                     mode=mode,
                     similarity_threshold=similarity_threshold,
-                    exact_match_only=exact_match_only
+                    exact_match_only=exact_match_only,
+                    prefilter_enabled=prefilter_enabled,
+                    prefilter_max_distance=prefilter_distance,
+                    bloom_enabled=bloom_enabled,
+                    bloom_rebuild_interval=bloom_rebuild_interval
                 )
                 logger.info(f"Initialized deduplication service in {mode.value} mode")
             except Exception as e:
@@ -122,6 +162,12 @@ class UnifiedVectorStore:
         logger.info(f"ADM scoring: {'enabled' if adm_enabled else 'disabled'}")
         logger.info(f"Deduplication: {'enabled' if self.deduplication_service else 'disabled'}")
 
+    def add_provider(self, provider: VectorProvider) -> None:
+        """Attach a provider that finished initializing after the store was created."""
+        self.providers[provider.name] = provider
+        self.stats['provider_usage'].setdefault(provider.name, 0)
+        logger.info(f"Added provider {provider.name} to UnifiedVectorStore")
+
     def _initialize_adm_engine(self):
         """Initialize the ADM scoring engine."""
         try:
@@ -162,29 +208,56 @@ class UnifiedVectorStore:
         Leverages existing implementations while adding resilience.
         """
         start_time = time.time()
+        timer = self.latency.timer('store')
 
         try:
-            # Check for duplicates first if deduplication is enabled
+            # Split long content into chunks embedded in one batch; the parent row
+            # gets their normalized mean (a caller-supplied embedding disables chunking).
+            # The duplicate check then compares that mean instead of embedding the
+            # whole content a second time
+            chunks: list[tuple[str, list[float]]] = []
+            embedding = request.embedding
+            if not embedding and self.chunker and self.embedding_model:
+                stage_start = time.perf_counter()
+                chunk_texts = self.chunker.split(request.content)
+                timer.add('chunk', time.perf_counter() - stage_start)
+                if len(chunk_texts) > 1:
+                    stage_start = time.perf_counter()
+                    chunk_embeddings = await self.embedding_model.embed_batch(chunk_texts)
+                    timer.add('embed', time.perf_counter() - stage_start)
+                    chunks = list(zip(chunk_texts, chunk_embeddings, strict=True))
+                    embedding = self._mean_embedding(chunk_embeddings)
+
+            # Check for duplicates if deduplication is enabled
+            dedup_result = None
             if self.deduplication_service:
+                stage_start = time.perf_counter()
                 dedup_result = await self.deduplication_service.check_duplicate(
                     content=request.content,
-                    metadata=request.metadata
+                    metadata=request.metadata,
+                    embedding=embedding
                 )
+                timer.add('dedup', time.perf_counter() - stage_start)
                 
                 if dedup_result.is_duplicate and dedup_result.existing_memory:
                     # Update statistics
                     self.stats['duplicates_prevented'] += 1
                     self.stats['storage_saved_bytes'] += len(request.content)
                     
-                    logger.info(f"Duplicate detected: {dedup_result.reason}")
+                    logger.info("Duplicate detected: %s", dedup_result.reason)
                     
                     # Return existing memory instead of creating new one
+                    timings = timer.finish()
+                    if request.include_timings:
+                        return dedup_result.existing_memory.model_copy(update={'timings': timings})
                     return dedup_result.existing_memory
 
-            # Generate embedding if not provided
-            embedding = request.embedding
+            # Generate embedding if not provided (or reuse the one computed during dedup)
+            embedding = embedding or (dedup_result.embedding if dedup_result else None)
             if not embedding and self.embedding_model:
+                stage_start = time.perf_counter()
                 embedding = await self._generate_embedding(request.content)
+                timer.add('embed', time.perf_counter() - stage_start)
             elif not embedding:
                 raise ValueError("No embedding provided and no embedding model configured")
 
@@ -195,6 +268,7 @@ class UnifiedVectorStore:
             if importance_score is None:
                 if self.adm_enabled and self.adm_engine:
                     # Use ADM scoring for intelligent importance calculation
+                    stage_start = time.perf_counter()
                     try:
                         adm_result = await self.adm_engine.calculate_adm_score(
                             request.content,
@@ -212,6 +286,7 @@ class UnifiedVectorStore:
                     except Exception as e:
                         logger.warning(f"ADM scoring failed, using fallback: {e}")
                         importance_score = self._calculate_importance(request)
+                    timer.add('adm', time.perf_counter() - stage_start)
                 else:
                     importance_score = self._calculate_importance(request)
 
@@ -224,6 +299,8 @@ class UnifiedVectorStore:
                 'created_at': time.time(),
                 'content_length': len(request.content)
             }
+            if chunks:
+                metadata[CHUNK_COUNT_KEY] = len(chunks)
 
             # Add ADM scoring data if available
             if adm_data:
@@ -235,13 +312,42 @@ class UnifiedVectorStore:
                     'adm_calculation_time': adm_data.get('calculation_time_ms', 0)
                 })
 
-            # Store in primary provider first
-            memory_id = await self._store_with_retry(
-                self.primary_provider,
-                request.content,
-                embedding,
-                metadata
-            )
+            # Store in primary provider first (with any chunk rows, in one write)
+            stage_start = time.perf_counter()
+            try:
+                memory_id = await self._store_with_retry(
+                    self.primary_provider,
+                    request.content,
+                    embedding,
+                    metadata,
+                    chunks
+                )
+            except Exception as e:
+                # An exact duplicate the Bloom filter had not seen yet (stored
+                # through another worker): return the memory that won
+                existing = None
+                if self.deduplication_service and is_unique_violation(e):
+                    existing = await self.deduplication_service.find_exact_match(request.content)
+                if existing is None:
+                    raise
+                self.stats['duplicates_prevented'] += 1
+                self.stats['storage_saved_bytes'] += len(request.content)
+                logger.info("Duplicate detected on insert: %s", existing.id)
+                timings = timer.finish()
+                if request.include_timings:
+                    return existing.model_copy(update={'timings': timings})
+                return existing
+            timer.add(f"provider.{self.primary_provider.name}", time.perf_counter() - stage_start)
+            if chunks:
+                self.stats['chunked_memories'] = self.stats.get('chunked_memories', 0) + 1
+                self.stats['chunks_stored'] = self.stats.get('chunks_stored', 0) + len(chunks)
+
+            if self.deduplication_service:
+                self.deduplication_service.remember(
+                    memory_id, request.content,
+                    fingerprint=dedup_result.fingerprint if dedup_result else None,
+                    content_hash=dedup_result.content_hash if dedup_result else None
+                )
 
             # Async replication to secondary providers for resilience
             asyncio.create_task(self._replicate_to_secondaries(
@@ -252,14 +358,20 @@ class UnifiedVectorStore:
             self.stats['total_stores'] += 1
             self.stats['provider_usage'][self.primary_provider.name] += 1
 
-            logger.info(f"Stored memory {memory_id} in {time.time() - start_time:.3f}s")
+            logger.info("Stored memory %s in %.3fs", memory_id, time.time() - start_time)
 
-            return MemoryResponse(
+            stage_start = time.perf_counter()
+            response = MemoryResponse(
                 id=memory_id,
                 content=request.content,
                 metadata=metadata,
                 importance_score=importance_score
             )
+            timer.add('serialize', time.perf_counter() - stage_start)
+            timings = timer.finish()
+            if request.include_timings:
+                response.timings = timings
+            return response
 
         except Exception as e:
             logger.error(f"Failed to store memory: {e}")
@@ -272,15 +384,22 @@ class UnifiedVectorStore:
         Uses existing vector store implementations with added optimizations.
         """
         start_time = time.time()
+        timer = self.latency.timer('query')
 
         try:
             # Check cache first (simple key based on query + filters)
+            stage_start = time.perf_counter()
             cache_key = self._get_cache_key(request)
-            if cache_key in self.query_cache:
-                cached_result = self.query_cache[cache_key]
-                if time.time() - cached_result['timestamp'] < 300:  # 5 min cache
-                    logger.debug(f"Cache hit for query: {request.query[:50]}...")
-                    return cached_result['response']
+            cached_result = self.query_cache.get(cache_key) if cache_key in self.query_cache else None
+            timer.add('cache', time.perf_counter() - stage_start)
+            if cached_result and time.time() - cached_result['timestamp'] < 300:  # 5 min cache
+                logger.debug("Cache hit for query: %.50s...", request.query)
+                self.stats['cache_hits'] += 1
+                timings = timer.finish()
+                if request.include_timings:
+                    # Cached responses are shared, so never mutate them in place
+                    return cached_result['response'].model_copy(update={'timings': timings})
+                return cached_result['response']
 
             # EMERGENCY FIX: If empty query, use direct database retrieval
             if not request.query or request.query.strip() == "":
@@ -302,7 +421,10 @@ class UnifiedVectorStore:
                             memories = []
                     else:
                         try:
-                            emergency_search = EmergencySearchFix(pgvector.connection_pool, getattr(pgvector, "table_name", "vector_memories"))
+                            emergency_search = EmergencySearchFix(
+                                getattr(pgvector, "read_pool", None) or pgvector.connection_pool,
+                                getattr(pgvector, "table_name", "vector_memories")
+                            )
                             # Get ALL memories directly
                             memories = await emergency_search.emergency_search_all(limit=request.limit)
                         except Exception as e:
@@ -326,7 +448,7 @@ class UnifiedVectorStore:
                         'timestamp': time.time()
                     }
                     
-                    logger.info(f"Emergency search returned {len(memories)} memories")
+                    logger.info("Emergency search returned %d memories", len(memories))
                     return response
             
             # For non-empty queries, try multiple search strategies
@@ -336,7 +458,9 @@ class UnifiedVectorStore:
             # Strategy 1: Try embedding-based search if possible
             try:
                 if self.embedding_model and request.query:
+                    stage_start = time.perf_counter()
                     query_embedding = await self._generate_embedding(request.query)
+                    timer.add('embed', time.perf_counter() - stage_start)
                 else:
                     logger.warning("No embedding model available for query")
 
@@ -355,7 +479,8 @@ class UnifiedVectorStore:
                         memories = await self._query_provider(
                             providers_to_query[0],
                             query_embedding,
-                            request
+                            request,
+                            timer
                         )
                         providers_used = [providers_to_query[0].name]
                     else:
@@ -363,7 +488,8 @@ class UnifiedVectorStore:
                         memories, providers_used = await self._query_multiple_providers(
                             providers_to_query,
                             query_embedding,
-                            request
+                            request,
+                            timer
                         )
                 except Exception as e:
                     logger.error(f"Vector search failed: {e}")
@@ -377,33 +503,58 @@ class UnifiedVectorStore:
                 pgvector = self.providers.get('pgvector')
                 if pgvector and pgvector.enabled:
                     from .search_fix import EmergencySearchFix
-                    emergency_search = EmergencySearchFix(pgvector.connection_pool, getattr(pgvector, "table_name", "vector_memories"))
+                    emergency_search = EmergencySearchFix(
+                        getattr(pgvector, "read_pool", None) or pgvector.connection_pool,
+                        getattr(pgvector, "table_name", "vector_memories")
+                    )
                     
                     # Try full-text search
+                    stage_start = time.perf_counter()
                     memories = await emergency_search.text_search(request.query, limit=request.limit * 2)
                     
                     # If still no results, try fuzzy search
                     if not memories:
                         logger.warning("Text search failed, trying fuzzy search")
                         memories = await emergency_search.fuzzy_search(request.query, limit=request.limit * 2)
+                    timer.add('text_search', time.perf_counter() - stage_start)
                     
                     providers_used = ['text_search_fallback']
 
+            # Long memories match through their chunks; report each parent once
+            if memories:
+                stage_start = time.perf_counter()
+                memories = await self._collapse_chunks(memories)
+                timer.add('collapse', time.perf_counter() - stage_start)
+
             # Filter and sort results - but be more lenient
             if memories:
                 # Lower the similarity threshold to avoid filtering out all results
                 original_threshold = request.min_similarity
                 if len(memories) < request.limit / 2:
                     request.min_similarity = 0.0  # Accept all results if we have too few
-                    logger.info(f"Lowered similarity threshold from {original_threshold} to 0.0")
+                    logger.info("Lowered similarity threshold from %s to 0.0", original_threshold)
                 
+                stage_start = time.perf_counter()
                 filtered_memories = self._filter_and_rank_memories(memories, request)
+                timer.add('rank', time.perf_counter() - stage_start)
                 
                 # Restore original threshold
                 request.min_similarity = original_threshold
             else:
                 filtered_memories = []
 
+            # Optional GraphRAG-style expansion of the top vector hits
+            query_metadata = None
+            if request.graph_expand and filtered_memories:
+                stage_start = time.perf_counter()
+                filtered_memories, graph_metadata = await self._expand_with_graph(
+                    filtered_memories, query_embedding, request
+                )
+                timer.add('graph_expand', time.perf_counter() - stage_start)
+                query_metadata = {'graph_expansion': graph_metadata}
+                if graph_metadata.get('memories_added'):
+                    providers_used = [*providers_used, 'graph']
+
             query_time = (time.time() - start_time) * 1000  # Convert to ms
 
             # Update stats
@@ -413,12 +564,16 @@ class UnifiedVectorStore:
                 self.stats['total_queries']
             )
 
+            stage_start = time.perf_counter()
             response = QueryResponse(
                 memories=filtered_memories[:request.limit],
                 total_found=len(filtered_memories),
                 query_time_ms=query_time,
-                providers_used=providers_used
+                providers_used=providers_used,
+                query_metadata=query_metadata
             )
+            timer.add('serialize', time.perf_counter() - stage_start)
+            timings = timer.finish()
 
             # Cache result
             self.query_cache[cache_key] = {
@@ -426,7 +581,9 @@ class UnifiedVectorStore:
                 'timestamp': time.time()
             }
 
-            logger.info(f"Query returned {len(filtered_memories)} memories in {query_time:.1f}ms")
+            logger.info("Query returned %d memories in %.1fms", len(filtered_memories), query_time)
+            if request.include_timings:
+                return response.model_copy(update={'timings': timings})
             return response
 
         except Exception as e:
@@ -506,17 +663,48 @@ class UnifiedVectorStore:
         return max(scoring.min_score, min(scoring.max_score, total_score))
 
     async def _store_with_retry(self, provider: VectorProvider, content: str,
-                               embedding: list[float], metadata: dict[str, Any]) -> UUID:
-        """Store with retry logic."""
+                               embedding: list[float], metadata: dict[str, Any],
+                               chunks: list[tuple[str, list[float]]] | None = None) -> UUID:
+        """Store with retry logic; chunks are written with their parent."""
         for attempt in range(provider.config.retry_count):
             try:
+                if chunks:
+                    return await provider.store_with_chunks(content, embedding, metadata, chunks)
                 return await provider.store(content, embedding, metadata)
             except Exception as e:
-                if attempt == provider.config.retry_count - 1:
+                if attempt == provider.config.retry_count - 1 or is_unique_violation(e):
                     raise
                 logger.warning(f"Store attempt {attempt + 1} failed for {provider.name}: {e}")
                 await asyncio.sleep(2 ** attempt)  # Exponential backoff
 
+    @staticmethod
+    def _mean_embedding(embeddings: list[list[float]]) -> list[float]:
+        """Unit-normalized mean of chunk embeddings (the parent's document vector)."""
+        import numpy as np
+
+        mean = np.mean(np.asarray(embeddings, dtype=np.float32), axis=0)
+        norm = np.linalg.norm(mean)
+        return (mean / norm if norm else mean).tolist()
+
+    async def _collapse_chunks(self, memories: list[MemoryResponse]) -> list[MemoryResponse]:
+        """Replace chunk hits with their parent memories (fetched when the parent row did not match)."""
+        if not any(PARENT_KEY in (m.metadata or {}) for m in memories):
+            return memories
+
+        present = {str(m.id) for m in memories if PARENT_KEY not in (m.metadata or {})}
+        missing = {m.metadata[PARENT_KEY] for m in memories
+                   if PARENT_KEY in (m.metadata or {}) and m.metadata[PARENT_KEY] not in present}
+        parents = {}
+        if missing and hasattr(self.primary_provider, 'get_memories'):
+            try:
+                fetched = await self.primary_provider.get_memories([UUID(i) for i in missing])
+                parents = {str(m.id): m for m in fetched}
+            except Exception as e:
+                logger.warning(f"Failed to fetch parent memories for chunk hits: {e}")
+
+        aggregation = self.chunker.aggregation if self.chunker else 'max'
+        return collapse_chunk_hits(memories, parents, aggregation)
+
     async def _replicate_to_secondaries(self, memory_id: UUID, content: str,
                                        embedding: list[float], metadata: dict[str, Any]):
         """Replicate to secondary providers for resilience."""
@@ -526,7 +714,7 @@ class UnifiedVectorStore:
         for provider in secondary_providers:
             try:
                 await self._store_with_retry(provider, content, embedding, metadata)
-                logger.debug(f"Replicated memory {memory_id} to {provider.name}")
+                logger.debug("Replicated memory %s to %s", memory_id, provider.name)
             except Exception as e:
                 logger.warning(f"Failed to replicate to {provider.name}: {e}")
 
@@ -555,8 +743,9 @@ class UnifiedVectorStore:
         return [self.primary_provider] if self.primary_provider.enabled else enabled_providers[:1]
 
     async def _query_provider(self, provider: VectorProvider, query_embedding: list[float],
-                             request: QueryRequest) -> list[MemoryResponse]:
+                             request: QueryRequest, timer: StageTimer | None = None) -> list[MemoryResponse]:
         """Query a single provider with proper error handling."""
+        stage_start = time.perf_counter()
         try:
             # Check if this is an empty query (zero vector or no embedding)
             is_empty_query = not query_embedding or all(v == 0.0 for v in query_embedding)
@@ -564,7 +753,7 @@ class UnifiedVectorStore:
             if is_empty_query:
                 # Use get_recent_memories if available (currently only PgVectorProvider)
                 if hasattr(provider, 'get_recent_memories'):
-                    logger.info(f"Using get_recent_memories for empty query on {provider.name}")
+                    logger.info("Using get_recent_memories for empty query on %s", provider.name)
                     try:
                         results = await provider.get_recent_memories(request.limit * 2, request.filters or {})
                     except Exception as e:
@@ -578,7 +767,7 @@ class UnifiedVectorStore:
                             results = []
                 else:
                     # Fall back to regular query for providers without get_recent_memories
-                    logger.info(f"Provider {provider.name} doesn't support get_recent_memories, using regular query")
+                    logger.info("Provider %s doesn't support get_recent_memories, using regular query", provider.name)
                     results = await provider.query(query_embedding, request.limit * 2, request.filters)
             else:
                 # Regular vector similarity query
@@ -593,16 +782,20 @@ class UnifiedVectorStore:
             logger.error(f"Query failed for provider {provider.name}: {e}")
             # Re-raise the exception to be handled by _query_multiple_providers
             raise
+        finally:
+            if timer:
+                timer.add(f"provider.{provider.name}", time.perf_counter() - stage_start)
 
     async def _query_multiple_providers(self, providers: list[VectorProvider],
-                                       query_embedding: list[float], request: QueryRequest) -> tuple[list[MemoryResponse], list[str]]:
+                                       query_embedding: list[float], request: QueryRequest,
+                                       timer: StageTimer | None = None) -> tuple[list[MemoryResponse], list[str]]:
         """Query multiple providers and aggregate results."""
         tasks = []
         provider_names = []
 
         for provider in providers:
             task = asyncio.create_task(
-                self._query_provider(provider, query_embedding, request)
+                self._query_provider(provider, query_embedding, request, timer)
             )
             tasks.append(task)
             provider_names.append(provider.name)
@@ -636,6 +829,87 @@ class UnifiedVectorStore:
 
         return filtered
 
+    async def _expand_with_graph(self, memories: list[MemoryResponse], query_embedding: list[float] | None,
+                                 request: QueryRequest) -> tuple[list[MemoryResponse], dict[str, Any]]:
+        """
+        Expand the top-k vector hits through the knowledge graph and re-rank.
+
+        The graph provider enforces node/memory/time budgets per stage (no new
+        stage starts after expansion_timeout_ms); the whole expansion is
+        additionally cancelled by asyncio.wait_for at that same budget, so a
+        stage still running on a slow database can never add more than the
+        budget to the query latency. On timeout or failure the vector results
+        are returned unchanged.
+
+        All candidates are re-scored in one pass with graph proximity as an
+        extra signal (1.0 for the original hits).
+        """
+        graph_provider = self.providers.get('graph')
+        metadata: dict[str, Any] = {'enabled': False, 'memories_added': 0}
+        if not graph_provider or not graph_provider.enabled or not hasattr(graph_provider, 'expand_memories'):
+            metadata['error'] = 'Graph provider not available'
+            return memories, metadata
+
+        seeds = memories[:request.limit]
+        seed_ids = [m.id for m in seeds]
+        timeout = graph_provider.expansion_timeout_ms / 1000
+        metadata['enabled'] = True
+
+        try:
+            expansion = await asyncio.wait_for(
+                graph_provider.expand_memories(
+                    seed_ids,
+                    query_embedding=query_embedding,
+                    max_hops=request.graph_hops,
+                    min_strength=request.graph_min_strength,
+                    exclude_ids=[m.id for m in memories],
+                    filters=self._expansion_filters(request),
+                    time_range=request.time_range,
+                    min_similarity=request.min_similarity
+                ),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(f"Graph expansion exceeded {timeout * 1000:.0f}ms, using vector results only")
+            metadata.update({'truncated': True, 'error': 'timeout'})
+            return memories, metadata
+        except Exception as e:
+            logger.warning(f"Graph expansion failed, using vector results only: {e}")
+            metadata['error'] = str(e)
+            return memories, metadata
+
+        proximity = dict.fromkeys(seed_ids, 1.0)
+        candidates = list(memories)
+        for memory, score in expansion['memories']:
+            proximity[memory.id] = score
+            candidates.append(memory)
+
+        candidates.sort(key=lambda m: (
+            (m.similarity_score or 0) * 0.6 +
+            (m.importance_score or 0) * 0.2 +
+            proximity.get(m.id, 0.0) * 0.2
+        ), reverse=True)
+
+        metadata.update({
+            'seed_memories': len(seed_ids),
+            'nodes': expansion['nodes'],
+            'hops': expansion['hops'],
+            'memories_added': len(expansion['memories']),
+            'truncated': expansion['truncated'],
+            'timings_ms': {k: round(v, 3) for k, v in expansion['timings_ms'].items()}
+        })
+        return candidates, metadata
+
+    @staticmethod
+    def _expansion_filters(request: QueryRequest) -> dict[str, Any]:
+        """Metadata filters graph-expanded memories must match, including the request's user and conversation."""
+        filters = dict(request.filters or {})
+        if request.user_id:
+            filters['user_id'] = request.user_id
+        if request.conversation_id:
+            filters['conversation_id'] = request.conversation_id
+        return filters
+
     def _get_cache_key(self, request: QueryRequest) -> str:
         """Generate cache key for query."""
         # Simple cache key - in production, use more sophisticated hashing
@@ -645,7 +919,8 @@ class UnifiedVectorStore:
             str(request.min_similarity),
             str(sorted(request.filters.items()) if request.filters else ""),
             request.user_id or "",
-            request.conversation_id or ""
+            request.conversation_id or "",
+            f"graph:{request.graph_hops}:{request.graph_min_strength}" if request.graph_expand else ""
         ]
         return "|".join(key_parts)
     
@@ -710,7 +985,9 @@ class UnifiedVectorStore:
                         # Special handling for pgvector
                         if count == 0 and name == 'pgvector' and hasattr(provider, 'connection_pool'):
                             async with provider.connection_pool.acquire() as conn:
-                                count = await conn.fetchval("SELECT COUNT(*) FROM vector_memories")
+                                count = await conn.fetchval(
+                                    f"SELECT COUNT(*) FROM vector_memories WHERE NOT (metadata ? '{PARENT_KEY}')"
+                                )
                         
                         if count > 0:
                             total_memories += count
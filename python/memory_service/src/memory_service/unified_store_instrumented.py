@@ -11,6 +11,7 @@ from typing import Any, Optional
 from opentelemetry import trace
 from opentelemetry.trace import Status, StatusCode
 
+from .deduplication import is_unique_violation
 from .models import MemoryRequest, MemoryResponse, QueryRequest, QueryResponse
 from .observability import trace_operation, record_metric, add_span_attributes
 from .unified_store import UnifiedVectorStore as BaseUnifiedVectorStore
@@ -66,8 +67,8 @@ class InstrumentedUnifiedVectorStore(BaseUnifiedVectorStore):
                         add_span_attributes(duplicate_found=True)
                         return dedup_result.existing_memory
             
-            # Trace embedding generation
-            if not request.embedding and self.embedding_model:
+            # Trace embedding generation (with chunking, the base store embeds the chunks itself)
+            if not request.embedding and self.embedding_model and not self.chunker:
                 with tracer.start_as_current_span("embedding.generate") as embed_span:
                     embed_start = time.time()
                     try:
@@ -205,7 +206,7 @@ class InstrumentedUnifiedVectorStore(BaseUnifiedVectorStore):
             add_span_attributes(success=False, error_type=type(e).__name__)
             raise
     
-    async def _query_provider(self, provider, query_embedding, request):
+    async def _query_provider(self, provider, query_embedding, request, timer=None):
         """Query provider with tracing."""
         with tracer.start_as_current_span(f"provider.query.{provider.name}") as span:
             span.set_attribute("provider.name", provider.name)
@@ -214,7 +215,7 @@ class InstrumentedUnifiedVectorStore(BaseUnifiedVectorStore):
             
             start_time = time.time()
             try:
-                results = await super()._query_provider(provider, query_embedding, request)
+                results = await super()._query_provider(provider, query_embedding, request, timer)
                 
                 duration = (time.time() - start_time) * 1000
                 span.set_attribute("duration_ms", duration)
@@ -231,7 +232,7 @@ class InstrumentedUnifiedVectorStore(BaseUnifiedVectorStore):
                 record_metric(f"{provider.name}.query.errors", 1)
                 raise
     
-    async def _store_with_retry(self, provider, content, embedding, metadata):
+    async def _store_with_retry(self, provider, content, embedding, metadata, chunks=None):
         """Store with retry and tracing."""
         with tracer.start_as_current_span(f"provider.store.{provider.name}") as span:
             span.set_attribute("provider.name", provider.name)
@@ -242,7 +243,10 @@ class InstrumentedUnifiedVectorStore(BaseUnifiedVectorStore):
                     span.set_attribute("attempt", attempt + 1)
                     start_time = time.time()
                     
-                    result = await provider.store(content, embedding, metadata)
+                    if chunks:
+                        result = await provider.store_with_chunks(content, embedding, metadata, chunks)
+                    else:
+                        result = await provider.store(content, embedding, metadata)
                     
                     duration = (time.time() - start_time) * 1000
                     span.set_attribute("duration_ms", duration)
@@ -253,7 +257,7 @@ class InstrumentedUnifiedVectorStore(BaseUnifiedVectorStore):
                     return result
                     
                 except Exception as e:
-                    if attempt == provider.config.retry_count - 1:
+                    if attempt == provider.config.retry_count - 1 or is_unique_violation(e):
                         span.set_status(Status(StatusCode.ERROR, str(e)))
                         span.record_exception(e)
                         record_metric(f"{provider.name}.store.errors", 1)
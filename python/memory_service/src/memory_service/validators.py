@@ -130,3 +130,29 @@ def validate_graph_depth(depth: int) -> int:
         raise HTTPException(status_code=400, detail="Depth cannot exceed 5 (performance limit)")
 
     return depth
+
+
+def validate_graph_limit(value, field_name: str, minimum: int, maximum: int) -> int:
+    """
+    Validate a node/edge budget for graph queries, clamped to [minimum, maximum].
+
+    Args:
+        value: Requested budget (int or numeric string)
+        field_name: Name of the field for error messages
+        minimum: Smallest budget allowed
+        maximum: Largest budget allowed (performance limit)
+
+    Returns:
+        Validated budget
+
+    Raises:
+        HTTPException: If the value is not an integer
+    """
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        raise HTTPException(status_code=422, detail=f"{field_name} must be an integer")
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=422, detail=f"{field_name} must be an integer") from None
+
+    return max(minimum, min(value, maximum))
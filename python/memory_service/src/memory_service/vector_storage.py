@@ -0,0 +1,161 @@
+"""
+Vector Storage Modes for the pgvector ANN Index
+
+text-embedding-3 vectors are Matryoshka-trained: a prefix of the
+dimensions, compared by cosine, ranks nearly as well as the full vector.
+A reduced storage mode indexes only such a prefix and/or half-precision
+(halfvec) values through an expression index on the existing embedding
+column, so the index is 3-12x smaller and stays in RAM. For very large
+collections the binary mode indexes 1 bit per dimension (binary_quantize
+into a bit column, searched by Hamming distance), ~32x smaller than full
+vectors. Queries over-fetch candidates from that index and rerank them by
+full-precision cosine distance on the heap rows, in the same statement.
+
+Because the reduced copy is an index expression, switching modes needs no
+row rewrite: build the new index (see migration_reduced_ann_index.sql),
+switch PGVECTOR_STORAGE, then drop the old index
+(migration_reduced_ann_index_cutover.sql).
+"""
+
+from dataclasses import dataclass
+from typing import Any
+
+# Candidates per requested result: sign bits lose far more than a prefix or
+# halfvec does, so binary search needs a deeper rerank for the same recall
+DEFAULT_OVERFETCH = 4
+BINARY_OVERFETCH = 10
+
+
+@dataclass(frozen=True)
+class VectorStorage:
+    """
+    How vectors are kept in the ANN index.
+
+    Attributes:
+        dim: Full embedding dimension (the table column)
+        ann_dim: Leading dimensions kept in the index
+        halfvec: Index 16-bit floats instead of 32-bit
+        binary: Index sign bits, compared by Hamming distance
+        overfetch: Candidates fetched per requested result before reranking
+    """
+    dim: int
+    ann_dim: int
+    halfvec: bool = False
+    binary: bool = False
+    overfetch: int = DEFAULT_OVERFETCH
+
+    @classmethod
+    def parse(cls, spec: str | None, dim: int, overfetch: int | None = None) -> 'VectorStorage':
+        """
+        Parse a storage spec: 'full', 'halfvec', 'binary', 'matryoshka:512',
+        'matryoshka:256+halfvec' or 'matryoshka:512+binary'. Without an
+        explicit overfetch, binary storage uses BINARY_OVERFETCH.
+        """
+        spec = (spec or 'full').strip().lower()
+        ann_dim, halfvec, binary = dim, False, False
+        for part in spec.split('+'):
+            kind, _, value = part.partition(':')
+            if kind == 'full':
+                continue
+            elif kind == 'halfvec':
+                halfvec = True
+            elif kind == 'binary':
+                binary = True
+            elif kind == 'matryoshka':
+                ann_dim = int(value)
+            else:
+                raise ValueError(
+                    f"Unknown vector storage '{spec}' (expected full, halfvec, binary or matryoshka:<dim>)"
+                )
+        if not 0 < ann_dim <= dim:
+            raise ValueError(f"Matryoshka dimension must be between 1 and {dim}, got {ann_dim}")
+        if halfvec and binary:
+            raise ValueError(f"Vector storage '{spec}' cannot be both halfvec and binary")
+        if overfetch is None:
+            overfetch = BINARY_OVERFETCH if binary else DEFAULT_OVERFETCH
+        return cls(dim=dim, ann_dim=ann_dim, halfvec=halfvec, binary=binary, overfetch=max(1, overfetch))
+
+    @classmethod
+    def from_config(cls, config: dict[str, Any], dim: int) -> 'VectorStorage':
+        overfetch = config.get('rerank_overfetch')
+        return cls.parse(config.get('vector_storage'), dim, int(overfetch) if overfetch else None)
+
+    @property
+    def reduced(self) -> bool:
+        return self.ann_dim < self.dim or self.halfvec or self.binary
+
+    @property
+    def label(self) -> str:
+        parts = [f"matryoshka:{self.ann_dim}"] if self.ann_dim < self.dim else []
+        if self.halfvec:
+            parts.append('halfvec')
+        if self.binary:
+            parts.append('binary')
+        return '+'.join(parts) or 'full'
+
+    @property
+    def opclass(self) -> str:
+        if self.binary:
+            return 'bit_hamming_ops'
+        return 'halfvec_cosine_ops' if self.halfvec else 'vector_cosine_ops'
+
+    @property
+    def distance_operator(self) -> str:
+        """pgvector operator matching opclass (Hamming for bits, cosine otherwise)."""
+        return '<~>' if self.binary else '<=>'
+
+    @property
+    def bytes_per_vector(self) -> int:
+        """Size of one indexed value, excluding index overhead."""
+        if self.binary:
+            return (self.ann_dim + 7) // 8
+        return self.ann_dim * (2 if self.halfvec else 4)
+
+    def _reduce_sql(self, vector_sql: str) -> str:
+        if not self.reduced:
+            return vector_sql
+        if self.ann_dim < self.dim:
+            vector_sql = f"subvector({vector_sql}, 1, {self.ann_dim})"
+        if self.binary:
+            return f"(binary_quantize({vector_sql})::bit({self.ann_dim}))"
+        return f"({vector_sql}::{'halfvec' if self.halfvec else 'vector'}({self.ann_dim}))"
+
+    def index_expression(self, column: str = 'embedding') -> str:
+        """The indexed expression; ORDER BY must use exactly this for the index to apply."""
+        return self._reduce_sql(column)
+
+    def query_expression(self, param: str = '$1') -> str:
+        # The parameter is typed as vector once; the reduction is applied on top
+        return self._reduce_sql(f"{param}::vector")
+
+    def index_name(self, table: str) -> str:
+        suffix = ''
+        if self.reduced:
+            suffix = f"_{self.ann_dim}{'h' if self.halfvec else ''}{'b' if self.binary else ''}"
+        return f"idx_{table}_embedding{suffix}"
+
+    def reduce(self, vectors):
+        """NumPy equivalent of the index expression, for offline recall estimates."""
+        import numpy as np
+
+        reduced = np.asarray(vectors, dtype=np.float32)[..., :self.ann_dim]
+        if self.binary:
+            # binary_quantize sets a bit for every positive component
+            return reduced > 0
+        return reduced.astype(np.float16) if self.halfvec else reduced
+
+    def similarity(self, reduced, reduced_query):
+        """
+        Index-order scores (higher is nearer) of reduced rows against a
+        reduced query: negated Hamming distance for bits, cosine otherwise.
+        """
+        import numpy as np
+
+        if self.binary:
+            return -np.count_nonzero(reduced != reduced_query, axis=-1).astype(np.float32)
+        rows = np.asarray(reduced, dtype=np.float32)
+        query = np.asarray(reduced_query, dtype=np.float32)
+        norms = np.linalg.norm(rows, axis=-1)
+        norms[norms == 0] = 1
+        query_norm = np.linalg.norm(query) or 1
+        return (rows @ query) / (norms * query_norm)
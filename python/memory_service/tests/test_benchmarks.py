@@ -0,0 +1,104 @@
+"""
+Test suite for the offline benchmark suite.
+
+Runs every scenario at a tiny size against the in-process backends and
+checks the baseline comparison rules.
+"""
+
+import pytest
+
+
+def _result(**overrides):
+    result = {'scenario': 'store_memory', 'size': 100, 'operations': 100, 'throughput_per_s': 1000.0,
+              'p50_ms': 1.0, 'p95_ms': 2.0, 'rss_delta_mb': 100.0}
+    result.update(overrides)
+    return result
+
+
+class TestCompareToBaseline:
+    """Tests for compare_to_baseline."""
+
+    def test_within_tolerance_passes(self):
+        from benchmarks.harness import compare_to_baseline
+
+        assert compare_to_baseline([_result(throughput_per_s=900.0, p95_ms=2.4)], [_result()]) == []
+
+    def test_regressions_are_reported(self):
+        from benchmarks.harness import compare_to_baseline
+
+        regressions = compare_to_baseline(
+            [_result(throughput_per_s=500.0, p95_ms=5.0, rss_delta_mb=200.0)], [_result()]
+        )
+
+        assert len(regressions) == 3
+        assert all(message.startswith("store_memory[100]") for message in regressions)
+
+    def test_small_samples_and_tiny_deltas_ignored(self):
+        """Percentiles of a few batch runs and sub-noise deltas do not fail the run."""
+        from benchmarks.harness import compare_to_baseline
+
+        baseline = [_result(scenario='batch_import', operations=3, p50_ms=100.0, p95_ms=100.0),
+                    _result(p50_ms=0.1, p95_ms=0.2, rss_delta_mb=1.0)]
+        results = [_result(scenario='batch_import', operations=3, p50_ms=200.0, p95_ms=200.0),
+                   _result(p50_ms=0.3, p95_ms=0.4, rss_delta_mb=3.0)]
+
+        assert compare_to_baseline(results, baseline) == []
+
+
+class TestScenarios:
+    """Smoke test for the scenarios on the in-process backends."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("scenario", ['store_memory', 'query_memories', 'batch_import',
+                                          'export', 'graph_store'])
+    async def test_scenario_runs(self, scenario, tmp_path):
+        from benchmarks.scenarios import SCENARIOS
+
+        result = await SCENARIOS[scenario](20, 'memory', str(tmp_path), 64)
+
+        assert result['scenario'] == scenario
+        assert result['operations'] > 0
+        assert result['throughput_per_s'] > 0
+        assert result['p50_ms'] <= result['p99_ms']
+        assert result['rss_delta_mb'] >= 0
+
+    @pytest.mark.asyncio
+    async def test_graph_scenario_fails_on_swallowed_errors(self, tmp_path, monkeypatch):
+        from benchmarks.backends import InMemoryGraphConnection
+        from benchmarks.scenarios import SCENARIOS
+
+        async def broken_fetchrow(*_args):
+            raise IndexError("tuple index out of range")
+
+        monkeypatch.setattr(InMemoryGraphConnection, 'fetchrow', broken_fetchrow)
+
+        with pytest.raises(RuntimeError, match="Graph store failed"):
+            await SCENARIOS['graph_store'](5, 'memory', str(tmp_path), 64)
+
+
+class TestRss:
+    """RSS growth is measured per scenario."""
+
+    @pytest.mark.asyncio
+    async def test_growth_ignores_earlier_peaks(self):
+        import sys
+
+        from benchmarks.harness import measure, reset_peak_rss
+
+        if sys.platform != 'linux':
+            pytest.skip("resetting the RSS high-water mark needs /proc/self/clear_refs")
+
+        async def allocate(_i):
+            block = bytearray(200 * 1024 * 1024)
+            block[::4096] = b'x' * len(block[::4096])
+
+        async def idle(_i):
+            pass
+
+        reset_peak_rss()
+        heavy = await measure('heavy', 1, allocate, 1)
+        reset_peak_rss()
+        light = await measure('light', 1, idle, 1)
+
+        assert heavy['rss_delta_mb'] > 150
+        assert light['rss_delta_mb'] < 20
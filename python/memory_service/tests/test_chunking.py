@@ -0,0 +1,279 @@
+"""
+Tests for token-aware chunking: overlapping windows, collapsing chunk hits
+to parent memories, and storing/querying long memories end to end.
+"""
+
+from uuid import uuid4
+
+import pytest
+
+
+def _words(start, count):
+    return ' '.join(f"w{i}" for i in range(start, start + count))
+
+
+class TestTextChunker:
+    """Tests for TextChunker with the approximate tokenizer."""
+
+    def _chunker(self, **kwargs):
+        from memory_service.chunking import RegexTokenizer, TextChunker
+
+        return TextChunker(tokenizer=RegexTokenizer(), **kwargs)
+
+    def test_short_text_is_not_split(self):
+        chunker = self._chunker(max_tokens=10, overlap_tokens=2)
+
+        assert chunker.split("just a few words") == ["just a few words"]
+
+    def test_windows_overlap_and_reach_the_end(self):
+        chunker = self._chunker(max_tokens=10, overlap_tokens=3)
+
+        chunks = chunker.split(_words(0, 25))
+
+        assert chunks[0] == _words(0, 10)
+        assert chunks[1] == _words(7, 10)
+        assert chunks[-1].endswith("w24")
+        assert all(len(chunk.split()) == 10 for chunk in chunks)
+
+    def test_chunks_keep_original_text(self):
+        chunker = self._chunker(max_tokens=4, overlap_tokens=1)
+
+        chunks = chunker.split("Hello, world!  Second   sentence here.")
+
+        assert chunks[0] == "Hello, world!"
+        assert all(chunk in "Hello, world!  Second   sentence here." for chunk in chunks)
+
+    def test_invalid_settings(self):
+        with pytest.raises(ValueError):
+            self._chunker(max_tokens=10, overlap_tokens=10)
+        with pytest.raises(ValueError):
+            self._chunker(aggregation='mean')
+
+    def test_tokenizer_is_cached(self):
+        from memory_service.chunking import get_tokenizer
+
+        assert get_tokenizer() is get_tokenizer()
+
+
+class TestCollapseChunkHits:
+    """Tests for collapse_chunk_hits."""
+
+    def _hit(self, score, parent=None, index=None, content="chunk"):
+        from memory_service.models import MemoryResponse
+
+        metadata = {'user_id': 'u1'}
+        if parent:
+            metadata.update({'parent_id': str(parent), 'chunk_index': index})
+        return MemoryResponse(content=content, metadata=metadata, similarity_score=score)
+
+    def test_max_and_sum_aggregation(self):
+        from memory_service.chunking import collapse_chunk_hits
+
+        parent_id = uuid4()
+        parent = self._hit(0.5, content="full document")
+        parent = parent.model_copy(update={'id': parent_id})
+        other = self._hit(0.7, content="other memory")
+        hits = [self._hit(0.8, parent_id, 3), other, self._hit(0.6, parent_id, 1), parent]
+
+        collapsed = collapse_chunk_hits(hits, aggregation='max')
+        assert [m.content for m in collapsed] == ["full document", "other memory"]
+        assert collapsed[0].similarity_score == 0.8
+        assert collapsed[0].metadata['matched_chunks'] == [1, 3]
+
+        summed = collapse_chunk_hits(hits, aggregation='sum')
+        assert summed[0].similarity_score == 1.0
+
+    def test_parent_fetched_or_best_chunk_stands_in(self):
+        from memory_service.chunking import collapse_chunk_hits
+        from memory_service.models import MemoryResponse
+
+        fetched_id, missing_id = uuid4(), uuid4()
+        parents = {str(fetched_id): MemoryResponse(id=fetched_id, content="fetched parent")}
+        hits = [self._hit(0.9, fetched_id, 0), self._hit(0.4, missing_id, 2, "weak"),
+                self._hit(0.7, missing_id, 5, "strong")]
+
+        collapsed = collapse_chunk_hits(hits, parents)
+
+        assert collapsed[0].content == "fetched parent"
+        assert collapsed[1].id == missing_id
+        assert collapsed[1].content == "strong"
+        assert 'parent_id' not in collapsed[1].metadata
+
+
+class TestChunkedStore:
+    """UnifiedVectorStore stores chunks as child rows and returns parents."""
+
+    def _store(self, name="memory"):
+        from benchmarks.backends import InMemoryVectorProvider
+        from memory_service.chunking import RegexTokenizer, TextChunker
+        from memory_service.embedding_models import MockEmbeddingModel
+        from memory_service.models import ProviderConfig
+        from memory_service.unified_store import UnifiedVectorStore
+
+        provider = InMemoryVectorProvider(ProviderConfig(name=name, primary=True,
+                                                         config={'embedding_dim': 256}))
+
+        class CountingModel(MockEmbeddingModel):
+            calls = []
+
+            async def embed_batch(self, texts):
+                self.calls.append(len(texts))
+                return await super().embed_batch(texts)
+
+        store = UnifiedVectorStore([provider], embedding_model=CountingModel(256), adm_enabled=False,
+                                   chunker=TextChunker(max_tokens=40, overlap_tokens=8,
+                                                       tokenizer=RegexTokenizer()))
+        store.query_cache = {}
+        return store
+
+    @pytest.mark.asyncio
+    async def test_long_memory_is_searchable_by_its_tail(self):
+        from memory_service.models import MemoryRequest, QueryRequest
+
+        store = self._store()
+        filler = ' '.join(["quarterly planning notes about budgets and hiring"] * 20)
+        tail = "the staging cluster TLS certificates expire in May and must be renewed"
+        document = f"{filler} {tail}"
+        await store.store_memory(MemoryRequest(content="short note about lunch", importance_score=0.5))
+        stored = await store.store_memory(MemoryRequest(content=document, importance_score=0.5))
+
+        chunk_count = stored.metadata['chunk_count']
+        assert chunk_count > 3
+        # All chunks were embedded in one batch call
+        assert store.embedding_model.calls == [chunk_count]
+        assert len(store.primary_provider._rows) == 2 + chunk_count
+        assert store.stats['chunks_stored'] == chunk_count
+
+        response = await store.query_memories(QueryRequest(query="TLS certificates staging cluster expire",
+                                                           limit=5, min_similarity=0.0))
+
+        ids = [m.id for m in response.memories]
+        assert ids[0] == stored.id
+        assert len(ids) == len(set(ids))
+        assert response.memories[0].content == document
+        assert response.memories[0].metadata['matched_chunks']
+
+    @pytest.mark.asyncio
+    async def test_caller_embedding_disables_chunking(self):
+        from memory_service.models import MemoryRequest
+
+        store = self._store()
+        stored = await store.store_memory(MemoryRequest(
+            content=' '.join(["long text"] * 100), embedding=[0.1] * 256, importance_score=0.5
+        ))
+
+        assert 'chunk_count' not in stored.metadata
+        assert len(store.primary_provider._rows) == 1
+
+    @pytest.mark.asyncio
+    async def test_chunks_stay_out_of_listings_and_secondaries(self):
+        import asyncio
+
+        from benchmarks.backends import InMemoryVectorProvider
+        from memory_service.models import MemoryRequest, ProviderConfig, QueryRequest
+
+        # Named pgvector: empty queries take the direct recent-memories path
+        store = self._store(name="pgvector")
+        secondary = InMemoryVectorProvider(ProviderConfig(name="replica", primary=False,
+                                                          config={'embedding_dim': 256}))
+        store.providers['replica'] = secondary
+        stored = await store.store_memory(MemoryRequest(content=' '.join(["budget review notes"] * 60),
+                                                        importance_score=0.5))
+        await store.store_memory(MemoryRequest(content="short note about lunch", importance_score=0.5))
+        await asyncio.sleep(0.01)
+
+        assert stored.metadata['chunk_count'] > 1
+        # Only the parent is replicated
+        assert [row['content'] for row in secondary._rows][1] == "short note about lunch"
+        assert len(secondary._rows) == 2
+        assert not any('parent_id' in row['metadata'] for row in secondary._rows)
+
+        response = await store.query_memories(QueryRequest(query="", limit=5, min_similarity=0.0))
+        assert response.total_found == 2
+        assert stored.id in [m.id for m in response.memories]
+        assert (await store.primary_provider.get_stats())['total_memories'] == 2
+
+    @pytest.mark.asyncio
+    async def test_duplicate_check_reuses_the_chunk_embedding(self):
+        from memory_service.deduplication import DeduplicationResult
+        from memory_service.models import MemoryRequest
+
+        store = self._store()
+        checked = []
+
+        class Dedup:
+            async def check_duplicate(self, content, metadata=None, embedding=None):
+                checked.append(embedding)
+                return DeduplicationResult(is_duplicate=False, embedding=embedding)
+
+            def remember(self, *args, **kwargs):
+                pass
+
+        store.deduplication_service = Dedup()
+        stored = await store.store_memory(MemoryRequest(content=' '.join(["budget review notes"] * 60),
+                                                        importance_score=0.5))
+
+        # One batch for the chunks; the check got their mean instead of a whole-text embedding
+        assert store.embedding_model.calls == [stored.metadata['chunk_count']]
+        assert checked[0] == pytest.approx(list(store.primary_provider._vectors[0]), abs=1e-6)
+
+    def test_pgvector_listings_and_counts_skip_chunk_rows(self):
+        from memory_service.models import ProviderConfig
+        from memory_service.providers import PgVectorProvider
+
+        provider = PgVectorProvider(ProviderConfig(name="pgvector", primary=True, config={'embedding_dim': 256}))
+
+        assert "NOT (metadata ? 'parent_id')" in provider._recent_sql
+        assert "NOT (metadata ? 'parent_id')" in provider._count_sql
+        filtered = ' '.join(provider._build_recent_sql(["metadata->>'user_id' = $2"]).split())
+        assert "WHERE NOT (metadata ? 'parent_id') AND metadata->>'user_id' = $2" in filtered
+
+    @pytest.mark.asyncio
+    async def test_pgvector_writes_parent_and_chunks_in_one_transaction(self):
+        import json
+        from contextlib import asynccontextmanager
+
+        from memory_service.models import ProviderConfig
+        from memory_service.providers import PgVectorProvider
+
+        calls = []
+
+        class Conn:
+            @asynccontextmanager
+            async def transaction(self):
+                calls.append('begin')
+                yield
+                calls.append('commit')
+
+            async def execute(self, sql, *args):
+                calls.append(sql)
+
+            async def executemany(self, sql, records):
+                calls.append(list(records))
+
+        class Pool:
+            @asynccontextmanager
+            async def acquire(self):
+                yield Conn()
+
+        provider = PgVectorProvider(ProviderConfig(name="pgvector", primary=True, config={'embedding_dim': 2}))
+        provider.connection_pool = provider.write_pool = Pool()
+
+        memory_id = await provider.store_with_chunks("a b c", [1.0, 0.0], {'importance_score': 0.7},
+                                                     [("a b", [1.0, 0.0]), ("b c", [0.0, 1.0])])
+
+        assert calls[0] == 'begin' and calls[-1] == 'commit'
+        records = calls[1]
+        assert [record[1] for record in records] == ["a b c", "a b", "b c"]
+        assert records[0][0] == memory_id
+        chunk_metadata = [json.loads(record[3]) for record in records[1:]]
+        assert [m['parent_id'] for m in chunk_metadata] == [str(memory_id)] * 2
+        assert [m['chunk_index'] for m in chunk_metadata] == [0, 1]
+        assert records[2][2] == '[0.0,1.0]' and records[2][4] == 0.7
+
+    def test_chunk_rows_stay_out_of_the_hash_trigger(self):
+        from pathlib import Path
+
+        schema = (Path(__file__).parent.parent / 'init-db.sql').read_text()
+
+        assert "WHEN (NOT (NEW.metadata ? 'parent_id'))" in schema
@@ -0,0 +1,128 @@
+"""
+Test suite for the content hash backfill and orphan cleanup.
+
+Uses an in-memory connection that mimics keyset pagination, COPY staging
+and batched DELETE ... USING statements.
+"""
+
+import hashlib
+from uuid import UUID
+
+import pytest
+
+
+class BackfillConnection:
+    """Mock connection over a sorted list of memories."""
+
+    def __init__(self, memories, hashed=()):
+        self.memories = sorted(memories, key=lambda m: m['id'])
+        self.hashes = dict.fromkeys(hashed)
+        self.staging = []
+        self.copies = 0
+        self.orphans = 0
+        self.delete_batches = []
+
+    def transaction(self):
+        class Transaction:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *args):
+                return None
+        return Transaction()
+
+    async def fetch(self, query: str, *args):
+        last_id, limit = args
+        rows = [m for m in self.memories
+                if (last_id is None or m['id'] > last_id) and m['id'] not in self.hashes]
+        return rows[:limit]
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.copies += 1
+        self.staging = list(records)
+
+    async def execute(self, query: str, *args):
+        if "INSERT INTO memory_content_hashes" in query:
+            for content_hash, memory_id, _ in self.staging:
+                self.hashes[memory_id] = content_hash
+            return f"INSERT 0 {len(self.staging)}"
+        if "DELETE FROM memory_content_hashes" in query:
+            deleted = min(self.orphans, args[1])
+            self.orphans -= deleted
+            self.delete_batches.append(deleted)
+            return f"DELETE {deleted}"
+        return "CREATE TABLE"
+
+
+def _pool(conn):
+    class Pool:
+        def acquire(self):
+            class AcquireContext:
+                async def __aenter__(self):
+                    return conn
+
+                async def __aexit__(self, *args):
+                    return None
+            return AcquireContext()
+    return Pool()
+
+
+def _memories(count):
+    return [{'id': UUID(int=i + 1), 'content': f"memory number {i}"} for i in range(count)]
+
+
+class TestContentHashBackfill:
+    """Tests for ContentHashBackfill."""
+
+    @pytest.mark.asyncio
+    async def test_backfills_in_batches(self):
+        """Every missing hash is written, one COPY per batch."""
+        from memory_service.deduplication import ContentHashBackfill
+
+        memories = _memories(25)
+        conn = BackfillConnection(memories, hashed=[memories[3]['id']])
+        backfill = ContentHashBackfill(_pool(conn), batch_size=10, workers=3)
+
+        progress = await backfill.run()
+
+        assert progress['status'] == 'completed'
+        assert progress['memories_hashed'] == 24
+        assert progress['batches'] == 3
+        assert conn.copies == 3
+        assert conn.hashes[memories[0]['id']] == hashlib.sha256(b"memory number 0").hexdigest()
+        assert progress['last_id'] == str(memories[-1]['id'])
+
+    @pytest.mark.asyncio
+    async def test_resume_from_cursor(self):
+        """A run limited by max_rows can be resumed from its last_id."""
+        from memory_service.deduplication import ContentHashBackfill
+
+        memories = _memories(12)
+        conn = BackfillConnection(memories)
+        backfill = ContentHashBackfill(_pool(conn), batch_size=5)
+
+        first = await backfill.run(max_rows=7)
+        assert first['memories_hashed'] == 7
+
+        second = await backfill.run(start_after=UUID(first['last_id']))
+        assert second['memories_hashed'] == 5
+        assert len(conn.hashes) == 12
+
+
+class TestOrphanCleanup:
+    """Tests for batched orphan cleanup."""
+
+    @pytest.mark.asyncio
+    async def test_cleanup_batches_until_done(self):
+        """Deletes run in bounded batches until a short batch is returned."""
+        from memory_service.deduplication import DeduplicationService
+
+        conn = BackfillConnection([])
+        conn.orphans = 12
+        service = DeduplicationService(vector_store=None)
+        service.connection_pool = _pool(conn)
+
+        deleted = await service.cleanup_old_hashes(days=30, batch_size=5)
+
+        assert deleted == 12
+        assert conn.delete_batches == [5, 5, 2]
@@ -0,0 +1,327 @@
+"""
+Test suite for the deduplication prefilters and embedding reuse.
+
+Covers the content hash Bloom filter, SimHash near-duplicate lookup and
+verifies that a dedup-enabled check embeds the content at most once and
+hands the embedding back.
+"""
+
+import hashlib
+from uuid import uuid4
+
+import pytest
+
+
+class TestSimHashIndex:
+    """Tests for SimHash fingerprints and the LSH index."""
+
+    def test_near_duplicates_are_candidates(self):
+        """A one-word edit stays within range; unrelated text does not."""
+        from memory_service.deduplication import SimHashIndex, simhash
+
+        base = ("The quarterly planning meeting moved to Thursday afternoon so the design "
+                "team can present the new onboarding flow to marketing and sales leads")
+        edited = base.replace("Thursday", "Friday")
+        unrelated = "Remember to renew the TLS certificates on the staging cluster before May"
+
+        index = SimHashIndex(max_distance=8)
+        memory_id = uuid4()
+        index.add(memory_id, simhash(base))
+
+        assert index.candidates(simhash(edited)) == [memory_id]
+        assert index.candidates(simhash(unrelated)) == []
+
+    def test_eviction(self):
+        """The oldest fingerprint is evicted once max_entries is reached."""
+        from memory_service.deduplication import SimHashIndex
+
+        index = SimHashIndex(max_distance=2, max_entries=2)
+        first, second, third = uuid4(), uuid4(), uuid4()
+        index.add(first, 0)
+        index.add(second, (1 << 64) - 1)
+        index.add(third, (1 << 32) - 1)
+
+        assert len(index) == 2
+        assert index.candidates(0) == []
+        assert index.candidates((1 << 64) - 1) == [second]
+
+
+class TestContentHashBloomFilter:
+    """Tests for the exact-match Bloom filter."""
+
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        """Added hashes are always found; unseen hashes rarely are."""
+        from memory_service.deduplication import ContentHashBloomFilter
+
+        bloom = ContentHashBloomFilter(capacity=5000, error_rate=0.01)
+        added = [hashlib.sha256(f"memory {i}".encode()).hexdigest() for i in range(5000)]
+        for content_hash in added:
+            bloom.add(content_hash)
+
+        assert all(content_hash in bloom for content_hash in added)
+
+        unseen = [hashlib.sha256(f"other {i}".encode()).hexdigest() for i in range(5000)]
+        false_positives = sum(content_hash in bloom for content_hash in unseen)
+        assert false_positives / len(unseen) < 0.03
+        assert bloom.false_positive_rate == pytest.approx(0.01, rel=0.5)
+        assert bloom.memory_bytes < 8 * 1024
+
+
+class CountingEmbeddingModel:
+    """Embedding model counting calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def embed_text(self, text: str):
+        self.calls += 1
+        return [0.1, 0.2, 0.3]
+
+
+class FakePgVector:
+    """pgvector stand-in returning no similar memories."""
+
+    def __init__(self):
+        self.queries = 0
+
+    async def query(self, query_embedding, limit, filters):
+        self.queries += 1
+        return []
+
+
+class FakeStore:
+    def __init__(self):
+        self.embedding_model = CountingEmbeddingModel()
+        self.providers = {'pgvector': FakePgVector()}
+
+
+@pytest.fixture
+def service():
+    from memory_service.deduplication import DeduplicationMode, DeduplicationService
+
+    service = DeduplicationService(FakeStore(), mode=DeduplicationMode.LOG_ONLY)
+    service.connection_pool = object()
+
+    async def no_exact_match(_content_hash):
+        return None
+
+    service._check_exact_match = no_exact_match
+    service._start_background_tasks = lambda: None
+    return service
+
+
+class TestDeduplicationPipeline:
+    """Tests for check_duplicate stage gating."""
+
+    @pytest.mark.asyncio
+    async def test_embedding_is_returned(self, service):
+        """The semantic stage embedding is handed back for the store path."""
+        result = await service.check_duplicate("brand new content")
+
+        assert not result.is_duplicate
+        assert result.embedding == [0.1, 0.2, 0.3]
+        assert result.fingerprint is not None
+        assert service.vector_store.embedding_model.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_provided_embedding_is_not_recomputed(self, service):
+        """A caller-supplied embedding is used for the vector lookup."""
+        result = await service.check_duplicate("brand new content", embedding=[1.0, 0.0, 0.0])
+
+        assert result.embedding == [1.0, 0.0, 0.0]
+        assert service.vector_store.embedding_model.calls == 0
+
+    @pytest.mark.asyncio
+    async def test_warm_prefilter_skips_semantic_stage(self, service):
+        """With a warm index and no near duplicate, no embedding or vector query runs."""
+        service.near_duplicates.warm = True
+        service.remember(uuid4(), "completely different text about databases and indexes")
+
+        result = await service.check_duplicate(
+            "weekend hiking trip photos from the mountains near the lake cabin with the whole "
+            "family and the dog before the first snow closed the pass for the season"
+        )
+
+        assert result.embedding is None
+        assert service.metrics['prefilter_skips'] == 1
+        assert service.vector_store.embedding_model.calls == 0
+        assert service.vector_store.providers['pgvector'].queries == 0
+
+    @pytest.mark.asyncio
+    async def test_short_content_bypasses_prefilter(self, service):
+        """Short content is always checked semantically."""
+        service.near_duplicates.warm = True
+
+        await service.check_duplicate("short note")
+
+        assert service.metrics['prefilter_skips'] == 0
+        assert service.metrics['semantic_checks'] == 1
+
+    @pytest.mark.asyncio
+    async def test_near_duplicate_runs_semantic_stage(self, service):
+        """A near duplicate in the warm index still gets the vector check."""
+        content = ("weekend hiking trip photos from the mountains near the lake cabin with the whole "
+                   "family and the dog before the first snow closed the pass for the season")
+        service.near_duplicates.warm = True
+        service.remember(uuid4(), content)
+
+        await service.check_duplicate(content + " again")
+
+        assert service.metrics['semantic_checks'] == 1
+        assert service.vector_store.providers['pgvector'].queries == 1
+
+    @pytest.mark.asyncio
+    async def test_bloom_miss_skips_exact_lookup(self, service):
+        """A definite Bloom filter miss never reaches the database."""
+        from memory_service.deduplication import ContentHashBloomFilter
+
+        lookups = []
+
+        async def exact_match(content_hash):
+            lookups.append(content_hash)
+            return None
+
+        service._check_exact_match = exact_match
+        service.content_hashes = ContentHashBloomFilter(capacity=1000)
+        service.remember(uuid4(), "already stored content")
+
+        await service.check_duplicate("never seen before")
+        await service.check_duplicate("already stored content")
+
+        assert service.metrics['bloom_skips'] == 1
+        assert lookups == [service._hash_content("already stored content")]
+
+    @pytest.mark.asyncio
+    async def test_rebuild_streams_hashes(self, service):
+        """Rebuilds stream hashes with a cursor and keep writes made meanwhile."""
+        stored = hashlib.sha256(b"stored").hexdigest()
+
+        class Transaction:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *args):
+                return None
+
+        class Connection:
+            async def fetchval(self, query, *args):
+                return 1
+
+            def transaction(self):
+                return Transaction()
+
+            async def cursor(self, query, prefetch=None):
+                # A write lands while the cursor is streaming
+                service.remember(uuid4(), "written during rebuild")
+                yield {'content_hash': stored}
+
+        class Pool:
+            def acquire(self):
+                class AcquireContext:
+                    async def __aenter__(self):
+                        return Connection()
+
+                    async def __aexit__(self, *args):
+                        return None
+                return AcquireContext()
+
+        service.connection_pool = Pool()
+        await service._rebuild_bloom_filter()
+
+        assert stored in service.content_hashes
+        assert service._hash_content("written during rebuild") in service.content_hashes
+        stats = await service.get_stats()
+        assert stats['bloom_filter']['items'] == 2
+
+    @pytest.mark.asyncio
+    async def test_warmup_batches_fingerprints_and_backs_off(self, service, monkeypatch):
+        """Warmup hashes all rows in one thread hop and retries failures with growing delays."""
+        import asyncio
+
+        import memory_service.deduplication as deduplication
+
+        rows = [{'id': uuid4(), 'content': f"memory number {i}"} for i in range(5)]
+        attempts = []
+
+        class Pool:
+            def acquire(self):
+                class AcquireContext:
+                    async def __aenter__(self):
+                        attempts.append(1)
+                        if len(attempts) < 3:
+                            raise ConnectionError("database starting up")
+                        return self
+
+                    async def __aexit__(self, *args):
+                        return None
+
+                    async def fetch(self, query, *args):
+                        return rows
+                return AcquireContext()
+
+        delays = []
+        thread_calls = []
+        real_to_thread = asyncio.to_thread
+
+        async def fake_sleep(delay):
+            delays.append(delay)
+
+        async def counting_to_thread(func, *args):
+            thread_calls.append(func)
+            return await real_to_thread(func, *args)
+
+        monkeypatch.setattr(deduplication.asyncio, 'sleep', fake_sleep)
+        monkeypatch.setattr(deduplication.asyncio, 'to_thread', counting_to_thread)
+        service.connection_pool = Pool()
+
+        await service._warm_prefilter()
+
+        assert delays == [deduplication.PREFILTER_RETRY_INITIAL, deduplication.PREFILTER_RETRY_INITIAL * 2]
+        assert thread_calls == [deduplication.simhash_many]
+        assert service.near_duplicates.warm
+        assert len(service.near_duplicates) == 5
+
+
+class TestDuplicateOnInsert:
+    """A duplicate the Bloom filter missed is resolved when the insert hits content_hash."""
+
+    @pytest.mark.asyncio
+    async def test_unique_violation_returns_existing_memory(self):
+        from benchmarks.backends import InMemoryVectorProvider
+        from memory_service.deduplication import DeduplicationResult
+        from memory_service.embedding_models import MockEmbeddingModel
+        from memory_service.models import MemoryRequest, MemoryResponse, ProviderConfig
+        from memory_service.unified_store import UnifiedVectorStore
+
+        class UniqueViolationError(Exception):
+            sqlstate = '23505'
+
+        class Provider(InMemoryVectorProvider):
+            attempts = 0
+
+            async def store(self, content, embedding, metadata):
+                self.attempts += 1
+                raise UniqueViolationError("duplicate key value violates unique constraint")
+
+        existing = MemoryResponse(id=uuid4(), content="stored by another worker", metadata={},
+                                  importance_score=0.5)
+
+        class Dedup:
+            async def check_duplicate(self, content, metadata=None, embedding=None):
+                return DeduplicationResult(is_duplicate=False)
+
+            async def find_exact_match(self, content):
+                return existing if content == existing.content else None
+
+        provider = Provider(ProviderConfig(name="memory", primary=True, config={'embedding_dim': 8}))
+        store = UnifiedVectorStore([provider], embedding_model=MockEmbeddingModel(8), adm_enabled=False)
+        store.deduplication_service = Dedup()
+
+        stored = await store.store_memory(MemoryRequest(content=existing.content, importance_score=0.5))
+
+        assert stored.id == existing.id
+        assert provider.attempts == 1  # not retried
+        assert store.stats['duplicates_prevented'] == 1
+
+        with pytest.raises(UniqueViolationError):
+            await store.store_memory(MemoryRequest(content="something else", importance_score=0.5))
@@ -0,0 +1,185 @@
+"""
+Test suite for the mock and local embedding models.
+
+Checks that the hashed n-gram projection is deterministic, that overlapping
+texts are closer than unrelated ones and that batches match single calls,
+and that the local model batches concurrent callers off the event loop.
+"""
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+
+
+class TestMockEmbeddingModel:
+    """Tests for MockEmbeddingModel."""
+
+    def test_similarity_follows_overlap(self):
+        """A one-word edit stays close; unrelated text is far."""
+        from memory_service.embedding_models import MockEmbeddingModel
+
+        model = MockEmbeddingModel(dimension=512)
+        base, edited, unrelated = model.encode([
+            "Quarterly planning meeting moved to Thursday afternoon for the design team",
+            "Quarterly planning meeting moved to Friday afternoon for the design team",
+            "Renew TLS certificates on the staging cluster before May",
+        ])
+
+        assert np.linalg.norm(base) == pytest.approx(1.0, rel=1e-5)
+        assert base @ edited > 0.8
+        assert base @ unrelated < 0.3
+
+    def test_deterministic_across_instances(self):
+        """Same seed gives identical vectors; another seed gives a different space."""
+        from memory_service.embedding_models import MockEmbeddingModel
+
+        text = "deterministic embeddings for load tests"
+        first = MockEmbeddingModel(dimension=256).encode([text])
+        second = MockEmbeddingModel(dimension=256).encode([text])
+        reseeded = MockEmbeddingModel(dimension=256, seed=1).encode([text])
+
+        assert np.array_equal(first, second)
+        assert abs(float(first[0] @ reseeded[0])) < 0.5
+
+    @pytest.mark.asyncio
+    async def test_batch_matches_single(self):
+        """embed_batch is one vectorized pass with the same result as embed_text."""
+        from memory_service.embedding_models import MockEmbeddingModel
+
+        model = MockEmbeddingModel(dimension=128)
+        texts = ["first memory", "second memory about graphs", "!!!"]
+
+        batch = await model.embed_batch(texts)
+        single = [await model.embed_text(text) for text in texts]
+
+        assert np.allclose(batch, single)
+        assert all(len(vector) == 128 for vector in batch)
+
+        with pytest.raises(ValueError):
+            await model.embed_text("   ")
+
+    @pytest.mark.asyncio
+    async def test_latency_injection(self):
+        """Configured latency is applied once per call."""
+        from memory_service.embedding_models import create_embedding_model
+
+        model = create_embedding_model(provider="mock", dimension=64, latency_ms=30)
+
+        started = time.perf_counter()
+        await model.embed_batch(["a", "b", "c"])
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        assert 30 <= elapsed_ms < 1000
+
+
+class FakeSentenceTransformer:
+    """Stands in for a SentenceTransformer: mock vectors, records batches and threads."""
+
+    def __init__(self, dimension=32, delay=0.0):
+        from memory_service.embedding_models import MockEmbeddingModel
+
+        self.mock = MockEmbeddingModel(dimension=dimension)
+        self.delay = delay
+        self.batches = []
+        self.threads = set()
+
+    def get_sentence_embedding_dimension(self):
+        return self.mock.dimension
+
+    def encode(self, texts, batch_size=32, normalize_embeddings=True, convert_to_numpy=True,
+               show_progress_bar=False):
+        self.batches.append(list(texts))
+        self.threads.add(threading.current_thread().name)
+        if self.delay:
+            time.sleep(self.delay)
+        return self.mock.encode(texts)
+
+
+class TestLocalEmbeddingModel:
+    """Tests for LocalEmbeddingModel dynamic batching."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_batches(self):
+        """Concurrent embed_text calls are merged and run on the inference threads."""
+        from memory_service.embedding_models import LocalEmbeddingModel
+
+        encoder = FakeSentenceTransformer()
+        model = LocalEmbeddingModel(encoder=encoder, max_batch_size=8, max_wait_ms=20)
+        texts = [f"memory number {i}" for i in range(20)]
+
+        results = await asyncio.gather(*(model.embed_text(text) for text in texts))
+
+        assert model.dimension == 32
+        assert np.allclose(results, encoder.mock.encode(texts), atol=1e-6)
+        assert [len(batch) for batch in encoder.batches] == [8, 8, 4]
+        assert all(name.startswith("local-embed") for name in encoder.threads)
+        await model.close()
+
+    @pytest.mark.asyncio
+    async def test_event_loop_not_blocked(self):
+        """A slow batch runs in the thread pool while the loop keeps serving."""
+        from memory_service.embedding_models import LocalEmbeddingModel
+
+        model = LocalEmbeddingModel(encoder=FakeSentenceTransformer(delay=0.2), max_wait_ms=0)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        embeddings = await model.embed_batch(["slow batch one", "slow batch two"])
+        task.cancel()
+
+        assert len(embeddings) == 2
+        assert ticks >= 10
+        await model.close()
+
+    @pytest.mark.asyncio
+    async def test_encoder_errors_reach_every_caller(self):
+        from memory_service.embedding_models import LocalEmbeddingModel
+
+        class Broken(FakeSentenceTransformer):
+            def encode(self, texts, **kwargs):
+                raise RuntimeError("onnx session failed")
+
+        model = LocalEmbeddingModel(encoder=Broken(), max_wait_ms=10)
+        results = await asyncio.gather(model.embed_text("a"), model.embed_text("b"), return_exceptions=True)
+
+        assert all("onnx session failed" in str(result) for result in results)
+        with pytest.raises(ValueError):
+            await model.embed_batch(["ok", " "])
+        await model.close()
+
+    def test_model_load_is_cached_per_process(self, monkeypatch):
+        """The factory loads each model once and reuses it across instances."""
+        import sys
+        import types
+
+        from memory_service import embedding_models
+
+        loads = []
+
+        def sentence_transformer(name, **options):
+            loads.append((name, options))
+            return FakeSentenceTransformer(dimension=16)
+
+        monkeypatch.setitem(sys.modules, 'sentence_transformers',
+                            types.SimpleNamespace(SentenceTransformer=sentence_transformer))
+        monkeypatch.setattr(embedding_models, '_local_encoders', {})
+
+        first = embedding_models.create_embedding_model(provider="local", backend="onnx",
+                                                        onnx_file="onnx/model_qint8_avx512.onnx")
+        second = embedding_models.create_embedding_model(provider="local", backend="onnx",
+                                                         onnx_file="onnx/model_qint8_avx512.onnx")
+
+        assert first._encoder is second._encoder
+        assert loads == [("sentence-transformers/all-MiniLM-L6-v2", {
+            'device': 'cpu', 'backend': 'onnx', 'model_kwargs': {'file_name': 'onnx/model_qint8_avx512.onnx'}
+        })]
+        assert first.dimension == 16
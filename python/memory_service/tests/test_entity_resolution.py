@@ -0,0 +1,84 @@
+"""
+Test suite for blocking-based entity resolution.
+
+Verifies duplicate clustering, alias rules and incremental mode without a
+database connection.
+"""
+
+import pytest
+
+
+class TestEntityResolver:
+    """Tests for EntityResolver clustering."""
+
+    @pytest.fixture
+    def resolver(self):
+        from memory_service.entity_resolution import EntityResolver
+
+        resolver = EntityResolver(rules={"PostgreSQL": ["Postgres", "postgresql"]})
+        for entity_id, name in enumerate([
+            "Nike", "Nike Inc.", "NIKE",
+            "Von Base", "Von Base Enterprises",
+            "Postgres", "PostgreSQL",
+            "Kubernetes Engine", "Kubernetes Engines",
+            "Bill Gates", "Gates Bill",
+            "Tesla", "Anthropic",
+        ]):
+            resolver.add(entity_id, name)
+        return resolver
+
+    def _cluster_names(self, resolver, clusters):
+        return sorted(sorted((resolver.entities[i].name for i in cluster), key=str.lower) for cluster in clusters)
+
+    def test_find_clusters(self, resolver):
+        """Suffix, case, containment, token order and trigram matches are grouped."""
+        clusters = self._cluster_names(resolver, resolver.find_clusters())
+
+        assert ["Nike", "NIKE", "Nike Inc."] in clusters
+        assert ["Von Base", "Von Base Enterprises"] in clusters
+        assert ["Postgres", "PostgreSQL"] in clusters
+        assert ["Kubernetes Engine", "Kubernetes Engines"] in clusters
+        assert ["Bill Gates", "Gates Bill"] in clusters
+        assert not any("Tesla" in names or "Anthropic" in names for names in clusters)
+
+    def test_no_transitive_merges_through_single_words(self):
+        """A bare first or brand word does not chain distinct entities together."""
+        from memory_service.entity_resolution import EntityResolver
+
+        resolver = EntityResolver()
+        for entity_id, name in enumerate(["Bill Gates", "Bill", "Bill Clinton",
+                                          "Apple", "Apple Music", "Apple Pie Recipes"]):
+            resolver.add(entity_id, name)
+
+        assert resolver.find_clusters() == []
+
+    def test_canonical_name_prefers_rules(self, resolver):
+        """Rule canonical names win over the alphabetical fallback."""
+        clusters = resolver.find_clusters()
+        postgres = next(c for c in clusters if resolver.entities[c[0]].name.startswith("Postgre"))
+
+        assert resolver.canonical_name(postgres) == "PostgreSQL"
+
+    def test_incremental_only_returns_new_clusters(self, resolver):
+        """Incremental mode ignores clusters without a new entity."""
+        resolver.add(100, "tesla inc")
+
+        clusters = self._cluster_names(resolver, resolver.find_clusters(only_ids={100}))
+
+        assert clusters == [["Tesla", "tesla inc"]]
+
+    def test_blocking_limits_comparisons(self):
+        """Unrelated names are never compared pairwise."""
+        import random
+        import string
+
+        from memory_service.entity_resolution import EntityResolver
+
+        rng = random.Random(42)
+        resolver = EntityResolver()
+        for i in range(300):
+            resolver.add(i, ''.join(rng.choices(string.ascii_lowercase, k=10)))
+
+        resolver.find_clusters()
+
+        assert resolver.comparisons < 300 * 299 // 2 // 10
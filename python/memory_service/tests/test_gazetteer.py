@@ -0,0 +1,186 @@
+"""
+Test suite for the entity gazetteer fast path.
+
+Covers the Aho-Corasick automaton, canonical alias resolution and the
+incremental addition of new entities.
+"""
+
+from uuid import uuid4
+
+import pytest
+
+
+class MockConnection:
+    """Mock connection returning graph_nodes and canonicalization rows."""
+
+    def __init__(self, nodes, aliases=None):
+        self.nodes = nodes
+        self.aliases = aliases
+
+    async def fetch(self, query: str, *args):
+        if "FROM graph_nodes" in query:
+            return self.nodes
+        if "FROM entity_canonicalization" in query:
+            if self.aliases is None:
+                raise Exception('relation "entity_canonicalization" does not exist')
+            return self.aliases
+        return []
+
+
+class TestAhoCorasickAutomaton:
+    """Tests for the raw multi-pattern matcher."""
+
+    def test_overlapping_patterns(self):
+        """All overlapping occurrences are reported."""
+        from memory_service.gazetteer import AhoCorasickAutomaton
+
+        automaton = AhoCorasickAutomaton()
+        for pattern in ["he", "she", "his", "hers"]:
+            automaton.add(pattern, pattern)
+
+        matches = sorted((start, payload) for start, _, payload in automaton.iter_matches("ushers"))
+        assert matches == [(1, "she"), (2, "he"), (2, "hers")]
+
+    def test_incremental_add(self):
+        """Patterns added after a search are matched on the next search."""
+        from memory_service.gazetteer import AhoCorasickAutomaton
+
+        automaton = AhoCorasickAutomaton()
+        automaton.add("alpha", 1)
+        assert [p for _, _, p in automaton.iter_matches("alpha beta")] == [1]
+
+        automaton.add("beta", 2)
+        assert [p for _, _, p in automaton.iter_matches("alpha beta")] == [1, 2]
+        assert automaton.pattern_count == 2
+
+
+class TestEntityGazetteer:
+    """Tests for canonical entity extraction."""
+
+    @pytest.fixture
+    def gazetteer(self):
+        from memory_service.gazetteer import EntityGazetteer
+
+        gazetteer = EntityGazetteer()
+        self.vbe_id = uuid4()
+        self.openai_id = uuid4()
+        gazetteer.add_entity(self.vbe_id, "Von Base Enterprises", "organization",
+                             aliases=["VBE", "Von Base"])
+        gazetteer.add_entity(self.openai_id, "OpenAI", "organization", aliases=["Open AI"])
+        return gazetteer
+
+    def test_aliases_resolve_to_canonical_id(self, gazetteer):
+        """Aliases are reported under the canonical name and ID."""
+        entities = gazetteer.extract("vbe partnered with open ai last year")
+
+        assert [e['entity_id'] for e in entities] == [self.vbe_id, self.openai_id]
+        assert entities[0]['name'] == "Von Base Enterprises"
+        assert entities[0]['surface_form'] == "vbe"
+        assert entities[1]['start'] == 19
+        assert entities[1]['end'] == 26
+
+    def test_leftmost_longest(self, gazetteer):
+        """The longest alias wins when matches overlap."""
+        entities = gazetteer.extract("Von Base Enterprises ships XR")
+
+        assert len(entities) == 1
+        assert entities[0]['end'] == len("Von Base Enterprises")
+
+    def test_word_boundaries(self, gazetteer):
+        """Aliases embedded inside other words are not matched."""
+        assert gazetteer.extract("OpenAIs and VBEX are not entities") == []
+
+    def test_stopword_and_short_single_token_names_skipped(self, gazetteer):
+        """One-word names that are common words or too short never match."""
+        gazetteer.add_entity(uuid4(), "The", "work_of_art")
+        gazetteer.add_entity(uuid4(), "Bob", "person")
+
+        entities = gazetteer.extract("the report bob sent to vbe")
+
+        assert [e['entity_id'] for e in entities] == [self.vbe_id]
+
+    def test_removed_entity_redirects_to_merge_target(self, gazetteer):
+        """Names of a merged-away entity resolve to the entity it merged into."""
+        duplicate_id = uuid4()
+        gazetteer.add_entity(duplicate_id, "Von Base Corp", "organization")
+
+        gazetteer.remove_entity(duplicate_id, merged_into=self.vbe_id)
+        gazetteer.remove_entity(self.openai_id)
+
+        assert gazetteer.lookup("Von Base Corp") == self.vbe_id
+        assert gazetteer.lookup("OpenAI") is None
+        assert [e['entity_id'] for e in gazetteer.extract("Von Base Corp and OpenAI")] == [self.vbe_id]
+
+    @pytest.mark.asyncio
+    async def test_load_without_canonicalization_table(self):
+        """Loading tolerates a missing entity_canonicalization table."""
+        from memory_service.gazetteer import EntityGazetteer
+
+        node_id = uuid4()
+        conn = MockConnection([{'id': node_id, 'entity_name': 'Nike', 'entity_type': 'organization'}])
+
+        gazetteer = EntityGazetteer()
+        assert await gazetteer.load(conn) == 1
+        assert gazetteer.loaded
+        assert gazetteer.lookup("NIKE") == node_id
+
+    @pytest.mark.asyncio
+    async def test_load_with_aliases(self):
+        """Canonicalization aliases are attached to their canonical entity."""
+        from memory_service.gazetteer import EntityGazetteer
+
+        node_id = uuid4()
+        conn = MockConnection(
+            [{'id': node_id, 'entity_name': 'PostgreSQL', 'entity_type': 'technology'}],
+            [{'alias': 'Postgres', 'canonical_id': node_id}]
+        )
+
+        gazetteer = EntityGazetteer()
+        await gazetteer.load(conn)
+
+        entities = gazetteer.extract("We moved to postgres")
+        assert entities[0]['name'] == "PostgreSQL"
+        assert entities[0]['entity_id'] == node_id
+
+
+class TestGraphStoreWithGazetteer:
+    """GraphProvider.store trusts gazetteer IDs instead of looking them up."""
+
+    @pytest.mark.asyncio
+    async def test_gazetteer_id_is_updated_directly_and_merged_ids_fall_back(self):
+        from benchmarks.backends import (
+            HashEntityEncoder,
+            InMemoryGraphConnection,
+            InMemoryGraphPool,
+        )
+        from memory_service.models import ProviderConfig
+        from memory_service.providers import GraphProvider
+
+        class Connection(InMemoryGraphConnection):
+            def __init__(self):
+                super().__init__()
+                self.lookups = []
+
+            async def fetchrow(self, query, *args):
+                self.lookups.append(query)
+                return await super().fetchrow(query, *args)
+
+        conn = Connection()
+        nike_id = uuid4()
+        conn.nodes[('Nike', 'organization')] = conn.nodes_by_id[nike_id] = {'id': nike_id, 'mention_count': 1}
+        provider = GraphProvider(ProviderConfig(name="graph", config={'connection_pool': InMemoryGraphPool(conn)}))
+        provider._embedding_model = HashEntityEncoder()
+
+        await provider.store("Nike opened a new store downtown", [], {'importance_score': 0.5})
+
+        assert conn.nodes_by_id[nike_id]['mention_count'] == 2
+        assert conn.lookups == []
+
+        # Merged away by entity deduplication: the UPDATE matches nothing
+        del conn.nodes[('Nike', 'organization')], conn.nodes_by_id[nike_id]
+        await provider.store("Nike opened a second store", [], {'importance_score': 0.5})
+
+        assert provider._gazetteer_stale
+        assert len(conn.lookups) == 1
+        assert ('Nike', 'organization') in conn.nodes
+        assert conn.nodes[('Nike', 'organization')]['id'] != nike_id
@@ -0,0 +1,156 @@
+"""
+Test suite for the graph centrality job.
+
+Checks the sparse PageRank/degree computation and that results are written
+back with a single bulk UPDATE.
+"""
+
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+
+class TestComputeCentrality:
+    """Tests for compute_centrality."""
+
+    def test_star_graph(self):
+        """The hub of a star outranks its leaves and has full degree."""
+        from memory_service.graph_analytics import compute_centrality
+
+        sources = np.array([0, 0, 0, 0])
+        targets = np.array([1, 2, 3, 4])
+        result = compute_centrality(6, sources, targets, np.ones(4))
+
+        pagerank = result['pagerank']
+        assert pagerank.sum() == pytest.approx(1.0)
+        assert pagerank[0] == pagerank.max()
+        assert pagerank[1] == pytest.approx(pagerank[4])
+        # Node 5 is isolated: it only receives teleport and dangling mass
+        assert pagerank[5] < pagerank[1]
+        assert result['degree'].tolist() == [4, 1, 1, 1, 1, 0]
+
+    def test_weights_and_parallel_edges(self):
+        """Stronger and parallel edges attract more rank; degree counts neighbours once."""
+        from memory_service.graph_analytics import compute_centrality
+
+        sources = np.array([0, 0, 0])
+        targets = np.array([1, 1, 2])
+        result = compute_centrality(3, sources, targets, np.array([0.5, 0.5, 0.1]))
+
+        assert result['pagerank'][1] > result['pagerank'][2]
+        assert result['degree'].tolist() == [2, 1, 1]
+
+
+class AnalyticsConnection:
+    """Mock connection recording executed statements."""
+
+    def __init__(self, nodes, edges, locked=False):
+        self.nodes = nodes
+        self.edges = edges
+        self.locked = locked
+        self.executed = []
+
+    async def fetchval(self, query: str, *args):
+        if "pg_try_advisory_lock" in query:
+            return not self.locked
+        return None
+
+    async def execute(self, query: str, *args):
+        self.executed.append((query, args))
+        return "UPDATE"
+
+    async def fetch(self, query: str, *args):
+        if "FROM graph_nodes" in query:
+            return [{'id': node_id} for node_id in self.nodes]
+        if "FROM graph_relationships" in query:
+            return [{'from_node_id': a, 'to_node_id': b, 'strength': s} for a, b, s in self.edges]
+        return []
+
+
+class TestGraphAnalyticsJob:
+    """Tests for GraphAnalyticsJob.run_once."""
+
+    @pytest.mark.asyncio
+    async def test_run_once_bulk_update(self):
+        """All nodes are updated by one UPDATE ... FROM unnest statement."""
+        from memory_service.graph_analytics import GraphAnalyticsJob
+
+        nodes = [uuid4() for _ in range(3)]
+        conn = AnalyticsConnection(nodes, [(nodes[0], nodes[1], 0.8), (nodes[0], nodes[2], 0.4)])
+        result = await GraphAnalyticsJob(self._provider(conn)).run_once()
+
+        updates = [(query, args) for query, args in conn.executed if "UPDATE graph_nodes" in query]
+        assert len(updates) == 1
+        query, (ids, pagerank, degree) = updates[0]
+        assert ids == nodes
+        assert degree == [2, 1, 1]
+        assert pagerank[0] == max(pagerank)
+        # Mention-based importance scores are left alone
+        assert "importance_score" not in query
+        assert result['nodes'] == 3
+        assert result['edges'] == 2
+        assert "pg_advisory_unlock" in conn.executed[-1][0]
+
+    @pytest.mark.asyncio
+    async def test_run_skipped_while_another_worker_holds_the_lock(self):
+        from memory_service.graph_analytics import GraphAnalyticsJob
+
+        conn = AnalyticsConnection([uuid4()], [], locked=True)
+
+        assert await GraphAnalyticsJob(self._provider(conn)).run_once() is None
+        assert conn.executed == []
+
+    @staticmethod
+    def _provider(conn):
+        class Pool:
+            def acquire(self):
+                class AcquireContext:
+                    async def __aenter__(self):
+                        return conn
+
+                    async def __aexit__(self, *args):
+                        return None
+                return AcquireContext()
+
+        class Provider:
+            connection_pool = Pool()
+
+            async def _ensure_pool(self):
+                return None
+
+        return Provider()
+
+
+class TestLiveStats:
+    """Tests for the dashboard stats queries."""
+
+    @pytest.mark.asyncio
+    async def test_top_entities_before_first_analytics_run(self):
+        """Without the degree column, connections are counted from relationships."""
+        from asyncpg.exceptions import UndefinedColumnError
+        from memory_service.graph_live_sync import get_graph_live_stats
+
+        class Connection:
+            def __init__(self):
+                self.queries = []
+
+            async def fetchval(self, query, *args):
+                return 1
+
+            async def fetch(self, query, *args):
+                self.queries.append(query)
+                if "degree as connections" in query:
+                    raise UndefinedColumnError('column "degree" does not exist')
+                if "FROM graph_nodes n" in query:
+                    return [{'entity_name': 'Nike', 'entity_type': 'organization',
+                             'importance_score': 0.5, 'connections': 3}]
+                return []
+
+        conn = Connection()
+        stats = await get_graph_live_stats(conn)
+
+        assert stats['top_entities'] == [
+            {'name': 'Nike', 'type': 'organization', 'importance': 0.5, 'connections': 3}
+        ]
+        assert len(conn.queries) == 3
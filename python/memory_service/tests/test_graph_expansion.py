@@ -0,0 +1,263 @@
+"""
+Test suite for graph-augmented retrieval.
+
+Covers the bounded graph walk in GraphProvider.expand_memories and the
+re-ranking done by UnifiedVectorStore without a live database.
+"""
+
+import asyncio
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+
+class ExpansionConnection:
+    """Mock connection serving memory_entity_map, relationships and memories."""
+
+    def __init__(self, seed_entities, edges, memories_by_entity):
+        self.seed_entities = seed_entities
+        self.edges = edges
+        self.memories_by_entity = memories_by_entity
+        self.edge_queries = 0
+        self.memory_query = None
+
+    async def fetch(self, query: str, *args):
+        if "SELECT DISTINCT entity_id" in query:
+            return [{'entity_id': e} for e in self.seed_entities[:args[1]]]
+
+        if "FROM graph_relationships" in query:
+            self.edge_queries += 1
+            frontier, min_strength, limit = set(args[0]), args[1], args[2]
+            rows = [
+                {'from_node_id': a, 'to_node_id': b, 'strength': s}
+                for a, b, s in self.edges
+                if (a in frontier or b in frontier) and s >= min_strength
+            ]
+            return sorted(rows, key=lambda r: -r['strength'])[:limit]
+
+        if "FROM unnest" in query:
+            self.memory_query = (query, args)
+            entity_ids, proximities, exclude, _, limit = args[:5]
+            best = {}
+            for entity_id, proximity in zip(entity_ids, proximities, strict=True):
+                for memory_id in self.memories_by_entity.get(entity_id, []):
+                    if memory_id not in exclude:
+                        best[memory_id] = max(best.get(memory_id, 0.0), proximity)
+            ranked = sorted(best.items(), key=lambda item: -item[1])[:limit]
+            return [{
+                'id': memory_id,
+                'content': f"memory {memory_id}",
+                'metadata': {},
+                'importance_score': 0.5,
+                'created_at': datetime.utcnow(),
+                'proximity': proximity,
+                'similarity_score': 0.4
+            } for memory_id, proximity in ranked]
+
+        return []
+
+
+class MockPool:
+    """Mock connection pool returning a single connection."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def acquire(self):
+        conn = self.conn
+
+        class AcquireContext:
+            async def __aenter__(self):
+                return conn
+
+            async def __aexit__(self, *args):
+                return None
+
+        return AcquireContext()
+
+
+def _graph_provider(conn, **config):
+    from memory_service.models import ProviderConfig
+    from memory_service.providers import GraphProvider
+
+    return GraphProvider(ProviderConfig(
+        name="graph",
+        enabled=True,
+        config={'connection_pool': MockPool(conn), **config}
+    ))
+
+
+class TestExpandMemories:
+    """Tests for the bounded graph walk."""
+
+    @pytest.mark.asyncio
+    async def test_proximity_decays_per_hop(self):
+        """Two-hop memories score the product of edge strengths."""
+        a, b, c = uuid4(), uuid4(), uuid4()
+        seed, near, far = uuid4(), uuid4(), uuid4()
+        conn = ExpansionConnection(
+            seed_entities=[a],
+            edges=[(a, b, 0.8), (b, c, 0.5), (a, c, 0.1)],
+            memories_by_entity={a: [seed], b: [near], c: [far]}
+        )
+        provider = _graph_provider(conn)
+
+        result = await provider.expand_memories([seed], max_hops=2, min_strength=0.3)
+
+        scores = {memory.id: proximity for memory, proximity in result['memories']}
+        assert scores == {near: pytest.approx(0.8), far: pytest.approx(0.4)}
+        assert result['hops'] == 2
+        assert result['nodes'] == 3
+        assert not result['truncated']
+        assert set(result['timings_ms']) >= {'seed_entities', 'traverse', 'fetch_memories', 'total'}
+
+    @pytest.mark.asyncio
+    async def test_node_budget_truncates(self):
+        """The walk stops adding nodes once expansion_max_nodes is reached."""
+        hub = uuid4()
+        spokes = [uuid4() for _ in range(20)]
+        conn = ExpansionConnection(
+            seed_entities=[hub],
+            edges=[(hub, spoke, 0.9) for spoke in spokes],
+            memories_by_entity={spoke: [uuid4()] for spoke in spokes}
+        )
+        provider = _graph_provider(conn, expansion_max_nodes=5, expansion_max_memories=3)
+
+        result = await provider.expand_memories([uuid4()], max_hops=3)
+
+        assert result['nodes'] == 5
+        assert result['truncated']
+        assert len(result['memories']) == 3
+        assert conn.edge_queries == 1
+
+
+    @pytest.mark.asyncio
+    async def test_request_filters_reach_memory_query(self):
+        """Expanded memories are restricted like the vector hits they join."""
+        a, b = uuid4(), uuid4()
+        conn = ExpansionConnection(seed_entities=[a], edges=[(a, b, 0.9)],
+                                   memories_by_entity={b: [uuid4()]})
+        provider = _graph_provider(conn)
+        start = datetime(2026, 1, 1)
+
+        await provider.expand_memories(
+            [uuid4()], query_embedding=[0.1, 0.2],
+            filters={'user_id': 'alice', 'source': 'chat'},
+            time_range={'start': start}, min_similarity=0.6
+        )
+
+        query, args = conn.memory_query
+        assert "vm.metadata->>'user_id' = $6" in query
+        assert "vm.metadata->>'source' = $7" in query
+        assert "vm.created_at >= $8" in query
+        assert "1 - (vm.embedding <=> $4::vector) >= $9" in query
+        assert list(args[5:]) == ['alice', 'chat', start, 0.6]
+
+
+class TestGraphAugmentedQuery:
+    """Tests for re-ranking in UnifiedVectorStore."""
+
+    @pytest.fixture
+    def store(self):
+        from memory_service.unified_store import UnifiedVectorStore
+
+        store = UnifiedVectorStore.__new__(UnifiedVectorStore)
+        store.providers = {}
+        return store
+
+    @pytest.mark.asyncio
+    async def test_expanded_memories_are_reranked(self, store):
+        """Graph neighbours compete with vector hits in a single ranking."""
+        from memory_service.models import MemoryResponse, QueryRequest
+
+        hit = MemoryResponse(content="hit", importance_score=0.5, similarity_score=0.5)
+        neighbour = MemoryResponse(content="neighbour", importance_score=0.5, similarity_score=0.55)
+
+        class FakeGraph:
+            enabled = True
+            expansion_timeout_ms = 100
+
+            async def expand_memories(self, seed_ids, **kwargs):
+                return {'memories': [(neighbour, 0.9)], 'nodes': 2, 'hops': 1,
+                        'truncated': False, 'timings_ms': {'total': 1.0}}
+
+        store.providers['graph'] = FakeGraph()
+        memories, metadata = await store._expand_with_graph(
+            [hit], [0.1, 0.2], QueryRequest(query="q", graph_expand=True)
+        )
+
+        assert [m.content for m in memories] == ["neighbour", "hit"]
+        assert metadata['memories_added'] == 1
+        assert metadata['timings_ms'] == {'total': 1.0}
+
+    @pytest.mark.asyncio
+    async def test_request_constraints_passed_to_expansion(self, store):
+        """User, conversation, time range and similarity floor reach the graph provider."""
+        from memory_service.models import MemoryResponse, QueryRequest
+
+        calls = []
+
+        class FakeGraph:
+            enabled = True
+            expansion_timeout_ms = 100
+
+            async def expand_memories(self, seed_ids, **kwargs):
+                calls.append(kwargs)
+                return {'memories': [], 'nodes': 0, 'hops': 0, 'truncated': False, 'timings_ms': {}}
+
+        store.providers['graph'] = FakeGraph()
+        request = QueryRequest(query="q", graph_expand=True, user_id="alice", conversation_id="c1",
+                               filters={'source': 'chat'}, min_similarity=0.5,
+                               time_range={'start': datetime(2026, 1, 1)})
+        await store._expand_with_graph([MemoryResponse(content="hit")], [0.1], request)
+
+        assert calls[0]['filters'] == {'source': 'chat', 'user_id': 'alice', 'conversation_id': 'c1'}
+        assert calls[0]['time_range'] == request.time_range
+        assert calls[0]['min_similarity'] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_timeout_returns_vector_results(self, store):
+        """A slow expansion falls back to the unchanged vector hits."""
+        from memory_service.models import MemoryResponse, QueryRequest
+
+        hit = MemoryResponse(content="hit", similarity_score=0.5)
+
+        class SlowGraph:
+            enabled = True
+            expansion_timeout_ms = 5
+
+            async def expand_memories(self, seed_ids, **kwargs):
+                await asyncio.sleep(1)
+
+        store.providers['graph'] = SlowGraph()
+        memories, metadata = await store._expand_with_graph(
+            [hit], None, QueryRequest(query="q", graph_expand=True)
+        )
+
+        assert memories == [hit]
+        assert metadata['error'] == 'timeout'
+
+    @pytest.mark.asyncio
+    async def test_expansion_is_capped_at_the_budget(self, store):
+        """An expansion running past expansion_timeout_ms is cut there, not at a multiple of it."""
+        import time
+
+        from memory_service.models import MemoryResponse, QueryRequest
+
+        class SlowGraph:
+            enabled = True
+            expansion_timeout_ms = 50
+
+            async def expand_memories(self, seed_ids, **kwargs):
+                await asyncio.sleep(0.08)
+                return {'memories': [], 'nodes': 0, 'hops': 0, 'truncated': False, 'timings_ms': {}}
+
+        store.providers['graph'] = SlowGraph()
+        started = time.perf_counter()
+        _, metadata = await store._expand_with_graph(
+            [MemoryResponse(content="hit", similarity_score=0.5)], None, QueryRequest(query="q", graph_expand=True)
+        )
+
+        assert metadata['error'] == 'timeout'
+        assert time.perf_counter() - started < 0.08
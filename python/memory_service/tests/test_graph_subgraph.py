@@ -0,0 +1,127 @@
+"""
+Test suite for bounded subgraph extraction.
+
+Covers the columnar result layout, edge limits and the graph-version cache
+behind /graph/query and /graph/insights.
+"""
+
+from uuid import uuid4
+
+import pytest
+
+
+class SubgraphConnection:
+    """Mock connection returning CTE rows and a configurable graph version."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.version = 1
+        self.fetch_calls = 0
+
+    async def fetchval(self, query: str, *args):
+        return self.version
+
+    async def fetch(self, query: str, *args):
+        self.fetch_calls += 1
+        return self.rows
+
+
+@pytest.fixture
+def nodes():
+    return [uuid4() for _ in range(3)]
+
+
+@pytest.fixture
+def connection(nodes):
+    rows = [
+        {'kind': 'node', 'id': nodes[0], 'target': None, 'label': 'Nike', 'type': 'organization',
+         'weight': 0.9, 'depth': 0, 'total_nodes': 4},
+        {'kind': 'node', 'id': nodes[1], 'target': None, 'label': 'Adidas', 'type': 'organization',
+         'weight': 0.7, 'depth': 1, 'total_nodes': 4},
+        {'kind': 'node', 'id': nodes[2], 'target': None, 'label': 'Portland', 'type': 'location',
+         'weight': 0.4, 'depth': 1, 'total_nodes': 4},
+        {'kind': 'edge', 'id': nodes[0], 'target': nodes[1], 'label': None, 'type': 'competes_with',
+         'weight': 0.8, 'depth': None, 'total_nodes': None},
+        {'kind': 'edge', 'id': nodes[0], 'target': nodes[2], 'label': None, 'type': 'located_in',
+         'weight': 0.6, 'depth': None, 'total_nodes': None},
+    ]
+    return SubgraphConnection(rows)
+
+
+@pytest.fixture
+def graph_provider(connection):
+    from memory_service.models import ProviderConfig
+    from memory_service.providers import GraphProvider
+
+    class Pool:
+        def acquire(self):
+            class AcquireContext:
+                async def __aenter__(self):
+                    return connection
+
+                async def __aexit__(self, *args):
+                    return None
+            return AcquireContext()
+
+    return GraphProvider(ProviderConfig(name="graph", enabled=True, config={'connection_pool': Pool()}))
+
+
+class TestExtractSubgraph:
+    """Tests for GraphProvider.extract_subgraph."""
+
+    @pytest.mark.asyncio
+    async def test_columnar_layout(self, graph_provider, nodes):
+        """Nodes are parallel columns and edges reference node positions."""
+        result = await graph_provider.extract_subgraph(entity_names=["Nike"], max_nodes=3)
+
+        assert result['nodes']['id'] == [str(n) for n in nodes]
+        assert result['nodes']['name'] == ['Nike', 'Adidas', 'Portland']
+        assert result['edges']['source'] == [0, 0]
+        assert result['edges']['target'] == [1, 2]
+        assert result['edges']['type'] == ['competes_with', 'located_in']
+        # total_nodes (4) exceeds the three returned nodes
+        assert result['truncated']
+
+    @pytest.mark.asyncio
+    async def test_edge_limit(self, graph_provider):
+        """The extra edge fetched beyond max_edges only flags truncation."""
+        result = await graph_provider.extract_subgraph(entity_names=["Nike"], max_edges=1)
+
+        assert result['edges']['target'] == [1]
+        assert result['truncated']
+
+    @pytest.mark.asyncio
+    async def test_cache_follows_graph_version(self, graph_provider, connection):
+        """Repeated calls are cached until the graph version changes."""
+        first = await graph_provider.extract_subgraph(entity_types=["organization"])
+        second = await graph_provider.extract_subgraph(entity_types=["organization"])
+
+        assert not first['cached']
+        assert second['cached']
+        assert connection.fetch_calls == 1
+
+        connection.version = 2
+        third = await graph_provider.extract_subgraph(entity_types=["organization"])
+
+        assert not third['cached']
+        assert connection.fetch_calls == 2
+
+
+class TestGraphLimitValidation:
+    """Tests for the node/edge budgets accepted by /graph/query."""
+
+    def test_budgets_are_clamped(self):
+        from memory_service.validators import validate_graph_limit
+
+        assert validate_graph_limit("50", "max_nodes", 1, 1000) == 50
+        assert validate_graph_limit(0, "max_nodes", 1, 1000) == 1
+        assert validate_graph_limit(10**6, "max_edges", 0, 5000) == 5000
+
+    @pytest.mark.parametrize("value", ["many", None, 2.5, True, [1]])
+    def test_non_integer_budget_is_rejected(self, value):
+        from fastapi import HTTPException
+        from memory_service.validators import validate_graph_limit
+
+        with pytest.raises(HTTPException) as error:
+            validate_graph_limit(value, "max_nodes", 1, 1000)
+        assert error.value.status_code == 422
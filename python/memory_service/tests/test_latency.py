@@ -0,0 +1,141 @@
+"""
+Test suite for latency histograms and per-stage timings.
+
+Covers bucket accuracy of the log-bucket histogram and the optional timing
+breakdown returned by UnifiedVectorStore for stores and queries.
+"""
+
+import random
+from uuid import uuid4
+
+import pytest
+
+
+class TestLatencyHistogram:
+    """Tests for LatencyHistogram."""
+
+    def test_percentiles_within_bucket_error(self):
+        """Percentiles stay within the ~12.5% bucket width of the exact value."""
+        from memory_service.latency import LatencyHistogram
+
+        rng = random.Random(7)
+        samples = sorted(rng.lognormvariate(-4, 1) for _ in range(10000))
+        histogram = LatencyHistogram()
+        for seconds in samples:
+            histogram.record(seconds)
+
+        for q in (50, 95, 99):
+            exact_ms = samples[int(len(samples) * q / 100) - 1] * 1000
+            assert histogram.percentile(q) == pytest.approx(exact_ms, rel=0.13)
+        assert histogram.count == 10000
+        assert histogram.snapshot()['max_ms'] == pytest.approx(samples[-1] * 1000, rel=1e-3)
+
+    def test_fixed_memory_and_overflow(self):
+        """Huge values land in the last bucket instead of growing the histogram."""
+        from memory_service.latency import LatencyHistogram
+
+        histogram = LatencyHistogram()
+        size = len(histogram.counts)
+        histogram.record(0.0)
+        histogram.record(10 ** 9)
+
+        assert len(histogram.counts) == size
+        assert histogram.counts[0] == 1
+        assert histogram.counts[-1] == 1
+
+    def test_stage_timer_flushes_on_finish(self):
+        """Stages accumulate per request and are recorded as '<operation>.<stage>'."""
+        from memory_service.latency import LatencyRecorder
+
+        recorder = LatencyRecorder()
+        timer = recorder.timer('query')
+        timer.add('embed', 0.010)
+        timer.add('embed', 0.005)
+        with timer.stage('rank'):
+            pass
+
+        assert recorder.histograms == {}
+        breakdown = timer.finish()
+
+        assert breakdown['embed'] == pytest.approx(15.0)
+        assert set(breakdown) == {'embed', 'rank', 'total'}
+        assert set(recorder.snapshot()) == {'query', 'query.embed', 'query.rank'}
+        assert recorder.snapshot()['query.embed']['count'] == 1
+
+
+class FakeEmbeddingModel:
+    async def embed_text(self, text: str):
+        return [0.1, 0.2, 0.3]
+
+
+@pytest.fixture
+def store():
+    from memory_service.latency import LatencyRecorder
+    from memory_service.models import ImportanceScoring, MemoryResponse, ProviderConfig
+    from memory_service.unified_store import UnifiedVectorStore, VectorProvider
+
+    class FakeProvider(VectorProvider):
+        async def store(self, content, embedding, metadata):
+            return uuid4()
+
+        async def query(self, query_embedding, limit, filters):
+            return [MemoryResponse(content="hit", similarity_score=0.9)]
+
+        async def health_check(self):
+            return {'status': 'healthy'}
+
+        async def get_stats(self):
+            return {}
+
+    provider = FakeProvider(ProviderConfig(name="fake", primary=True))
+    store = UnifiedVectorStore.__new__(UnifiedVectorStore)
+    store.providers = {'fake': provider}
+    store.primary_provider = provider
+    store.embedding_model = FakeEmbeddingModel()
+    store.importance_scorer = ImportanceScoring()
+    store.query_cache = {}
+    store.stats = {'total_stores': 0, 'total_queries': 0, 'cache_hits': 0, 'provider_usage': {'fake': 0},
+                   'avg_query_time': 0.0}
+    store.latency = LatencyRecorder()
+    store.deduplication_service = None
+    store.adm_enabled = False
+    store.adm_engine = None
+    return store
+
+
+class TestStoreTimings:
+    """Tests for the timing breakdown on UnifiedVectorStore."""
+
+    @pytest.mark.asyncio
+    async def test_query_timings_only_when_requested(self, store):
+        """The breakdown is opt-in; histograms are always recorded."""
+        from memory_service.models import QueryRequest
+
+        plain = await store.query_memories(QueryRequest(query="plain"))
+        timed = await store.query_memories(QueryRequest(query="timed", include_timings=True))
+
+        assert plain.timings is None
+        assert {'cache', 'embed', 'provider.fake', 'rank', 'serialize', 'total'} <= set(timed.timings)
+        assert store.latency.snapshot()['query']['count'] == 2
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_does_not_mutate_cached_response(self, store):
+        """A timed cache hit returns a copy with fresh timings."""
+        from memory_service.models import QueryRequest
+
+        await store.query_memories(QueryRequest(query="same"))
+        hit = await store.query_memories(QueryRequest(query="same", include_timings=True))
+
+        cached = next(iter(store.query_cache.values()))['response']
+        assert set(hit.timings) == {'cache', 'total'}
+        assert cached.timings is None
+
+    @pytest.mark.asyncio
+    async def test_store_timings(self, store):
+        """Stores report embed, provider and serialize stages."""
+        from memory_service.models import MemoryRequest
+
+        response = await store.store_memory(MemoryRequest(content="note", include_timings=True))
+
+        assert {'embed', 'provider.fake', 'serialize', 'total'} <= set(response.timings)
+        assert 'store.provider.fake' in store.latency.snapshot()
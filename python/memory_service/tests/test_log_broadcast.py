@@ -0,0 +1,144 @@
+"""
+Tests for log broadcasting: single handler fan-out, bounded client queues
+that drop the oldest lines, replay from the ring buffer and cross-thread
+publishing.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+
+import pytest
+
+
+def _logger(broadcaster, name="test.log_broadcast"):
+    log = logging.getLogger(name)
+    log.setLevel(logging.DEBUG)
+    log.propagate = False
+    broadcaster.install(log)
+    return log
+
+
+class TestLogBroadcaster:
+    """Tests for LogBroadcaster and LogSubscription."""
+
+    @pytest.mark.asyncio
+    async def test_fans_out_one_formatted_entry_to_every_subscriber(self):
+        from memory_service.log_broadcast import LogBroadcaster
+
+        broadcaster = LogBroadcaster(capacity=10)
+        log = _logger(broadcaster)
+        first, second = broadcaster.subscribe(), broadcaster.subscribe()
+
+        log.warning("disk at %d%%", 91)
+        a, b = await first.get(timeout=1), await second.get(timeout=1)
+
+        assert a is b
+        payload = json.loads(a.render("json")[len("data: "):])
+        assert payload['message'] == "disk at 91%"
+        assert payload['level'] == "WARNING"
+        assert a.render("plain") == "disk at 91%\n"
+        assert a.render("syslog").startswith("<132>")
+        broadcaster.uninstall(log)
+
+    @pytest.mark.asyncio
+    async def test_replays_recent_lines_then_follows_live(self):
+        from memory_service.log_broadcast import LogBroadcaster
+
+        broadcaster = LogBroadcaster(capacity=3)
+        log = _logger(broadcaster)
+        for i in range(5):
+            log.info(f"line {i}")
+
+        with broadcaster.subscribe(replay=2) as subscription:
+            log.info("live")
+            messages = [(await subscription.get(timeout=1)).message for _ in range(3)]
+            assert await subscription.get(timeout=0.01) is None
+
+        assert messages == ["line 3", "line 4", "live"]
+        assert broadcaster.stats()['subscribers'] == 0
+        assert broadcaster.stats()['buffered'] == 3
+        broadcaster.uninstall(log)
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_drops_oldest_and_reports_count(self):
+        from memory_service.log_broadcast import LogBroadcaster, render_dropped
+
+        broadcaster = LogBroadcaster(capacity=100, client_queue_size=2)
+        log = _logger(broadcaster)
+        subscription = broadcaster.subscribe()
+
+        for i in range(5):
+            log.info(f"line {i}")
+        await asyncio.sleep(0)
+
+        assert (await subscription.get(timeout=1)).message == "line 3"
+        assert subscription.take_dropped() == 3
+        assert subscription.take_dropped() == 0
+        assert json.loads(render_dropped("json", 3)[len("data: "):]) == {'dropped': 3}
+        subscription.close()
+        broadcaster.uninstall(log)
+
+    @pytest.mark.asyncio
+    async def test_records_from_other_threads_reach_the_loop(self):
+        from memory_service.log_broadcast import LogBroadcaster
+
+        broadcaster = LogBroadcaster()
+        log = _logger(broadcaster)
+        subscription = broadcaster.subscribe()
+
+        thread = threading.Thread(target=lambda: log.error("from worker"))
+        thread.start()
+        thread.join()
+
+        entry = await subscription.get(timeout=1)
+        assert entry.message == "from worker"
+        assert entry.render("syslog").startswith("<131>")
+        subscription.close()
+        broadcaster.uninstall(log)
+
+
+class TestLogEndpoints:
+    """/logs/stream and /debug/logs read from the shared broadcaster."""
+
+    def _endpoint(self, path):
+        from memory_service import api
+
+        return next(route.endpoint for route in api.app.routes if getattr(route, 'path', None) == path)
+
+    @pytest.mark.asyncio
+    async def test_stream_subscribes_only_while_iterated(self, monkeypatch):
+        from memory_service import api
+        from memory_service.log_broadcast import LogBroadcaster
+
+        broadcaster = LogBroadcaster()
+        monkeypatch.setattr(api, 'log_broadcaster', broadcaster)
+
+        response = await self._endpoint("/logs/stream")(format="plain", replay=0)
+        # A response that is never sent registers nothing
+        assert broadcaster.stats()['subscribers'] == 0
+
+        body = response.body_iterator
+        assert await body.__anext__() == "Log streaming connected\n"
+        assert broadcaster.stats()['subscribers'] == 1
+        await body.aclose()
+        assert broadcaster.stats()['subscribers'] == 0
+
+    @pytest.mark.asyncio
+    async def test_debug_logs_served_from_the_ring_buffer(self, monkeypatch):
+        from memory_service import api
+        from memory_service.log_broadcast import LogBroadcaster
+
+        broadcaster = LogBroadcaster(capacity=5)
+        log = _logger(broadcaster, "test.debug_logs")
+        monkeypatch.setattr(api, 'log_broadcaster', broadcaster)
+        for i in range(7):
+            log.info(f"line {i}")
+
+        result = await self._endpoint("/debug/logs")(lines=2)
+
+        assert [entry['message'] for entry in result['logs']] == ["line 5", "line 6"]
+        assert result['total_logs_captured'] == 5
+        assert [e.message for e in broadcaster.recent(10)] == [f"line {i}" for i in range(2, 7)]
+        broadcaster.uninstall(log)
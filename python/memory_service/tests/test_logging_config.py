@@ -0,0 +1,140 @@
+"""
+Tests for the logging pipeline: queued records formatted on the listener
+thread, per-call-site rate sampling and single Papertrail attachment.
+"""
+
+import logging
+import threading
+import time
+
+
+class Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+        self.threads = set()
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+        self.threads.add(threading.current_thread().name)
+
+
+def _record(name="memory_service.test", lineno=10, msg="hello", level=logging.INFO):
+    return logging.LogRecord(name, level, __file__, lineno, msg, None, None)
+
+
+class TestRateSamplingFilter:
+    """Tests for per-call-site sampling."""
+
+    def test_limits_each_call_site_per_window(self):
+        from memory_service.logging_config import RateSamplingFilter
+
+        sampler = RateSamplingFilter(limit=2, interval=60)
+
+        passed = [sampler.filter(_record()) for _ in range(5)]
+
+        assert passed == [True, True, False, False, False]
+        assert sampler.filter(_record(lineno=11))
+        assert sampler.filter(_record(level=logging.WARNING))
+        assert sampler.suppressed == 3
+
+    def test_next_window_reports_suppressed_count(self):
+        from memory_service.logging_config import RateSamplingFilter
+
+        sampler = RateSamplingFilter(limit=1, interval=0.05)
+        for _ in range(3):
+            sampler.filter(_record())
+        time.sleep(0.06)
+
+        record = _record(msg="stored %s")
+        assert sampler.filter(record)
+        assert record.msg == "stored %s [2 similar lines suppressed]"
+
+    def test_warnings_and_errors_are_never_sampled(self):
+        from memory_service.logging_config import RateSamplingFilter
+
+        sampler = RateSamplingFilter(limit=1, interval=60)
+
+        assert all(sampler.filter(_record(level=level)) for level in (logging.WARNING, logging.ERROR) * 10)
+        assert sampler.suppressed == 0
+
+    def test_sampling_is_opt_in(self, monkeypatch):
+        import memory_service.logging_config as logging_config
+
+        samplers = []
+
+        class Pipeline:
+            def __init__(self, handlers, sampler=None):
+                samplers.append(sampler)
+
+            def start(self):
+                pass
+
+            def stop(self):
+                pass
+
+            def add_handler(self, handler):
+                pass
+
+        monkeypatch.setattr(logging_config, 'LoggingPipeline', Pipeline)
+        monkeypatch.setattr(logging_config, '_pipeline', None)
+        monkeypatch.setattr(logging_config, 'setup_papertrail_logging', lambda: False)
+        monkeypatch.delenv('LOG_FILE', raising=False)
+        monkeypatch.delenv('LOG_SAMPLE_LIMIT', raising=False)
+        logging_config.setup_logging()
+        monkeypatch.setenv('LOG_SAMPLE_LIMIT', '5')
+        logging_config.setup_logging()
+
+        assert samplers[0] is None
+        assert samplers[1].limit == 5
+
+
+class TestLoggingPipeline:
+    """Tests for the queue handler and listener."""
+
+    def test_formats_on_listener_thread_once_per_record(self):
+        from memory_service.logging_config import LoggingPipeline
+
+        formatted_on = []
+
+        class Lazy:
+            def __str__(self):
+                formatted_on.append(threading.current_thread().name)
+                return "lazy"
+
+        capture = Capture()
+        log = logging.getLogger("memory_service.test_pipeline")
+        log.setLevel(logging.INFO)
+        pipeline = LoggingPipeline([capture])
+        log.addHandler(pipeline.queue_handler)
+        log.propagate = False
+        pipeline.listener.start()
+        pipeline.running = True
+        try:
+            log.info("value %s", Lazy())
+        finally:
+            log.removeHandler(pipeline.queue_handler)
+            pipeline.stop()
+
+        assert capture.lines == ["value lazy"]
+        assert formatted_on and threading.current_thread().name not in formatted_on
+        assert threading.current_thread().name not in capture.threads
+
+    def test_papertrail_handler_attached_once(self, monkeypatch):
+        import memory_service.logging_config as logging_config
+
+        capture = Capture()
+        monkeypatch.setattr(logging_config, 'create_papertrail_handler', lambda *args: capture)
+        capture.address = ('logs.example.com', 1234)
+        pipeline = logging_config.LoggingPipeline([])
+        monkeypatch.setattr(logging_config, '_pipeline', pipeline)
+        pipeline.start()
+        try:
+            assert logging_config.setup_papertrail_logging()
+            logging.getLogger("memory_service.api").warning("once")
+        finally:
+            pipeline.stop()
+
+        assert pipeline.listener.handlers == (capture,)
+        assert capture.lines.count("once") == 1
+        assert capture not in logging.getLogger("memory_service").handlers
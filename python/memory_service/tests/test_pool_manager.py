@@ -0,0 +1,280 @@
+"""
+Tests for the shared Postgres pool manager: budgeted lanes over one pool,
+per-lane wait accounting, and the subsystems that borrow from it.
+"""
+
+import asyncio
+
+import pytest
+
+
+class FakeConnection:
+    def __init__(self, index):
+        self.index = index
+        self.statements = []
+
+    async def execute(self, query, *args, timeout=None):
+        self.statements.append(' '.join(query.split()))
+        return "OK"
+
+    async def fetch(self, query, *args, timeout=None):
+        self.statements.append(' '.join(query.split()))
+        return []
+
+    async def fetchval(self, query, *args, column=0, timeout=None):
+        self.statements.append(' '.join(query.split()))
+        return 1
+
+    def transaction(self):
+        class Transaction:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *args):
+                return None
+
+            async def start(self):
+                return None
+
+            async def rollback(self):
+                return None
+
+        return Transaction()
+
+
+class FakePool:
+    """A pool with a real capacity: acquire blocks while every connection is out."""
+
+    def __init__(self, size):
+        self.connections = [FakeConnection(i) for i in range(size)]
+        self._idle = asyncio.Queue()
+        for conn in self.connections:
+            self._idle.put_nowait(conn)
+        self.closed = False
+
+    async def acquire(self, timeout=None):
+        return await asyncio.wait_for(self._idle.get(), timeout)
+
+    async def release(self, conn):
+        self._idle.put_nowait(conn)
+
+    def get_size(self):
+        return len(self.connections)
+
+    def get_idle_size(self):
+        return self._idle.qsize()
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_asyncpg(monkeypatch):
+    import asyncpg
+
+    created = []
+
+    async def create_pool(dsn, max_size, init=None, **kwargs):
+        await asyncio.sleep(0)
+        pool = FakePool(max_size)
+        for conn in pool.connections:
+            if init:
+                await init(conn)
+        created.append({'dsn': dsn, 'pool': pool, **kwargs})
+        return pool
+
+    monkeypatch.setattr(asyncpg, 'create_pool', create_pool)
+    return created
+
+
+def _manager(**kwargs):
+    from memory_service.pool_manager import SharedPoolManager
+
+    config = {'host': 'db', 'port': 5432, 'database': 'memories', 'user': 'u', 'password': 'p'}
+    return SharedPoolManager(config, **kwargs)
+
+
+class TestSharedPoolManager:
+    """Tests for lanes, budgets and wait accounting."""
+
+    def test_parse_pool_classes(self):
+        from memory_service.pool_manager import parse_pool_classes
+
+        assert parse_pool_classes("query=20, write=8,background=4,") == {'query': 20, 'write': 8, 'background': 4}
+        assert parse_pool_classes("") == {}
+
+    def test_default_budgets_follow_max_size(self):
+        manager = _manager(max_size=10, classes={'background': 1})
+
+        assert manager.lane('query').budget == 10
+        assert manager.lane('write').budget == 5
+        assert manager.lane('background').budget == 1
+        # Unknown lanes are sized like background work
+        assert manager.lane('reports').budget == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_start_creates_one_pool(self, fake_asyncpg):
+        manager = _manager(max_size=4)
+        hooked = []
+
+        async def hook(conn):
+            hooked.append(conn.index)
+
+        manager.add_init_hook(hook)
+        pools = await asyncio.gather(*(manager.start() for _ in range(5)))
+
+        assert len(fake_asyncpg) == 1
+        assert fake_asyncpg[0]['dsn'] == "postgresql://u:p@db:5432/memories"
+        assert all(pool is pools[0] for pool in pools)
+        assert sorted(hooked) == [0, 1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_lane_budget_caps_connections_and_counts_waiters(self, fake_asyncpg):
+        manager = _manager(max_size=4, classes={'background': 1})
+        lane = manager.lane('background')
+
+        first = await lane.acquire()
+        waiter = asyncio.ensure_future(lane.acquire())
+        await asyncio.sleep(0.01)
+
+        # The pool has idle connections, but the lane's budget is spent
+        assert not waiter.done()
+        assert manager.pool.get_idle_size() == 3
+        assert manager.stats()['waiting'] == 1
+        assert manager.stats()['classes']['background']['waiting'] == 1
+
+        await lane.release(first)
+        second = await waiter
+        await lane.release(second)
+
+        stats = lane.stats()
+        assert stats['waiting'] == 0 and stats['in_use'] == 0
+        assert stats['acquired'] == 2
+        assert stats['wait']['count'] == 2
+        assert stats['wait']['max_ms'] >= 5
+
+    @pytest.mark.asyncio
+    async def test_lanes_share_one_pool(self, fake_asyncpg):
+        manager = _manager(max_size=2)
+
+        async with manager.lane('query').acquire() as a:
+            async with manager.lane('write').acquire() as b:
+                assert a is not b
+                assert manager.stats()['used'] == 2
+                blocked = asyncio.create_task(manager.lane('graph').fetchval("SELECT 1"))
+                await asyncio.sleep(0.01)
+                # Pool exhausted: the graph lane waits on the shared pool
+                assert manager.stats()['classes']['graph']['waiting'] == 1
+
+        assert await blocked == 1
+        assert len(fake_asyncpg) == 1
+        assert manager.stats()['used'] == 0
+
+    @pytest.mark.asyncio
+    async def test_background_lanes_leave_headroom_for_queries(self, fake_asyncpg):
+        manager = _manager(max_size=4)
+        assert manager.non_interactive_limit == 3
+
+        held = [await manager.lane(name).acquire() for name in ('write', 'write', 'graph')]
+        blocked = asyncio.ensure_future(manager.lane('background').acquire())
+        await asyncio.sleep(0.01)
+
+        # Non-interactive lanes are within their own budgets but share a cap of 3
+        assert not blocked.done()
+        async with manager.lane('query').acquire(timeout=0.1) as conn:
+            assert conn is not None
+
+        await manager.lane('write').release(held[0])
+        await manager.lane('background').release(await blocked)
+        await manager.lane('write').release(held[1])
+        await manager.lane('graph').release(held[2])
+        assert manager.stats()['used'] == 0
+
+    @pytest.mark.asyncio
+    async def test_acquire_timeout_frees_the_slot(self, fake_asyncpg):
+        manager = _manager(max_size=1)
+        lane = manager.lane('query')
+
+        held = await lane.acquire()
+        with pytest.raises(asyncio.TimeoutError):
+            await lane.acquire(timeout=0.01)
+        await lane.release(held)
+
+        assert lane.stats()['timeouts'] == 1
+        assert lane.stats()['waiting'] == 0
+        async with lane.acquire(timeout=0.1):
+            assert lane.in_use == 1
+
+    @pytest.mark.asyncio
+    async def test_lane_close_is_noop_and_manager_closes_pool(self, fake_asyncpg):
+        manager = _manager(max_size=2)
+        await manager.start()
+        pool = manager.pool
+
+        await manager.lane('query').close()
+        assert not pool.closed
+
+        await manager.close()
+        assert pool.closed
+        assert manager.pool is None
+
+
+class TestSharedPoolConsumers:
+    """PgVectorProvider, DatabaseMonitor and TemporalMemoryStore on the shared pool."""
+
+    @pytest.mark.asyncio
+    async def test_pgvector_uses_query_and_write_lanes(self, fake_asyncpg):
+        from memory_service.models import ProviderConfig
+        from memory_service.providers import PgVectorProvider
+
+        manager = _manager(max_size=4)
+        provider = PgVectorProvider(ProviderConfig(name="pgvector", primary=True, config={
+            'host': 'db', 'port': 5432, 'database': 'memories', 'user': 'u', 'password': 'p',
+            'embedding_dim': 4, 'warmup_probes': 0, 'pool_manager': manager
+        }))
+
+        await provider.start()
+        assert provider.connection_pool is manager.lane('query')
+        assert provider.write_pool is manager.lane('write')
+
+        writes_before = manager.lane('write').acquired
+        await provider.store("hello", [0.1, 0.2, 0.3, 0.4], {})
+        assert manager.lane('write').acquired == writes_before + 1
+
+        await provider.close()
+        assert not manager.pool.closed
+        assert len(fake_asyncpg) == 1
+
+    @pytest.mark.asyncio
+    async def test_db_monitor_reports_real_waiters(self, fake_asyncpg):
+        from memory_service.db_monitoring import DatabaseMonitor
+
+        manager = _manager(max_size=2, classes={'background': 1})
+        monitor = DatabaseMonitor("postgresql://unused", pool_manager=manager)
+        await monitor.initialize_pool()
+        assert monitor.pool is manager.lane('background')
+
+        held = await manager.lane('background').acquire()
+        waiter = asyncio.ensure_future(manager.lane('background').acquire())
+        await asyncio.sleep(0.01)
+
+        stats = await monitor.get_pool_stats()
+        assert stats.waiting == 1
+        assert stats.max_size == 2
+        assert stats.classes['background']['in_use'] == 1
+
+        await manager.lane('background').release(held)
+        await manager.lane('background').release(await waiter)
+        await monitor.close()
+        assert not manager.pool.closed
+
+    @pytest.mark.asyncio
+    async def test_temporal_store_borrows_query_lane(self, fake_asyncpg):
+        from memory_service.temporal import TemporalMemoryStore
+
+        manager = _manager(max_size=2)
+        store = TemporalMemoryStore(unified_store=None, db_config={}, pool_manager=manager)
+        await store.initialize()
+
+        assert store.connection_pool is manager.lane('query')
+        assert fake_asyncpg == []
@@ -0,0 +1,188 @@
+"""
+Tests for the explicit provider lifecycle: PgVectorProvider.start() creates
+the pool, ensures the schema and warms hot statements; close() releases it.
+"""
+
+import asyncio
+
+import pytest
+
+
+class LifecycleConnection:
+    """Records statements; rolled-back transactions are tracked separately."""
+
+    def __init__(self, log):
+        self.log = log
+        self.rolled_back = 0
+
+    async def execute(self, query, *args):
+        self.log.append(('execute', ' '.join(query.split())))
+        return "OK"
+
+    async def fetch(self, query, *args):
+        self.log.append(('fetch', ' '.join(query.split()), args[-1] if args else None))
+        return []
+
+    async def fetchval(self, query, *args):
+        self.log.append(('fetchval', ' '.join(query.split())))
+        return 0
+
+    def transaction(self):
+        conn = self
+
+        class Transaction:
+            async def start(self):
+                return None
+
+            async def rollback(self):
+                conn.rolled_back += 1
+
+        return Transaction()
+
+
+class LifecyclePool:
+    def __init__(self, min_size=5):
+        self.log = []
+        self.connections = [LifecycleConnection(self.log) for _ in range(min_size)]
+        self.min_size = min_size
+        self.closed = False
+        self._next = 0
+
+    def get_min_size(self):
+        return self.min_size
+
+    async def _take(self):
+        conn = self.connections[self._next % len(self.connections)]
+        self._next += 1
+        return conn
+
+    def acquire(self):
+        pool = self
+
+        class AcquireContext:
+            def __await__(self):
+                return pool._take().__await__()
+
+            async def __aenter__(self):
+                return await pool._take()
+
+            async def __aexit__(self, *args):
+                return None
+
+        return AcquireContext()
+
+    async def release(self, conn):
+        return None
+
+    async def close(self):
+        self.closed = True
+
+
+def _provider(**overrides):
+    from memory_service.models import ProviderConfig
+    from memory_service.providers import PgVectorProvider
+
+    config = {'host': 'localhost', 'port': 5432, 'database': 'db', 'user': 'u', 'password': 'p',
+              'table_name': 'vector_memories', 'embedding_dim': 4, **overrides}
+    return PgVectorProvider(ProviderConfig(name="pgvector", primary=True, config=config))
+
+
+class TestPgVectorLifecycle:
+    """Tests for start(), warmup and close()."""
+
+    def test_constructor_does_not_connect(self, monkeypatch):
+        import asyncpg
+
+        async def create_pool(*args, **kwargs):
+            raise AssertionError("constructor must not connect")
+
+        monkeypatch.setattr(asyncpg, 'create_pool', create_pool)
+        provider = _provider()
+
+        assert provider.connection_pool is None
+        assert "INSERT INTO vector_memories" in provider._insert_sql
+
+    @pytest.mark.asyncio
+    async def test_start_is_shared_and_warms_every_connection(self, monkeypatch):
+        import asyncpg
+
+        pool = LifecyclePool()
+        calls = []
+
+        async def create_pool(*args, **kwargs):
+            calls.append(kwargs)
+            await asyncio.sleep(0)
+            return pool
+
+        monkeypatch.setattr(asyncpg, 'create_pool', create_pool)
+        provider = _provider(warmup_probes=2)
+
+        await asyncio.gather(provider.start(), provider.start(), provider._ensure_pool_ready())
+
+        assert len(calls) == 1
+        assert calls[0]['init'] == provider._prepare_connection
+        assert provider.connection_pool is pool
+        assert provider.enabled is True
+
+        ann = ' '.join(provider._query_sql.split())
+        warm_queries = [entry for entry in pool.log if entry[0] == 'fetch' and entry[1] == ann and entry[2] == 0]
+        probes = [entry for entry in pool.log if entry[0] == 'fetch' and entry[1] == ann and entry[2] == 10]
+        assert len(warm_queries) == 5
+        assert len(probes) == 2
+        assert all(conn.rolled_back == 1 for conn in pool.connections)
+        assert sum(1 for entry in pool.log if entry[0] == 'fetchval') == 5
+
+    @pytest.mark.asyncio
+    async def test_prewarm_index_when_enabled(self, monkeypatch):
+        import asyncpg
+
+        pool = LifecyclePool(min_size=1)
+
+        async def create_pool(*args, **kwargs):
+            return pool
+
+        monkeypatch.setattr(asyncpg, 'create_pool', create_pool)
+        provider = _provider(prewarm_index=True, warmup_probes=0)
+        await provider.start()
+
+        assert ('execute', "CREATE EXTENSION IF NOT EXISTS pg_prewarm") in pool.log
+
+    @pytest.mark.asyncio
+    async def test_failed_start_can_be_retried(self, monkeypatch):
+        import asyncpg
+
+        attempts = []
+
+        async def create_pool(*args, **kwargs):
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ConnectionRefusedError("database starting up")
+            return LifecyclePool(min_size=1)
+
+        monkeypatch.setattr(asyncpg, 'create_pool', create_pool)
+        provider = _provider(warmup_probes=0)
+
+        with pytest.raises(ConnectionRefusedError):
+            await provider.start()
+        assert provider.enabled is False
+
+        await provider.start()
+        assert provider.enabled is True
+        assert len(attempts) == 2
+
+    @pytest.mark.asyncio
+    async def test_close_releases_pool(self, monkeypatch):
+        import asyncpg
+
+        pool = LifecyclePool(min_size=1)
+
+        async def create_pool(*args, **kwargs):
+            return pool
+
+        monkeypatch.setattr(asyncpg, 'create_pool', create_pool)
+        provider = _provider(warmup_probes=0)
+        await provider.start()
+        await provider.close()
+
+        assert pool.closed is True
+        assert provider.connection_pool is None
@@ -0,0 +1,136 @@
+"""
+Tests for the sampled query log and its replay tool.
+"""
+
+import json
+import time
+
+import pytest
+
+
+class TestQueryLogSampler:
+    """Test sampling, anonymization and rotation."""
+
+    def test_record_is_anonymized(self, tmp_path):
+        from memory_service.models import QueryRequest, QueryResponse
+        from memory_service.query_log import QueryLogSampler
+
+        sampler = QueryLogSampler(str(tmp_path / "q.jsonl"), sample_rate=1.0, salt="s")
+        request = QueryRequest(query="Secret Project  plans", limit=5, filters={'team': 'alpha'}, user_id="alice")
+        sampler.record("POST /memories/query", request, time.time(), 12.5, QueryResponse(total_found=3))
+        sampler.close()
+
+        raw = (tmp_path / "q.jsonl").read_text()
+        assert "Secret" not in raw and "alpha" not in raw and "alice" not in raw
+        entry = json.loads(raw)
+        assert entry['endpoint'] == "POST /memories/query"
+        assert entry['query_tokens'] == 3
+        assert entry['limit'] == 5
+        assert list(entry['filters']) == ['team']
+        assert entry['user_id'] and entry['user_id'] != "alice"
+        assert entry['latency_ms'] == 12.5
+        assert entry['total_found'] == 3
+        assert entry['status'] == 'ok'
+
+    def test_same_query_same_hash(self, tmp_path):
+        from memory_service.models import QueryRequest
+        from memory_service.query_log import QueryLogSampler
+
+        sampler = QueryLogSampler(str(tmp_path / "q.jsonl"), sample_rate=1.0, salt="s")
+        first = sampler.request_shape(QueryRequest(query="Budget review"))
+        second = sampler.request_shape(QueryRequest(query="budget   REVIEW "))
+        other = sampler.request_shape(QueryRequest(query="launch plan"))
+        sampler.close()
+
+        assert first['query_hash'] == second['query_hash']
+        assert first['query_hash'] != other['query_hash']
+        assert sampler.request_shape(QueryRequest(query=""))['empty'] is True
+
+    def test_sample_rate_bounds(self, tmp_path):
+        from memory_service.query_log import QueryLogSampler
+
+        never = QueryLogSampler(str(tmp_path / "a.jsonl"), sample_rate=0.0)
+        always = QueryLogSampler(str(tmp_path / "b.jsonl"), sample_rate=1.0)
+        assert not any(never.should_sample() for _ in range(100))
+        assert all(always.should_sample() for _ in range(100))
+        never.close()
+        always.close()
+
+    def test_from_env_disabled_by_default(self, monkeypatch):
+        from memory_service.query_log import QueryLogSampler
+
+        monkeypatch.delenv('QUERY_LOG_SAMPLE_RATE', raising=False)
+        assert QueryLogSampler.from_env() is None
+
+    def test_rotation_and_load_order(self, tmp_path):
+        from memory_service.models import QueryRequest
+        from memory_service.query_log import QueryLogSampler, load_query_log
+
+        path = tmp_path / "q.jsonl"
+        sampler = QueryLogSampler(str(path), sample_rate=1.0, max_bytes=2000, backup_count=10)
+        for i in range(40):
+            sampler.record("POST /memories/query", QueryRequest(query=f"query {i}"), 1000.0 + i, 1.0)
+        sampler.close()
+
+        assert list(tmp_path.glob("q.jsonl.*"))
+        entries = load_query_log(path)
+        assert [entry['ts'] for entry in entries] == [1000.0 + i for i in range(40)]
+
+    def test_workers_write_their_own_logs(self, tmp_path, monkeypatch):
+        from memory_service.models import QueryRequest
+        from memory_service.query_log import (
+            QueryLogSampler,
+            load_query_log,
+            process_log_path,
+        )
+
+        path = tmp_path / "query_log.jsonl"
+        assert process_log_path(str(path), pid=1234) == str(tmp_path / "query_log.1234.jsonl")
+
+        monkeypatch.setenv('QUERY_LOG_SAMPLE_RATE', '1')
+        monkeypatch.setenv('QUERY_LOG_PATH', str(path))
+        monkeypatch.setenv('QUERY_LOG_SALT', 's')
+        first = QueryLogSampler.from_env()
+        second = QueryLogSampler(process_log_path(str(path), pid=1), sample_rate=1.0, salt='s')
+        assert first.path == process_log_path(str(path))
+        for i in range(4):
+            (first if i % 2 else second).record("GET /memories", QueryRequest(query="q"), 1000.0 + i, 1.0)
+        first.close()
+        second.close()
+
+        assert not path.exists()
+        assert [entry['ts'] for entry in load_query_log(path)] == [1000.0, 1001.0, 1002.0, 1003.0]
+
+
+class TestReplay:
+    """Test replaying a log against a local store."""
+
+    @pytest.mark.asyncio
+    async def test_replay_reports_cache_hits(self, tmp_path):
+        from benchmarks.replay import replay, seed_store, summarize_log, synthetic_query
+        from benchmarks.scenarios import build_store
+        from memory_service.models import QueryRequest
+        from memory_service.query_log import QueryLogSampler, load_query_log
+
+        path = tmp_path / "q.jsonl"
+        sampler = QueryLogSampler(str(path), sample_rate=1.0)
+        for i in range(20):
+            # Every query is issued twice, so half of the replay should hit the cache
+            request = QueryRequest(query=f"topic {i // 2}", limit=5, filters={'user_id': 'u1'} if (i // 2) % 2 == 0 else {})
+            sampler.record("POST /memories/query", request, 1000.0 + i * 0.001, 2.0)
+        sampler.close()
+        entries = load_query_log(path)
+
+        assert synthetic_query(entries[0]) == synthetic_query(entries[1])
+        assert summarize_log(entries)['repeat_rate'] == 0.5
+
+        store = await build_store('memory', str(tmp_path), 64)
+        await seed_store(store, entries, 50)
+        result = await replay(store, entries, speed=None)
+
+        assert result['queries'] == 20
+        assert result['errors'] == 0
+        assert result['cache_hits'] == 10
+        assert result['cache_hit_ratio'] == 0.5
+        assert result['latency']['count'] == 20
+        assert result['original_latency']['p50_ms'] > 0
@@ -0,0 +1,230 @@
+"""
+Tests for embedding rate limiting: header parsing, token buckets, AIMD
+concurrency, priority lanes and the OpenAI model's retry path.
+"""
+
+import asyncio
+import types
+
+import pytest
+
+
+class TestParsing:
+    """Tests for rate-limit header values."""
+
+    def test_parse_duration(self):
+        from memory_service.rate_limiter import parse_duration
+
+        assert parse_duration("1s") == 1.0
+        assert parse_duration("6m0s") == 360.0
+        assert parse_duration("20ms") == pytest.approx(0.02)
+        assert parse_duration("1h2m3.5s") == pytest.approx(3723.5)
+        assert parse_duration("0.5") == 0.5
+        assert parse_duration("") is None
+        assert parse_duration("soon") is None
+
+    def test_retry_after_prefers_milliseconds(self):
+        from memory_service.rate_limiter import retry_after_seconds
+
+        assert retry_after_seconds({'retry-after-ms': '250', 'retry-after': '1'}) == 0.25
+        assert retry_after_seconds({'retry-after': '2'}) == 2.0
+        assert retry_after_seconds({}) is None
+
+
+class TestBucketsAndConcurrency:
+    """Tests for TokenBucket and AdaptiveConcurrency."""
+
+    def test_bucket_syncs_to_server_quota(self):
+        from memory_service.rate_limiter import TokenBucket
+
+        bucket = TokenBucket(per_minute=600)
+        bucket.sync(limit=1200, remaining=10, reset=None)
+        now = bucket._updated
+
+        assert bucket.capacity == 1200
+        assert bucket.delay(5, now) == 0.0
+        # 10 tokens left, refilled at 20/s: 30 more take 1.5s
+        assert bucket.delay(40, now) == pytest.approx(1.5)
+        # Oversized requests wait for a full bucket instead of forever
+        assert bucket.delay(10_000, now) == pytest.approx((1200 - 10) / 20)
+
+    def test_aimd(self):
+        from memory_service.rate_limiter import AdaptiveConcurrency
+
+        concurrency = AdaptiveConcurrency(initial=4, minimum=1, maximum=6)
+        for _ in range(4):
+            concurrency.on_success()
+        assert 4.9 < concurrency.limit < 5.0
+
+        concurrency.on_overload()
+        assert concurrency.limit < 2.5
+        for _ in range(5):
+            concurrency.on_overload()
+        assert concurrency.limit == 1.0
+
+
+class TestEmbeddingRateLimiter:
+    """Tests for admission order and pauses."""
+
+    @pytest.mark.asyncio
+    async def test_interactive_waiters_go_first(self):
+        from memory_service.rate_limiter import EmbeddingRateLimiter, embedding_priority
+
+        limiter = EmbeddingRateLimiter(initial_concurrency=1, max_concurrency=1)
+        order = []
+
+        async def call(name, priority):
+            with embedding_priority(priority):
+                await limiter.acquire(10)
+            order.append(name)
+            await asyncio.sleep(0.01)
+            await limiter.release()
+
+        await limiter.acquire(10)
+        tasks = [asyncio.create_task(call(f"bulk-{i}", 'bulk')) for i in range(3)]
+        await asyncio.sleep(0.01)
+        tasks.append(asyncio.create_task(call("query", 'interactive')))
+        await asyncio.sleep(0.01)
+        await limiter.release()
+        await asyncio.gather(*tasks)
+
+        assert order == ["query", "bulk-0", "bulk-1", "bulk-2"]
+        assert limiter.stats()['granted'] == {'interactive': 2, 'bulk': 3}
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit_caps_in_flight(self):
+        from memory_service.rate_limiter import EmbeddingRateLimiter
+
+        limiter = EmbeddingRateLimiter(initial_concurrency=2, max_concurrency=2)
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            await limiter.acquire(1)
+            peak = max(peak, limiter.concurrency.in_flight)
+            await asyncio.sleep(0.01)
+            await limiter.release()
+
+        await asyncio.gather(*(call() for _ in range(8)))
+
+        assert peak == 2
+        assert limiter.stats()['in_flight'] == 0
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_pauses_and_halves_concurrency(self):
+        from memory_service.rate_limiter import EmbeddingRateLimiter
+
+        limiter = EmbeddingRateLimiter(initial_concurrency=8)
+        await limiter.acquire(1)
+        await limiter.release(rate_limited=True, retry_after=0.05)
+
+        assert limiter.concurrency.limit == 4.0
+        started = asyncio.get_running_loop().time()
+        await limiter.acquire(1)
+        assert asyncio.get_running_loop().time() - started >= 0.04
+        await limiter.release()
+
+    @pytest.mark.asyncio
+    async def test_token_budget_delays_requests(self):
+        from memory_service.rate_limiter import EmbeddingRateLimiter
+
+        # 6000 tokens per minute = 100 per second
+        limiter = EmbeddingRateLimiter(tokens_per_minute=6000)
+        limiter.update_from_headers({'x-ratelimit-remaining-tokens': '0'})
+
+        started = asyncio.get_running_loop().time()
+        await limiter.acquire(5)
+        assert asyncio.get_running_loop().time() - started >= 0.04
+        await limiter.release()
+
+
+def _raw_response(count, headers=None):
+    data = [types.SimpleNamespace(embedding=[0.1, 0.2]) for _ in range(count)]
+    return types.SimpleNamespace(headers=headers or {},
+                                 parse=lambda: types.SimpleNamespace(data=data))
+
+
+class FakeEmbeddings:
+    """embeddings.with_raw_response.create that fails with the queued errors first."""
+
+    def __init__(self, failures):
+        self.failures = list(failures)
+        self.calls = 0
+        self.with_raw_response = self
+
+    async def create(self, input, model, **options):
+        self.calls += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        return _raw_response(len(input), {'x-ratelimit-limit-requests': '500',
+                                          'x-ratelimit-remaining-requests': '499'})
+
+
+class TestOpenAIRetries:
+    """OpenAIEmbeddingModel requests go through the limiter and survive 429s."""
+
+    def _model(self, failures, **kwargs):
+        from memory_service.embedding_models import OpenAIEmbeddingModel
+
+        model = OpenAIEmbeddingModel(api_key="sk-test", **kwargs)
+        model.client = types.SimpleNamespace(embeddings=FakeEmbeddings(failures))
+        return model
+
+    def _rate_limit_error(self):
+        import openai
+
+        response = types.SimpleNamespace(status_code=429, headers={'retry-after-ms': '10'}, request=None)
+        return openai.RateLimitError("Rate limit reached", response=response, body=None)
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_request_is_retried(self):
+        pytest.importorskip("openai")
+        model = self._model([self._rate_limit_error(), self._rate_limit_error()], max_retries=3)
+
+        embeddings = await model.embed_batch(["first", "second"])
+
+        assert embeddings == [[0.1, 0.2], [0.1, 0.2]]
+        assert model.client.embeddings.calls == 3
+        stats = model.rate_limiter.stats()
+        assert stats['rate_limited'] == 2
+        assert stats['requests_per_minute'] == 500
+
+    @pytest.mark.asyncio
+    async def test_embed_text_gives_up_after_max_retries(self):
+        pytest.importorskip("openai")
+        model = self._model([self._rate_limit_error() for _ in range(3)], max_retries=2)
+
+        with pytest.raises(Exception, match="Rate limit exceeded"):
+            await model.embed_text("hello")
+
+        assert model.client.embeddings.calls == 3
+        assert model.rate_limiter.concurrency.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_request_releases_its_slot(self):
+        pytest.importorskip("openai")
+        model = self._model([])
+        started = asyncio.Event()
+
+        async def hanging_create(**_kwargs):
+            started.set()
+            await asyncio.sleep(3600)
+
+        model.client.embeddings.create = hanging_create
+        task = asyncio.create_task(model.embed_text("hello"))
+        await started.wait()
+        assert model.rate_limiter.concurrency.in_flight == 1
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert model.rate_limiter.concurrency.in_flight == 0
+
+    def test_client_retries_disabled(self):
+        pytest.importorskip("openai")
+        from memory_service.embedding_models import OpenAIEmbeddingModel
+
+        model = OpenAIEmbeddingModel(api_key="sk-test", max_retries=3)
+
+        assert model.client.max_retries == 0
+        assert model.max_retries == 3
@@ -0,0 +1,109 @@
+"""
+Tests for the recall@k harness: synthetic corpus, exact ground truth and
+end-to-end evaluation against the exact in-memory provider.
+"""
+
+import numpy as np
+import pytest
+
+
+class TestSyntheticCorpus:
+    """Test the synthetic dataset generator."""
+
+    def test_deterministic_and_normalized(self):
+        from benchmarks.recall import generate_corpus
+
+        first = generate_corpus(500, 32, num_queries=20, seed=3)
+        second = generate_corpus(500, 32, num_queries=20, seed=3)
+
+        assert np.array_equal(first.vectors, second.vectors)
+        assert first.metadata == second.metadata
+        assert np.allclose(np.linalg.norm(first.vectors, axis=1), 1.0, atol=1e-5)
+        assert first.queries.shape == (20, 32)
+
+    def test_metadata_cardinality(self):
+        from benchmarks.recall import generate_corpus
+
+        corpus = generate_corpus(2000, 16, num_users=5, num_conversations=40)
+
+        users = {m['user_id'] for m in corpus.metadata}
+        conversations = {m['conversation_id'] for m in corpus.metadata}
+        assert len(users) == 5
+        assert len(conversations) <= 40
+        # Each conversation belongs to exactly one user
+        owners = {}
+        for m in corpus.metadata:
+            assert owners.setdefault(m['conversation_id'], m['user_id']) == m['user_id']
+
+    def test_filtered_fraction(self):
+        from benchmarks.recall import generate_corpus
+
+        assert all(f is None for f in generate_corpus(100, 8, num_queries=50).query_filters)
+        filters = generate_corpus(100, 8, num_queries=50, filtered_fraction=1.0,
+                                  filter_field='conversation_id').query_filters
+        assert all(set(f) == {'conversation_id'} for f in filters)
+
+
+class TestGroundTruth:
+    """Test exact top-k computation."""
+
+    def test_matches_brute_force(self):
+        from benchmarks.recall import exact_top_k, generate_corpus
+
+        corpus = generate_corpus(300, 16, num_queries=10, seed=1)
+        truth = exact_top_k(corpus, 5)
+
+        for query, expected in zip(corpus.queries, truth, strict=True):
+            assert expected.tolist() == np.argsort(-(corpus.vectors @ query))[:5].tolist()
+
+    def test_respects_filters(self):
+        from benchmarks.recall import exact_top_k, generate_corpus
+
+        corpus = generate_corpus(300, 16, num_queries=10, filtered_fraction=1.0, seed=2)
+        truth = exact_top_k(corpus, 5)
+
+        for filters, expected in zip(corpus.query_filters, truth, strict=True):
+            assert len(expected) > 0
+            for index in expected:
+                assert corpus.metadata[index]['user_id'] == filters['user_id']
+
+
+class TestIndexConfig:
+    """Test index config parsing."""
+
+    def test_parse(self):
+        from benchmarks.recall import IndexConfig
+
+        config = IndexConfig.parse("ivfflat:lists=100,probes=10")
+        assert config.kind == 'ivfflat'
+        assert config.params == {'lists': 100, 'probes': 10}
+        assert config.label == "ivfflat:lists=100,probes=10"
+        assert IndexConfig.parse("exact").params == {}
+
+    def test_unknown_kind(self):
+        from benchmarks.recall import IndexConfig
+
+        with pytest.raises(ValueError):
+            IndexConfig.parse("annoy:trees=10")
+
+
+class TestRecallRun:
+    """End-to-end evaluation against the exact in-memory provider."""
+
+    @pytest.mark.asyncio
+    async def test_exact_provider_has_full_recall(self, tmp_path):
+        from benchmarks.recall import IndexConfig, generate_corpus, run_recall
+
+        corpus = generate_corpus(400, 16, num_queries=30, filtered_fraction=0.5, seed=4)
+        configs = [IndexConfig.parse("exact"), IndexConfig.parse("hnsw:m=16")]
+
+        results = await run_recall(['memory'], configs, corpus, 10, str(tmp_path))
+
+        # The in-memory provider only supports the exact config
+        assert len(results) == 1
+        result = results[0]
+        assert result['provider'] == 'memory'
+        assert result['queries'] == 30
+        assert result['recall_at_k'] == 1.0
+        assert result['filtered_recall_at_k'] == 1.0
+        assert result['qps'] > 0
@@ -0,0 +1,342 @@
+"""
+Tests for read-replica routing: replica selection, bounded read-your-writes
+via WAL positions, failover to the primary and PgVectorProvider integration.
+"""
+
+import random
+
+import pytest
+
+
+class Node:
+    """One fake Postgres server; connections share its WAL position and read log."""
+
+    def __init__(self, host, lsn="0/100", in_recovery=True):
+        self.host = host
+        self.lsn = lsn
+        self.in_recovery = in_recovery
+        self.reads = []
+        self.fail_reads = False
+
+
+class NodeConnection:
+    def __init__(self, node):
+        self.node = node
+
+    async def execute(self, query, *args, timeout=None):
+        return "OK"
+
+    async def fetch(self, query, *args, timeout=None):
+        if self.node.fail_reads:
+            raise ConnectionError(f"{self.node.host} down")
+        self.node.reads.append(' '.join(query.split())[:40])
+        return []
+
+    async def fetchrow(self, query, *args, timeout=None):
+        if 'pg_is_in_recovery' in query:
+            return {'in_recovery': self.node.in_recovery, 'replay_lsn': self.node.lsn}
+        self.node.reads.append('stats')
+        return {'total_memories': 0, 'avg_importance': None, 'oldest_memory': None,
+                'newest_memory': None, 'table_size': '0 bytes'}
+
+    async def fetchval(self, query, *args, timeout=None, column=0):
+        if 'pg_current_wal_lsn' in query:
+            return self.node.lsn
+        return 0
+
+    def transaction(self):
+        class Transaction:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *args):
+                return None
+
+            async def start(self):
+                return None
+
+            async def rollback(self):
+                return None
+
+        return Transaction()
+
+
+class NodePool:
+    def __init__(self, node, size):
+        self.node = node
+        self.connections = [NodeConnection(node) for _ in range(size)]
+        self.min_size = min(size, 2)
+
+    def get_min_size(self):
+        return self.min_size
+
+    def get_size(self):
+        return len(self.connections)
+
+    def get_idle_size(self):
+        return len(self.connections)
+
+    def acquire(self, timeout=None):
+        conn = self.connections[0]
+
+        class AcquireContext:
+            def __await__(self):
+                async def take():
+                    return conn
+                return take().__await__()
+
+            async def __aenter__(self):
+                return conn
+
+            async def __aexit__(self, *args):
+                return None
+
+        return AcquireContext()
+
+    async def release(self, conn):
+        return None
+
+    async def close(self):
+        return None
+
+
+@pytest.fixture
+def cluster(monkeypatch):
+    """A primary and two replicas keyed by host; create_pool connects by DSN host."""
+    import asyncpg
+
+    nodes = {
+        'primary': Node('primary', lsn="0/200", in_recovery=False),
+        'replica-a': Node('replica-a'),
+        'replica-b': Node('replica-b')
+    }
+    down = set()
+
+    async def create_pool(dsn, max_size=10, **_options):
+        host = dsn.rsplit('@', 1)[1].split(':')[0]
+        if host in down:
+            raise OSError(f"could not connect to {host}")
+        return NodePool(nodes[host], max_size)
+
+    monkeypatch.setattr(asyncpg, 'create_pool', create_pool)
+    return nodes, down
+
+
+async def _started(nodes, **overrides):
+    """Start a provider and forget the warmup statements it ran on the primary."""
+    provider = _provider(**overrides)
+    await provider.start()
+    for node in nodes.values():
+        node.reads.clear()
+    return provider
+
+
+def _provider(**overrides):
+    from memory_service.models import ProviderConfig
+    from memory_service.providers import PgVectorProvider
+
+    config = {'host': 'primary', 'port': 5432, 'database': 'db', 'user': 'u', 'password': 'p',
+              'embedding_dim': 4, 'warmup_probes': 0,
+              'read_replicas': ['replica-a', 'replica-b:5432'], **overrides}
+    return PgVectorProvider(ProviderConfig(name="pgvector", primary=True, config=config))
+
+
+class TestReplicaRouter:
+    """Tests for endpoint parsing and replica selection."""
+
+    def test_parse_lsn_orders_wal_positions(self):
+        from memory_service.replica_router import parse_lsn
+
+        assert parse_lsn("0/16B3748") < parse_lsn("0/16B3749") < parse_lsn("1/0")
+        assert parse_lsn(None) is None
+        assert parse_lsn("garbage") is None
+
+    def test_parse_replica_hosts(self):
+        from memory_service.replica_router import parse_replica_hosts
+
+        assert parse_replica_hosts("a:6432, b", default_port=5433) == [
+            {'host': 'a', 'port': 6432}, {'host': 'b', 'port': 5433}
+        ]
+        assert parse_replica_hosts("") == []
+
+    def _router(self, **kwargs):
+        from memory_service.replica_router import ReplicaRouter
+
+        router = ReplicaRouter.from_config(
+            {'host': 'primary', 'port': 5432, 'database': 'db', 'user': 'u', 'password': 'p'},
+            ['replica-a', 'replica-b'], **kwargs
+        )
+        for endpoint in router.endpoints:
+            endpoint.healthy = True
+        return router
+
+    def test_recent_write_pins_reads_to_primary_until_replayed(self):
+        from memory_service.replica_router import parse_lsn
+
+        router = self._router(staleness_window=60)
+        assert router.choose() is not None
+
+        # WAL position unknown: nothing can prove a replica has the write
+        router.note_write(None)
+        assert router.choose() is None
+
+        router.note_write("0/500")
+        a, b = router.endpoints
+        a.replay_lsn, b.replay_lsn = parse_lsn("0/400"), parse_lsn("0/500")
+        assert all(router.choose() is b for _ in range(20))
+
+        b.replay_lsn = parse_lsn("0/4FF")
+        assert router.choose() is None
+        assert router.primary_reads == 2
+
+    def test_staleness_window_expires(self):
+        router = self._router(staleness_window=0.0)
+        router.note_write(None)
+
+        assert router.choose() is not None
+
+    def test_lagging_replica_stays_excluded_after_window(self):
+        from memory_service.replica_router import parse_lsn
+
+        router = self._router(staleness_window=0.0)
+        router.note_write("0/500")
+        a, b = router.endpoints
+        a.replay_lsn, b.replay_lsn = parse_lsn("0/100"), parse_lsn("0/600")
+
+        assert all(router.choose() is b for _ in range(10))
+
+    @pytest.mark.asyncio
+    async def test_choose_fresh_rechecks_replay_lsn_on_demand(self, cluster):
+        from memory_service.replica_router import parse_lsn
+
+        nodes, _ = cluster
+        router = self._router(lsn_recheck_interval=60)
+        a, b = router.endpoints
+        a.replay_lsn = b.replay_lsn = parse_lsn("0/100")
+        router.note_write("0/500")
+        # The replicas have replayed the write since their last probe
+        nodes['replica-a'].lsn = nodes['replica-b'].lsn = "0/500"
+
+        assert router.choose() is None
+        assert await router.choose_fresh() is not None
+        assert router.lsn_rechecks == 2
+
+        # Behind again, but checked within the interval: no new round trip
+        router.note_write("0/900")
+        assert await router.choose_fresh() is None
+        assert router.lsn_rechecks == 2
+        await router.close()
+
+    def test_selection_prefers_low_latency_replicas(self):
+        router = self._router()
+        fast, slow = router.endpoints
+        fast.latency_ms, slow.latency_ms = 1.0, 9.0
+
+        random.seed(7)
+        picks = [router.choose() for _ in range(1000)]
+
+        assert 850 < picks.count(fast) < 950
+
+    def test_failures_take_replica_out_of_rotation(self):
+        router = self._router(failure_threshold=2, retry_after=60)
+        a, b = router.endpoints
+
+        router.record_failure(a, ConnectionError("reset"))
+        assert all(router.choose() is b for _ in range(10))
+        router.record_failure(a, ConnectionError("reset"))
+        assert not a.healthy
+        assert a.stats()['last_error'] == "reset"
+
+        router.record_failure(b, ConnectionError("reset"))
+        assert router.choose() is None
+
+
+class TestPgVectorReplicaRouting:
+    """PgVectorProvider reads on replicas, writes and fallbacks on the primary."""
+
+    @pytest.mark.asyncio
+    async def test_reads_go_to_replicas_and_writes_to_primary(self, cluster):
+        nodes, _ = cluster
+        provider = await _started(nodes)
+
+        for _ in range(10):
+            await provider.query([0.1, 0.2, 0.3, 0.4], 5, {})
+        await provider.get_recent_memories(5)
+        await provider.get_stats()
+
+        assert nodes['primary'].reads == []
+        assert len(nodes['replica-a'].reads) + len(nodes['replica-b'].reads) == 12
+        assert provider.replicas.replica_reads == 12
+
+        await provider.store("hello", [0.1, 0.2, 0.3, 0.4], {})
+        assert provider.replicas.last_write_lsn is not None
+
+        # The replicas have not replayed 0/200 yet: read from the primary
+        await provider.query([0.1, 0.2, 0.3, 0.4], 5, {})
+        assert len(nodes['primary'].reads) == 1
+
+        # After the next probe shows replica-a caught up, it serves reads again
+        nodes['replica-a'].lsn = "0/200"
+        for endpoint in provider.replicas.endpoints:
+            await provider.replicas.probe(endpoint)
+        before = len(nodes['replica-a'].reads)
+        await provider.query([0.1, 0.2, 0.3, 0.4], 5, {})
+        assert len(nodes['replica-a'].reads) == before + 1
+
+        await provider.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_replica_read_retries_on_primary(self, cluster):
+        nodes, _ = cluster
+        nodes['replica-a'].fail_reads = True
+        nodes['replica-b'].fail_reads = True
+        provider = await _started(nodes)
+
+        results = await provider.query([0.1, 0.2, 0.3, 0.4], 5, {})
+
+        assert results == []
+        assert len(nodes['primary'].reads) == 1
+        assert sum(e.consecutive_failures for e in provider.replicas.endpoints) == 1
+        await provider.close()
+
+    @pytest.mark.asyncio
+    async def test_unreachable_replica_stays_out_of_rotation(self, cluster):
+        nodes, down = cluster
+        down.add('replica-b')
+        provider = await _started(nodes)
+
+        for _ in range(5):
+            await provider.get_recent_memories(5)
+
+        assert len(nodes['replica-a'].reads) == 5
+        assert nodes['replica-b'].reads == []
+        health = await provider.health_check()
+        replicas = health['details']['read_replicas']['replicas']
+        assert replicas['replica-b:5432']['healthy'] is False
+        await provider.close()
+
+    @pytest.mark.asyncio
+    async def test_routed_read_pool_for_text_search(self, cluster):
+        from memory_service.search_fix import EmergencySearchFix
+
+        nodes, _ = cluster
+        provider = await _started(nodes, read_replicas=['replica-a'])
+
+        await EmergencySearchFix(provider.read_pool, provider.table_name).text_search("hello", limit=5)
+
+        assert nodes['primary'].reads == []
+        assert nodes['replica-a'].reads
+        assert provider.replicas.endpoints[0].reads == 1
+        await provider.close()
+
+    @pytest.mark.asyncio
+    async def test_without_replicas_reads_use_primary(self, cluster):
+        nodes, _ = cluster
+        provider = await _started(nodes, read_replicas=[])
+
+        await provider.query([0.1, 0.2, 0.3, 0.4], 5, {})
+
+        assert provider.replicas is None
+        assert provider.read_pool is provider.connection_pool
+        assert len(nodes['primary'].reads) == 1
+        await provider.close()
@@ -0,0 +1,156 @@
+"""
+Tests for the startup profile, import timing and background provider readiness.
+"""
+
+import asyncio
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+
+class TestStartupProfile:
+    """Test phase recording and the report."""
+
+    def test_phases_and_report(self):
+        from memory_service.startup_profile import StartupProfile
+
+        profile = StartupProfile()
+        with profile.phase("provider.chromadb"):
+            pass
+        profile.record("embedding_model", 0.25)
+        profile.mark_serving()
+        profile.mark_ready()
+
+        report = profile.report()
+        assert set(report['phases_ms']) == {"provider.chromadb", "embedding_model"}
+        assert report['phases_ms']['embedding_model'] == 250.0
+        assert report['time_to_serving_ms'] is not None
+        assert report['time_to_ready_ms'] >= report['time_to_serving_ms']
+
+    @pytest.mark.asyncio
+    async def test_timed_awaitable(self):
+        from memory_service.startup_profile import StartupProfile
+
+        profile = StartupProfile()
+        result = await profile.timed("provider.chromadb", asyncio.to_thread(lambda: 42))
+
+        assert result == 42
+        assert "provider.chromadb" in profile.phases
+
+    def test_import_hook_times_and_restores_loader(self, tmp_path, monkeypatch):
+        from memory_service.startup_profile import StartupProfile
+
+        (tmp_path / "startup_probe_module.py").write_text("import time\ntime.sleep(0.02)\n")
+        monkeypatch.syspath_prepend(str(tmp_path))
+        profile = StartupProfile()
+        profile.install_import_hook()
+        try:
+            import startup_probe_module
+        finally:
+            profile.mark_ready()
+            sys.modules.pop('startup_probe_module', None)
+
+        assert profile.imports['startup_probe_module'] >= 20
+        assert type(startup_probe_module.__loader__).__name__ == 'SourceFileLoader'
+        assert profile._finder is None
+
+
+class TestBackgroundProviders:
+    """Test readiness and late attachment of secondary providers."""
+
+    @pytest.mark.asyncio
+    async def test_secondary_attached_after_startup(self):
+        from benchmarks.backends import InMemoryVectorProvider
+        from memory_service.api import _attach_secondary, _mark_ready_when_primary_ready
+        from memory_service.models import ProviderConfig
+        from memory_service.unified_store import UnifiedVectorStore
+
+        primary = InMemoryVectorProvider(ProviderConfig(name="pgvector", primary=True))
+        store = UnifiedVectorStore([primary], adm_enabled=False)
+        app = SimpleNamespace(state=SimpleNamespace(ready=False))
+
+        async def slow_secondary():
+            await asyncio.sleep(0.01)
+            return InMemoryVectorProvider(ProviderConfig(name="chromadb", primary=False))
+
+        await _mark_ready_when_primary_ready(app, store)
+        assert app.state.ready is True
+        assert list(store.providers) == ["pgvector"]
+
+        await _attach_secondary(store, asyncio.create_task(slow_secondary()))
+        assert list(store.providers) == ["pgvector", "chromadb"]
+        assert store.stats['provider_usage']['chromadb'] == 0
+        assert store.primary_provider is primary
+
+    @pytest.mark.asyncio
+    async def test_not_ready_when_primary_pool_fails(self):
+        from benchmarks.backends import InMemoryVectorProvider
+        from memory_service.api import _mark_ready_when_primary_ready
+        from memory_service.models import ProviderConfig
+        from memory_service.unified_store import UnifiedVectorStore
+
+        primary = InMemoryVectorProvider(ProviderConfig(name="pgvector", primary=True))
+
+        async def failing_start():
+            raise RuntimeError("connection refused")
+
+        primary.start = failing_start
+        store = UnifiedVectorStore([primary], adm_enabled=False)
+        app = SimpleNamespace(state=SimpleNamespace(ready=False))
+
+        await _mark_ready_when_primary_ready(app, store)
+        assert app.state.ready is False
+
+    @pytest.mark.asyncio
+    async def test_import_hook_removed_when_never_ready(self, monkeypatch):
+        from contextlib import asynccontextmanager
+
+        from benchmarks.backends import InMemoryVectorProvider
+        from memory_service import api
+        from memory_service.models import ProviderConfig
+        from memory_service.startup_profile import StartupProfile
+        from memory_service.unified_store import UnifiedVectorStore
+
+        profile = StartupProfile()
+        monkeypatch.setattr(api, 'startup_profile', profile)
+
+        # Primary never starts
+        primary = InMemoryVectorProvider(ProviderConfig(name="pgvector", primary=True))
+
+        async def failing_start():
+            raise RuntimeError("connection refused")
+
+        primary.start = failing_start
+        profile.install_import_hook()
+        await api._mark_ready_when_primary_ready(SimpleNamespace(state=SimpleNamespace(ready=False)),
+                                                 UnifiedVectorStore([primary], adm_enabled=False))
+        assert profile._finder is None
+
+        # Lifespan startup fails
+        @asynccontextmanager
+        async def failing_lifespan(_app):
+            raise RuntimeError("bad configuration")
+            yield
+
+        monkeypatch.setattr(api, '_service_lifespan', failing_lifespan)
+        profile.install_import_hook()
+        with pytest.raises(RuntimeError, match="bad configuration"):
+            async with api.lifespan(SimpleNamespace()):
+                pass
+        assert profile._finder is None
+
+    def test_local_model_dimension_mismatch_stops_startup(self, monkeypatch):
+        from memory_service import embedding_models
+        from memory_service.api import _create_embedding_model
+
+        monkeypatch.setenv("EMBEDDING_PROVIDER", "local")
+        monkeypatch.setenv("EMBEDDING_DIMENSIONS", "1536")
+        monkeypatch.setattr(embedding_models, 'create_embedding_model',
+                            lambda **kwargs: SimpleNamespace(dimension=384))
+
+        with pytest.raises(RuntimeError, match="EMBEDDING_DIMENSIONS=1536"):
+            _create_embedding_model()
+
+        monkeypatch.setenv("EMBEDDING_DIMENSIONS", "384")
+        assert _create_embedding_model().dimension == 384
@@ -0,0 +1,184 @@
+"""
+Tests for usage tracking: ring-buffer event storage, streaming aggregates
+(latency sketch, top-k endpoints, per-minute windows) and the ASGI
+middleware.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+
+def _event(endpoint="/memories/query", status=200, ms=10.0, user="alice", minutes_ago=0, method="POST"):
+    from memory_service.tracking import UsageEvent
+
+    return UsageEvent(
+        timestamp=datetime.utcnow() - timedelta(minutes=minutes_ago),
+        event_type='memory_query' if 'query' in endpoint else 'api_request',
+        endpoint=endpoint,
+        method=method,
+        user_id=user,
+        response_time_ms=ms,
+        status_code=status,
+        request_size_bytes=100,
+        response_size_bytes=200,
+        metadata={'n': 1}
+    )
+
+
+class TestStreamingAggregates:
+    """Tests for the sketch and top-k building blocks."""
+
+    def test_latency_sketch_quantiles_within_relative_accuracy(self):
+        from memory_service.tracking import LatencySketch
+
+        sketch = LatencySketch(relative_accuracy=0.01)
+        for value in range(1, 1001):
+            sketch.add(float(value))
+
+        assert sketch.quantile(0.5) == pytest.approx(500, rel=0.02)
+        assert sketch.quantile(0.99) == pytest.approx(990, rel=0.02)
+        assert sketch.mean == pytest.approx(500.5)
+
+    def test_space_saving_keeps_heavy_hitters(self):
+        from memory_service.tracking import SpaceSaving
+
+        counter = SpaceSaving(capacity=3)
+        for key, count in (("a", 50), ("b", 30)):
+            for _ in range(count):
+                counter.add(key)
+        for i in range(20):
+            counter.add(f"rare-{i}")
+
+        top = counter.top(2)
+        assert list(top) == ["a", "b"]
+        assert len(counter.counts) == 3
+
+
+class TestUsageCollector:
+    """Tests for the ring-buffer collector."""
+
+    def test_ring_buffer_keeps_latest_events_in_order(self):
+        from memory_service.tracking import UsageCollector
+
+        collector = UsageCollector(max_events=3)
+        for ms in range(5):
+            collector.record(_event(ms=float(ms)))
+
+        assert len(collector) == 3
+        assert [e.response_time_ms for e in collector.events] == [2.0, 3.0, 4.0]
+        exported = collector.export_events(limit=2)
+        assert '"response_time_ms": 4.0' in exported and '"response_time_ms": 2.0' not in exported
+        assert collector.total_requests == 5
+
+    def test_performance_metrics_from_window_aggregates(self):
+        from memory_service.tracking import UsageCollector
+
+        collector = UsageCollector(max_events=10, window_minutes=60)
+        for _ in range(90):
+            collector.record(_event(ms=10.0))
+        for _ in range(10):
+            collector.record(_event(endpoint="/health", status=503, ms=100.0, user="bob", method="GET"))
+        # Outside the one-hour window: counted in totals only
+        collector.record(_event(ms=5000.0, user="carol", minutes_ago=120))
+
+        metrics = collector.get_performance_metrics()
+
+        assert metrics.total_requests == 101
+        assert metrics.error_rate == pytest.approx(10 / 101)
+        assert metrics.avg_response_time_ms == pytest.approx(19.0)
+        assert metrics.p95_response_time_ms == pytest.approx(100, rel=0.02)
+        assert metrics.requests_per_minute == pytest.approx(100 / 60)
+        assert metrics.memory_operations_per_minute == pytest.approx(90 / 60)
+        assert metrics.unique_users_last_hour == 2
+
+    def test_usage_patterns(self):
+        from memory_service.tracking import UsageCollector
+
+        collector = UsageCollector(max_events=5)
+        for _ in range(3):
+            collector.record(_event())
+        collector.record(_event(endpoint="/memories/{memory_id}", status=404, user="bob", method="GET"))
+
+        patterns = collector.get_usage_patterns()
+
+        assert patterns['popular_endpoints'] == {"/memories/query": 3, "/memories/{memory_id}": 1}
+        assert patterns['error_patterns']['error_breakdown'] == {"404_/memories/{memory_id}": 1}
+        assert sum(patterns['peak_hours'].values()) == 4
+        users = patterns['user_behavior']
+        assert users['total_users'] == 2
+        assert users['top_users']['alice']['total_requests'] == 3
+        assert users['top_users']['alice']['memory_operations'] == 3
+        assert patterns['performance_trends'] == {'status': 'insufficient_data'}
+
+
+class TestUsageTrackingMiddleware:
+    """Tests for the ASGI middleware."""
+
+    def _app(self, collector):
+        from fastapi import FastAPI
+        from fastapi.responses import StreamingResponse
+        from memory_service.tracking import UsageTrackingMiddleware
+
+        app = FastAPI()
+        app.add_middleware(UsageTrackingMiddleware)
+        app.state.usage_collector = collector
+
+        @app.get("/memories/{memory_id}")
+        async def get_memory(memory_id: str):
+            return {"id": memory_id}
+
+        @app.get("/stream")
+        async def stream():
+            async def chunks():
+                yield b"abc"
+                yield b"de"
+            return StreamingResponse(chunks())
+
+        return app
+
+    def test_records_route_template_status_and_sizes(self):
+        from fastapi.testclient import TestClient
+        from memory_service.tracking import UsageCollector
+
+        collector = UsageCollector(max_events=10)
+        client = TestClient(self._app(collector))
+
+        assert client.get("/memories/abc", headers={"X-User-ID": "alice"}).json() == {"id": "abc"}
+        assert client.get("/stream").content == b"abcde"
+        client.get("/missing")
+
+        first, stream, missing = collector.events
+        assert first.endpoint == "/memories/{memory_id}"
+        assert first.event_type == 'memory_operation'
+        assert first.user_id == "alice"
+        assert first.status_code == 200
+        assert stream.response_size_bytes == 5
+        assert missing.status_code == 404
+
+    def test_events_keep_no_client_address_or_query_values(self):
+        from fastapi.testclient import TestClient
+        from memory_service.tracking import UsageCollector
+
+        collector = UsageCollector(max_events=10)
+        client = TestClient(self._app(collector))
+        headers = {"X-Forwarded-For": "203.0.113.7", "User-Agent": "curl/8.4.0 (x86_64-pc-linux-gnu)"}
+
+        client.get("/memories/abc?token=secret&user=alice", headers=headers)
+        client.get("/memories/def", headers=headers)
+        client.get("/memories/abc", headers={"X-Forwarded-For": "198.51.100.1"})
+
+        first, second, other = (event.metadata for event in collector.events)
+        assert first['query_params'] == ["token", "user"]
+        assert first['user_agent'] == "curl/8.4.0"
+        assert 'ip_address' not in first
+        assert first['client'] == second['client'] != other['client']
+        exported = collector.export_events()
+        assert "203.0.113.7" not in exported and "secret" not in exported
+
+    def test_passes_through_without_collector(self):
+        from fastapi.testclient import TestClient
+
+        client = TestClient(self._app(None))
+
+        assert client.get("/memories/abc").status_code == 200
@@ -0,0 +1,223 @@
+"""
+Tests for reduced vector storage: spec parsing, the index/query expressions,
+the over-fetch + rerank query, OpenAI shortened embeddings and recall of the
+reduced modes on the in-memory provider.
+"""
+
+import numpy as np
+import pytest
+
+
+class TestVectorStorage:
+    """Tests for VectorStorage parsing and SQL expressions."""
+
+    def test_parse_specs(self):
+        from memory_service.vector_storage import VectorStorage
+
+        full = VectorStorage.parse(None, 1536)
+        assert not full.reduced and full.label == 'full'
+        assert VectorStorage.parse('halfvec', 1536).label == 'halfvec'
+        storage = VectorStorage.parse('matryoshka:256+halfvec', 1536, overfetch=8)
+        assert (storage.ann_dim, storage.halfvec, storage.overfetch) == (256, True, 8)
+        assert storage.label == 'matryoshka:256+halfvec'
+
+    def test_parse_rejects_bad_specs(self):
+        from memory_service.vector_storage import VectorStorage
+
+        with pytest.raises(ValueError):
+            VectorStorage.parse('pq:64', 1536)
+        with pytest.raises(ValueError):
+            VectorStorage.parse('matryoshka:2048', 1536)
+
+    def test_expressions_and_index_names(self):
+        from memory_service.vector_storage import VectorStorage
+
+        full = VectorStorage.parse('full', 1536)
+        assert full.index_expression() == 'embedding'
+        assert full.query_expression() == '$1::vector'
+        assert full.index_name('vector_memories') == 'idx_vector_memories_embedding'
+
+        reduced = VectorStorage.parse('matryoshka:512+halfvec', 1536)
+        assert reduced.index_expression() == '(subvector(embedding, 1, 512)::halfvec(512))'
+        assert reduced.query_expression() == '(subvector($1::vector, 1, 512)::halfvec(512))'
+        assert reduced.opclass == 'halfvec_cosine_ops'
+        assert reduced.index_name('vector_memories') == 'idx_vector_memories_embedding_512h'
+
+        assert VectorStorage.parse('halfvec', 8).index_expression() == '(embedding::halfvec(8))'
+
+    def test_reduce_matches_index_expression(self):
+        from memory_service.vector_storage import VectorStorage
+
+        vectors = np.arange(12, dtype=np.float32).reshape(2, 6)
+        reduced = VectorStorage.parse('matryoshka:4+halfvec', 6).reduce(vectors)
+
+        assert reduced.shape == (2, 4)
+        assert reduced.dtype == np.float16
+
+
+class TestPgVectorReducedStorage:
+    """PgVectorProvider query and schema SQL under a reduced storage mode."""
+
+    def _provider(self, **config):
+        from memory_service.models import ProviderConfig
+        from memory_service.providers import PgVectorProvider
+
+        return PgVectorProvider(ProviderConfig(name="pgvector", primary=True, config={
+            'embedding_dim': 1536, 'table_name': 'vector_memories', **config
+        }))
+
+    def test_full_storage_orders_by_embedding(self):
+        provider = self._provider()
+
+        assert 'WITH candidates' not in provider._query_sql
+        assert provider.ann_index_name == 'idx_vector_memories_embedding'
+
+    def test_reduced_storage_overfetches_then_reranks(self):
+        provider = self._provider(vector_storage='matryoshka:512+halfvec', rerank_overfetch=5)
+        sql = ' '.join(provider._query_sql.split())
+
+        assert ("ORDER BY (subvector(embedding, 1, 512)::halfvec(512)) <=> "
+                "(subvector($1::vector, 1, 512)::halfvec(512)) LIMIT $2 * 5") in sql
+        assert sql.endswith("FROM candidates ORDER BY embedding <=> $1::vector LIMIT $2")
+        assert provider.ann_index_name == 'idx_vector_memories_embedding_512h'
+
+    def test_set_vector_storage_rebuilds_query(self):
+        from memory_service.vector_storage import VectorStorage
+
+        provider = self._provider()
+        provider.set_vector_storage(VectorStorage.parse('halfvec', 1536))
+
+        assert '(embedding::halfvec(1536)) <=>' in provider._query_sql
+
+    @pytest.mark.asyncio
+    async def test_reduced_index_only_built_on_empty_table(self):
+        class Conn:
+            def __init__(self, index_valid, has_rows):
+                self.index_valid = index_valid
+                self.has_rows = has_rows
+                self.statements = []
+
+            async def fetchval(self, query, *args):
+                return self.index_valid if 'pg_index' in query else self.has_rows
+
+            async def execute(self, query, *args):
+                self.statements.append(' '.join(query.split()))
+
+        provider = self._provider(vector_storage='matryoshka:512+halfvec')
+
+        empty = Conn(index_valid=None, has_rows=False)
+        await provider._ensure_ann_index(empty)
+        assert empty.statements[0].startswith(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_vector_memories_embedding_512h")
+
+        for conn in (Conn(index_valid=None, has_rows=True), Conn(index_valid=False, has_rows=False)):
+            with pytest.raises(RuntimeError, match="migration_reduced_ann_index.sql"):
+                await provider._ensure_ann_index(conn)
+            assert conn.statements == []
+
+        ready = Conn(index_valid=True, has_rows=True)
+        await provider._ensure_ann_index(ready)
+        assert ready.statements == []
+
+
+class TestOpenAIDimensions:
+    """Shortened text-embedding-3 embeddings via the dimensions parameter."""
+
+    def test_dimensions_sent_for_embedding_3_models(self):
+        pytest.importorskip("openai")
+        from memory_service.embedding_models import OpenAIEmbeddingModel
+
+        model = OpenAIEmbeddingModel(api_key="sk-test", model="text-embedding-3-small", dimensions=512)
+
+        assert model.dimension == 512
+        assert model._request_options == {'dimensions': 512}
+
+    def test_dimensions_ignored_for_older_models(self):
+        pytest.importorskip("openai")
+        from memory_service.embedding_models import OpenAIEmbeddingModel
+
+        model = OpenAIEmbeddingModel(api_key="sk-test", model="text-embedding-ada-002", dimensions=512)
+
+        assert model.dimension == 1536
+        assert model._request_options == {}
+
+
+class TestReducedRecall:
+    """The in-memory provider emulates reduced storage, so recall is measurable offline."""
+
+    @pytest.mark.asyncio
+    async def test_reduced_storage_keeps_recall_with_overfetch(self, tmp_path):
+        from benchmarks.recall import IndexConfig, generate_corpus, run_recall
+
+        corpus = generate_corpus(600, 64, num_queries=40, filtered_fraction=0.5, seed=5)
+        configs = [IndexConfig.parse("exact:ann_dim=48,halfvec=1,overfetch=4"),
+                   IndexConfig.parse("exact:ann_dim=48,halfvec=1,overfetch=1")]
+
+        results = await run_recall(['memory'], configs, corpus, 10, str(tmp_path))
+
+        overfetched, single = results
+        assert overfetched['recall_at_k'] >= 0.95
+        assert overfetched['recall_at_k'] >= single['recall_at_k']
+        assert overfetched['filtered_recall_at_k'] >= 0.95
+
+
+class TestBinaryQuantizedStorage:
+    """Binary quantization: Hamming search over sign bits, cosine rerank."""
+
+    def test_parse_and_sql(self):
+        from memory_service.vector_storage import BINARY_OVERFETCH, VectorStorage
+
+        storage = VectorStorage.parse('binary', 1536)
+        assert storage.overfetch == BINARY_OVERFETCH
+        assert storage.index_expression() == '(binary_quantize(embedding)::bit(1536))'
+        assert storage.opclass == 'bit_hamming_ops'
+        assert storage.distance_operator == '<~>'
+        assert storage.index_name('vector_memories') == 'idx_vector_memories_embedding_1536b'
+        assert VectorStorage.parse('binary', 1536, overfetch=25).overfetch == 25
+        # 32x smaller than full float32 vectors
+        assert VectorStorage.parse('full', 1536).bytes_per_vector == 32 * storage.bytes_per_vector
+
+        prefix = VectorStorage.parse('matryoshka:512+binary', 1536)
+        assert prefix.query_expression() == '(binary_quantize(subvector($1::vector, 1, 512))::bit(512))'
+
+        with pytest.raises(ValueError):
+            VectorStorage.parse('halfvec+binary', 1536)
+
+    def test_hamming_similarity(self):
+        from memory_service.vector_storage import VectorStorage
+
+        storage = VectorStorage.parse('binary', 4)
+        rows = storage.reduce(np.array([[1, 1, -1, -1], [1, -1, 1, -1], [-1, -1, 1, 1]]))
+        scores = storage.similarity(rows, storage.reduce(np.array([1, 1, -1, 1])))
+
+        assert scores.tolist() == [-1.0, -3.0, -3.0]
+
+    def test_query_is_one_statement_with_hamming_stage(self):
+        from memory_service.models import ProviderConfig
+        from memory_service.providers import PgVectorProvider
+
+        provider = PgVectorProvider(ProviderConfig(name="pgvector", primary=True, config={
+            'embedding_dim': 1536, 'vector_storage': 'binary', 'rerank_overfetch': 20
+        }))
+        sql = ' '.join(provider._query_sql.split())
+
+        assert ("ORDER BY (binary_quantize(embedding)::bit(1536)) <~> "
+                "(binary_quantize($1::vector)::bit(1536)) LIMIT $2 * 20") in sql
+        assert sql.endswith("ORDER BY embedding <=> $1::vector LIMIT $2")
+
+    @pytest.mark.asyncio
+    async def test_oversampling_recovers_recall(self, tmp_path):
+        from benchmarks.recall import IndexConfig, generate_corpus, run_recall
+
+        corpus = generate_corpus(800, 64, num_queries=40, seed=6)
+        configs = [IndexConfig.parse("exact:binary=1,overfetch=1"),
+                   IndexConfig.parse("exact:binary=1,overfetch=20")]
+
+        results = await run_recall(['memory', 'lite'], configs, corpus, 10, str(tmp_path),
+                                   target_recall=0.9)
+
+        # The lite store has no reduced storage, so only the in-memory provider runs
+        assert [r['provider'] for r in results] == ['memory', 'memory']
+        single, oversampled = results
+        assert oversampled['recall_at_k'] > single['recall_at_k']
+        assert oversampled['meets_target'] and not single['meets_target']
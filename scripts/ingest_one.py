@@ -4,26 +4,27 @@ Day-1 Vertical Slice: Ingest ONE document
 Usage: python scripts/ingest_one.py [document_text]
 """
 
-import hashlib
 import os
 import sys
 import time
 import uuid
 
-# Add the python package to path
+# Add the python packages to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'python'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'python', 'memory_service', 'src'))
 
 from core_memory_slice import LiteGraphStore, LiteVectorStore
+from memory_service.embedding_models import MockEmbeddingModel
+
+_mock_model: MockEmbeddingModel | None = None
 
 
 def create_mock_embedding(text: str, dim: int = 1536) -> list[float]:
-    """Create deterministic mock embedding for testing"""
-    hash_bytes = hashlib.md5(text.encode()).digest()
-    embedding = []
-    for i in range(dim):
-        byte_idx = i % len(hash_bytes)
-        embedding.append(float(hash_bytes[byte_idx]) / 255.0)
-    return embedding
+    """Create deterministic mock embedding for testing (shared with the memory service)"""
+    global _mock_model
+    if _mock_model is None or _mock_model.dimension != dim:
+        _mock_model = MockEmbeddingModel(dimension=dim)
+    return _mock_model.encode([text])[0].tolist()
 
 
 def ingest_document(content: str, data_dir: str = "./slice_data") -> dict:
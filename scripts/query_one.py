@@ -4,7 +4,6 @@ Day-1 Vertical Slice: Query stored documents
 Usage: python scripts/query_one.py [query_text]
 """
 
-import hashlib
 import os
 import sys
 import time
@@ -13,16 +12,7 @@ import time
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'python'))
 
 from core_memory_slice import LiteGraphStore, LiteVectorStore
-
-
-def create_mock_embedding(text: str, dim: int = 1536) -> list[float]:
-    """Create deterministic mock embedding for testing"""
-    hash_bytes = hashlib.md5(text.encode()).digest()
-    embedding = []
-    for i in range(dim):
-        byte_idx = i % len(hash_bytes)
-        embedding.append(float(hash_bytes[byte_idx]) / 255.0)
-    return embedding
+from ingest_one import create_mock_embedding
 
 
 def query_documents(query: str, data_dir: str = "./slice_data", k: int = 3) -> dict: